@@ -0,0 +1,83 @@
+from typing import List, Optional, Tuple
+
+from app.adapters.internal import async_dynamodb_base
+from app.domain.model import product, product_version
+from app.domain.ports import async_products_query_service, products_query_service
+
+
+class AsyncDynamoDBProductsQueryService(
+    async_products_query_service.AsyncProductsQueryService
+):
+    """
+    Asynchronous facade of a DynamoDB products query service, cached or not.
+    Each read runs on the thread pool of the async DynamoDB client, so reads
+    awaited together run concurrently and share the cache of the wrapped service.
+    """
+
+    def __init__(
+        self,
+        query_service: products_query_service.ProductsQueryService,
+        dynamodb_client: async_dynamodb_base.AsyncDynamoDBClient,
+    ):
+        self._query_service = query_service
+        self._dynamodb_client = dynamodb_client
+
+    async def list_products(
+        self,
+        page_size: int,
+        next_token: Optional[str],
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[product.Product], Optional[str]]:
+        """Returns a page of products ordered by creation date."""
+        return await self._dynamodb_client.run(
+            self._query_service.list_products,
+            page_size=page_size,
+            next_token=next_token,
+            fields=fields,
+        )
+
+    async def get_product_by_id(
+        self,
+        product_id: str,
+        fields: Optional[List[str]] = None,
+        consistent_read: bool = False,
+    ) -> Optional[product.Product]:
+        """Returns a single product by ID."""
+        return await self._dynamodb_client.run(
+            self._query_service.get_product_by_id,
+            product_id=product_id,
+            fields=fields,
+            consistent_read=consistent_read,
+        )
+
+    async def get_products_by_ids(
+        self, product_ids: List[str], consistent_read: bool = False
+    ) -> List[product.Product]:
+        """Returns products by IDs in the requested order, skipping missing ones."""
+        return await self._dynamodb_client.run(
+            self._query_service.get_products_by_ids,
+            product_ids=product_ids,
+            consistent_read=consistent_read,
+        )
+
+    async def list_product_versions(
+        self,
+        product_id: str,
+        limit: int,
+        next_token: Optional[str] = None,
+        since: Optional[str] = None,
+        consistent_read: bool = False,
+    ) -> Tuple[List[product_version.ProductVersion], Optional[str]]:
+        """Returns a page of the versions of a product, newest first."""
+        return await self._dynamodb_client.run(
+            self._query_service.list_product_versions,
+            product_id=product_id,
+            limit=limit,
+            next_token=next_token,
+            since=since,
+            consistent_read=consistent_read,
+        )
+
+    async def invalidate_product(self, product_id: str) -> None:
+        """Drops the product from the cache of the wrapped service."""
+        self._query_service.invalidate_product(product_id)
@@ -0,0 +1,234 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.adapters.internal import ttl_lru_cache
+from app.domain.model import product, product_version
+from app.domain.ports import product_projections, products_query_service
+
+NOT_FOUND_SIZE_BYTES = 64
+MAX_TRACKED_GENERATIONS = 10000
+
+
+class CachedProductsQueryService(products_query_service.ProductsQueryService):
+    """
+    Read-through cache for single product reads.
+    The cache lives as long as the execution environment and is shared by
+    all requests it serves. Missing products are cached for a shorter time.
+
+    Each invalidation bumps a generation of the product, and a read is only
+    cached if the generation did not change while it was in flight, so a read
+    started before a write cannot cache the product as it was before it.
+    """
+
+    def __init__(
+        self,
+        query_service: products_query_service.ProductsQueryService,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+        not_found_ttl_seconds: float,
+        change_feed: Optional[product_projections.ProductChangeFeed] = None,
+        change_feed_poll_interval_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._query_service = query_service
+        self._not_found_ttl_seconds = not_found_ttl_seconds
+        self._cache = ttl_lru_cache.TTLLRUCache(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            ttl_seconds=ttl_seconds,
+            clock=clock,
+        )
+        self._change_feed = change_feed
+        self._change_feed_poll_interval_seconds = change_feed_poll_interval_seconds
+        self._clock = clock
+        self._change_feed_lock = threading.Lock()
+        self._change_feed_position: Optional[Tuple[int, ...]] = None
+        self._next_change_feed_poll = 0.0
+        self._generation_lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+        self._generations_epoch = 0
+
+    def list_products(
+        self,
+        page_size: int,
+        next_token: Optional[str],
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[product.Product], Optional[str]]:
+        """Returns a page of products from the underlying query service."""
+        return self._query_service.list_products(
+            page_size=page_size, next_token=next_token, fields=fields
+        )
+
+    def get_product_by_id(
+        self,
+        product_id: str,
+        fields: Optional[List[str]] = None,
+        consistent_read: bool = False,
+    ) -> Optional[product.Product]:
+        """
+        Returns a single product by ID, from the cache when possible.
+        Partial products read for the given fields are not cached.
+        Consistent reads skip the cache and refresh it with the product read.
+        """
+        self._apply_change_feed()
+        if not consistent_read:
+            cached = self._cache.get(product_id)
+            if cached is not ttl_lru_cache.MISSING:
+                return cached
+        if fields is not None:
+            return self._query_service.get_product_by_id(
+                product_id=product_id, fields=fields, consistent_read=consistent_read
+            )
+
+        generation = self._generation(product_id)
+        product_obj = self._query_service.get_product_by_id(
+            product_id=product_id, consistent_read=consistent_read
+        )
+        self._store(product_id, product_obj, generation)
+        return product_obj
+
+    def get_products_by_ids(
+        self, product_ids: List[str], consistent_read: bool = False
+    ) -> List[product.Product]:
+        """
+        Returns products by IDs, reading only the uncached ones.
+        Consistent reads skip the cache and refresh it with the products read.
+        """
+        self._apply_change_feed()
+        if consistent_read:
+            generations = {
+                product_id: self._generation(product_id)
+                for product_id in dict.fromkeys(product_ids)
+            }
+            products = self._query_service.get_products_by_ids(
+                product_ids=product_ids, consistent_read=True
+            )
+            found = {p.id: p for p in products}
+            for product_id, generation in generations.items():
+                self._store(product_id, found.get(product_id), generation)
+            return products
+
+        cached_products = {}
+        missing_ids = []
+        for product_id in dict.fromkeys(product_ids):
+            cached = self._cache.get(product_id)
+            if cached is ttl_lru_cache.MISSING:
+                missing_ids.append(product_id)
+            else:
+                cached_products[product_id] = cached
+
+        if missing_ids:
+            generations = [self._generation(product_id) for product_id in missing_ids]
+            fetched = {
+                p.id: p
+                for p in self._query_service.get_products_by_ids(
+                    product_ids=missing_ids
+                )
+            }
+            for product_id, generation in zip(missing_ids, generations):
+                cached_products[product_id] = fetched.get(product_id)
+                self._store(product_id, fetched.get(product_id), generation)
+
+        return [
+            cached_products[product_id]
+            for product_id in dict.fromkeys(product_ids)
+            if cached_products[product_id] is not None
+        ]
+
+    def list_product_versions(
+        self,
+        product_id: str,
+        limit: int,
+        next_token: Optional[str] = None,
+        since: Optional[str] = None,
+        consistent_read: bool = False,
+    ) -> Tuple[List[product_version.ProductVersion], Optional[str]]:
+        """Returns a page of product versions from the underlying query service."""
+        return self._query_service.list_product_versions(
+            product_id=product_id,
+            limit=limit,
+            next_token=next_token,
+            since=since,
+            consistent_read=consistent_read,
+        )
+
+    def invalidate_product(self, product_id: str) -> None:
+        """Drops the cached product, and any read of it still in flight."""
+        self._invalidate(product_id)
+        self._query_service.invalidate_product(product_id)
+
+    def _apply_change_feed(self) -> None:
+        """
+        Invalidates products changed in other containers.
+        Polls the change feed at most once per interval.
+        """
+        if not self._change_feed or self._clock() < self._next_change_feed_poll:
+            return
+        if not self._change_feed_lock.acquire(blocking=False):
+            return
+
+        try:
+            self._next_change_feed_poll = (
+                self._clock() + self._change_feed_poll_interval_seconds
+            )
+            position, product_ids = self._change_feed.get_changed_product_ids(
+                since_position=self._change_feed_position or ()
+            )
+            if self._change_feed_position is None or product_ids is None:
+                self._clear()
+            else:
+                for product_id in product_ids:
+                    self._invalidate(product_id)
+            self._change_feed_position = position
+        except Exception:
+            # Cached entries still expire after their TTL, so a failed poll
+            # only delays invalidation until the next one.
+            return
+        finally:
+            self._change_feed_lock.release()
+
+    def _generation(self, product_id: str) -> Tuple[int, int]:
+        with self._generation_lock:
+            return self._generations_epoch, self._generations.get(product_id, 0)
+
+    def _invalidate(self, product_id: str) -> None:
+        with self._generation_lock:
+            if len(self._generations) >= MAX_TRACKED_GENERATIONS:
+                # A new epoch stands for a bump of every product.
+                self._generations.clear()
+                self._generations_epoch += 1
+            self._generations[product_id] = self._generations.get(product_id, 0) + 1
+            self._cache.invalidate(product_id)
+
+    def _clear(self) -> None:
+        with self._generation_lock:
+            self._generations.clear()
+            self._generations_epoch += 1
+            self._cache.clear()
+
+    def _store(
+        self,
+        product_id: str,
+        product_obj: Optional[product.Product],
+        generation: Tuple[int, int],
+    ) -> None:
+        """Caches a read, unless the product was invalidated since it started."""
+        with self._generation_lock:
+            if generation != (
+                self._generations_epoch,
+                self._generations.get(product_id, 0),
+            ):
+                return
+            if product_obj is None:
+                self._cache.put(
+                    product_id,
+                    None,
+                    size_bytes=NOT_FOUND_SIZE_BYTES,
+                    ttl_seconds=self._not_found_ttl_seconds,
+                )
+            else:
+                self._cache.put(
+                    product_id, product_obj, size_bytes=len(product_obj.json())
+                )
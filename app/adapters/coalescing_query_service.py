@@ -0,0 +1,110 @@
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from app.adapters.internal import single_flight
+from app.domain.model import product, product_version
+from app.domain.ports import products_query_service
+
+
+class CoalescingProductsQueryService(products_query_service.ProductsQueryService):
+    """
+    Coalesces concurrent reads of the same product within the container, so at
+    most one read per product is in flight for single and batch reads.
+    A read that starts while another one is in flight gets that read's result,
+    which is never older than a read made by the caller itself would be.
+    Consistent reads are not coalesced, because a read in flight may have
+    started before a write the caller expects to see.
+    """
+
+    def __init__(
+        self,
+        query_service: products_query_service.ProductsQueryService,
+        coalescer: single_flight.SingleFlight,
+    ):
+        self._query_service = query_service
+        self._coalescer = coalescer
+
+    def list_products(
+        self,
+        page_size: int,
+        next_token: Optional[str],
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[product.Product], Optional[str]]:
+        """Returns a page of products from the underlying query service."""
+        return self._query_service.list_products(
+            page_size=page_size, next_token=next_token, fields=fields
+        )
+
+    def get_product_by_id(
+        self,
+        product_id: str,
+        fields: Optional[List[str]] = None,
+        consistent_read: bool = False,
+    ) -> Optional[product.Product]:
+        """Returns a single product by ID, joining an identical read in flight."""
+        if consistent_read:
+            return self._query_service.get_product_by_id(
+                product_id=product_id, fields=fields, consistent_read=True
+            )
+        return self._coalescer.do(
+            self._read_key(product_id, fields),
+            lambda: self._query_service.get_product_by_id(
+                product_id=product_id, fields=fields
+            ),
+        )
+
+    def get_products_by_ids(
+        self, product_ids: List[str], consistent_read: bool = False
+    ) -> List[product.Product]:
+        """
+        Returns products by IDs in the requested order, skipping missing ones.
+        Products already being read are awaited, the rest are read in one batch.
+        """
+        if consistent_read:
+            return self._query_service.get_products_by_ids(
+                product_ids=product_ids, consistent_read=True
+            )
+        results = self._coalescer.do_many(
+            [self._read_key(product_id) for product_id in product_ids],
+            self._read_products,
+        )
+        return [
+            results[key]
+            for key in dict.fromkeys(
+                self._read_key(product_id) for product_id in product_ids
+            )
+            if results[key] is not None
+        ]
+
+    def list_product_versions(
+        self,
+        product_id: str,
+        limit: int,
+        next_token: Optional[str] = None,
+        since: Optional[str] = None,
+        consistent_read: bool = False,
+    ) -> Tuple[List[product_version.ProductVersion], Optional[str]]:
+        """Returns a page of product versions from the underlying query service."""
+        return self._query_service.list_product_versions(
+            product_id=product_id,
+            limit=limit,
+            next_token=next_token,
+            since=since,
+            consistent_read=consistent_read,
+        )
+
+    def invalidate_product(self, product_id: str) -> None:
+        """Drops any state cached for the product by the underlying service."""
+        self._query_service.invalidate_product(product_id)
+
+    def _read_products(self, keys: List[Hashable]) -> Dict[Hashable, Any]:
+        products = self._query_service.get_products_by_ids(
+            product_ids=[product_id for product_id, _ in keys]  # type: ignore
+        )
+        return {self._read_key(product_obj.id): product_obj for product_obj in products}
+
+    @staticmethod
+    def _read_key(
+        product_id: str, fields: Optional[List[str]] = None
+    ) -> Tuple[str, Optional[Tuple[str, ...]]]:
+        """Full and partial reads of a product are coalesced separately."""
+        return product_id, tuple(fields) if fields is not None else None
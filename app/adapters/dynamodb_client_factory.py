@@ -0,0 +1,49 @@
+import typing
+
+import boto3
+from botocore import config
+
+if typing.TYPE_CHECKING:
+    from mypy_boto3_dynamodb import client
+
+# Defaults sized for a Lambda function that fans out reads and bulk writes
+# over a few threads. Every adapter of an entry point shares one client.
+MAX_POOL_CONNECTIONS = 25
+CONNECT_TIMEOUT_SECONDS = 1.0
+READ_TIMEOUT_SECONDS = 3.0
+TOTAL_MAX_ATTEMPTS = 5
+RETRY_MODE = "adaptive"
+TCP_KEEPALIVE = True
+
+
+def create_dynamodb_client(
+    region_name: typing.Optional[str] = None,
+    max_pool_connections: int = MAX_POOL_CONNECTIONS,
+    connect_timeout_seconds: float = CONNECT_TIMEOUT_SECONDS,
+    read_timeout_seconds: float = READ_TIMEOUT_SECONDS,
+    total_max_attempts: int = TOTAL_MAX_ATTEMPTS,
+    retry_mode: str = RETRY_MODE,
+    tcp_keepalive: bool = TCP_KEEPALIVE,
+) -> "client.DynamoDBClient":
+    """
+    Creates a low-level DynamoDB client. Adapters exchange AttributeValue maps
+    with it, converted by the attribute_value_codec module.
+
+    The connection pool should be at least as large as the number of threads
+    calling the client at once, or calls wait for a free connection.
+    The adaptive retry mode adds client-side rate limiting with a token bucket
+    that slows down requests while DynamoDB throttles them. Short timeouts
+    retry stalled connections instead of waiting on them, and TCP keep-alive
+    keeps idle pooled connections open between invocations.
+    """
+    return boto3.session.Session().client(
+        "dynamodb",
+        region_name=region_name,
+        config=config.Config(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=connect_timeout_seconds,
+            read_timeout=read_timeout_seconds,
+            retries={"mode": retry_mode, "total_max_attempts": total_max_attempts},
+            tcp_keepalive=tcp_keepalive,
+        ),
+    )
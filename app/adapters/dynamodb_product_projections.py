@@ -0,0 +1,322 @@
+import secrets
+import typing
+
+from app.adapters.dynamodb_unit_of_work import (
+    PRODUCT_CODEC,
+    DBIndex,
+    DBPrefix,
+    DynamoDBProductsRepository,
+)
+from app.adapters.internal import attribute_value_codec, dynamodb_base
+from app.domain.exceptions.repository_exception import RepositoryException
+from app.domain.model import product, product_change
+from app.domain.ports import product_projections
+
+if typing.TYPE_CHECKING:
+    from mypy_boto3_dynamodb import client
+
+# Kept small, as every rebuild writes and every read is billed for the whole item.
+LISTING_HEAD_SIZE = 25
+LISTING_HEAD_MAX_BYTES = 16 * 1024
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_ATTEMPTS = 5
+CHANGE_LOG_SHARDS = 8
+CHANGE_LOG_SIZE = 200
+CHANGE_LOG_MAX_ATTEMPTS = 5
+
+
+def generate_listing_head_key() -> dict:
+    """Generates primary key for the materialized first page of the products listing."""
+    return {
+        "PK": DBPrefix.PRODUCT_LISTING.value,
+        "SK": f"{DBPrefix.PRODUCT_LISTING.value}#HEAD",
+    }
+
+
+def generate_change_log_key(shard: int) -> dict:
+    """
+    Generates primary key for a shard of the product change log. Each shard
+    is in its own partition, so concurrent writers rarely contend.
+    """
+    return {
+        "PK": f"{DBPrefix.CHANGE_LOG.value}#{shard}",
+        "SK": DBPrefix.CHANGE_LOG.value,
+    }
+
+
+def generate_listing_sort_key(product_id: str, create_date: str) -> str:
+    """Generates the position of a product in the products listing."""
+    return DynamoDBProductsRepository.generate_product_index_key(
+        product_id=product_id, create_date=create_date
+    )["GSI1SK"]
+
+
+class DynamoDBProductProjections(product_projections.ProductProjections):
+    """
+    Maintains read-side projections of products in the DynamoDB table:
+    a bounded change log that containers poll to invalidate their caches, and
+    optionally the first page of the products listing stored as a single item.
+    The change log is split into shards, and each batch of changes is appended
+    to a random shard, so stream batches processed at the same time do not all
+    compare and swap the same item.
+
+    The listing head is rebuilt from products read consistently from the base
+    table. The GSI1 index only supplies candidates, together with the products
+    already in the head and the changed ones, so a product the index still
+    lists after its deletion, or does not list yet, is placed correctly.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        dynamodb_client: "client.DynamoDBClient",
+        maintain_listing_head: bool = False,
+    ):
+        self._table_name = table_name
+        self._dynamodb_client = dynamodb_client
+        self._maintain_listing_head = maintain_listing_head
+
+    def apply_changes(self, changes: typing.List[product_change.ProductChange]) -> None:
+        """Records the changes in the change log and refreshes the listing head."""
+        self._append_to_change_log([change.id for change in changes])
+
+        if self._maintain_listing_head:
+            listing_head = self._get_listing_head()
+            if self._affects_listing_head(listing_head, changes):
+                self._rebuild_listing_head(listing_head, changes)
+
+    def _append_to_change_log(self, product_ids: typing.List[str]) -> None:
+        for _ in range(CHANGE_LOG_MAX_ATTEMPTS):
+            change_log_key = generate_change_log_key(
+                secrets.randbelow(CHANGE_LOG_SHARDS)
+            )
+            response = self._dynamodb_client.get_item(
+                TableName=self._table_name,
+                Key=attribute_value_codec.serialize_item(change_log_key),
+                ConsistentRead=True,
+            )
+            change_log = attribute_value_codec.deserialize_item(
+                response.get("Item", {})
+            )
+            sequence = int(change_log["sequence"]) if change_log else 0
+            entries = change_log["changes"] if change_log else []
+
+            new_sequence = sequence + 1
+            entries = entries + [
+                {"id": product_id, "sequence": new_sequence}
+                for product_id in product_ids
+            ]
+            try:
+                self._dynamodb_client.put_item(
+                    TableName=self._table_name,
+                    Item=attribute_value_codec.serialize_item(
+                        {
+                            **change_log_key,
+                            "sequence": new_sequence,
+                            "changes": entries[-CHANGE_LOG_SIZE:],
+                        }
+                    ),
+                    ConditionExpression=(
+                        "attribute_not_exists(PK) OR #sequence = :sequence"
+                    ),
+                    ExpressionAttributeNames={"#sequence": "sequence"},
+                    ExpressionAttributeValues={":sequence": {"N": str(sequence)}},
+                )
+                return
+            except self._dynamodb_client.exceptions.ConditionalCheckFailedException:
+                continue
+
+        raise RepositoryException("Failed to append to the product change log.")
+
+    def _get_listing_head(self) -> typing.List[product.Product]:
+        response = self._dynamodb_client.get_item(
+            TableName=self._table_name,
+            Key=attribute_value_codec.serialize_item(generate_listing_head_key()),
+            ConsistentRead=True,
+        )
+        listing_head = response.get("Item")
+        if not listing_head:
+            return []
+        return [
+            PRODUCT_CODEC.unmarshal(item["M"]) for item in listing_head["products"]["L"]
+        ]
+
+    @staticmethod
+    def _affects_listing_head(
+        listing_head: typing.List[product.Product],
+        changes: typing.List[product_change.ProductChange],
+    ) -> bool:
+        if len(listing_head) < LISTING_HEAD_SIZE:
+            return True
+
+        last_product = listing_head[-1]
+        last_sort_key = generate_listing_sort_key(
+            last_product.id, last_product.createDate
+        )
+        return any(
+            not change.createDate
+            or generate_listing_sort_key(change.id, change.createDate) <= last_sort_key
+            for change in changes
+        )
+
+    def _rebuild_listing_head(
+        self,
+        listing_head: typing.List[product.Product],
+        changes: typing.List[product_change.ProductChange],
+    ) -> None:
+        result = self._dynamodb_client.query(
+            TableName=self._table_name,
+            IndexName=DBIndex.PRODUCTS_BY_CREATE_DATE.value,
+            KeyConditionExpression="GSI1PK = :partition_key",
+            ExpressionAttributeValues={":partition_key": {"S": DBPrefix.PRODUCT.value}},
+            **dynamodb_base.projection_expression(["id", "GSI1SK"]),
+            Limit=LISTING_HEAD_SIZE,
+        )
+        indexed_items = [
+            attribute_value_codec.deserialize_item(item) for item in result["Items"]
+        ]
+        # Products after the last indexed one may be preceded by unread ones.
+        last_sort_key = (
+            indexed_items[-1]["GSI1SK"]
+            if "LastEvaluatedKey" in result and indexed_items
+            else None
+        )
+
+        candidate_ids = list(
+            dict.fromkeys(
+                [item["id"] for item in indexed_items]
+                + [p.id for p in listing_head]
+                + [
+                    change.id
+                    for change in changes
+                    if change.changeType != product_change.ProductChangeType.REMOVE
+                ]
+            )
+        )
+        listed = sorted(
+            (
+                (generate_listing_sort_key(p.id, p.createDate), p)
+                for p in self._get_products_consistently(candidate_ids)
+            ),
+            key=lambda listed_product: listed_product[0],
+        )
+        if last_sort_key is not None:
+            listed = [
+                (sort_key, p) for sort_key, p in listed if sort_key <= last_sort_key
+            ]
+
+        products = []
+        size_bytes = 0
+        for _, product_obj in listed[:LISTING_HEAD_SIZE]:
+            size_bytes += len(product_obj.json())
+            if size_bytes > LISTING_HEAD_MAX_BYTES:
+                break
+            products.append({"M": PRODUCT_CODEC.marshal(product_obj)})
+
+        self._dynamodb_client.put_item(
+            TableName=self._table_name,
+            Item={
+                **attribute_value_codec.serialize_item(generate_listing_head_key()),
+                "products": {"L": products},
+                "hasMore": {
+                    "BOOL": len(products) < len(listed) or last_sort_key is not None
+                },
+            },
+        )
+
+    def _get_products_consistently(
+        self, product_ids: typing.List[str]
+    ) -> typing.List[product.Product]:
+        """Reads existing products with strongly consistent BatchGetItem calls."""
+        products = []
+        for chunk in dynamodb_base.chunked(product_ids, BATCH_GET_MAX_KEYS):
+            request_items: dict = {
+                self._table_name: {
+                    "Keys": [
+                        attribute_value_codec.serialize_item(
+                            DynamoDBProductsRepository.generate_product_key(id)
+                        )
+                        for id in chunk
+                    ],
+                    "ConsistentRead": True,
+                }
+            }
+            for _ in range(BATCH_GET_MAX_ATTEMPTS):
+                result = self._dynamodb_client.batch_get_item(
+                    RequestItems=request_items
+                )
+                products.extend(
+                    PRODUCT_CODEC.unmarshal(item)
+                    for item in result["Responses"].get(self._table_name, [])
+                )
+                request_items = result.get("UnprocessedKeys") or {}
+                if not request_items:
+                    break
+            else:
+                raise RepositoryException(
+                    "Failed to read the products of the listing head."
+                )
+        return products
+
+
+class DynamoDBProductChangeFeed(product_projections.ProductChangeFeed):
+    """
+    Reads the product change log maintained by DynamoDBProductProjections.
+    A position holds the sequence of every shard of the log.
+    """
+
+    def __init__(self, table_name: str, dynamodb_client: "client.DynamoDBClient"):
+        self._table_name = table_name
+        self._dynamodb_client = dynamodb_client
+
+    def get_changed_product_ids(
+        self, since_position: typing.Tuple[int, ...]
+    ) -> typing.Tuple[typing.Tuple[int, ...], typing.Optional[typing.List[str]]]:
+        """Returns the latest position and the IDs changed after since_position."""
+        change_logs = self._get_change_logs()
+        position = tuple(
+            int(change_log["sequence"]) if change_log else 0
+            for change_log in change_logs
+        )
+        if not since_position:
+            since_position = (0,) * CHANGE_LOG_SHARDS
+        if len(since_position) != CHANGE_LOG_SHARDS:
+            return position, None
+
+        product_ids: typing.List[str] = []
+        for change_log, since_sequence in zip(change_logs, since_position):
+            if not change_log:
+                continue
+            sequence = int(change_log["sequence"])
+            entries = change_log["changes"]
+            if sequence < since_sequence or (
+                len(entries) >= CHANGE_LOG_SIZE
+                and int(entries[0]["sequence"]) > since_sequence
+            ):
+                return position, None
+            product_ids.extend(
+                entry["id"]
+                for entry in entries
+                if int(entry["sequence"]) > since_sequence
+            )
+
+        return position, list(dict.fromkeys(product_ids))
+
+    def _get_change_logs(self) -> typing.List[typing.Optional[dict]]:
+        """Reads every shard of the change log in one batch, None for empty ones."""
+        keys = [generate_change_log_key(shard) for shard in range(CHANGE_LOG_SHARDS)]
+        response = self._dynamodb_client.batch_get_item(
+            RequestItems={
+                self._table_name: {
+                    "Keys": [attribute_value_codec.serialize_item(key) for key in keys]
+                }
+            }
+        )
+        if response.get("UnprocessedKeys"):
+            raise RepositoryException("Failed to read the product change log.")
+
+        change_logs = {}
+        for item in response["Responses"].get(self._table_name, []):
+            change_log = attribute_value_codec.deserialize_item(item)
+            change_logs[change_log["PK"]] = change_log
+        return [change_logs.get(key["PK"]) for key in keys]
@@ -0,0 +1,101 @@
+import queue
+import threading
+import typing
+from concurrent import futures
+
+from app.adapters.dynamodb_unit_of_work import PRODUCT_CODEC, DBIndex
+from app.domain.exceptions.repository_exception import RepositoryException
+from app.domain.model import product
+from app.domain.ports import product_export
+
+if typing.TYPE_CHECKING:
+    from mypy_boto3_dynamodb import client
+
+TOTAL_SEGMENTS = 8
+MAX_EXPORT_WORKERS = 8
+QUEUED_PAGES_PER_WORKER = 2
+QUEUE_POLL_SECONDS = 0.1
+
+_SEGMENT_DONE = object()
+
+
+class DynamoDBProductsExportSource(product_export.ProductsExportSource):
+    """
+    Reads all products with a parallel scan of the sparse products index.
+    Each segment is scanned by a worker thread, and pages are handed over
+    through a bounded queue, so memory use depends on the number of workers
+    and not on the number of products.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        dynamodb_client: "client.DynamoDBClient",
+        total_segments: int = TOTAL_SEGMENTS,
+        max_workers: int = MAX_EXPORT_WORKERS,
+    ):
+        self._table_name = table_name
+        self._dynamodb_client = dynamodb_client
+        self._total_segments = total_segments
+        self._max_workers = max_workers
+
+    def read_products(self) -> typing.Iterator[typing.List[product.Product]]:
+        """Yields products page by page as the segment scans return them."""
+        pages: queue.Queue = queue.Queue(
+            maxsize=self._max_workers * QUEUED_PAGES_PER_WORKER
+        )
+        stop = threading.Event()
+
+        with futures.ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for segment in range(self._total_segments):
+                executor.submit(self._scan_segment, segment, pages, stop)
+
+            try:
+                finished_segments = 0
+                while finished_segments < self._total_segments:
+                    page = pages.get()
+                    if page is _SEGMENT_DONE:
+                        finished_segments += 1
+                    elif isinstance(page, Exception):
+                        raise RepositoryException(
+                            "Failed to scan products for export."
+                        ) from page
+                    else:
+                        yield page
+            finally:
+                # Unblocks workers waiting for queue space when the export
+                # fails or the consumer stops early.
+                stop.set()
+
+    def _scan_segment(
+        self, segment: int, pages: queue.Queue, stop: threading.Event
+    ) -> None:
+        scan_kwargs = {
+            "TableName": self._table_name,
+            "IndexName": DBIndex.PRODUCTS_BY_CREATE_DATE.value,
+            "Segment": segment,
+            "TotalSegments": self._total_segments,
+        }
+        try:
+            while not stop.is_set():
+                result = self._dynamodb_client.scan(**scan_kwargs)
+                products = [PRODUCT_CODEC.unmarshal(item) for item in result["Items"]]
+                if products:
+                    self._put(pages, products, stop)
+                if "LastEvaluatedKey" not in result:
+                    break
+                scan_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+        except Exception as e:
+            self._put(pages, e, stop)
+            return
+
+        self._put(pages, _SEGMENT_DONE, stop)
+
+    @staticmethod
+    def _put(pages: queue.Queue, page: typing.Any, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=QUEUE_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
@@ -1,58 +1,371 @@
-from typing import Any, List, Optional, Tuple
+import math
+import time
+from concurrent import futures
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
-from boto3.dynamodb.conditions import Key
-from mypy_boto3_dynamodb import client
-
-from app.adapters.dynamodb_unit_of_work import DBPrefix, DynamoDBProductsRepository
-from app.domain.model import product
+from app.adapters import dynamodb_product_projections
+from app.adapters.dynamodb_unit_of_work import (
+    PRODUCT_CODEC,
+    PRODUCT_VERSION_CODEC,
+    DBIndex,
+    DBPrefix,
+    DynamoDBProductsRepository,
+)
+from app.adapters.internal import (
+    attribute_value_codec,
+    dynamodb_base,
+    pagination_cursor,
+)
+from app.domain.exceptions.domain_exception import DomainException
+from app.domain.exceptions.repository_exception import RepositoryException
+from app.domain.model import product, product_version, time_sortable_id
 from app.domain.ports import products_query_service
 
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb import client
+
+MAX_PAGE_FILL_REQUESTS = 5
+PAGE_FILL_TIME_BUDGET_SECONDS = 1.0
+MAX_READ_AHEAD_LIMIT = 1000
+BATCH_GET_CHUNK_SIZE = 100
+BATCH_GET_MAX_ATTEMPTS = 5
+BATCH_GET_BASE_BACKOFF_SECONDS = 0.05
+MAX_BATCH_GET_WORKERS = 8
+
 
 class DynamoDBProductsQueryService(products_query_service.ProductsQueryService):
     """Products DynamoDB query service."""
 
-    def __init__(self, table_name: str, dynamodb_client: client.DynamoDBClient):
+    def __init__(
+        self,
+        table_name: str,
+        dynamodb_client: "client.DynamoDBClient",
+        cursor_signing_key: str,
+        max_page_fill_requests: int = MAX_PAGE_FILL_REQUESTS,
+        page_fill_time_budget_seconds: float = PAGE_FILL_TIME_BUDGET_SECONDS,
+        use_listing_head: bool = False,
+    ):
         self._table_name = table_name
         self._dynamodb_client = dynamodb_client
+        self._use_listing_head = use_listing_head
+        self._max_page_fill_requests = max_page_fill_requests
+        self._page_fill_time_budget_seconds = page_fill_time_budget_seconds
+        self._cursor_codec = pagination_cursor.PaginationCursorCodec(
+            signing_key=cursor_signing_key
+        )
 
     def list_products(
-        self, page_size: int, next_token: Any
-    ) -> Tuple[List[product.Product], Any]:
-        """Returns a list of all products in repository with paging after 1 MB."""
+        self,
+        page_size: int,
+        next_token: Optional[str],
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[product.Product], Optional[str]]:
+        """
+        Returns a page of products ordered by creation date.
+        Reads the sparse products index, so a page costs only the items it returns.
+        Global secondary indexes only support eventually consistent reads.
+        Keeps reading until the page is full or the request/time budget is spent,
+        and positions the returned token right after the last returned product.
+        The first page is served from the materialized listing head when enabled,
+        unless fields are given, as the head is read whole.
+        When fields are given, only those, the id and the index sort key are read.
+        """
+
+        if self._use_listing_head and not next_token and fields is None:
+            first_page = self._list_products_from_listing_head(page_size)
+            if first_page is not None:
+                return first_page
 
+        query_kwargs = {
+            "TableName": self._table_name,
+            "IndexName": DBIndex.PRODUCTS_BY_CREATE_DATE.value,
+            "KeyConditionExpression": "GSI1PK = :partition_key",
+            "ExpressionAttributeValues": {
+                ":partition_key": {"S": DBPrefix.PRODUCT.value}
+            },
+            **self._product_projection(fields, "GSI1SK"),
+        }
         if next_token:
-            result = self._dynamodb_client.scan(
-                TableName=self._table_name,
-                Limit=page_size,
-                FilterExpression=Key("PK").begins_with(f"{DBPrefix.PRODUCT.value}#")
-                & Key("SK").begins_with(f"{DBPrefix.PRODUCT.value}#"),
-                ExclusiveStartKey=next_token,
-            )
-        else:
-            result = self._dynamodb_client.scan(
-                TableName=self._table_name,
-                Limit=page_size,
-                FilterExpression=Key("PK").begins_with(f"{DBPrefix.PRODUCT.value}#")
-                & Key("SK").begins_with(f"{DBPrefix.PRODUCT.value}#"),
+            query_kwargs["ExclusiveStartKey"] = self._decode_next_token(next_token)
+
+        items: List[dict] = []
+        last_evaluated_key = None
+        evaluated_count = 0
+        deadline = time.monotonic() + self._page_fill_time_budget_seconds
+
+        for _ in range(self._max_page_fill_requests):
+            remaining = page_size - len(items)
+            query_kwargs["Limit"] = self._read_ahead_limit(
+                remaining=remaining,
+                evaluated_count=evaluated_count,
+                matched_count=len(items),
             )
+            result = self._dynamodb_client.query(**query_kwargs)
 
-        products = [product.Product.parse_obj(item) for item in result["Items"]]
+            evaluated_count += result.get("ScannedCount", len(result["Items"]))
+            if len(result["Items"]) > remaining:
+                items.extend(result["Items"][:remaining])
+                last_evaluated_key = items[-1]
+                break
 
-        if "LastEvaluatedKey" in result:
-            return products, result["LastEvaluatedKey"]
+            items.extend(result["Items"])
+            last_evaluated_key = result.get("LastEvaluatedKey")
+            if (
+                len(items) >= page_size
+                or not last_evaluated_key
+                or time.monotonic() >= deadline
+            ):
+                break
+            query_kwargs["ExclusiveStartKey"] = last_evaluated_key
+
+        products = [self._unmarshal_product(item, fields) for item in items]
+
+        if last_evaluated_key:
+            return products, self._encode_next_token(last_evaluated_key)
         else:
             return products, None
 
-    def get_product_by_id(self, product_id: str) -> Optional[product.Product]:
-        """Returns a single product by ID."""
+    def get_product_by_id(
+        self,
+        product_id: str,
+        fields: Optional[List[str]] = None,
+        consistent_read: bool = False,
+    ) -> Optional[product.Product]:
+        """Returns a single product by ID, reading only the given fields and the id."""
 
         product_response = self._dynamodb_client.get_item(
             TableName=self._table_name,
-            Key=DynamoDBProductsRepository.generate_product_key(product_id),
+            Key=attribute_value_codec.serialize_item(
+                DynamoDBProductsRepository.generate_product_key(product_id)
+            ),
+            ConsistentRead=consistent_read,
+            **self._product_projection(fields),
         )
 
         return (
-            product.Product.parse_obj(product_response["Item"])
-            if product_response["Item"]
+            self._unmarshal_product(product_response["Item"], fields)
+            if product_response.get("Item")
             else None
         )
+
+    def get_products_by_ids(
+        self, product_ids: List[str], consistent_read: bool = False
+    ) -> List[product.Product]:
+        """
+        Returns products by IDs in the requested order, skipping missing ones.
+        Reads in concurrent chunks of up to 100 keys.
+        """
+
+        unique_ids = list(dict.fromkeys(product_ids))
+        chunks = dynamodb_base.chunked(unique_ids, BATCH_GET_CHUNK_SIZE)
+
+        if len(chunks) <= 1:
+            chunk_results = [
+                self._batch_get_chunk(chunk, consistent_read) for chunk in chunks
+            ]
+        else:
+            with futures.ThreadPoolExecutor(
+                max_workers=min(len(chunks), MAX_BATCH_GET_WORKERS)
+            ) as executor:
+                chunk_results = list(
+                    executor.map(
+                        lambda chunk: self._batch_get_chunk(chunk, consistent_read),
+                        chunks,
+                    )
+                )
+
+        products_by_id = {
+            product_obj.id: product_obj
+            for items in chunk_results
+            for product_obj in map(PRODUCT_CODEC.unmarshal, items)
+        }
+        return [
+            products_by_id[product_id]
+            for product_id in unique_ids
+            if product_id in products_by_id
+        ]
+
+    def list_product_versions(
+        self,
+        product_id: str,
+        limit: int,
+        next_token: Optional[str] = None,
+        since: Optional[str] = None,
+        consistent_read: bool = False,
+    ) -> Tuple[List[product_version.ProductVersion], Optional[str]]:
+        """
+        Returns a page of the versions of a product, newest first.
+        Versions are stored in the product partition under time-sortable sort
+        keys, so a page is a single backwards Query of a key range, which can
+        be strongly consistent unlike the products index.
+        """
+        partition_key = DynamoDBProductsRepository.generate_product_key(product_id)[
+            "PK"
+        ]
+        version_prefix = f"{DBPrefix.PRODUCT_VERSION.value}#"
+        query_kwargs = {
+            "TableName": self._table_name,
+            "ScanIndexForward": False,
+            "Limit": limit,
+            "ConsistentRead": consistent_read,
+        }
+        if since:
+            # "~" sorts after every character of the ID encoding.
+            query_kwargs[
+                "KeyConditionExpression"
+            ] = "PK = :partition_key AND SK BETWEEN :from_key AND :to_key"
+            query_kwargs["ExpressionAttributeValues"] = {
+                ":partition_key": {"S": partition_key},
+                ":from_key": {
+                    "S": version_prefix
+                    + time_sortable_id.timestamp_prefix(
+                        time_sortable_id.parse_timestamp_ms(since)
+                    )
+                },
+                ":to_key": {"S": f"{version_prefix}~"},
+            }
+        else:
+            query_kwargs[
+                "KeyConditionExpression"
+            ] = "PK = :partition_key AND begins_with(SK, :version_prefix)"
+            query_kwargs["ExpressionAttributeValues"] = {
+                ":partition_key": {"S": partition_key},
+                ":version_prefix": {"S": version_prefix},
+            }
+        if next_token:
+            fields = self._cursor_codec.decode(next_token)
+            if (
+                len(fields) != 2
+                or fields[0] != product_id
+                or not fields[1].startswith(version_prefix)
+            ):
+                raise DomainException("Invalid pagination token.")
+            query_kwargs["ExclusiveStartKey"] = {
+                "PK": {"S": partition_key},
+                "SK": {"S": fields[1]},
+            }
+
+        result = self._dynamodb_client.query(**query_kwargs)
+
+        versions = [PRODUCT_VERSION_CODEC.unmarshal(item) for item in result["Items"]]
+        last_evaluated_key = result.get("LastEvaluatedKey")
+        if not last_evaluated_key:
+            return versions, None
+        return versions, self._cursor_codec.encode(
+            [product_id, last_evaluated_key["SK"]["S"]]
+        )
+
+    def _batch_get_chunk(
+        self, product_ids: List[str], consistent_read: bool = False
+    ) -> List[dict]:
+        """Reads a single batch, retrying unprocessed keys with exponential backoff."""
+        request_items = {
+            self._table_name: {
+                "Keys": [
+                    attribute_value_codec.serialize_item(
+                        DynamoDBProductsRepository.generate_product_key(product_id)
+                    )
+                    for product_id in product_ids
+                ],
+                "ConsistentRead": consistent_read,
+            }
+        }
+        items: List[dict] = []
+
+        for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(BATCH_GET_BASE_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+            result = self._dynamodb_client.batch_get_item(RequestItems=request_items)
+            items.extend(result["Responses"].get(self._table_name, []))
+
+            request_items = result.get("UnprocessedKeys") or {}
+            if not request_items:
+                return items
+
+        raise RepositoryException(
+            "Failed to read all requested products from DynamoDB."
+        )
+
+    def _list_products_from_listing_head(
+        self, page_size: int
+    ) -> Optional[Tuple[List[product.Product], Optional[str]]]:
+        """Returns the first page from the listing head, or None if it cannot."""
+        if page_size > dynamodb_product_projections.LISTING_HEAD_SIZE:
+            return None
+
+        response = self._dynamodb_client.get_item(
+            TableName=self._table_name,
+            Key=attribute_value_codec.serialize_item(
+                dynamodb_product_projections.generate_listing_head_key()
+            ),
+        )
+        listing_head = response.get("Item")
+        if not listing_head:
+            return None
+
+        listed_items = listing_head["products"]["L"]
+        listing_has_more = listing_head["hasMore"]["BOOL"]
+        if len(listed_items) < page_size and listing_has_more:
+            return None
+
+        products = [
+            PRODUCT_CODEC.unmarshal(item["M"]) for item in listed_items[:page_size]
+        ]
+        has_more = len(listed_items) > page_size or listing_has_more
+        if not products or not has_more:
+            return products, None
+
+        last_sort_key = dynamodb_product_projections.generate_listing_sort_key(
+            products[-1].id, products[-1].createDate
+        )
+        return products, self._cursor_codec.encode([last_sort_key])
+
+    @staticmethod
+    def _product_projection(fields: Optional[List[str]], *attribute_names: str) -> dict:
+        if fields is None:
+            return {}
+        return dynamodb_base.projection_expression(
+            list(dict.fromkeys(["id", *attribute_names, *fields]))
+        )
+
+    @staticmethod
+    def _unmarshal_product(item: dict, fields: Optional[List[str]]) -> product.Product:
+        if fields is None:
+            return PRODUCT_CODEC.unmarshal(item)
+        return PRODUCT_CODEC.unmarshal_partial(item)
+
+    def _read_ahead_limit(
+        self, remaining: int, evaluated_count: int, matched_count: int
+    ) -> int:
+        """
+        Estimates how many items to evaluate to fill the rest of the page,
+        based on the ratio of matched to evaluated items seen so far.
+        """
+        if not matched_count:
+            return remaining if not evaluated_count else MAX_READ_AHEAD_LIMIT
+        estimate = math.ceil(remaining * evaluated_count / matched_count)
+        return max(remaining, min(estimate, MAX_READ_AHEAD_LIMIT))
+
+    def _encode_next_token(self, last_evaluated_key: dict) -> str:
+        """
+        Encodes the products index position as an opaque token.
+        The table key is derived from the index sort key, so only that is stored.
+        """
+        return self._cursor_codec.encode([last_evaluated_key["GSI1SK"]["S"]])
+
+    def _decode_next_token(self, next_token: str) -> dict:
+        """Decodes an opaque token into the products index start key."""
+        fields = self._cursor_codec.decode(next_token)
+        if len(fields) != 1 or "#" not in fields[0]:
+            raise DomainException("Invalid pagination token.")
+
+        index_sort_key = fields[0]
+        product_id = index_sort_key.rsplit("#", 1)[1]
+        return attribute_value_codec.serialize_item(
+            {
+                **DynamoDBProductsRepository.generate_product_key(product_id),
+                "GSI1PK": DBPrefix.PRODUCT.value,
+                "GSI1SK": index_sort_key,
+            }
+        )
@@ -1,16 +1,36 @@
 import enum
+import time
 import typing
 
-from mypy_boto3_dynamodb import client
-
-from app.adapters.internal import dynamodb_base
-from app.domain.model import product, product_version
+from app.adapters.internal import attribute_value_codec, dynamodb_base, ttl_lru_cache
+from app.domain.model import bulk_write, idempotency_record, product, product_version
 from app.domain.ports import unit_of_work
 
+if typing.TYPE_CHECKING:
+    from mypy_boto3_dynamodb import client
+
 
 class DBPrefix(enum.Enum):
     PRODUCT = "PRODUCT"
     PRODUCT_VERSION = "PRODUCTVERSION"
+    PRODUCT_LISTING = "PRODUCTLISTING"
+    CHANGE_LOG = "PRODUCTCHANGELOG"
+    IDEMPOTENCY = "IDEMPOTENCY"
+
+
+class DBIndex(enum.Enum):
+    PRODUCTS_BY_CREATE_DATE = "GSI1"
+
+
+PRODUCT_CODEC = attribute_value_codec.ModelCodec(product.Product)
+PRODUCT_VERSION_CODEC = attribute_value_codec.ModelCodec(product_version.ProductVersion)
+IDEMPOTENCY_RECORD_CODEC = attribute_value_codec.ModelCodec(
+    idempotency_record.IdempotencyRecord
+)
+
+IDEMPOTENCY_CACHE_MAX_ENTRIES = 1000
+IDEMPOTENCY_CACHE_MAX_BYTES = 4 * 1024 * 1024
+IDEMPOTENCY_CACHE_TTL_SECONDS = 300.0
 
 
 class DynamoDBProductsRepository(
@@ -24,40 +44,84 @@ class DynamoDBProductsRepository(
     def add(self, product: product.Product) -> None:
         """Adds a product to the DynamoDB table."""
         self.add_generic_item(
-            item=product.dict(), key=self.generate_product_key(product_id=product.id)
+            item={
+                **PRODUCT_CODEC.marshal(product),
+                **attribute_value_codec.serialize_item(
+                    self.generate_product_index_key(
+                        product_id=product.id, create_date=product.createDate
+                    )
+                ),
+            },
+            key=self.generate_product_key(product_id=product.id),
         )
 
-    def get(self, product_id: str) -> typing.Optional[product.Product]:
+    def get(
+        self, product_id: str, consistent_read: bool = False
+    ) -> typing.Optional[product.Product]:
         """Gets a product from the DynamoDB table."""
         key = self.generate_product_key(product_id)
-        request = self._create_get_request(key)
-        product_dict = self._context.get_generic_item(request)
+        request = self._create_get_request(key, consistent_read)
+        product_item = self._context.get_generic_item(request)
         return (
-            product.Product.parse_obj(product_dict)
-            if product_dict is not None
-            else None
+            PRODUCT_CODEC.unmarshal(product_item) if product_item is not None else None
         )
 
-    def update_attributes(self, product_id: str, **kwargs) -> None:
-        """Updates arbitraty attributes of the product in DynamoDB table."""
+    def update_attributes(
+        self,
+        product_id: str,
+        expected_version: typing.Optional[int] = None,
+        last_updated_before: typing.Optional[str] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Updates arbitraty attributes of the product in DynamoDB table and
+        increments its version in the same request. With an expected version,
+        the update is conditional on it, so concurrent updates are rejected
+        instead of overwriting each other. With last_updated_before, the update
+        is conditional on the product not being updated since that time.
+        """
         update_expression_setters = [
-            f"{key}=:p{idx}" for idx, (key, value) in enumerate(kwargs.items())
+            f"#p{idx}=:p{idx}" for idx, (key, value) in enumerate(kwargs.items())
         ]
-        update_values = {
+        update_names = {f"#p{idx}": key for idx, key in enumerate(kwargs.keys())}
+        update_values: typing.Dict[str, typing.Any] = {
             f":p{idx}": value for idx, (key, value) in enumerate(kwargs.items())
         }
+        update_names["#version"] = "version"
+        update_values[":version_increment"] = 1
+
+        condition = "(attribute_exists(PK) AND attribute_exists(SK))"
+        if expected_version is not None:
+            update_values[":expected_version"] = expected_version
+            version_condition = "#version = :expected_version"
+            if expected_version == 0:
+                # Products written before versioning have no version attribute.
+                version_condition = (
+                    f"(attribute_not_exists(#version) OR {version_condition})"
+                )
+            condition = f"{condition} AND {version_condition}"
+        if last_updated_before is not None:
+            update_names["#last_update_date"] = "lastUpdateDate"
+            update_values[":last_updated_before"] = last_updated_before
+            condition = f"{condition} AND #last_update_date < :last_updated_before"
+
         self.update_generic_item(
             expression={
-                "UpdateExpression": f"set {', '.join(update_expression_setters)}",
+                "UpdateExpression": (
+                    f"set {', '.join(update_expression_setters)} "
+                    "ADD #version :version_increment"
+                ),
+                "ExpressionAttributeNames": update_names,
                 "ExpressionAttributeValues": update_values,
-                "ConditionExpression": "(attribute_exists(PK) AND attribute_exists(SK))",
+                "ConditionExpression": condition,
             },
             key=self.generate_product_key(product_id=product_id),
         )
 
-    def delete(self, product_id: str) -> None:
+    def delete(self, product_id: str, must_exist: bool = False) -> None:
+        """Deletes a product, failing when it is missing if must_exist is set."""
         key = self.generate_product_key(product_id)
-        self.delete_generic_item(key=key)
+        self.delete_generic_item(key=key, must_exist=must_exist)
 
     @staticmethod
     def generate_product_key(product_id: str) -> dict:
@@ -67,6 +131,17 @@ class DynamoDBProductsRepository(
             "SK": f"{DBPrefix.PRODUCT.value}#{product_id}",
         }
 
+    @staticmethod
+    def generate_product_index_key(product_id: str, create_date: str) -> dict:
+        """
+        Generates products listing index key. Only product entities carry it,
+        which keeps the index sparse.
+        """
+        return {
+            "GSI1PK": DBPrefix.PRODUCT.value,
+            "GSI1SK": f"{create_date}#{product_id}",
+        }
+
 
 class DynamoDBProductVersionsRepository(
     dynamodb_base.DynamoDBRepository, unit_of_work.ProductVersionsRepository
@@ -81,22 +156,22 @@ class DynamoDBProductVersionsRepository(
     ) -> None:
         """Adds a product version to the DynamoDB table."""
         self.add_generic_item(
-            item=product_version.dict(),
+            item=PRODUCT_VERSION_CODEC.marshal(product_version),
             key=self.generate_product_version_key(
                 product_id=product_id, version_id=product_version.id
             ),
         )
 
     def get(
-        self, product_id: str, version_id: str
+        self, product_id: str, version_id: str, consistent_read: bool = False
     ) -> typing.Optional[product_version.ProductVersion]:
         """Gets a product version from the DynamoDB table."""
         key = self.generate_product_version_key(product_id, version_id)
-        request = self._create_get_request(key)
-        product_version_dics = self._context.get_generic_item(request)
+        request = self._create_get_request(key, consistent_read)
+        product_version_item = self._context.get_generic_item(request)
         return (
-            product_version.ProductVersion.parse_obj(product_version_dics)
-            if product_version_dics is not None
+            PRODUCT_VERSION_CODEC.unmarshal(product_version_item)
+            if product_version_item is not None
             else None
         )
 
@@ -109,25 +184,145 @@ class DynamoDBProductVersionsRepository(
         }
 
 
+class DynamoDBIdempotencyRecordsRepository(
+    dynamodb_base.DynamoDBRepository, unit_of_work.IdempotencyRecordsRepository
+):
+    """
+    Idempotency records DynamoDB repository. Records expire through the
+    table's time to live on expiresAt. Records read or committed are kept in
+    a cache shared by the container, because they do not change once written.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        context: dynamodb_base.DynamoDBContext,
+        cache: ttl_lru_cache.TTLLRUCache,
+        cache_ttl_seconds: float,
+    ):
+        super().__init__(table_name, context)
+        self._cache = cache
+        self._cache_ttl_seconds = cache_ttl_seconds
+        self._added: typing.List[idempotency_record.IdempotencyRecord] = []
+
+    def add(self, record: idempotency_record.IdempotencyRecord) -> None:
+        """
+        Adds an idempotency record to the DynamoDB table, unless an unexpired
+        record with the same key exists.
+        """
+        self._context.add_generic_item(
+            item={
+                "Put": {
+                    "TableName": self._table_name,
+                    "Item": {
+                        **IDEMPOTENCY_RECORD_CODEC.marshal(record),
+                        **attribute_value_codec.serialize_item(
+                            self.generate_idempotency_record_key(record.key)
+                        ),
+                    },
+                    # Expired records linger until the time to live deletes them.
+                    "ConditionExpression": (
+                        "attribute_not_exists(PK) OR expiresAt <= :now"
+                    ),
+                    "ExpressionAttributeValues": {":now": {"N": str(int(time.time()))}},
+                }
+            }
+        )
+        self._added.append(record)
+
+    def get(self, key: str) -> typing.Optional[idempotency_record.IdempotencyRecord]:
+        """Gets an idempotency record from the cache or with a consistent read."""
+        cached = self._cache.get(key)
+        if cached is not ttl_lru_cache.MISSING:
+            return cached
+
+        request = self._create_get_request(
+            self.generate_idempotency_record_key(key), consistent_read=True
+        )
+        item = self._context.get_generic_item(request)
+        record = IDEMPOTENCY_RECORD_CODEC.unmarshal(item) if item is not None else None
+        if record is not None:
+            self._store(record)
+        return record
+
+    def store_committed(self) -> None:
+        """Caches the records added since the last commit."""
+        for record in self._added:
+            self._store(record)
+        self._added = []
+
+    def _store(self, record: idempotency_record.IdempotencyRecord) -> None:
+        ttl_seconds = min(self._cache_ttl_seconds, record.expiresAt - time.time())
+        if ttl_seconds > 0:
+            self._cache.put(
+                record.key,
+                record,
+                size_bytes=len(record.result) + len(record.key),
+                ttl_seconds=ttl_seconds,
+            )
+
+    @staticmethod
+    def generate_idempotency_record_key(key: str) -> dict:
+        """Generates primary key for idempotency record entity."""
+        return {
+            "PK": f"{DBPrefix.IDEMPOTENCY.value}#{key}",
+            "SK": f"{DBPrefix.IDEMPOTENCY.value}#{key}",
+        }
+
+
 class DynamoDBUnitOfWork(unit_of_work.UnitOfWork):
     """Repository provider and unit of work for DynamoDB."""
 
     products: DynamoDBProductsRepository
     product_versions: DynamoDBProductVersionsRepository
+    idempotency_records: DynamoDBIdempotencyRecordsRepository
 
-    def __init__(self, table_name: str, dynamodb_client: client.DynamoDBClient):
+    def __init__(
+        self,
+        table_name: str,
+        dynamodb_client: "client.DynamoDBClient",
+        transaction_max_items: int = dynamodb_base.TRANSACTION_MAX_ITEMS,
+        max_bulk_workers: int = dynamodb_base.MAX_BULK_WORKERS,
+        idempotency_cache_max_entries: int = IDEMPOTENCY_CACHE_MAX_ENTRIES,
+        idempotency_cache_ttl_seconds: float = IDEMPOTENCY_CACHE_TTL_SECONDS,
+    ):
         self._dynamo_db_client = dynamodb_client
         self._table_name = table_name
+        self._transaction_max_items = transaction_max_items
+        self._max_bulk_workers = max_bulk_workers
         self._context: typing.Optional[dynamodb_base.DynamoDBContext] = None
+        self._idempotency_cache_ttl_seconds = idempotency_cache_ttl_seconds
+        self._idempotency_cache = ttl_lru_cache.TTLLRUCache(
+            max_entries=idempotency_cache_max_entries,
+            max_bytes=IDEMPOTENCY_CACHE_MAX_BYTES,
+            ttl_seconds=idempotency_cache_ttl_seconds,
+        )
 
     def commit(self) -> None:
-        """Commits up to 25 changes to the DynamoDB table in a single transaction."""
+        """Commits up to 100 changes to the DynamoDB table in a single transaction."""
         if self._context:
             self._context.commit()
+            self.idempotency_records.store_committed()
+
+    def commit_returning_product(self) -> typing.Optional[product.Product]:
+        """
+        Commits a single product change with one item write. An update reads
+        back the stored product with ReturnValues ALL_NEW in the same request.
+        """
+        item = self._context.commit_single() if self._context else None
+        return PRODUCT_CODEC.unmarshal(item) if item else None
+
+    def commit_bulk(
+        self, mode: bulk_write.BulkWriteMode
+    ) -> typing.List[typing.Optional[str]]:
+        """Commits any number of changes in chunks and reports per-change errors."""
+        return self._context.commit_bulk(mode) if self._context else []
 
     def __enter__(self) -> typing.Any:
         self._context = dynamodb_base.DynamoDBContext(
-            dynamodb_client=self._dynamo_db_client
+            dynamodb_client=self._dynamo_db_client,
+            transaction_max_items=self._transaction_max_items,
+            max_bulk_workers=self._max_bulk_workers,
         )
         self.products = DynamoDBProductsRepository(
             table_name=self._table_name, context=self._context
@@ -135,6 +330,12 @@ class DynamoDBUnitOfWork(unit_of_work.UnitOfWork):
         self.product_versions = DynamoDBProductVersionsRepository(
             table_name=self._table_name, context=self._context
         )
+        self.idempotency_records = DynamoDBIdempotencyRecordsRepository(
+            table_name=self._table_name,
+            context=self._context,
+            cache=self._idempotency_cache,
+            cache_ttl_seconds=self._idempotency_cache_ttl_seconds,
+        )
 
         return self
 
@@ -142,3 +343,4 @@ class DynamoDBUnitOfWork(unit_of_work.UnitOfWork):
         self._context = None
         self.products = None  # type: ignore
         self.product_versions = None  # type: ignore
+        self.idempotency_records = None  # type: ignore
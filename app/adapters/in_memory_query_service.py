@@ -0,0 +1,15 @@
+from typing import Optional
+
+from app.adapters import in_memory_unit_of_work
+from app.adapters.internal import local_store
+
+
+class InMemoryProductsQueryService(local_store.LocalProductsQueryService):
+    """Products query service reading an in-memory store."""
+
+    def __init__(
+        self,
+        store: in_memory_unit_of_work.InMemoryStore,
+        cursor_signing_key: Optional[str] = None,
+    ):
+        super().__init__(store, cursor_signing_key)
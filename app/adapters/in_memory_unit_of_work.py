@@ -0,0 +1,127 @@
+import bisect
+import threading
+import typing
+
+from app.adapters.internal import dynamodb_base, local_store
+from app.domain.model import idempotency_record, product, product_version
+
+
+class InMemoryStore(local_store.LocalStore):
+    """
+    Store kept in process memory. Product IDs are kept sorted by listing
+    position and version IDs per product, so pages are read by bisection
+    instead of sorting. A reentrant lock serializes all access, and conditions
+    are checked before any change is applied, so transactions are atomic.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._products: typing.Dict[str, product.Product] = {}
+        self._listing: typing.List[str] = []
+        self._versions: typing.Dict[
+            str, typing.Dict[str, product_version.ProductVersion]
+        ] = {}
+        self._version_ids: typing.Dict[str, typing.List[str]] = {}
+        self._idempotency_records: typing.Dict[
+            str, idempotency_record.IdempotencyRecord
+        ] = {}
+
+    def transaction(self) -> typing.ContextManager[typing.Any]:
+        return self._lock
+
+    def get_product(self, product_id: str) -> typing.Optional[product.Product]:
+        return self._products.get(product_id)
+
+    def get_products(
+        self, product_ids: typing.List[str]
+    ) -> typing.List[product.Product]:
+        return [
+            self._products[product_id]
+            for product_id in product_ids
+            if product_id in self._products
+        ]
+
+    def put_product(self, product_obj: product.Product) -> None:
+        self.delete_product(product_obj.id)
+        self._products[product_obj.id] = product_obj
+        bisect.insort(
+            self._listing,
+            local_store.generate_listing_sort_key(
+                product_obj.id, product_obj.createDate
+            ),
+        )
+
+    def delete_product(self, product_id: str) -> None:
+        current = self._products.pop(product_id, None)
+        if current is None:
+            return
+        sort_key = local_store.generate_listing_sort_key(current.id, current.createDate)
+        del self._listing[bisect.bisect_left(self._listing, sort_key)]
+
+    def list_products(
+        self, after_sort_key: typing.Optional[str], limit: int
+    ) -> typing.List[product.Product]:
+        start = bisect.bisect_right(self._listing, after_sort_key or "")
+        end = start + limit
+        return [
+            self._products[sort_key.rsplit("#", 1)[1]]
+            for sort_key in self._listing[start:end]
+        ]
+
+    def get_product_version(
+        self, product_id: str, version_id: str
+    ) -> typing.Optional[product_version.ProductVersion]:
+        return self._versions.get(product_id, {}).get(version_id)
+
+    def put_product_version(
+        self, product_id: str, product_version_obj: product_version.ProductVersion
+    ) -> None:
+        versions = self._versions.setdefault(product_id, {})
+        if product_version_obj.id not in versions:
+            bisect.insort(
+                self._version_ids.setdefault(product_id, []), product_version_obj.id
+            )
+        versions[product_version_obj.id] = product_version_obj
+
+    def list_product_versions(
+        self,
+        product_id: str,
+        before_id: typing.Optional[str],
+        from_id: typing.Optional[str],
+        limit: int,
+    ) -> typing.List[product_version.ProductVersion]:
+        version_ids = self._version_ids.get(product_id, [])
+        end = (
+            bisect.bisect_left(version_ids, before_id)
+            if before_id
+            else len(version_ids)
+        )
+        start = bisect.bisect_left(version_ids, from_id) if from_id else 0
+        start = max(start, end - limit)
+        versions = self._versions.get(product_id, {})
+        return [versions[version_id] for version_id in reversed(version_ids[start:end])]
+
+    def get_idempotency_record(
+        self, key: str
+    ) -> typing.Optional[idempotency_record.IdempotencyRecord]:
+        return self._idempotency_records.get(key)
+
+    def put_idempotency_record(
+        self, record: idempotency_record.IdempotencyRecord
+    ) -> None:
+        self._idempotency_records[record.key] = record
+
+
+class InMemoryUnitOfWork(local_store.LocalUnitOfWork):
+    """
+    Repository provider and unit of work for an in-memory store, with the
+    transactional semantics of DynamoDBUnitOfWork. Meant for tests and
+    load tests of the domain without DynamoDB.
+    """
+
+    def __init__(
+        self,
+        store: InMemoryStore,
+        transaction_max_items: int = dynamodb_base.TRANSACTION_MAX_ITEMS,
+    ):
+        super().__init__(store, transaction_max_items)
@@ -0,0 +1,28 @@
+import asyncio
+import functools
+from concurrent import futures
+from typing import Any, Callable
+
+# Matches the connection pool of clients created by dynamodb_client_factory,
+# more concurrent calls would only queue for a connection.
+MAX_CONCURRENT_CALLS = 25
+
+
+class AsyncDynamoDBClient:
+    """
+    Runs blocking DynamoDB calls on a bounded thread pool, so they can be
+    awaited. botocore clients are thread-safe, so independent calls awaited
+    together are in flight at the same time.
+    """
+
+    def __init__(self, max_concurrent_calls: int = MAX_CONCURRENT_CALLS):
+        self._executor = futures.ThreadPoolExecutor(
+            max_workers=max_concurrent_calls, thread_name_prefix="dynamodb"
+        )
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Runs a blocking function that uses the client on the client's thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
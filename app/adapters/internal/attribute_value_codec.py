@@ -0,0 +1,233 @@
+import enum
+from decimal import Decimal
+from typing import Any, Callable, Dict, Generic, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+AttributeValue = Dict[str, Any]
+AttributeValueMap = Dict[str, AttributeValue]
+
+NULL: AttributeValue = {"NULL": True}
+
+
+def serialize_value(value: Any) -> AttributeValue:
+    """
+    Converts a Python value to a DynamoDB AttributeValue.
+    Supports the same types as boto3's TypeSerializer.
+    """
+    serializer = _SERIALIZERS_BY_TYPE.get(type(value))
+    if serializer is not None:
+        return serializer(value)
+    return _serialize_subclass(value)
+
+
+def deserialize_value(attribute_value: AttributeValue) -> Any:
+    """
+    Converts a DynamoDB AttributeValue to a Python value.
+    Numbers become Decimal, like with boto3's TypeDeserializer.
+    """
+    ((tag, value),) = attribute_value.items()
+    return _DESERIALIZERS_BY_TAG[tag](value)
+
+
+def serialize_item(item: Dict[str, Any]) -> AttributeValueMap:
+    """Converts a dictionary of Python values to an AttributeValue map."""
+    return {name: serialize_value(value) for name, value in item.items()}
+
+
+def deserialize_item(item: AttributeValueMap) -> Dict[str, Any]:
+    """Converts an AttributeValue map to a dictionary of Python values."""
+    return {name: deserialize_value(value) for name, value in item.items()}
+
+
+class ModelCodec(Generic[ModelT]):
+    """
+    Converts between a pydantic model and DynamoDB AttributeValue maps.
+    A converter per field is chosen once from the field type, so scalar fields
+    are converted without inspecting each value. Attributes that are not model
+    fields, like keys, are ignored when reading.
+    """
+
+    def __init__(self, model: Type[ModelT]):
+        self._model = model
+        self._fields: Tuple[
+            Tuple[
+                str, Callable[[Any], AttributeValue], Callable[[AttributeValue], Any]
+            ],
+            ...,
+        ] = tuple(
+            (name, *_compile_field_converters(field.outer_type_, field.allow_none))
+            for name, field in model.__fields__.items()
+        )
+        self._required_fields = frozenset(
+            name for name, field in model.__fields__.items() if field.required
+        )
+
+    def marshal(self, obj: ModelT) -> AttributeValueMap:
+        """Converts a model instance to an AttributeValue map."""
+        values = obj.__dict__
+        return {name: serialize(values[name]) for name, serialize, _ in self._fields}
+
+    def unmarshal(self, item: AttributeValueMap) -> ModelT:
+        """
+        Converts an AttributeValue map to a model instance.
+        Items written by marshal are trusted and not validated again. Items
+        without a required field are validated, which raises ValidationError.
+        """
+        values = {}
+        for name, _, deserialize in self._fields:
+            attribute_value = item.get(name)
+            if attribute_value is not None:
+                values[name] = deserialize(attribute_value)
+
+        if not self._required_fields.issubset(values):
+            return self._model.parse_obj(values)
+        return self._model.construct(**values)
+
+    def unmarshal_partial(self, item: AttributeValueMap) -> ModelT:
+        """
+        Converts a projected AttributeValue map to a model instance without
+        validation. Only the fields present in the item are set.
+        """
+        return self._model.construct(
+            **{
+                name: deserialize(item[name])
+                for name, _, deserialize in self._fields
+                if name in item
+            }
+        )
+
+
+def _compile_field_converters(
+    field_type: Any, allow_none: bool
+) -> Tuple[Callable[[Any], AttributeValue], Callable[[AttributeValue], Any]]:
+    if isinstance(field_type, type) and issubclass(field_type, enum.Enum):
+        enum_type = field_type
+
+        def deserialize(attribute_value: AttributeValue) -> Any:
+            return enum_type(deserialize_value(attribute_value))
+
+        serialize = serialize_value
+    elif field_type is str:
+        serialize = _serialize_string
+        deserialize = _deserialize_string
+    elif field_type is bool:
+        serialize = _serialize_bool
+        deserialize = _deserialize_bool
+    elif field_type is int:
+        serialize = _serialize_number
+        deserialize = _deserialize_int
+    else:
+        return serialize_value, deserialize_value
+
+    if not allow_none:
+        return serialize, deserialize
+
+    def serialize_optional(value: Any) -> AttributeValue:
+        return NULL if value is None else serialize(value)
+
+    def deserialize_optional(attribute_value: AttributeValue) -> Any:
+        return None if "NULL" in attribute_value else deserialize(attribute_value)
+
+    return serialize_optional, deserialize_optional
+
+
+def _serialize_string(value: str) -> AttributeValue:
+    return {"S": value}
+
+
+def _serialize_bool(value: bool) -> AttributeValue:
+    return {"BOOL": value}
+
+
+def _serialize_number(value: Any) -> AttributeValue:
+    return {"N": str(value)}
+
+
+def _serialize_float(value: float) -> AttributeValue:
+    raise TypeError("Float types are not supported. Use Decimal types instead.")
+
+
+def _serialize_null(value: None) -> AttributeValue:
+    return NULL
+
+
+def _serialize_binary(value: Any) -> AttributeValue:
+    return {"B": bytes(value)}
+
+
+def _serialize_map(value: dict) -> AttributeValue:
+    return {"M": {key: serialize_value(item) for key, item in value.items()}}
+
+
+def _serialize_list(value: Any) -> AttributeValue:
+    return {"L": [serialize_value(item) for item in value]}
+
+
+def _serialize_set(value: Any) -> AttributeValue:
+    if not value:
+        raise TypeError("Empty sets are not supported by DynamoDB.")
+    if all(isinstance(item, str) for item in value):
+        return {"SS": list(value)}
+    if all(isinstance(item, (bytes, bytearray)) for item in value):
+        return {"BS": [bytes(item) for item in value]}
+    if all(
+        isinstance(item, (int, Decimal)) and not isinstance(item, bool)
+        for item in value
+    ):
+        return {"NS": [str(item) for item in value]}
+    raise TypeError(f"Unsupported set {value!r}.")
+
+
+def _serialize_subclass(value: Any) -> AttributeValue:
+    if isinstance(value, enum.Enum):
+        return serialize_value(value.value)
+    for base_type, serializer in _SERIALIZERS_BY_TYPE.items():
+        if isinstance(value, base_type):
+            return serializer(value)
+    raise TypeError(f"Unsupported type {type(value)} for value {value!r}.")
+
+
+def _deserialize_string(attribute_value: AttributeValue) -> str:
+    return attribute_value["S"]
+
+
+def _deserialize_bool(attribute_value: AttributeValue) -> bool:
+    return attribute_value["BOOL"]
+
+
+def _deserialize_int(attribute_value: AttributeValue) -> int:
+    return int(attribute_value["N"])
+
+
+# bool comes before int, because bool is a subclass of int.
+_SERIALIZERS_BY_TYPE: Dict[type, Callable[[Any], AttributeValue]] = {
+    str: _serialize_string,
+    bool: _serialize_bool,
+    int: _serialize_number,
+    Decimal: _serialize_number,
+    float: _serialize_float,
+    type(None): _serialize_null,
+    bytes: _serialize_binary,
+    bytearray: _serialize_binary,
+    dict: _serialize_map,
+    list: _serialize_list,
+    tuple: _serialize_list,
+    set: _serialize_set,
+    frozenset: _serialize_set,
+}
+
+_DESERIALIZERS_BY_TAG: Dict[str, Callable[[Any], Any]] = {
+    "S": lambda value: value,
+    "N": Decimal,
+    "BOOL": lambda value: value,
+    "NULL": lambda value: None,
+    "B": bytes,
+    "M": lambda value: {key: deserialize_value(item) for key, item in value.items()},
+    "L": lambda value: [deserialize_value(item) for item in value],
+    "SS": set,
+    "NS": lambda value: {Decimal(item) for item in value},
+    "BS": lambda value: {bytes(item) for item in value},
+}
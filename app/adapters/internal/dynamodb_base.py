@@ -1,35 +1,234 @@
-from typing import Any, List
+import time
+from concurrent import futures
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Sequence, Tuple, cast
 
-from mypy_boto3_dynamodb import client, type_defs
+from app.adapters.internal import attribute_value_codec
+from app.domain.exceptions import repository_exception, write_conflict_exception
+from app.domain.model import bulk_write
 
-from app.domain.exceptions import repository_exception
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb import client, type_defs
+
+TRANSACTION_MAX_ITEMS = 100
+BATCH_WRITE_MAX_ITEMS = 25
+BATCH_WRITE_MAX_ATTEMPTS = 5
+BATCH_WRITE_BASE_BACKOFF_SECONDS = 0.05
+MAX_BULK_WORKERS = 8
 
 
 class DynamoDBContext:
     """Transactional context manager for DynamoDB."""
 
-    def __init__(self, dynamodb_client: client.DynamoDBClient):
-        self._db_items: List[type_defs.TransactWriteItemTypeDef] = []
+    def __init__(
+        self,
+        dynamodb_client: "client.DynamoDBClient",
+        transaction_max_items: int = TRANSACTION_MAX_ITEMS,
+        max_bulk_workers: int = MAX_BULK_WORKERS,
+    ):
+        self._db_items: List["type_defs.TransactWriteItemTypeDef"] = []
         self._dynamo_db_client = dynamodb_client
+        self._transaction_max_items = transaction_max_items
+        self._max_bulk_workers = max_bulk_workers
 
     def commit(self) -> None:
-        """Commits up to 25 changes to the DynamoDB table in a single transaction."""
+        """
+        Commits up to 100 changes to the DynamoDB table in a single transaction.
+        Raises WriteConflictException when a condition fails or a concurrent
+        transaction touches the same items.
+        """
         try:
             self._dynamo_db_client.transact_write_items(TransactItems=self._db_items)
             self._db_items = []
         except Exception as e:
+            reason_codes = {
+                reason.get("Code")
+                for reason in getattr(e, "response", {}).get("CancellationReasons", [])
+            }
+            if "ConditionalCheckFailed" in reason_codes:
+                raise write_conflict_exception.WriteConflictException(
+                    "A condition of the transaction was not met."
+                ) from e
+            if "TransactionConflict" in reason_codes:
+                raise write_conflict_exception.WriteConflictException(
+                    "The transaction conflicted with a concurrent one.", retryable=True
+                ) from e
             raise repository_exception.RepositoryException(
                 "Failed to commit a transaction to DynamoDB."
             ) from e
 
+    def commit_single(self) -> Optional[attribute_value_codec.AttributeValueMap]:
+        """
+        Commits exactly one pending change with a single item write instead of
+        a transaction, which costs half the write capacity.
+        Returns the item as stored after an update, or None for puts and deletes.
+        Raises WriteConflictException when the condition of the change fails.
+        """
+        if len(self._db_items) != 1:
+            raise repository_exception.RepositoryException(
+                f"Expected a single pending change, found {len(self._db_items)}."
+            )
+
+        db_item = self._db_items[0]
+        try:
+            if "Update" in db_item:
+                result = self._dynamo_db_client.update_item(
+                    **db_item["Update"], ReturnValues="ALL_NEW"
+                )
+            elif "Put" in db_item:
+                result = self._dynamo_db_client.put_item(**db_item["Put"])
+            else:
+                result = self._dynamo_db_client.delete_item(**db_item["Delete"])
+        except self._dynamo_db_client.exceptions.ConditionalCheckFailedException as e:
+            raise write_conflict_exception.WriteConflictException(
+                "The condition of the change was not met."
+            ) from e
+        except self._dynamo_db_client.exceptions.TransactionConflictException as e:
+            raise write_conflict_exception.WriteConflictException(
+                "The change conflicted with a concurrent transaction.", retryable=True
+            ) from e
+        except Exception as e:
+            raise repository_exception.RepositoryException(
+                "Failed to commit a change to DynamoDB."
+            ) from e
+
+        self._db_items = []
+        return result.get("Attributes")
+
+    def commit_bulk(self, mode: bulk_write.BulkWriteMode) -> List[Optional[str]]:
+        """
+        Commits any number of pending changes in concurrently executed chunks.
+        Returns an error message per pending change, or None if it was written.
+
+        TRANSACTIONAL mode writes each chunk in its own transaction.
+        BEST_EFFORT mode writes conditional changes one by one, so each keeps
+        its condition and gets its own result, and unconditional puts and
+        deletes with batch writes.
+        """
+        if mode == bulk_write.BulkWriteMode.TRANSACTIONAL:
+            tasks = self._create_transaction_tasks()
+        else:
+            tasks = self._create_best_effort_tasks()
+
+        errors: List[Optional[str]] = [None] * len(self._db_items)
+        with futures.ThreadPoolExecutor(max_workers=self._max_bulk_workers) as executor:
+            for task_errors in executor.map(lambda task: task(), tasks):
+                for index, error in task_errors:
+                    errors[index] = error
+
+        self._db_items = []
+        return errors
+
+    def _create_transaction_tasks(self) -> List[Callable[[], List[Tuple[int, Any]]]]:
+        indexes = list(range(len(self._db_items)))
+        return [
+            lambda chunk=chunk: self._write_transaction_chunk(chunk)
+            for chunk in chunked(indexes, self._transaction_max_items)
+        ]
+
+    def _write_transaction_chunk(self, indexes: List[int]) -> List[Tuple[int, Any]]:
+        try:
+            self._dynamo_db_client.transact_write_items(
+                TransactItems=[self._db_items[index] for index in indexes]
+            )
+            return [(index, None) for index in indexes]
+        except Exception as e:
+            reasons = getattr(e, "response", {}).get("CancellationReasons", [])
+            return [
+                (index, _cancellation_reason(reasons, position, e))
+                for position, index in enumerate(indexes)
+            ]
+
+    def _create_best_effort_tasks(self) -> List[Callable[[], List[Tuple[int, Any]]]]:
+        batch_writes = []
+        tasks = []
+        for index, db_item in enumerate(self._db_items):
+            if "Put" in db_item and "ConditionExpression" not in db_item["Put"]:
+                put = db_item["Put"]
+                batch_writes.append(
+                    (index, put["TableName"], {"PutRequest": {"Item": put["Item"]}})
+                )
+            elif "Delete" in db_item and "ConditionExpression" not in db_item["Delete"]:
+                delete = db_item["Delete"]
+                batch_writes.append(
+                    (
+                        index,
+                        delete["TableName"],
+                        {"DeleteRequest": {"Key": delete["Key"]}},
+                    )
+                )
+            else:
+                tasks.append(lambda index=index: self._write_single_change(index))
+
+        tasks.extend(
+            lambda chunk=chunk: self._write_batch_chunk(chunk)
+            for chunk in chunked(batch_writes, BATCH_WRITE_MAX_ITEMS)
+        )
+        return tasks
+
+    def _write_single_change(self, index: int) -> List[Tuple[int, Any]]:
+        db_item = self._db_items[index]
+        try:
+            if "Update" in db_item:
+                self._dynamo_db_client.update_item(**db_item["Update"])
+            elif "Put" in db_item:
+                self._dynamo_db_client.put_item(**db_item["Put"])
+            elif "Delete" in db_item:
+                self._dynamo_db_client.delete_item(**db_item["Delete"])
+            else:
+                return [(index, "Unsupported change in best effort mode.")]
+            return [(index, None)]
+        except Exception as e:
+            return [(index, str(e))]
+
+    def _write_batch_chunk(
+        self, batch_writes: List[Tuple[int, str, dict]]
+    ) -> List[Tuple[int, Any]]:
+        pending = batch_writes
+        for attempt in range(BATCH_WRITE_MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(BATCH_WRITE_BASE_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+            request_items: dict = {}
+            for _, table_name, request in pending:
+                request_items.setdefault(table_name, []).append(request)
+            try:
+                result = self._dynamo_db_client.batch_write_item(
+                    RequestItems=request_items
+                )
+            except Exception as e:
+                # Items processed by earlier attempts were written.
+                pending_indexes = {index for index, _, _ in pending}
+                return [
+                    (index, str(e) if index in pending_indexes else None)
+                    for index, _, _ in batch_writes
+                ]
+
+            unprocessed = result.get("UnprocessedItems") or {}
+            pending = [
+                (index, table_name, request)
+                for index, table_name, request in pending
+                if request in unprocessed.get(table_name, [])
+            ]
+            if not pending:
+                break
+
+        unprocessed_indexes = {index for index, _, _ in pending}
+        return [
+            (
+                index,
+                "Unprocessed after retries." if index in unprocessed_indexes else None,
+            )
+            for index, _, _ in batch_writes
+        ]
+
     def add_generic_item(self, item: dict) -> None:
         """Adds DynamoDB modifying instructions to a pending list."""
-        dynamodb_item = type_defs.TransactWriteItemTypeDef(**item)
+        dynamodb_item = cast("type_defs.TransactWriteItemTypeDef", item)
         self._db_items.append(dynamodb_item)
 
     def get_generic_item(self, request: dict) -> Any:
         """
-        Gets a generic item from DynamoDB by primary key.
+        Gets a generic item from DynamoDB by primary key as an AttributeValue map.
         Primary key must contain both partition key and sort key.
         """
         item = self._dynamo_db_client.get_item(**request)
@@ -37,14 +236,48 @@ class DynamoDBContext:
         return item["Item"] if "Item" in item else None
 
 
+def chunked(items: Sequence, size: int) -> List[Sequence]:
+    """Splits items into consecutive chunks of at most size items."""
+    chunks = []
+    for start in range(0, len(items), size):
+        end = start + size
+        chunks.append(items[start:end])
+    return chunks
+
+
+def projection_expression(attribute_names: Sequence[str]) -> dict:
+    """
+    Builds request parameters that read only the given attributes.
+    Attribute names are always aliased, because many are DynamoDB reserved words.
+    """
+    aliases = {f"#p{idx}": name for idx, name in enumerate(attribute_names)}
+    return {
+        "ProjectionExpression": ", ".join(aliases),
+        "ExpressionAttributeNames": aliases,
+    }
+
+
+def _cancellation_reason(reasons: list, position: int, error: Exception) -> str:
+    """Returns the item's own cancellation reason when DynamoDB reports one."""
+    if position < len(reasons) and reasons[position].get("Code") not in (None, "None"):
+        return reasons[position].get("Message") or reasons[position]["Code"]
+    return f"Transaction chunk failed: {error}"
+
+
 class DynamoDBRepository:
-    """Generic DynamoDB repository."""
+    """
+    Generic DynamoDB repository.
+    Items are AttributeValue maps, while keys and expression values are plain
+    Python values serialized here.
+    """
 
     def __init__(self, table_name: str, context: DynamoDBContext):
         self._table_name = table_name
         self._context = context
 
-    def add_generic_item(self, item: dict, key: dict) -> None:
+    def add_generic_item(
+        self, item: attribute_value_codec.AttributeValueMap, key: dict
+    ) -> None:
         """
         Converts item to a DynamoDB put item instruction
         and adds to the pending transactions list.
@@ -62,27 +295,61 @@ class DynamoDBRepository:
             item=self._create_update_modifier(expression=expression, key=key)
         )
 
-    def delete_generic_item(self, key: dict) -> None:
+    def delete_generic_item(self, key: dict, must_exist: bool = False) -> None:
         """
         Converts item to a DynamoDB delete instruction
         and adds to the pending transactions list.
+        With must_exist, the delete fails when the item does not exist.
         """
-        self._context.add_generic_item(item=self._create_delete_modifier(key=key))
+        self._context.add_generic_item(
+            item=self._create_delete_modifier(key=key, must_exist=must_exist)
+        )
 
-    def _create_put_modifier(self, obj: dict, key: dict) -> dict:
+    def _create_put_modifier(
+        self, obj: attribute_value_codec.AttributeValueMap, key: dict
+    ) -> dict:
         return {
             "Put": {
                 "TableName": self._table_name,
-                "Item": {**obj, **key},
+                "Item": {**obj, **attribute_value_codec.serialize_item(key)},
                 "ConditionExpression": "(attribute_not_exists(PK) AND attribute_not_exists(SK))",
             }
         }
 
     def _create_update_modifier(self, expression: dict, key: dict) -> dict:
-        return {"Update": {"TableName": self._table_name, "Key": key, **expression}}
+        if "ExpressionAttributeValues" in expression:
+            expression = {
+                **expression,
+                "ExpressionAttributeValues": attribute_value_codec.serialize_item(
+                    expression["ExpressionAttributeValues"]
+                ),
+            }
+        return {
+            "Update": {
+                "TableName": self._table_name,
+                "Key": attribute_value_codec.serialize_item(key),
+                **expression,
+            }
+        }
 
-    def _create_get_request(self, key: dict) -> dict:
-        return {"TableName": self._table_name, "Key": {**key}}
+    def _create_get_request(self, key: dict, consistent_read: bool = False) -> dict:
+        """
+        Builds a get request. Consistent reads cost twice the read capacity
+        of the default eventually consistent ones.
+        """
+        return {
+            "TableName": self._table_name,
+            "Key": attribute_value_codec.serialize_item(key),
+            "ConsistentRead": consistent_read,
+        }
 
-    def _create_delete_modifier(self, key: dict) -> dict:
-        return {"Delete": {"TableName": self._table_name, "Key": key}}
+    def _create_delete_modifier(self, key: dict, must_exist: bool = False) -> dict:
+        delete = {
+            "TableName": self._table_name,
+            "Key": attribute_value_codec.serialize_item(key),
+        }
+        if must_exist:
+            delete[
+                "ConditionExpression"
+            ] = "(attribute_exists(PK) AND attribute_exists(SK))"
+        return {"Delete": delete}
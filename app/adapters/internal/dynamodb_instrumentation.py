@@ -0,0 +1,140 @@
+import time
+import typing
+
+from app.adapters.internal import emf_metrics
+
+if typing.TYPE_CHECKING:
+    from mypy_boto3_dynamodb import client
+
+READ_OPERATIONS = frozenset(
+    {"GetItem", "BatchGetItem", "Query", "Scan", "TransactGetItems"}
+)
+
+_STARTED = "metrics_started"
+_ITEMS_WRITTEN = "metrics_items_written"
+_REQUEST_BYTES = "metrics_request_bytes"
+
+
+def instrument_dynamodb_client(
+    dynamodb_client: "client.DynamoDBClient", recorder: emf_metrics.MetricsRecorder
+) -> None:
+    """
+    Records per-operation metrics for every call made with the client, so the
+    unit of work and the query services are measured alike:
+    latency, consumed read and write capacity units, items read and written,
+    and request and response payload bytes.
+
+    Consumed capacity is only requested while the invocation is sampled.
+    """
+    events = dynamodb_client.meta.events
+
+    def on_provide_params(params, model, context, **kwargs):
+        if not recorder.sampling:
+            return
+        context[_STARTED] = time.perf_counter()
+        context[_ITEMS_WRITTEN] = _count_items_written(model.name, params)
+        if "ReturnConsumedCapacity" in model.input_shape.members:
+            params.setdefault("ReturnConsumedCapacity", "TOTAL")
+
+    def on_before_call(params, context, **kwargs):
+        if _STARTED in context:
+            context[_REQUEST_BYTES] = len(params.get("body") or b"")
+
+    def on_after_call(http_response, parsed, model, context, **kwargs):
+        if _STARTED not in context:
+            return
+        dimensions = {"Operation": model.name}
+        _record_call(recorder, dimensions, context)
+        recorder.add(
+            "ResponseBytes", len(http_response.content or b""), "Bytes", dimensions
+        )
+        if http_response.status_code >= 300:
+            recorder.add("Errors", 1, "Count", dimensions)
+            return
+
+        read_units, write_units = _sum_consumed_capacity(
+            model.name, parsed.get("ConsumedCapacity")
+        )
+        recorder.add("ConsumedRCU", read_units, "Count", dimensions)
+        recorder.add("ConsumedWCU", write_units, "Count", dimensions)
+        recorder.add("ItemsRead", _count_items_read(parsed), "Count", dimensions)
+        recorder.add("ItemsWritten", context[_ITEMS_WRITTEN], "Count", dimensions)
+
+    def on_after_call_error(context, **kwargs):
+        if _STARTED not in context:
+            return
+        operation = kwargs["event_name"].rsplit(".", 1)[-1]
+        dimensions = {"Operation": operation}
+        _record_call(recorder, dimensions, context)
+        recorder.add("Errors", 1, "Count", dimensions)
+
+    events.register("provide-client-params.dynamodb.*", on_provide_params)
+    events.register("before-call.dynamodb.*", on_before_call)
+    events.register("after-call.dynamodb.*", on_after_call)
+    events.register("after-call-error.dynamodb.*", on_after_call_error)
+
+
+def _record_call(
+    recorder: emf_metrics.MetricsRecorder,
+    dimensions: typing.Dict[str, str],
+    context: dict,
+) -> None:
+    recorder.add(
+        "Latency",
+        round((time.perf_counter() - context[_STARTED]) * 1000, 3),
+        "Milliseconds",
+        dimensions,
+    )
+    recorder.add("RequestBytes", context.get(_REQUEST_BYTES, 0), "Bytes", dimensions)
+
+
+def _sum_consumed_capacity(
+    operation: str, consumed_capacity: typing.Any
+) -> typing.Tuple[float, float]:
+    """
+    Returns the read and write capacity units consumed by a call. Units
+    reported without a read or write split count for the kind of operation.
+    """
+    if consumed_capacity is None:
+        return 0.0, 0.0
+    if isinstance(consumed_capacity, dict):
+        consumed_capacity = [consumed_capacity]
+
+    read_units = 0.0
+    write_units = 0.0
+    for capacity in consumed_capacity:
+        if "ReadCapacityUnits" in capacity or "WriteCapacityUnits" in capacity:
+            read_units += capacity.get("ReadCapacityUnits", 0.0)
+            write_units += capacity.get("WriteCapacityUnits", 0.0)
+        elif operation in READ_OPERATIONS:
+            read_units += capacity.get("CapacityUnits", 0.0)
+        else:
+            write_units += capacity.get("CapacityUnits", 0.0)
+    return read_units, write_units
+
+
+def _count_items_read(parsed: dict) -> int:
+    if "Count" in parsed:
+        return parsed["Count"]
+    if "Item" in parsed:
+        return 1
+    responses = parsed.get("Responses")
+    if isinstance(responses, dict):
+        return sum(len(items) for items in responses.values())
+    if isinstance(responses, list):
+        return sum(1 for response in responses if "Item" in response)
+    return 0
+
+
+def _count_items_written(operation: str, params: dict) -> int:
+    if operation in READ_OPERATIONS:
+        return 0
+    if operation == "TransactWriteItems":
+        return len(params.get("TransactItems", []))
+    if operation == "BatchWriteItem":
+        return sum(
+            len(requests) for requests in params.get("RequestItems", {}).values()
+        )
+    if operation in ("PutItem", "UpdateItem", "DeleteItem"):
+        return 1
+    return 0
@@ -0,0 +1,133 @@
+import json
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MAX_METRICS_PER_LINE = 100
+MAX_VALUES_PER_METRIC = 100
+COUNT_UNIT = "Count"
+
+Dimensions = Tuple[Tuple[str, str], ...]
+
+
+def _write_stdout(line: str) -> None:
+    sys.stdout.write(line + "\n")
+
+
+class MetricsRecorder:
+    """
+    Collects metrics during sampled invocations and writes them as CloudWatch
+    Embedded Metric Format (EMF) lines, one per dimension set.
+
+    Every value is kept, so CloudWatch can compute percentiles from the values
+    of a metric like it does for a histogram. Invocations that are not sampled
+    record nothing, which keeps the overhead to a flag check per metric.
+    Counts are scaled by the inverse of the sample rate, so their sums estimate
+    the totals of all invocations.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        sample_rate: float,
+        write: Callable[[str], Any] = _write_stdout,
+        sample: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._namespace = namespace
+        self._sample_rate = sample_rate
+        self._write = write
+        self._sample = sample
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._metrics: Dict[Dimensions, Dict[str, Tuple[str, List[float]]]] = {}
+        self.sampling = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._sample_rate > 0
+
+    def start_invocation(self) -> bool:
+        """Decides whether the invocation is sampled and drops unflushed values."""
+        with self._lock:
+            self._metrics = {}
+        self.sampling = self.enabled and self._sample() < self._sample_rate
+        return self.sampling
+
+    def add(
+        self,
+        name: str,
+        value: float,
+        unit: str,
+        dimensions: Optional[Dict[str, str]] = None,
+        scale: bool = True,
+    ) -> None:
+        """
+        Records a value when the invocation is sampled. Safe to call from threads.
+        Counts are scaled to the sample rate unless they already cover the
+        invocations that were not sampled.
+        """
+        if not self.sampling:
+            return
+        if scale and unit == COUNT_UNIT:
+            value = value * (1 / self._sample_rate)
+
+        key = tuple(sorted(dimensions.items())) if dimensions else ()
+        with self._lock:
+            metrics = self._metrics.setdefault(key, {})
+            metrics.setdefault(name, (unit, []))[1].append(value)
+
+    def flush(self) -> None:
+        """Writes the recorded values and ends sampling for the invocation."""
+        with self._lock:
+            recorded, self._metrics = self._metrics, {}
+        self.sampling = False
+
+        timestamp = int(self._clock() * 1000)
+        for dimensions, metrics in recorded.items():
+            for line in self._to_lines(timestamp, dimensions, metrics):
+                self._write(json.dumps(line, separators=(",", ":")))
+
+    def _to_lines(
+        self,
+        timestamp: int,
+        dimensions: Dimensions,
+        metrics: Dict[str, Tuple[str, List[float]]],
+    ) -> List[Dict[str, Any]]:
+        """Splits the values into lines within the EMF limits."""
+        lines = []
+        names = list(metrics)
+        for start in range(0, len(names), MAX_METRICS_PER_LINE):
+            end = start + MAX_METRICS_PER_LINE
+            chunk = names[start:end]
+            longest = max(len(metrics[name][1]) for name in chunk)
+            for offset in range(0, longest, MAX_VALUES_PER_METRIC):
+                last = offset + MAX_VALUES_PER_METRIC
+                values = {name: metrics[name][1][offset:last] for name in chunk}
+                values = {name: value for name, value in values.items() if value}
+                lines.append(
+                    {
+                        "_aws": {
+                            "Timestamp": timestamp,
+                            "CloudWatchMetrics": [
+                                {
+                                    "Namespace": self._namespace,
+                                    "Dimensions": [[name for name, _ in dimensions]],
+                                    "Metrics": [
+                                        {"Name": name, "Unit": metrics[name][0]}
+                                        for name in values
+                                    ],
+                                }
+                            ],
+                        },
+                        **dict(dimensions),
+                        "SampleRate": self._sample_rate,
+                        **{
+                            name: value[0] if len(value) == 1 else value
+                            for name, value in values.items()
+                        },
+                    }
+                )
+        return lines
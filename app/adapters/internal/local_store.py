@@ -0,0 +1,581 @@
+import secrets
+import time
+import typing
+from abc import ABC, abstractmethod
+
+from app.adapters.internal import dynamodb_base, pagination_cursor
+from app.domain.exceptions import repository_exception, write_conflict_exception
+from app.domain.exceptions.domain_exception import DomainException
+from app.domain.model import (
+    bulk_write,
+    idempotency_record,
+    product,
+    product_version,
+    time_sortable_id,
+)
+from app.domain.ports import products_query_service, unit_of_work
+
+CONDITION_FAILED_MESSAGE = "The conditional request failed"
+
+
+def generate_listing_sort_key(product_id: str, create_date: str) -> str:
+    """Generates the position of a product in the products listing."""
+    return f"{create_date}#{product_id}"
+
+
+class LocalStore(ABC):
+    """
+    Storage of the local adapters, used for tests and load tests without
+    DynamoDB. Items are kept per entity type, and products are also kept in
+    the order of the products listing.
+    """
+
+    @abstractmethod
+    def transaction(self) -> typing.ContextManager[None]:
+        """
+        Serializes access to the store. Changes made inside the block are
+        applied together or, when it raises, not at all.
+        """
+
+    @abstractmethod
+    def get_product(self, product_id: str) -> typing.Optional[product.Product]:
+        ...
+
+    @abstractmethod
+    def get_products(
+        self, product_ids: typing.List[str]
+    ) -> typing.List[product.Product]:
+        """Returns the existing products among the given IDs, in any order."""
+
+    @abstractmethod
+    def put_product(self, product_obj: product.Product) -> None:
+        ...
+
+    @abstractmethod
+    def delete_product(self, product_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def list_products(
+        self, after_sort_key: typing.Optional[str], limit: int
+    ) -> typing.List[product.Product]:
+        """Returns up to limit products listed after the given listing position."""
+
+    @abstractmethod
+    def get_product_version(
+        self, product_id: str, version_id: str
+    ) -> typing.Optional[product_version.ProductVersion]:
+        ...
+
+    @abstractmethod
+    def put_product_version(
+        self, product_id: str, product_version_obj: product_version.ProductVersion
+    ) -> None:
+        ...
+
+    @abstractmethod
+    def list_product_versions(
+        self,
+        product_id: str,
+        before_id: typing.Optional[str],
+        from_id: typing.Optional[str],
+        limit: int,
+    ) -> typing.List[product_version.ProductVersion]:
+        """
+        Returns up to limit versions of the product, newest first, with IDs
+        lower than before_id and not lower than from_id when they are given.
+        """
+
+    @abstractmethod
+    def get_idempotency_record(
+        self, key: str
+    ) -> typing.Optional[idempotency_record.IdempotencyRecord]:
+        ...
+
+    @abstractmethod
+    def put_idempotency_record(
+        self, record: idempotency_record.IdempotencyRecord
+    ) -> None:
+        ...
+
+
+class LocalChange(ABC):
+    """A pending change with the condition DynamoDB would check for it."""
+
+    key: typing.Tuple[str, ...]
+
+    @abstractmethod
+    def check(self, store: LocalStore) -> bool:
+        """Returns whether the condition of the change holds."""
+
+    @abstractmethod
+    def apply(self, store: LocalStore) -> typing.Optional[product.Product]:
+        """Applies the change. Returns the stored product after an update."""
+
+
+class _PutProduct(LocalChange):
+    def __init__(self, product_obj: product.Product):
+        self.key = ("PRODUCT", product_obj.id)
+        self._product = product_obj
+
+    def check(self, store: LocalStore) -> bool:
+        return store.get_product(self._product.id) is None
+
+    def apply(self, store: LocalStore) -> typing.Optional[product.Product]:
+        store.put_product(self._product)
+        return None
+
+
+class _UpdateProduct(LocalChange):
+    def __init__(
+        self,
+        product_id: str,
+        expected_version: typing.Optional[int],
+        attributes: typing.Dict[str, typing.Any],
+        last_updated_before: typing.Optional[str] = None,
+    ):
+        self.key = ("PRODUCT", product_id)
+        self._product_id = product_id
+        self._expected_version = expected_version
+        self._attributes = attributes
+        self._last_updated_before = last_updated_before
+
+    def check(self, store: LocalStore) -> bool:
+        current = store.get_product(self._product_id)
+        return (
+            current is not None
+            and (
+                self._expected_version is None
+                or current.version == self._expected_version
+            )
+            and (
+                self._last_updated_before is None
+                or current.lastUpdateDate < self._last_updated_before
+            )
+        )
+
+    def apply(self, store: LocalStore) -> typing.Optional[product.Product]:
+        current = store.get_product(self._product_id)
+        updated = current.copy(
+            update={**self._attributes, "version": current.version + 1}
+        )
+        store.put_product(updated)
+        return updated
+
+
+class _DeleteProduct(LocalChange):
+    def __init__(self, product_id: str, must_exist: bool):
+        self.key = ("PRODUCT", product_id)
+        self._product_id = product_id
+        self._must_exist = must_exist
+
+    def check(self, store: LocalStore) -> bool:
+        return not self._must_exist or store.get_product(self._product_id) is not None
+
+    def apply(self, store: LocalStore) -> typing.Optional[product.Product]:
+        store.delete_product(self._product_id)
+        return None
+
+
+class _PutProductVersion(LocalChange):
+    def __init__(
+        self, product_id: str, product_version_obj: product_version.ProductVersion
+    ):
+        self.key = ("PRODUCTVERSION", product_id, product_version_obj.id)
+        self._product_id = product_id
+        self._product_version = product_version_obj
+
+    def check(self, store: LocalStore) -> bool:
+        return (
+            store.get_product_version(self._product_id, self._product_version.id)
+            is None
+        )
+
+    def apply(self, store: LocalStore) -> typing.Optional[product.Product]:
+        store.put_product_version(self._product_id, self._product_version)
+        return None
+
+
+class _PutIdempotencyRecord(LocalChange):
+    def __init__(self, record: idempotency_record.IdempotencyRecord, now: int):
+        self.key = ("IDEMPOTENCY", record.key)
+        self._record = record
+        self._now = now
+
+    def check(self, store: LocalStore) -> bool:
+        existing = store.get_idempotency_record(self._record.key)
+        return existing is None or existing.expiresAt <= self._now
+
+    def apply(self, store: LocalStore) -> typing.Optional[product.Product]:
+        store.put_idempotency_record(self._record)
+        return None
+
+
+class LocalContext:
+    """
+    Transactional context for the local stores with the semantics of
+    DynamoDBContext: conditions are checked for all changes before any is
+    applied, a transaction holds at most one change per item, and failed
+    conditions raise WriteConflictException.
+    """
+
+    def __init__(
+        self,
+        store: LocalStore,
+        transaction_max_items: int = dynamodb_base.TRANSACTION_MAX_ITEMS,
+    ):
+        self._store = store
+        self._transaction_max_items = transaction_max_items
+        self._changes: typing.List[LocalChange] = []
+
+    def add_change(self, change: LocalChange) -> None:
+        """Adds a change to the pending list."""
+        self._changes.append(change)
+
+    def commit(self) -> None:
+        """Commits up to transaction_max_items changes in a single transaction."""
+        if not self._changes:
+            return
+        if len(self._changes) > self._transaction_max_items:
+            raise repository_exception.RepositoryException(
+                "Failed to commit a transaction to the local store."
+            )
+        failed = self._write_transaction(self._changes)
+        if failed is None:
+            raise repository_exception.RepositoryException(
+                "Failed to commit a transaction to the local store."
+            )
+        if failed:
+            raise write_conflict_exception.WriteConflictException(
+                "A condition of the transaction was not met."
+            )
+        self._changes = []
+
+    def commit_single(self) -> typing.Optional[product.Product]:
+        """
+        Commits exactly one pending change.
+        Returns the product as stored after an update, or None for puts and deletes.
+        """
+        if len(self._changes) != 1:
+            raise repository_exception.RepositoryException(
+                f"Expected a single pending change, found {len(self._changes)}."
+            )
+
+        change = self._changes[0]
+        with self._store.transaction():
+            if not change.check(self._store):
+                raise write_conflict_exception.WriteConflictException(
+                    "The condition of the change was not met."
+                )
+            stored = change.apply(self._store)
+
+        self._changes = []
+        return stored
+
+    def commit_bulk(
+        self, mode: bulk_write.BulkWriteMode
+    ) -> typing.List[typing.Optional[str]]:
+        """
+        Commits any number of pending changes and returns an error message per
+        change, or None if it was written.
+
+        TRANSACTIONAL mode writes each chunk in its own transaction.
+        BEST_EFFORT mode writes each change on its own with its condition.
+        """
+        errors: typing.List[typing.Optional[str]] = []
+        if mode == bulk_write.BulkWriteMode.TRANSACTIONAL:
+            for chunk in dynamodb_base.chunked(
+                self._changes, self._transaction_max_items
+            ):
+                errors.extend(self._write_transaction_chunk(chunk))
+        else:
+            errors = [self._write_best_effort(change) for change in self._changes]
+
+        self._changes = []
+        return errors
+
+    def _write_transaction(
+        self, changes: typing.Sequence[LocalChange]
+    ) -> typing.Optional[typing.List[int]]:
+        """
+        Writes the changes if all conditions hold. Returns the positions of the
+        changes whose condition failed, or None when the transaction is invalid.
+        """
+        if len({change.key for change in changes}) != len(changes):
+            return None
+
+        with self._store.transaction():
+            failed = [
+                position
+                for position, change in enumerate(changes)
+                if not change.check(self._store)
+            ]
+            if not failed:
+                for change in changes:
+                    change.apply(self._store)
+        return failed
+
+    def _write_transaction_chunk(
+        self, changes: typing.Sequence[LocalChange]
+    ) -> typing.List[typing.Optional[str]]:
+        failed = self._write_transaction(changes)
+        if failed is None:
+            return [
+                "Transaction chunk failed: "
+                "A transaction cannot include several changes of one item."
+            ] * len(changes)
+        if not failed:
+            return [None] * len(changes)
+        return [
+            CONDITION_FAILED_MESSAGE
+            if position in failed
+            else f"Transaction chunk failed: {CONDITION_FAILED_MESSAGE}"
+            for position in range(len(changes))
+        ]
+
+    def _write_best_effort(self, change: LocalChange) -> typing.Optional[str]:
+        with self._store.transaction():
+            if not change.check(self._store):
+                return CONDITION_FAILED_MESSAGE
+            change.apply(self._store)
+        return None
+
+
+class LocalProductsRepository(unit_of_work.ProductsRepository):
+    """Products repository of the local stores."""
+
+    def __init__(self, store: LocalStore, context: LocalContext):
+        self._store = store
+        self._context = context
+
+    def add(self, product: product.Product) -> None:
+        """Adds a product, unless one with the same ID exists."""
+        self._context.add_change(_PutProduct(product))
+
+    def update_attributes(
+        self,
+        product_id: str,
+        expected_version: typing.Optional[int] = None,
+        last_updated_before: typing.Optional[str] = None,
+        **kwargs,
+    ) -> None:
+        """Updates the given attributes and increments the product version."""
+        self._context.add_change(
+            _UpdateProduct(product_id, expected_version, kwargs, last_updated_before)
+        )
+
+    def get(
+        self, product_id: str, consistent_read: bool = False
+    ) -> typing.Optional[product.Product]:
+        """Gets a product. Reads of the local stores are always consistent."""
+        with self._store.transaction():
+            return self._store.get_product(product_id)
+
+    def delete(self, product_id: str, must_exist: bool = False) -> None:
+        """Deletes a product, failing when it is missing if must_exist is set."""
+        self._context.add_change(_DeleteProduct(product_id, must_exist))
+
+
+class LocalProductVersionsRepository(unit_of_work.ProductVersionsRepository):
+    """Product versions repository of the local stores."""
+
+    def __init__(self, store: LocalStore, context: LocalContext):
+        self._store = store
+        self._context = context
+
+    def add(
+        self, product_id: str, product_version: product_version.ProductVersion
+    ) -> None:
+        self._context.add_change(_PutProductVersion(product_id, product_version))
+
+    def get(
+        self, product_id: str, version_id: str, consistent_read: bool = False
+    ) -> typing.Optional[product_version.ProductVersion]:
+        with self._store.transaction():
+            return self._store.get_product_version(product_id, version_id)
+
+
+class LocalIdempotencyRecordsRepository(unit_of_work.IdempotencyRecordsRepository):
+    """Idempotency records repository of the local stores."""
+
+    def __init__(self, store: LocalStore, context: LocalContext):
+        self._store = store
+        self._context = context
+
+    def add(self, record: idempotency_record.IdempotencyRecord) -> None:
+        """Adds a record, unless an unexpired record with the same key exists."""
+        self._context.add_change(_PutIdempotencyRecord(record, int(time.time())))
+
+    def get(self, key: str) -> typing.Optional[idempotency_record.IdempotencyRecord]:
+        with self._store.transaction():
+            return self._store.get_idempotency_record(key)
+
+
+class LocalUnitOfWork(unit_of_work.UnitOfWork):
+    """Repository provider and unit of work for the local stores."""
+
+    products: LocalProductsRepository
+    product_versions: LocalProductVersionsRepository
+    idempotency_records: LocalIdempotencyRecordsRepository
+
+    def __init__(
+        self,
+        store: LocalStore,
+        transaction_max_items: int = dynamodb_base.TRANSACTION_MAX_ITEMS,
+    ):
+        self._store = store
+        self._transaction_max_items = transaction_max_items
+        self._context: typing.Optional[LocalContext] = None
+
+    def commit(self) -> None:
+        """Commits the pending changes in a single transaction."""
+        if self._context:
+            self._context.commit()
+
+    def commit_returning_product(self) -> typing.Optional[product.Product]:
+        """Commits a single product change and returns the product after an update."""
+        return self._context.commit_single() if self._context else None
+
+    def commit_bulk(
+        self, mode: bulk_write.BulkWriteMode
+    ) -> typing.List[typing.Optional[str]]:
+        """Commits any number of changes in chunks and reports per-change errors."""
+        return self._context.commit_bulk(mode) if self._context else []
+
+    def __enter__(self) -> typing.Any:
+        self._context = LocalContext(
+            store=self._store, transaction_max_items=self._transaction_max_items
+        )
+        self.products = LocalProductsRepository(self._store, self._context)
+        self.product_versions = LocalProductVersionsRepository(
+            self._store, self._context
+        )
+        self.idempotency_records = LocalIdempotencyRecordsRepository(
+            self._store, self._context
+        )
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._context = None
+        self.products = None  # type: ignore
+        self.product_versions = None  # type: ignore
+        self.idempotency_records = None  # type: ignore
+
+
+class LocalProductsQueryService(products_query_service.ProductsQueryService):
+    """
+    Products query service of the local stores. Pages are read from the
+    listing order after the position in the token, like from the DynamoDB
+    products index, and tokens are signed the same way, with a random key
+    unless one is given. Every read is consistent, so consistent_read has
+    no effect.
+    """
+
+    def __init__(
+        self, store: LocalStore, cursor_signing_key: typing.Optional[str] = None
+    ):
+        self._store = store
+        self._cursor_codec = pagination_cursor.PaginationCursorCodec(
+            signing_key=cursor_signing_key or secrets.token_urlsafe(32)
+        )
+
+    def list_products(
+        self,
+        page_size: int,
+        next_token: typing.Optional[str],
+        fields: typing.Optional[typing.List[str]] = None,
+    ) -> typing.Tuple[typing.List[product.Product], typing.Optional[str]]:
+        """Returns a page of products ordered by creation date."""
+        after_sort_key = None
+        if next_token:
+            token_fields = self._cursor_codec.decode(next_token)
+            if len(token_fields) != 1 or "#" not in token_fields[0]:
+                raise DomainException("Invalid pagination token.")
+            after_sort_key = token_fields[0]
+
+        with self._store.transaction():
+            products = self._store.list_products(after_sort_key, page_size + 1)
+
+        if len(products) <= page_size:
+            return [_project(p, fields) for p in products], None
+
+        products = products[:page_size]
+        last_sort_key = generate_listing_sort_key(
+            products[-1].id, products[-1].createDate
+        )
+        return [_project(p, fields) for p in products], self._cursor_codec.encode(
+            [last_sort_key]
+        )
+
+    def get_product_by_id(
+        self,
+        product_id: str,
+        fields: typing.Optional[typing.List[str]] = None,
+        consistent_read: bool = False,
+    ) -> typing.Optional[product.Product]:
+        with self._store.transaction():
+            product_obj = self._store.get_product(product_id)
+        return _project(product_obj, fields) if product_obj else None
+
+    def get_products_by_ids(
+        self, product_ids: typing.List[str], consistent_read: bool = False
+    ) -> typing.List[product.Product]:
+        """Returns products by IDs in the requested order, skipping missing ones."""
+        unique_ids = list(dict.fromkeys(product_ids))
+        with self._store.transaction():
+            products_by_id = {p.id: p for p in self._store.get_products(unique_ids)}
+        return [
+            products_by_id[product_id]
+            for product_id in unique_ids
+            if product_id in products_by_id
+        ]
+
+    def list_product_versions(
+        self,
+        product_id: str,
+        limit: int,
+        next_token: typing.Optional[str] = None,
+        since: typing.Optional[str] = None,
+        consistent_read: bool = False,
+    ) -> typing.Tuple[
+        typing.List[product_version.ProductVersion], typing.Optional[str]
+    ]:
+        """Returns a page of the versions of a product, newest first."""
+        before_id = None
+        if next_token:
+            token_fields = self._cursor_codec.decode(next_token)
+            if len(token_fields) != 2 or token_fields[0] != product_id:
+                raise DomainException("Invalid pagination token.")
+            before_id = token_fields[1]
+        from_id = (
+            time_sortable_id.timestamp_prefix(
+                time_sortable_id.parse_timestamp_ms(since)
+            )
+            if since
+            else None
+        )
+
+        with self._store.transaction():
+            versions = self._store.list_product_versions(
+                product_id, before_id, from_id, limit + 1
+            )
+
+        if len(versions) <= limit:
+            return versions, None
+        versions = versions[:limit]
+        return versions, self._cursor_codec.encode([product_id, versions[-1].id])
+
+
+def _project(
+    product_obj: product.Product, fields: typing.Optional[typing.List[str]]
+) -> product.Product:
+    """Returns a product carrying only the given fields and the id."""
+    if fields is None:
+        return product_obj
+    return product.Product.construct(
+        **{
+            name: getattr(product_obj, name)
+            for name in ("id", *fields)
+            if name in product.Product.__fields__
+        }
+    )
@@ -0,0 +1,98 @@
+import base64
+import binascii
+import hashlib
+import hmac
+from typing import List, Sequence
+
+from app.domain.exceptions.domain_exception import DomainException
+
+CURSOR_VERSION = 1
+SIGNATURE_LENGTH = 16
+MAX_TOKEN_LENGTH = 1024
+
+
+class PaginationCursorCodec:
+    """
+    Encodes pagination positions as opaque, versioned and signed tokens.
+
+    Token layout (base64url without padding):
+    version (1 byte) | fields (varint length + UTF-8 bytes each) | HMAC-SHA256 (16 bytes)
+    """
+
+    def __init__(self, signing_key: str):
+        if not signing_key:
+            # Tokens signed with an empty key could be forged by anyone.
+            raise ValueError("The pagination cursor signing key must not be empty.")
+        self._signing_key = signing_key.encode("utf-8")
+
+    def encode(self, fields: Sequence[str]) -> str:
+        """Encodes a sequence of string fields into a signed token."""
+        payload = bytearray([CURSOR_VERSION])
+        for field in fields:
+            field_bytes = field.encode("utf-8")
+            payload += _encode_varint(len(field_bytes))
+            payload += field_bytes
+
+        token = bytes(payload) + self._sign(payload)
+        return base64.urlsafe_b64encode(token).rstrip(b"=").decode("ascii")
+
+    def decode(self, token: str) -> List[str]:
+        """Decodes a token into its fields. Raises DomainException if it is invalid."""
+        if not token or len(token) > MAX_TOKEN_LENGTH:
+            raise DomainException("Invalid pagination token.")
+
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except (binascii.Error, ValueError) as e:
+            raise DomainException("Invalid pagination token.") from e
+
+        payload, signature = raw[:-SIGNATURE_LENGTH], raw[-SIGNATURE_LENGTH:]
+        if (
+            len(payload) < 1
+            or payload[0] != CURSOR_VERSION
+            or not hmac.compare_digest(signature, self._sign(payload))
+        ):
+            raise DomainException("Invalid pagination token.")
+
+        fields = []
+        position = 1
+        try:
+            while position < len(payload):
+                length, position = _decode_varint(payload, position)
+                end = position + length
+                if end > len(payload):
+                    raise ValueError("Field exceeds payload length.")
+                fields.append(payload[position:end].decode("utf-8"))
+                position = end
+        except ValueError as e:
+            raise DomainException("Invalid pagination token.") from e
+
+        return fields
+
+    def _sign(self, payload: bytes) -> bytes:
+        return hmac.new(self._signing_key, payload, hashlib.sha256).digest()[
+            :SIGNATURE_LENGTH
+        ]
+
+
+def _encode_varint(value: int) -> bytes:
+    result = bytearray()
+    while value > 0x7F:
+        result.append((value & 0x7F) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def _decode_varint(data: bytes, position: int):
+    result = 0
+    shift = 0
+    while True:
+        if position >= len(data) or shift > 28:
+            raise ValueError("Malformed varint.")
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
@@ -0,0 +1,77 @@
+import threading
+from concurrent import futures
+from typing import Any, Callable, Dict, Hashable, List, Sequence
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls for the same key. While a call for a key is
+    in flight, other callers wait for its result instead of making their own.
+    Results are not kept once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, futures.Future] = {}
+        self._lookups = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """Returns the result of fetch, or of the call already in flight for key."""
+        return self.do_many([key], lambda keys: {key: fetch()})[key]
+
+    def do_many(
+        self,
+        keys: Sequence[Hashable],
+        fetch_many: Callable[[List[Hashable]], Dict[Hashable, Any]],
+    ) -> Dict[Hashable, Any]:
+        """
+        Returns a result per key. Keys already in flight are awaited, and the
+        others are fetched with a single fetch_many call. Keys missing from
+        the dictionary returned by fetch_many resolve to None.
+        """
+        led: Dict[Hashable, futures.Future] = {}
+        followed: Dict[Hashable, futures.Future] = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                in_flight = self._in_flight.get(key)
+                if in_flight is None:
+                    led[key] = self._in_flight[key] = futures.Future()
+                else:
+                    followed[key] = in_flight
+            self._lookups += len(led) + len(followed)
+            self._coalesced += len(followed)
+
+        # Fetching before waiting on other callers cannot deadlock, because
+        # every caller completes the keys it leads without waiting first.
+        results: Dict[Hashable, Any] = {}
+        if led:
+            try:
+                fetched = fetch_many(list(led))
+            except BaseException as e:
+                self._release(led)
+                for future in led.values():
+                    future.set_exception(e)
+                raise
+            self._release(led)
+            for key, future in led.items():
+                results[key] = fetched.get(key)
+                future.set_result(results[key])
+
+        for key, future in followed.items():
+            results[key] = future.result()
+        return results
+
+    def pop_stats(self) -> Dict[str, int]:
+        """Returns the number of lookups and coalesced lookups since the last call."""
+        with self._lock:
+            stats = {"lookups": self._lookups, "coalesced": self._coalesced}
+            self._lookups = 0
+            self._coalesced = 0
+        return stats
+
+    def _release(self, led: Dict[Hashable, futures.Future]) -> None:
+        """Lets callers arriving from now on start a new call for the keys."""
+        with self._lock:
+            for key in led:
+                del self._in_flight[key]
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+MISSING = object()
+
+
+class TTLLRUCache:
+    """
+    Thread-safe least recently used cache bounded by entry count and total size.
+    Entries expire after their time to live.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Returns the cached value, or MISSING if it is absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+
+            value, expires_at, _ = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                return MISSING
+
+            self._entries.move_to_end(key)
+            return value
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        size_bytes: int,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        """Stores a value, evicting least recently used entries to fit the limits."""
+        if size_bytes > self._max_bytes or self._max_entries <= 0:
+            return
+
+        ttl = self._ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, self._clock() + ttl, size_bytes)
+            self._size_bytes += size_bytes
+
+            while (
+                len(self._entries) > self._max_entries
+                or self._size_bytes > self._max_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Removes a value from the cache."""
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Removes all values from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size_bytes -= entry[2]
@@ -0,0 +1,44 @@
+import json
+import os
+import typing
+
+from app.domain.model import product, product_export
+from app.domain.ports import product_export as product_export_ports
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+class LocalFileExportSink(product_export_ports.ProductsExportSink):
+    """
+    Writes export chunks as newline delimited JSON files to a local directory,
+    standing in for an object store. Each file is written under a temporary
+    name and then renamed, so readers never see partial chunks. The manifest
+    is written last.
+    """
+
+    def __init__(self, directory: str, file_prefix: str = "products"):
+        self._directory = directory
+        self._file_prefix = file_prefix
+
+    def write_chunk(
+        self, chunk_index: int, products: typing.List[product.Product]
+    ) -> str:
+        """Writes products as one JSON object per line and returns the file path."""
+        lines = "".join(
+            json.dumps(product_obj.__dict__, separators=(",", ":")) + "\n"
+            for product_obj in products
+        )
+        return self._write_file(f"{self._file_prefix}-{chunk_index:05d}.ndjson", lines)
+
+    def complete(self, result: product_export.ProductExportResult) -> None:
+        """Writes the manifest listing the chunks."""
+        self._write_file(MANIFEST_FILE_NAME, result.json())
+
+    def _write_file(self, file_name: str, content: str) -> str:
+        os.makedirs(self._directory, exist_ok=True)
+        path = os.path.join(self._directory, file_name)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as export_file:
+            export_file.write(content)
+        os.replace(temporary_path, path)
+        return path
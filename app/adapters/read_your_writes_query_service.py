@@ -0,0 +1,99 @@
+import collections
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from app.domain.model import product, product_version
+from app.domain.ports import products_query_service
+
+
+class ReadYourWritesProductsQueryService(products_query_service.ProductsQueryService):
+    """
+    Reads products written through this execution environment with consistent
+    reads for a short window after the write, so a client reading back its own
+    write is not served stale data. Writes are learned from invalidate_product,
+    which command handlers call after committing. Other reads stay eventually
+    consistent, at half the read capacity cost.
+    """
+
+    def __init__(
+        self,
+        query_service: products_query_service.ProductsQueryService,
+        window_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._query_service = query_service
+        self._window_seconds = window_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._written_until: "collections.OrderedDict[str, float]" = (
+            collections.OrderedDict()
+        )
+
+    def list_products(
+        self,
+        page_size: int,
+        next_token: Optional[str],
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[product.Product], Optional[str]]:
+        """Returns a page of products from the underlying query service."""
+        return self._query_service.list_products(
+            page_size=page_size, next_token=next_token, fields=fields
+        )
+
+    def get_product_by_id(
+        self,
+        product_id: str,
+        fields: Optional[List[str]] = None,
+        consistent_read: bool = False,
+    ) -> Optional[product.Product]:
+        """Returns a single product, consistently if it was written recently."""
+        return self._query_service.get_product_by_id(
+            product_id=product_id,
+            fields=fields,
+            consistent_read=consistent_read or self._was_written(product_id),
+        )
+
+    def get_products_by_ids(
+        self, product_ids: List[str], consistent_read: bool = False
+    ) -> List[product.Product]:
+        """Returns products by IDs, consistently if any was written recently."""
+        return self._query_service.get_products_by_ids(
+            product_ids=product_ids,
+            consistent_read=consistent_read
+            or any(self._was_written(id) for id in product_ids),
+        )
+
+    def list_product_versions(
+        self,
+        product_id: str,
+        limit: int,
+        next_token: Optional[str] = None,
+        since: Optional[str] = None,
+        consistent_read: bool = False,
+    ) -> Tuple[List[product_version.ProductVersion], Optional[str]]:
+        """Returns a page of product versions, consistently after a recent write."""
+        return self._query_service.list_product_versions(
+            product_id=product_id,
+            limit=limit,
+            next_token=next_token,
+            since=since,
+            consistent_read=consistent_read or self._was_written(product_id),
+        )
+
+    def invalidate_product(self, product_id: str) -> None:
+        """Records a write of the product and passes the invalidation on."""
+        now = self._clock()
+        with self._lock:
+            self._written_until.pop(product_id, None)
+            self._written_until[product_id] = now + self._window_seconds
+            while (
+                self._written_until and next(iter(self._written_until.values())) <= now
+            ):
+                self._written_until.popitem(last=False)
+        self._query_service.invalidate_product(product_id)
+
+    def _was_written(self, product_id: str) -> bool:
+        with self._lock:
+            written_until = self._written_until.get(product_id)
+        return written_until is not None and self._clock() < written_until
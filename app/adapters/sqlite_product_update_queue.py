@@ -0,0 +1,56 @@
+import sqlite3
+import threading
+import typing
+
+from app.domain.commands import update_product_command
+from app.domain.ports import product_update_queue
+
+
+class SQLiteProductUpdateQueue(product_update_queue.ProductUpdateQueue):
+    """
+    Local stand-in for the product update queue, kept in an SQLite database,
+    in memory by default. Messages are received in the order they were sent
+    and stay queued until they are deleted, like with Amazon SQS.
+    """
+
+    def __init__(self, database: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS product_updates ("
+                "message_id INTEGER PRIMARY KEY AUTOINCREMENT, body TEXT NOT NULL)"
+            )
+
+    def send(self, command: update_product_command.UpdateProductCommand) -> None:
+        """Adds the update to the end of the queue."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO product_updates (body) VALUES (?)", (command.json(),)
+            )
+
+    def receive(
+        self, max_messages: int
+    ) -> typing.List[typing.Tuple[str, update_product_command.UpdateProductCommand]]:
+        """Returns up to max_messages of the oldest updates with their message IDs."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT message_id, body FROM product_updates "
+                "ORDER BY message_id LIMIT ?",
+                (max_messages,),
+            ).fetchall()
+        return [
+            (
+                str(message_id),
+                update_product_command.UpdateProductCommand.parse_raw(body),
+            )
+            for message_id, body in rows
+        ]
+
+    def delete(self, message_ids: typing.List[str]) -> None:
+        """Removes the given messages from the queue."""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM product_updates WHERE message_id = ?",
+                [(int(message_id),) for message_id in message_ids],
+            )
@@ -0,0 +1,15 @@
+from typing import Optional
+
+from app.adapters import sqlite_unit_of_work
+from app.adapters.internal import local_store
+
+
+class SQLiteProductsQueryService(local_store.LocalProductsQueryService):
+    """Products query service reading an SQLite store."""
+
+    def __init__(
+        self,
+        store: sqlite_unit_of_work.SQLiteStore,
+        cursor_signing_key: Optional[str] = None,
+    ):
+        super().__init__(store, cursor_signing_key)
@@ -0,0 +1,165 @@
+import contextlib
+import json
+import sqlite3
+import threading
+import typing
+
+from app.adapters.internal import dynamodb_base, local_store
+from app.domain.model import idempotency_record, product, product_version
+
+MAX_QUERY_PARAMETERS = 500
+
+
+class SQLiteStore(local_store.LocalStore):
+    """
+    Store kept in an SQLite database, in memory by default. Products are
+    listed through an index on their listing position and versions through
+    the primary key of their table, so pages are read by key ranges.
+    Items are stored as JSON written by the store itself, so they are not
+    validated again when read.
+    """
+
+    def __init__(self, database: str = ":memory:"):
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS products ("
+                "id TEXT PRIMARY KEY, sort_key TEXT NOT NULL, body TEXT NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS products_by_sort_key "
+                "ON products (sort_key)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS product_versions ("
+                "product_id TEXT NOT NULL, version_id TEXT NOT NULL, "
+                "body TEXT NOT NULL, PRIMARY KEY (product_id, version_id)"
+                ") WITHOUT ROWID"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_records ("
+                "key TEXT PRIMARY KEY, body TEXT NOT NULL)"
+            )
+
+    @contextlib.contextmanager
+    def transaction(self) -> typing.Iterator[None]:
+        with self._lock, self._connection:
+            yield
+
+    def get_product(self, product_id: str) -> typing.Optional[product.Product]:
+        row = self._connection.execute(
+            "SELECT body FROM products WHERE id = ?", (product_id,)
+        ).fetchone()
+        return _load(product.Product, row[0]) if row else None
+
+    def get_products(
+        self, product_ids: typing.List[str]
+    ) -> typing.List[product.Product]:
+        products = []
+        for chunk in dynamodb_base.chunked(product_ids, MAX_QUERY_PARAMETERS):
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self._connection.execute(
+                f"SELECT body FROM products WHERE id IN ({placeholders})", tuple(chunk)
+            ).fetchall()
+            products.extend(_load(product.Product, body) for body, in rows)
+        return products
+
+    def put_product(self, product_obj: product.Product) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO products (id, sort_key, body) VALUES (?, ?, ?)",
+            (
+                product_obj.id,
+                local_store.generate_listing_sort_key(
+                    product_obj.id, product_obj.createDate
+                ),
+                product_obj.json(),
+            ),
+        )
+
+    def delete_product(self, product_id: str) -> None:
+        self._connection.execute("DELETE FROM products WHERE id = ?", (product_id,))
+
+    def list_products(
+        self, after_sort_key: typing.Optional[str], limit: int
+    ) -> typing.List[product.Product]:
+        rows = self._connection.execute(
+            "SELECT body FROM products WHERE sort_key > ? ORDER BY sort_key LIMIT ?",
+            (after_sort_key or "", limit),
+        ).fetchall()
+        return [_load(product.Product, body) for body, in rows]
+
+    def get_product_version(
+        self, product_id: str, version_id: str
+    ) -> typing.Optional[product_version.ProductVersion]:
+        row = self._connection.execute(
+            "SELECT body FROM product_versions WHERE product_id = ? AND version_id = ?",
+            (product_id, version_id),
+        ).fetchone()
+        return _load(product_version.ProductVersion, row[0]) if row else None
+
+    def put_product_version(
+        self, product_id: str, product_version_obj: product_version.ProductVersion
+    ) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO product_versions (product_id, version_id, body) "
+            "VALUES (?, ?, ?)",
+            (product_id, product_version_obj.id, product_version_obj.json()),
+        )
+
+    def list_product_versions(
+        self,
+        product_id: str,
+        before_id: typing.Optional[str],
+        from_id: typing.Optional[str],
+        limit: int,
+    ) -> typing.List[product_version.ProductVersion]:
+        conditions = ["product_id = ?"]
+        parameters: typing.List[typing.Any] = [product_id]
+        if before_id:
+            conditions.append("version_id < ?")
+            parameters.append(before_id)
+        if from_id:
+            conditions.append("version_id >= ?")
+            parameters.append(from_id)
+        rows = self._connection.execute(
+            f"SELECT body FROM product_versions WHERE {' AND '.join(conditions)} "
+            "ORDER BY version_id DESC LIMIT ?",
+            (*parameters, limit),
+        ).fetchall()
+        return [_load(product_version.ProductVersion, body) for body, in rows]
+
+    def get_idempotency_record(
+        self, key: str
+    ) -> typing.Optional[idempotency_record.IdempotencyRecord]:
+        row = self._connection.execute(
+            "SELECT body FROM idempotency_records WHERE key = ?", (key,)
+        ).fetchone()
+        return _load(idempotency_record.IdempotencyRecord, row[0]) if row else None
+
+    def put_idempotency_record(
+        self, record: idempotency_record.IdempotencyRecord
+    ) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO idempotency_records (key, body) VALUES (?, ?)",
+            (record.key, record.json()),
+        )
+
+
+class SQLiteUnitOfWork(local_store.LocalUnitOfWork):
+    """
+    Repository provider and unit of work for an SQLite store, with the
+    transactional semantics of DynamoDBUnitOfWork. Meant for tests and
+    load tests of the domain without DynamoDB.
+    """
+
+    def __init__(
+        self,
+        store: SQLiteStore,
+        transaction_max_items: int = dynamodb_base.TRANSACTION_MAX_ITEMS,
+    ):
+        super().__init__(store, transaction_max_items)
+
+
+def _load(model: typing.Type[typing.Any], body: str) -> typing.Any:
+    return model.construct(**json.loads(body))
@@ -0,0 +1,28 @@
+import typing
+
+from app.domain.commands import update_product_command
+from app.domain.exceptions.repository_exception import RepositoryException
+from app.domain.ports import product_update_queue
+
+if typing.TYPE_CHECKING:
+    from mypy_boto3_sqs import client
+
+
+class SQSProductUpdateQueue(product_update_queue.ProductUpdateQueue):
+    """
+    Sends product updates to an Amazon SQS queue as JSON messages. The queue
+    consumer receives them in batches and merges the updates of each product.
+    """
+
+    def __init__(self, queue_url: str, sqs_client: "client.SQSClient"):
+        self._queue_url = queue_url
+        self._sqs_client = sqs_client
+
+    def send(self, command: update_product_command.UpdateProductCommand) -> None:
+        """Sends the update to the queue."""
+        try:
+            self._sqs_client.send_message(
+                QueueUrl=self._queue_url, MessageBody=command.json()
+            )
+        except Exception as e:
+            raise RepositoryException("Failed to queue the product update.") from e
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import unittest.mock
+
+import assertpy
+
+from app.adapters import async_dynamodb_query_service
+from app.adapters.internal import async_dynamodb_base
+from app.domain.model import product
+from app.domain.ports import products_query_service
+
+
+def _create_product(product_id: str) -> product.Product:
+    return product.Product(
+        id=product_id,
+        name="test-name",
+        createDate="2022-10-10T10:10:10+00:00",
+        lastUpdateDate="2022-10-10T10:10:10+00:00",
+    )
+
+
+def test_reads_awaited_together_should_run_concurrently():
+    # Arrange
+    both_reads_started = threading.Barrier(2, timeout=5)
+
+    def get_product_by_id(product_id, fields=None, consistent_read=False):
+        # Fails with BrokenBarrierError unless the other read is in flight.
+        both_reads_started.wait()
+        return _create_product(product_id)
+
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+    mock_query_service.get_product_by_id.side_effect = get_product_by_id
+    query_service = async_dynamodb_query_service.AsyncDynamoDBProductsQueryService(
+        mock_query_service,
+        async_dynamodb_base.AsyncDynamoDBClient(),
+    )
+
+    async def read_both():
+        return await asyncio.gather(
+            query_service.get_product_by_id("id-1"),
+            query_service.get_product_by_id("id-2"),
+        )
+
+    # Act
+    products = asyncio.run(read_both())
+
+    # Assert
+    assertpy.assert_that([p.id for p in products]).is_equal_to(["id-1", "id-2"])
+
+
+def test_async_query_service_should_delegate_to_wrapped_service():
+    # Arrange
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+    mock_query_service.list_products.return_value = ([_create_product("id-1")], "t")
+    mock_query_service.get_products_by_ids.return_value = [_create_product("id-1")]
+    query_service = async_dynamodb_query_service.AsyncDynamoDBProductsQueryService(
+        mock_query_service,
+        async_dynamodb_base.AsyncDynamoDBClient(),
+    )
+
+    async def read_and_invalidate():
+        page = await query_service.list_products(
+            page_size=1, next_token=None, fields=["name"]
+        )
+        products = await query_service.get_products_by_ids(["id-1"])
+        await query_service.invalidate_product("id-1")
+        return page, products
+
+    # Act
+    page, products = asyncio.run(read_and_invalidate())
+
+    # Assert
+    assertpy.assert_that(page[1]).is_equal_to("t")
+    assertpy.assert_that(products).is_length(1)
+    mock_query_service.list_products.assert_called_once_with(
+        page_size=1, next_token=None, fields=["name"]
+    )
+    mock_query_service.invalidate_product.assert_called_once_with("id-1")
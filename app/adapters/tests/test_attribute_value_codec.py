@@ -0,0 +1,128 @@
+from decimal import Decimal
+
+import assertpy
+import pydantic
+from boto3.dynamodb import types
+
+from app.adapters.internal import attribute_value_codec
+from app.domain.model import bulk_write, product
+
+
+def test_serialize_item_should_match_boto3_type_serializer():
+    # Arrange
+    item = {
+        "text": "value",
+        "number": 10,
+        "decimal": Decimal("1.5"),
+        "flag": True,
+        "nothing": None,
+        "binary": b"\x00\x01",
+        "names": {"a", "b"},
+        "numbers": {1, 2},
+        "list": ["value", 1, {"nested": [False]}],
+        "enum": bulk_write.BulkWriteMode.BEST_EFFORT,
+    }
+    type_serializer = types.TypeSerializer()
+
+    # Act
+    serialized = attribute_value_codec.serialize_item(item)
+
+    # Assert
+    expected = {
+        name: type_serializer.serialize(
+            value.value if name == "enum" else value  # boto3 rejects enums
+        )
+        for name, value in item.items()
+    }
+    serialized["names"]["SS"].sort()
+    serialized["numbers"]["NS"].sort()
+    expected["names"]["SS"].sort()
+    expected["numbers"]["NS"].sort()
+    expected["binary"] = {"B": b"\x00\x01"}
+    assertpy.assert_that(serialized).is_equal_to(expected)
+
+
+def test_deserialize_item_should_match_boto3_type_deserializer():
+    # Arrange
+    item = {
+        "text": {"S": "value"},
+        "number": {"N": "10"},
+        "flag": {"BOOL": False},
+        "nothing": {"NULL": True},
+        "names": {"SS": ["a", "b"]},
+        "numbers": {"NS": ["1", "2.5"]},
+        "map": {"M": {"list": {"L": [{"S": "value"}, {"N": "1"}]}}},
+    }
+
+    # Act
+    deserialized = attribute_value_codec.deserialize_item(item)
+
+    # Assert
+    type_deserializer = types.TypeDeserializer()
+    assertpy.assert_that(deserialized).is_equal_to(
+        {name: type_deserializer.deserialize(value) for name, value in item.items()}
+    )
+
+
+def test_serialize_value_should_reject_floats():
+    # Act & Assert
+    assertpy.assert_that(attribute_value_codec.serialize_value).raises(
+        TypeError
+    ).when_called_with(1.5)
+
+
+def test_model_codec_should_round_trip_model_and_ignore_other_attributes():
+    # Arrange
+    codec = attribute_value_codec.ModelCodec(product.Product)
+    product_obj = product.Product(
+        id="id-1",
+        name="name",
+        description=None,
+        createDate="2022-10-10T10:10:10+00:00",
+        lastUpdateDate="2022-10-10T10:10:10+00:00",
+    )
+
+    # Act
+    item = codec.marshal(product_obj)
+    unmarshalled = codec.unmarshal({**item, "PK": {"S": "PRODUCT#id-1"}})
+
+    # Assert
+    assertpy.assert_that(item).is_equal_to(
+        {
+            "id": {"S": "id-1"},
+            "name": {"S": "name"},
+            "description": {"NULL": True},
+            "createDate": {"S": "2022-10-10T10:10:10+00:00"},
+            "lastUpdateDate": {"S": "2022-10-10T10:10:10+00:00"},
+            "version": {"N": "0"},
+        }
+    )
+    assertpy.assert_that(unmarshalled).is_equal_to(product_obj)
+    assertpy.assert_that(unmarshalled.dict()).is_equal_to(product_obj.dict())
+
+
+def test_model_codec_should_convert_enum_and_bool_fields():
+    # Arrange
+    codec = attribute_value_codec.ModelCodec(bulk_write.BulkWriteResult)
+    result = bulk_write.BulkWriteResult(
+        operation=bulk_write.BulkWriteOperation.DELETE, id="id-1", succeeded=True
+    )
+
+    # Act
+    unmarshalled = codec.unmarshal(codec.marshal(result))
+
+    # Assert
+    assertpy.assert_that(unmarshalled).is_equal_to(result)
+    assertpy.assert_that(unmarshalled.operation).is_instance_of(
+        bulk_write.BulkWriteOperation
+    )
+
+
+def test_model_codec_should_validate_items_without_required_fields():
+    # Arrange
+    codec = attribute_value_codec.ModelCodec(product.Product)
+
+    # Act & Assert
+    assertpy.assert_that(codec.unmarshal).raises(
+        pydantic.ValidationError
+    ).when_called_with({"id": {"S": "id-1"}})
@@ -0,0 +1,235 @@
+import datetime
+import unittest.mock
+
+import assertpy
+
+from app.adapters import cached_query_service
+from app.adapters.internal import ttl_lru_cache
+from app.domain.model import product
+from app.domain.ports import product_projections, products_query_service
+
+
+def _create_product(product_id: str) -> product.Product:
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    return product.Product(
+        id=product_id,
+        name="test-name",
+        description="test-description",
+        createDate=current_time,
+        lastUpdateDate=current_time,
+    )
+
+
+def _create_query_service(mock_query_service, **kwargs):
+    return cached_query_service.CachedProductsQueryService(
+        mock_query_service,
+        **{
+            "max_entries": 10,
+            "max_bytes": 1024 * 1024,
+            "ttl_seconds": 60,
+            "not_found_ttl_seconds": 60,
+            **kwargs,
+        },
+    )
+
+
+def test_get_product_by_id_should_read_through_cache():
+    # Arrange
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+    mock_query_service.get_product_by_id.return_value = _create_product("test-id")
+    query_service = _create_query_service(mock_query_service)
+
+    # Act
+    first = query_service.get_product_by_id(product_id="test-id")
+    second = query_service.get_product_by_id(product_id="test-id")
+
+    # Assert
+    mock_query_service.get_product_by_id.assert_called_once()
+    assertpy.assert_that(second).is_equal_to(first)
+
+
+def test_get_product_by_id_should_cache_missing_products():
+    # Arrange
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+    mock_query_service.get_product_by_id.return_value = None
+    query_service = _create_query_service(mock_query_service)
+
+    # Act
+    query_service.get_product_by_id(product_id="does-not-exist")
+    result = query_service.get_product_by_id(product_id="does-not-exist")
+
+    # Assert
+    mock_query_service.get_product_by_id.assert_called_once()
+    assertpy.assert_that(result).is_none()
+
+
+def test_get_product_by_id_with_fields_should_not_cache_partial_products():
+    # Arrange
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+    mock_query_service.get_product_by_id.return_value = product.Product.construct(
+        id="test-id", name="test-name"
+    )
+    query_service = _create_query_service(mock_query_service)
+
+    # Act
+    query_service.get_product_by_id(product_id="test-id", fields=["name"])
+    query_service.get_product_by_id(product_id="test-id", fields=["name"])
+
+    # Assert
+    assertpy.assert_that(mock_query_service.get_product_by_id.call_count).is_equal_to(2)
+    mock_query_service.get_product_by_id.assert_called_with(
+        product_id="test-id", fields=["name"], consistent_read=False
+    )
+
+
+def test_invalidate_product_should_read_product_again():
+    # Arrange
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+    mock_query_service.get_product_by_id.return_value = _create_product("test-id")
+    query_service = _create_query_service(mock_query_service)
+    query_service.get_product_by_id(product_id="test-id")
+
+    # Act
+    query_service.invalidate_product("test-id")
+    query_service.get_product_by_id(product_id="test-id")
+
+    # Assert
+    assertpy.assert_that(mock_query_service.get_product_by_id.call_count).is_equal_to(2)
+
+
+def test_consistent_read_should_bypass_cache_and_refresh_it():
+    # Arrange
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+    stale_product = _create_product("test-id")
+    fresh_product = stale_product.copy(update={"name": "fresh-name"})
+    mock_query_service.get_product_by_id.side_effect = [stale_product, fresh_product]
+    query_service = _create_query_service(mock_query_service)
+    query_service.get_product_by_id(product_id="test-id")
+
+    # Act
+    consistent = query_service.get_product_by_id(
+        product_id="test-id", consistent_read=True
+    )
+    cached = query_service.get_product_by_id(product_id="test-id")
+
+    # Assert
+    mock_query_service.get_product_by_id.assert_called_with(
+        product_id="test-id", consistent_read=True
+    )
+    assertpy.assert_that(consistent).is_equal_to(fresh_product)
+    assertpy.assert_that(cached).is_equal_to(fresh_product)
+
+
+def test_invalidate_product_during_read_should_not_cache_stale_product():
+    # Arrange
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+    stale_product = _create_product("test-id")
+    fresh_product = stale_product.copy(update={"name": "fresh-name"})
+    query_service = _create_query_service(mock_query_service)
+
+    def get_product_by_id(product_id, consistent_read=False):
+        # The product is written while the read of its old state is in flight.
+        query_service.invalidate_product(product_id)
+        mock_query_service.get_product_by_id.side_effect = None
+        mock_query_service.get_product_by_id.return_value = fresh_product
+        return stale_product
+
+    mock_query_service.get_product_by_id.side_effect = get_product_by_id
+
+    # Act
+    first = query_service.get_product_by_id(product_id="test-id")
+    second = query_service.get_product_by_id(product_id="test-id")
+
+    # Assert
+    assertpy.assert_that(first).is_equal_to(stale_product)
+    assertpy.assert_that(second).is_equal_to(fresh_product)
+
+
+def test_get_products_by_ids_should_read_only_uncached_products():
+    # Arrange
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+    mock_query_service.get_product_by_id.return_value = _create_product("id-1")
+    mock_query_service.get_products_by_ids.return_value = [_create_product("id-2")]
+    query_service = _create_query_service(mock_query_service)
+    query_service.get_product_by_id(product_id="id-1")
+
+    # Act
+    products = query_service.get_products_by_ids(product_ids=["id-2", "id-1", "id-3"])
+
+    # Assert
+    mock_query_service.get_products_by_ids.assert_called_once_with(
+        product_ids=["id-2", "id-3"]
+    )
+    assertpy.assert_that([p.id for p in products]).is_equal_to(["id-2", "id-1"])
+
+
+def test_cache_should_evict_least_recently_used_and_expired_entries():
+    # Arrange
+    now = [0.0]
+    cache = ttl_lru_cache.TTLLRUCache(
+        max_entries=2, max_bytes=100, ttl_seconds=10, clock=lambda: now[0]
+    )
+    cache.put("a", 1, size_bytes=10)
+    cache.put("b", 2, size_bytes=10)
+    cache.get("a")
+
+    # Act
+    cache.put("c", 3, size_bytes=10)
+    cache.put("d", 4, size_bytes=85)
+
+    # Assert
+    assertpy.assert_that(cache.get("b")).is_same_as(ttl_lru_cache.MISSING)
+    assertpy.assert_that(cache.get("a")).is_same_as(ttl_lru_cache.MISSING)
+    assertpy.assert_that(cache.get("c")).is_equal_to(3)
+    assertpy.assert_that(cache.get("d")).is_equal_to(4)
+    now[0] = 11
+    assertpy.assert_that(cache.get("d")).is_same_as(ttl_lru_cache.MISSING)
+    assertpy.assert_that(cache.size_bytes).is_equal_to(10)
+
+
+def test_get_product_by_id_should_invalidate_products_from_change_feed():
+    # Arrange
+    now = [0.0]
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+    mock_query_service.get_product_by_id.return_value = _create_product("test-id")
+    mock_change_feed = unittest.mock.create_autospec(
+        spec=product_projections.ProductChangeFeed, instance=True
+    )
+    mock_change_feed.get_changed_product_ids.side_effect = [
+        ((1,), []),
+        ((2,), ["test-id"]),
+    ]
+    query_service = _create_query_service(
+        mock_query_service,
+        change_feed=mock_change_feed,
+        change_feed_poll_interval_seconds=5,
+        clock=lambda: now[0],
+    )
+    query_service.get_product_by_id(product_id="test-id")
+    query_service.get_product_by_id(product_id="test-id")
+
+    # Act
+    now[0] = 6
+    query_service.get_product_by_id(product_id="test-id")
+
+    # Assert
+    assertpy.assert_that(
+        mock_change_feed.get_changed_product_ids.call_count
+    ).is_equal_to(2)
+    assertpy.assert_that(mock_query_service.get_product_by_id.call_count).is_equal_to(2)
@@ -0,0 +1,176 @@
+import threading
+import time
+import unittest.mock
+
+import assertpy
+import pytest
+
+from app.adapters import coalescing_query_service
+from app.adapters.internal import single_flight
+from app.domain.model import product
+from app.domain.ports import products_query_service
+
+
+def _create_product(product_id: str) -> product.Product:
+    return product.Product(
+        id=product_id,
+        name="test-name",
+        createDate="2022-10-10T10:10:10+00:00",
+        lastUpdateDate="2022-10-10T10:10:10+00:00",
+    )
+
+
+def _run_in_threads(count, target):
+    results = [None] * count
+
+    def run(index):
+        results[index] = target()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+@pytest.fixture
+def mock_query_service():
+    return unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+
+
+def test_get_product_by_id_should_coalesce_concurrent_reads(mock_query_service):
+    # Arrange
+    release_read = threading.Event()
+
+    def get_product_by_id(product_id, fields=None):
+        release_read.wait(timeout=5)
+        return _create_product(product_id)
+
+    mock_query_service.get_product_by_id.side_effect = get_product_by_id
+    coalescer = single_flight.SingleFlight()
+    query_service = coalescing_query_service.CoalescingProductsQueryService(
+        mock_query_service, coalescer
+    )
+
+    # Act
+    threads, results = _run_in_threads(
+        5, lambda: query_service.get_product_by_id("id-1")
+    )
+    time.sleep(0.2)  # Lets all threads join the first read.
+    release_read.set()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    mock_query_service.get_product_by_id.assert_called_once_with(
+        product_id="id-1", fields=None
+    )
+    assertpy.assert_that({p.id for p in results}).is_equal_to({"id-1"})
+    assertpy.assert_that(coalescer.pop_stats()).is_equal_to(
+        {"lookups": 5, "coalesced": 4}
+    )
+    assertpy.assert_that(coalescer.pop_stats()).is_equal_to(
+        {"lookups": 0, "coalesced": 0}
+    )
+
+
+def test_get_products_by_ids_should_read_only_products_not_in_flight(
+    mock_query_service,
+):
+    # Arrange
+    release_read = threading.Event()
+
+    def get_product_by_id(product_id, fields=None):
+        release_read.wait(timeout=5)
+        return _create_product(product_id)
+
+    mock_query_service.get_product_by_id.side_effect = get_product_by_id
+    mock_query_service.get_products_by_ids.side_effect = lambda product_ids: [
+        _create_product(product_id)
+        for product_id in product_ids
+        if product_id != "missing"
+    ]
+    query_service = coalescing_query_service.CoalescingProductsQueryService(
+        mock_query_service, single_flight.SingleFlight()
+    )
+    threads, _ = _run_in_threads(1, lambda: query_service.get_product_by_id("id-1"))
+    time.sleep(0.2)  # Lets the single read start.
+
+    # Act
+    batch_threads, batch_results = _run_in_threads(
+        1,
+        lambda: query_service.get_products_by_ids(["id-2", "id-1", "missing", "id-2"]),
+    )
+    time.sleep(0.2)
+    release_read.set()
+    for thread in threads + batch_threads:
+        thread.join()
+
+    # Assert
+    mock_query_service.get_products_by_ids.assert_called_once_with(
+        product_ids=["id-2", "missing"]
+    )
+    assertpy.assert_that([p.id for p in batch_results[0]]).is_equal_to(["id-2", "id-1"])
+
+
+def test_failed_read_should_raise_for_all_waiting_callers(mock_query_service):
+    # Arrange
+    release_read = threading.Event()
+
+    def get_product_by_id(product_id, fields=None):
+        if product_id == "id-2":
+            return _create_product(product_id)
+        release_read.wait(timeout=5)
+        raise Exception("Throttled")
+
+    mock_query_service.get_product_by_id.side_effect = get_product_by_id
+    query_service = coalescing_query_service.CoalescingProductsQueryService(
+        mock_query_service, single_flight.SingleFlight()
+    )
+    errors = []
+
+    def read():
+        try:
+            query_service.get_product_by_id("id-1")
+        except Exception as e:
+            errors.append(e)
+
+    # Act
+    threads, _ = _run_in_threads(3, read)
+    time.sleep(0.2)
+    release_read.set()
+    for thread in threads:
+        thread.join()
+    query_service.get_product_by_id("id-2")
+
+    # Assert
+    assertpy.assert_that(errors).is_length(3)
+    assertpy.assert_that(mock_query_service.get_product_by_id.call_count).is_equal_to(2)
+
+
+def test_consistent_read_should_not_join_read_in_flight(mock_query_service):
+    # Arrange
+    release_read = threading.Event()
+
+    def get_product_by_id(product_id, fields=None, consistent_read=False):
+        if not consistent_read:
+            release_read.wait(timeout=5)
+        return _create_product(product_id)
+
+    mock_query_service.get_product_by_id.side_effect = get_product_by_id
+    query_service = coalescing_query_service.CoalescingProductsQueryService(
+        mock_query_service, single_flight.SingleFlight()
+    )
+    threads, _ = _run_in_threads(1, lambda: query_service.get_product_by_id("id-1"))
+    time.sleep(0.2)
+
+    # Act
+    result = query_service.get_product_by_id("id-1", consistent_read=True)
+    release_read.set()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assertpy.assert_that(result.id).is_equal_to("id-1")
+    assertpy.assert_that(mock_query_service.get_product_by_id.call_count).is_equal_to(2)
@@ -0,0 +1,47 @@
+import assertpy
+
+from app.adapters import dynamodb_client_factory
+
+
+def test_create_dynamodb_client_should_apply_tuned_defaults():
+    # Act
+    client = dynamodb_client_factory.create_dynamodb_client(region_name="eu-west-1")
+
+    # Assert
+    client_config = client.meta.config
+    assertpy.assert_that(client_config.max_pool_connections).is_equal_to(
+        dynamodb_client_factory.MAX_POOL_CONNECTIONS
+    )
+    assertpy.assert_that(client_config.connect_timeout).is_equal_to(
+        dynamodb_client_factory.CONNECT_TIMEOUT_SECONDS
+    )
+    assertpy.assert_that(client_config.read_timeout).is_equal_to(
+        dynamodb_client_factory.READ_TIMEOUT_SECONDS
+    )
+    assertpy.assert_that(client_config.retries).is_equal_to(
+        {"mode": "adaptive", "total_max_attempts": 5}
+    )
+    assertpy.assert_that(client_config.tcp_keepalive).is_true()
+
+
+def test_create_dynamodb_client_should_apply_given_settings():
+    # Act
+    client = dynamodb_client_factory.create_dynamodb_client(
+        region_name="eu-west-1",
+        max_pool_connections=50,
+        connect_timeout_seconds=2,
+        read_timeout_seconds=10,
+        total_max_attempts=3,
+        retry_mode="standard",
+        tcp_keepalive=False,
+    )
+
+    # Assert
+    client_config = client.meta.config
+    assertpy.assert_that(client_config.max_pool_connections).is_equal_to(50)
+    assertpy.assert_that(client_config.connect_timeout).is_equal_to(2)
+    assertpy.assert_that(client_config.read_timeout).is_equal_to(10)
+    assertpy.assert_that(client_config.retries).is_equal_to(
+        {"mode": "standard", "total_max_attempts": 3}
+    )
+    assertpy.assert_that(client_config.tcp_keepalive).is_false()
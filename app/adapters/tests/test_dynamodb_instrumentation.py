@@ -0,0 +1,121 @@
+import json
+
+import assertpy
+import boto3
+import moto
+import pytest
+
+from app.adapters.internal import (
+    attribute_value_codec,
+    dynamodb_instrumentation,
+    emf_metrics,
+)
+
+TEST_TABLE_NAME = "test-table"
+
+
+@pytest.fixture
+def dynamodb_client():
+    with moto.mock_dynamodb():
+        client = boto3.client("dynamodb", region_name="eu-central-1")
+        client.create_table(
+            TableName=TEST_TABLE_NAME,
+            KeySchema=[
+                {"AttributeName": "PK", "KeyType": "HASH"},
+                {"AttributeName": "SK", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "PK", "AttributeType": "S"},
+                {"AttributeName": "SK", "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield client
+
+
+def _create_recorder(lines, sample_value):
+    return emf_metrics.MetricsRecorder(
+        namespace="TestNamespace",
+        sample_rate=0.5,
+        write=lambda line: lines.append(json.loads(line)),
+        sample=lambda: sample_value,
+    )
+
+
+def _lines_by_operation(lines):
+    return {line["Operation"]: line for line in lines}
+
+
+def test_instrumented_client_should_record_metrics_per_operation(dynamodb_client):
+    # Arrange
+    lines = []
+    recorder = _create_recorder(lines, sample_value=0.1)
+    dynamodb_instrumentation.instrument_dynamodb_client(dynamodb_client, recorder)
+    key = attribute_value_codec.serialize_item({"PK": "PRODUCT#1", "SK": "PRODUCT#1"})
+    recorder.start_invocation()
+
+    # Act
+    dynamodb_client.put_item(
+        TableName=TEST_TABLE_NAME, Item={**key, "name": {"S": "test-name"}}
+    )
+    dynamodb_client.get_item(TableName=TEST_TABLE_NAME, Key=key)
+    dynamodb_client.query(
+        TableName=TEST_TABLE_NAME,
+        KeyConditionExpression="PK = :partition_key",
+        ExpressionAttributeValues={":partition_key": {"S": "PRODUCT#1"}},
+    )
+    recorder.flush()
+
+    # Assert
+    metrics = _lines_by_operation(lines)
+    assertpy.assert_that(metrics).contains_key("PutItem", "GetItem", "Query")
+    for operation in ("PutItem", "GetItem", "Query"):
+        assertpy.assert_that(metrics[operation]["Latency"]).is_greater_than(0)
+        assertpy.assert_that(metrics[operation]["RequestBytes"]).is_greater_than(0)
+        assertpy.assert_that(metrics[operation]["ResponseBytes"]).is_greater_than(0)
+    # Counts are scaled by the inverse of the 0.5 sample rate.
+    assertpy.assert_that(metrics["PutItem"]["ItemsWritten"]).is_equal_to(2)
+    assertpy.assert_that(metrics["PutItem"]["ConsumedWCU"]).is_greater_than(0)
+    assertpy.assert_that(metrics["GetItem"]["ItemsRead"]).is_equal_to(2)
+    assertpy.assert_that(metrics["GetItem"]["ConsumedRCU"]).is_greater_than(0)
+    assertpy.assert_that(metrics["Query"]["ItemsRead"]).is_equal_to(2)
+
+
+def test_instrumented_client_should_record_failed_calls(dynamodb_client):
+    # Arrange
+    lines = []
+    recorder = _create_recorder(lines, sample_value=0.1)
+    dynamodb_instrumentation.instrument_dynamodb_client(dynamodb_client, recorder)
+    recorder.start_invocation()
+
+    # Act
+    with pytest.raises(dynamodb_client.exceptions.ResourceNotFoundException):
+        dynamodb_client.get_item(
+            TableName="missing-table", Key={"PK": {"S": "1"}, "SK": {"S": "1"}}
+        )
+    recorder.flush()
+
+    # Assert
+    metrics = _lines_by_operation(lines)
+    assertpy.assert_that(metrics["GetItem"]["Errors"]).is_equal_to(2)
+    assertpy.assert_that(metrics["GetItem"]).does_not_contain_key("ConsumedRCU")
+
+
+def test_instrumented_client_should_not_request_capacity_when_not_sampled(
+    dynamodb_client,
+):
+    # Arrange
+    lines = []
+    recorder = _create_recorder(lines, sample_value=0.9)
+    dynamodb_instrumentation.instrument_dynamodb_client(dynamodb_client, recorder)
+    recorder.start_invocation()
+
+    # Act
+    response = dynamodb_client.get_item(
+        TableName=TEST_TABLE_NAME, Key={"PK": {"S": "1"}, "SK": {"S": "1"}}
+    )
+    recorder.flush()
+
+    # Assert
+    assertpy.assert_that(response).does_not_contain_key("ConsumedCapacity")
+    assertpy.assert_that(lines).is_empty()
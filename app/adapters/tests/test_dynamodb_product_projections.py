@@ -0,0 +1,286 @@
+import datetime
+import unittest.mock
+import uuid
+
+import assertpy
+import boto3
+import moto
+import pytest
+
+from app.adapters import (
+    dynamodb_product_projections,
+    dynamodb_query_service,
+    dynamodb_unit_of_work,
+)
+from app.domain.model import product, product_change
+
+TEST_TABLE_NAME = "test-table"
+
+
+@pytest.fixture
+def mock_dynamodb():
+    with moto.mock_dynamodb():
+        yield boto3.resource("dynamodb", region_name="eu-central-1")
+
+
+@pytest.fixture
+def dynamodb_client(mock_dynamodb):
+    return boto3.client("dynamodb", region_name="eu-central-1")
+
+
+@pytest.fixture(autouse=True)
+def backend_app_dynamodb_table(mock_dynamodb):
+    table = mock_dynamodb.create_table(
+        TableName=TEST_TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+            {"AttributeName": "GSI1PK", "AttributeType": "S"},
+            {"AttributeName": "GSI1SK", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "GSI1",
+                "KeySchema": [
+                    {"AttributeName": "GSI1PK", "KeyType": "HASH"},
+                    {"AttributeName": "GSI1SK", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+    table.meta.client.get_waiter("table_exists").wait(TableName=TEST_TABLE_NAME)
+    return table
+
+
+def _add_products(dynamodb_client, product_count: int) -> list:
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    start_time = datetime.datetime.now(datetime.timezone.utc)
+    products = [
+        product.Product(
+            id=str(uuid.uuid4()),
+            name="test-name",
+            createDate=(start_time + datetime.timedelta(seconds=i)).isoformat(),
+            lastUpdateDate=start_time.isoformat(),
+        )
+        for i in range(product_count)
+    ]
+    with unit_of_work:
+        for new_product in products:
+            unit_of_work.products.add(new_product)
+        unit_of_work.commit()
+    return products
+
+
+def test_apply_changes_should_publish_changed_ids_to_change_feed(dynamodb_client):
+    # Arrange
+    projections = dynamodb_product_projections.DynamoDBProductProjections(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    change_feed = dynamodb_product_projections.DynamoDBProductChangeFeed(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    first_position, _ = change_feed.get_changed_product_ids(since_position=())
+
+    # Act
+    projections.apply_changes(
+        [
+            product_change.ProductChange(
+                id="id-1", changeType=product_change.ProductChangeType.MODIFY
+            )
+        ]
+    )
+    middle_position, _ = change_feed.get_changed_product_ids(since_position=())
+    projections.apply_changes(
+        [
+            product_change.ProductChange(
+                id="id-2", changeType=product_change.ProductChangeType.REMOVE
+            )
+        ]
+    )
+
+    # Assert
+    position, product_ids = change_feed.get_changed_product_ids(
+        since_position=first_position
+    )
+    assertpy.assert_that(sum(position)).is_equal_to(2)
+    assertpy.assert_that(product_ids).contains_only("id-1", "id-2")
+    assertpy.assert_that(
+        change_feed.get_changed_product_ids(since_position=middle_position)[1]
+    ).is_equal_to(["id-2"])
+    assertpy.assert_that(
+        change_feed.get_changed_product_ids(since_position=position)[1]
+    ).is_empty()
+
+
+def test_apply_changes_should_spread_change_log_writes_across_shards(
+    dynamodb_client,
+):
+    # Arrange
+    projections = dynamodb_product_projections.DynamoDBProductProjections(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    change_feed = dynamodb_product_projections.DynamoDBProductChangeFeed(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+
+    # Act
+    with unittest.mock.patch.object(
+        dynamodb_product_projections.secrets, "randbelow", side_effect=[0, 3]
+    ):
+        for product_id in ["id-1", "id-2"]:
+            projections.apply_changes(
+                [
+                    product_change.ProductChange(
+                        id=product_id,
+                        changeType=product_change.ProductChangeType.MODIFY,
+                    )
+                ]
+            )
+
+    # Assert
+    position, product_ids = change_feed.get_changed_product_ids(since_position=())
+    assertpy.assert_that(position).is_equal_to((1, 0, 0, 1, 0, 0, 0, 0))
+    assertpy.assert_that(product_ids).is_equal_to(["id-1", "id-2"])
+    assertpy.assert_that(
+        change_feed.get_changed_product_ids(since_position=(1, 0))[1]
+    ).is_none()
+
+
+def test_list_products_should_serve_first_page_from_listing_head(dynamodb_client):
+    # Arrange
+    products = _add_products(dynamodb_client, product_count=5)
+    projections = dynamodb_product_projections.DynamoDBProductProjections(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        maintain_listing_head=True,
+    )
+    projections.apply_changes(
+        [
+            product_change.ProductChange(
+                id=p.id,
+                changeType=product_change.ProductChangeType.INSERT,
+                createDate=p.createDate,
+            )
+            for p in products
+        ]
+    )
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        use_listing_head=True,
+        cursor_signing_key="test-signing-key",
+    )
+
+    # Act
+    first_page, next_token = query_service.list_products(page_size=3, next_token=None)
+    second_page, last_token = query_service.list_products(
+        page_size=3, next_token=next_token
+    )
+
+    # Assert
+    assertpy.assert_that([p.id for p in first_page + second_page]).is_equal_to(
+        [p.id for p in products]
+    )
+    assertpy.assert_that(last_token).is_none()
+
+
+def test_list_products_with_fields_should_not_read_listing_head(dynamodb_client):
+    # Arrange
+    products = _add_products(dynamodb_client, product_count=2)
+    projections = dynamodb_product_projections.DynamoDBProductProjections(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        maintain_listing_head=True,
+    )
+    projections.apply_changes(
+        [
+            product_change.ProductChange(
+                id=p.id,
+                changeType=product_change.ProductChangeType.INSERT,
+                createDate=p.createDate,
+            )
+            for p in products
+        ]
+    )
+    spy_client = unittest.mock.Mock(wraps=dynamodb_client)
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=spy_client,
+        use_listing_head=True,
+        cursor_signing_key="test-signing-key",
+    )
+
+    # Act
+    page, _ = query_service.list_products(page_size=3, next_token=None, fields=["name"])
+
+    # Assert
+    assertpy.assert_that([p.id for p in page]).is_equal_to([p.id for p in products])
+    spy_client.get_item.assert_not_called()
+
+
+def test_apply_changes_should_not_list_deleted_product_still_in_index(
+    dynamodb_client,
+):
+    # Arrange
+    products = _add_products(dynamodb_client, product_count=3)
+    spy_client = unittest.mock.Mock(wraps=dynamodb_client)
+    projections = dynamodb_product_projections.DynamoDBProductProjections(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=spy_client,
+        maintain_listing_head=True,
+    )
+    projections.apply_changes(
+        [
+            product_change.ProductChange(
+                id=p.id,
+                changeType=product_change.ProductChangeType.INSERT,
+                createDate=p.createDate,
+            )
+            for p in products
+        ]
+    )
+    # The eventually consistent index still lists the product after its deletion.
+    spy_client.query.return_value = dynamodb_client.query(
+        TableName=TEST_TABLE_NAME,
+        IndexName="GSI1",
+        KeyConditionExpression="GSI1PK = :partition_key",
+        ExpressionAttributeValues={":partition_key": {"S": "PRODUCT"}},
+    )
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    with unit_of_work:
+        unit_of_work.products.delete(products[0].id)
+        unit_of_work.commit()
+
+    # Act
+    projections.apply_changes(
+        [
+            product_change.ProductChange(
+                id=products[0].id,
+                changeType=product_change.ProductChangeType.REMOVE,
+                createDate=products[0].createDate,
+            )
+        ]
+    )
+
+    # Assert
+    spy_client.query.assert_called()
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=spy_client,
+        use_listing_head=True,
+        cursor_signing_key="test-signing-key",
+    )
+    page, next_token = query_service.list_products(page_size=5, next_token=None)
+    assertpy.assert_that([p.id for p in page]).is_equal_to([p.id for p in products[1:]])
+    assertpy.assert_that(next_token).is_none()
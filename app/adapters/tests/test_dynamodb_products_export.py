@@ -0,0 +1,194 @@
+import datetime
+import json
+import unittest.mock
+import uuid
+
+import assertpy
+import boto3
+import moto
+import pytest
+
+from app.adapters import (
+    dynamodb_products_export,
+    dynamodb_unit_of_work,
+    local_file_export_sink,
+)
+from app.domain.exceptions.repository_exception import RepositoryException
+from app.domain.model import product, product_export, product_version
+
+TEST_TABLE_NAME = "test-table"
+
+
+@pytest.fixture
+def mock_dynamodb():
+    with moto.mock_dynamodb():
+        yield boto3.resource("dynamodb", region_name="eu-central-1")
+
+
+@pytest.fixture
+def dynamodb_client(mock_dynamodb):
+    return boto3.client("dynamodb", region_name="eu-central-1")
+
+
+@pytest.fixture(autouse=True)
+def backend_app_dynamodb_table(mock_dynamodb):
+    table = mock_dynamodb.create_table(
+        TableName=TEST_TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+            {"AttributeName": "GSI1PK", "AttributeType": "S"},
+            {"AttributeName": "GSI1SK", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "GSI1",
+                "KeySchema": [
+                    {"AttributeName": "GSI1PK", "KeyType": "HASH"},
+                    {"AttributeName": "GSI1SK", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+    table.meta.client.get_waiter("table_exists").wait(TableName=TEST_TABLE_NAME)
+    return table
+
+
+def test_read_products_should_return_all_products(dynamodb_client):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    product_ids = [str(uuid.uuid4()) for i in range(20)]
+    with unit_of_work:
+        for product_id in product_ids:
+            unit_of_work.products.add(
+                product.Product(
+                    id=product_id,
+                    name="test-name",
+                    createDate=current_time,
+                    lastUpdateDate=current_time,
+                )
+            )
+        unit_of_work.product_versions.add(
+            product_ids[0],
+            product_version.ProductVersion(
+                id="version-1", version="1", createDate=current_time
+            ),
+        )
+        unit_of_work.commit()
+    export_source = dynamodb_products_export.DynamoDBProductsExportSource(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        total_segments=1,
+        max_workers=1,
+    )
+
+    # Act
+    pages = list(export_source.read_products())
+
+    # Assert
+    exported_ids = [p.id for page in pages for p in page]
+    assertpy.assert_that(exported_ids).contains_only(*product_ids)
+    assertpy.assert_that(exported_ids).is_length(len(product_ids))
+
+
+def test_read_products_should_scan_every_segment_to_the_last_page():
+    # Arrange
+    def scan(**kwargs):
+        if "ExclusiveStartKey" not in kwargs:
+            return {
+                "Items": [_product_item(f"{kwargs['Segment']}-0")],
+                "LastEvaluatedKey": {"PK": {"S": "last"}},
+            }
+        return {"Items": [_product_item(f"{kwargs['Segment']}-1")]}
+
+    mock_client = unittest.mock.Mock()
+    mock_client.scan.side_effect = scan
+    export_source = dynamodb_products_export.DynamoDBProductsExportSource(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=mock_client,
+        total_segments=3,
+        max_workers=2,
+    )
+
+    # Act
+    pages = list(export_source.read_products())
+
+    # Assert
+    assertpy.assert_that([p.id for page in pages for p in page]).contains_only(
+        "0-0", "0-1", "1-0", "1-1", "2-0", "2-1"
+    )
+    assertpy.assert_that(
+        {c.kwargs["Segment"] for c in mock_client.scan.call_args_list}
+    ).is_equal_to({0, 1, 2})
+    assertpy.assert_that(
+        {c.kwargs["TotalSegments"] for c in mock_client.scan.call_args_list}
+    ).is_equal_to({3})
+
+
+def test_read_products_should_raise_when_segment_scan_fails():
+    # Arrange
+    mock_client = unittest.mock.Mock()
+    mock_client.scan.side_effect = Exception("Throttled")
+    export_source = dynamodb_products_export.DynamoDBProductsExportSource(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=mock_client,
+        total_segments=4,
+        max_workers=2,
+    )
+
+    # Act & Assert
+    assertpy.assert_that(list).raises(RepositoryException).when_called_with(
+        export_source.read_products()
+    )
+
+
+def test_local_file_export_sink_should_write_ndjson_chunks_and_manifest(tmp_path):
+    # Arrange
+    sink = local_file_export_sink.LocalFileExportSink(str(tmp_path))
+    products = [
+        product.Product(
+            id=f"id-{i}",
+            name="test-name",
+            createDate="2022-10-10T10:10:10+00:00",
+            lastUpdateDate="2022-10-10T10:10:10+00:00",
+        )
+        for i in range(2)
+    ]
+
+    # Act
+    location = sink.write_chunk(0, products)
+    sink.complete(
+        product_export.ProductExportResult(productCount=2, chunkLocations=[location])
+    )
+
+    # Assert
+    with open(location) as chunk_file:
+        lines = chunk_file.read().splitlines()
+    assertpy.assert_that([json.loads(line) for line in lines]).is_equal_to(
+        [p.dict() for p in products]
+    )
+    with open(tmp_path / local_file_export_sink.MANIFEST_FILE_NAME) as manifest:
+        assertpy.assert_that(json.load(manifest)["chunkLocations"]).is_equal_to(
+            [location]
+        )
+
+
+def _product_item(product_id: str) -> dict:
+    return dynamodb_unit_of_work.PRODUCT_CODEC.marshal(
+        product.Product(
+            id=product_id,
+            name="test-name",
+            createDate="2022-10-10T10:10:10+00:00",
+            lastUpdateDate="2022-10-10T10:10:10+00:00",
+        )
+    )
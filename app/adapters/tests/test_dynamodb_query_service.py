@@ -1,4 +1,5 @@
 import datetime
+import unittest.mock
 import uuid
 
 import assertpy
@@ -7,9 +8,12 @@ import moto
 import pytest
 
 from app.adapters import dynamodb_query_service, dynamodb_unit_of_work
-from app.domain.model import product
+from app.adapters.internal import attribute_value_codec, dynamodb_base
+from app.domain.exceptions.domain_exception import DomainException
+from app.domain.model import product, product_version, time_sortable_id
 
 TEST_TABLE_NAME = "test-table"
+TEST_CURSOR_SIGNING_KEY = "test-signing-key"
 
 
 @pytest.fixture
@@ -18,6 +22,11 @@ def mock_dynamodb():
         yield boto3.resource("dynamodb", region_name="eu-central-1")
 
 
+@pytest.fixture
+def dynamodb_client(mock_dynamodb):
+    return boto3.client("dynamodb", region_name="eu-central-1")
+
+
 @pytest.fixture(autouse=True)
 def backend_app_dynamodb_table(mock_dynamodb):
     table = mock_dynamodb.create_table(
@@ -29,6 +38,18 @@ def backend_app_dynamodb_table(mock_dynamodb):
         AttributeDefinitions=[
             {"AttributeName": "PK", "AttributeType": "S"},
             {"AttributeName": "SK", "AttributeType": "S"},
+            {"AttributeName": "GSI1PK", "AttributeType": "S"},
+            {"AttributeName": "GSI1SK", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "GSI1",
+                "KeySchema": [
+                    {"AttributeName": "GSI1PK", "KeyType": "HASH"},
+                    {"AttributeName": "GSI1SK", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
         ],
         BillingMode="PAY_PER_REQUEST",
     )
@@ -37,13 +58,15 @@ def backend_app_dynamodb_table(mock_dynamodb):
     return table
 
 
-def test_list_products_return_all_products(mock_dynamodb):
+def test_list_products_return_all_products(dynamodb_client):
     # Arrange
     unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
     )
     query_service = dynamodb_query_service.DynamoDBProductsQueryService(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
     )
     current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
     product_count = 5
@@ -74,13 +97,15 @@ def test_list_products_return_all_products(mock_dynamodb):
     )
 
 
-def test_list_products_paging(mock_dynamodb):
+def test_list_products_paging(dynamodb_client):
     # Arrange
     unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
     )
     query_service = dynamodb_query_service.DynamoDBProductsQueryService(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
     )
     current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
     product_count = 5
@@ -109,13 +134,59 @@ def test_list_products_paging(mock_dynamodb):
         assertpy.assert_that(products[0].id).is_in(*product_ids)
 
 
-def test_get_product_by_id_returns_product(mock_dynamodb):
+def test_list_products_with_fields_should_read_only_requested_fields(
+    dynamodb_client,
+):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
+    )
+    start_time = datetime.datetime.now(datetime.timezone.utc)
+    product_ids = [str(uuid.uuid4()) for i in range(3)]
+
+    with unit_of_work:
+        for i, product_id in enumerate(product_ids):
+            unit_of_work.products.add(
+                product.Product(
+                    id=product_id,
+                    name=f"test-name-{i}",
+                    description="test-description",
+                    createDate=(start_time + datetime.timedelta(seconds=i)).isoformat(),
+                    lastUpdateDate=start_time.isoformat(),
+                )
+            )
+        unit_of_work.commit()
+
+    # Act
+    first_page, next_token = query_service.list_products(
+        page_size=2, next_token=None, fields=["name"]
+    )
+    second_page, _ = query_service.list_products(
+        page_size=2, next_token=next_token, fields=["name"]
+    )
+
+    # Assert
+    products = first_page + second_page
+    assertpy.assert_that([p.id for p in products]).is_equal_to(product_ids)
+    assertpy.assert_that(products[0].__fields_set__).is_equal_to({"id", "name"})
+    assertpy.assert_that(products[0].name).is_equal_to("test-name-0")
+    assertpy.assert_that(products[0].description).is_none()
+
+
+def test_get_product_by_id_returns_product(dynamodb_client):
     # Arrange
     unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
     )
     query_service = dynamodb_query_service.DynamoDBProductsQueryService(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
     )
     current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
     product_id = str(uuid.uuid4())
@@ -137,3 +208,347 @@ def test_get_product_by_id_returns_product(mock_dynamodb):
     # Assert
     assertpy.assert_that(product_response).is_not_none()
     assertpy.assert_that(product_response.id).is_equal_to(product_id)
+
+
+def test_list_products_returns_only_products_ordered_by_create_date(dynamodb_client):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
+    )
+    start_time = datetime.datetime.now(datetime.timezone.utc)
+    product_count = 3
+    product_ids = [str(uuid.uuid4()) for i in range(product_count)]
+
+    with unit_of_work:
+        for i in reversed(range(product_count)):
+            create_date = (start_time + datetime.timedelta(seconds=i)).isoformat()
+            new_product = product.Product(
+                id=product_ids[i],
+                name="test-name",
+                description="test-description",
+                createDate=create_date,
+                lastUpdateDate=create_date,
+            )
+            unit_of_work.products.add(new_product)
+            unit_of_work.product_versions.add(
+                product_ids[i],
+                product_version.ProductVersion(
+                    id=str(uuid.uuid4()),
+                    name="test-name",
+                    version="1",
+                    createDate=create_date,
+                ),
+            )
+        unit_of_work.commit()
+
+    # Act
+    products, last_evaluated_key = query_service.list_products(
+        page_size=product_count * 2, next_token=None
+    )
+
+    # Assert
+    assertpy.assert_that([product.id for product in products]).is_equal_to(product_ids)
+    assertpy.assert_that(last_evaluated_key).is_none()
+
+
+def test_list_products_when_next_token_is_invalid_should_throw(dynamodb_client):
+    # Arrange
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        cursor_signing_key="test-key",
+    )
+
+    # Act & Assert
+    with pytest.raises(DomainException):
+        query_service.list_products(page_size=1, next_token="invalid-token")
+
+
+def _product_index_item(product_id: str, create_date: str) -> dict:
+    return attribute_value_codec.serialize_item(
+        {
+            **dynamodb_unit_of_work.DynamoDBProductsRepository.generate_product_key(
+                product_id
+            ),
+            **dynamodb_unit_of_work.DynamoDBProductsRepository.generate_product_index_key(
+                product_id=product_id, create_date=create_date
+            ),
+            "id": product_id,
+            "name": "test-name",
+            "createDate": create_date,
+            "lastUpdateDate": create_date,
+        }
+    )
+
+
+def test_list_products_should_fill_page_across_short_responses():
+    # Arrange
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    items = [_product_index_item(str(uuid.uuid4()), current_time) for i in range(4)]
+    mock_client = unittest.mock.Mock()
+    mock_client.query.side_effect = [
+        {"Items": items[:1], "ScannedCount": 1, "LastEvaluatedKey": items[0]},
+        {"Items": [], "ScannedCount": 0, "LastEvaluatedKey": items[0]},
+        {"Items": items[1:3], "ScannedCount": 2, "LastEvaluatedKey": items[2]},
+    ]
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=mock_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
+    )
+
+    # Act
+    products, next_token = query_service.list_products(page_size=3, next_token=None)
+
+    # Assert
+    assertpy.assert_that([p.id for p in products]).is_equal_to(
+        [item["id"]["S"] for item in items[:3]]
+    )
+    assertpy.assert_that(
+        [c.kwargs["Limit"] for c in mock_client.query.call_args_list]
+    ).is_equal_to([3, 2, 2])
+    assertpy.assert_that(
+        query_service._decode_next_token(next_token)["GSI1SK"]
+    ).is_equal_to(items[2]["GSI1SK"])
+
+
+def test_list_products_should_stop_when_request_budget_is_spent():
+    # Arrange
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    item = _product_index_item(str(uuid.uuid4()), current_time)
+    mock_client = unittest.mock.Mock()
+    mock_client.query.return_value = {
+        "Items": [],
+        "ScannedCount": 0,
+        "LastEvaluatedKey": item,
+    }
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=mock_client,
+        max_page_fill_requests=2,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
+    )
+
+    # Act
+    products, next_token = query_service.list_products(page_size=3, next_token=None)
+
+    # Assert
+    assertpy.assert_that(products).is_empty()
+    assertpy.assert_that(mock_client.query.call_count).is_equal_to(2)
+    assertpy.assert_that(next_token).is_not_none()
+
+
+def test_get_products_by_ids_returns_existing_products_in_requested_order(
+    dynamodb_client,
+):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
+    )
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    product_ids = [str(uuid.uuid4()) for i in range(150)]
+
+    for chunk in dynamodb_base.chunked(product_ids, 25):
+        with unit_of_work:
+            for product_id in chunk:
+                unit_of_work.products.add(
+                    product.Product(
+                        id=product_id,
+                        name="test-name",
+                        createDate=current_time,
+                        lastUpdateDate=current_time,
+                    )
+                )
+            unit_of_work.commit()
+
+    requested_ids = list(reversed(product_ids)) + ["does-not-exist", product_ids[0]]
+
+    # Act
+    products = query_service.get_products_by_ids(product_ids=requested_ids)
+
+    # Assert
+    assertpy.assert_that([p.id for p in products]).is_equal_to(
+        list(reversed(product_ids))
+    )
+
+
+def test_get_products_by_ids_should_retry_unprocessed_keys():
+    # Arrange
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    items = [_product_index_item(str(uuid.uuid4()), current_time) for i in range(2)]
+    mock_client = unittest.mock.Mock()
+    mock_client.batch_get_item.side_effect = [
+        {
+            "Responses": {TEST_TABLE_NAME: items[:1]},
+            "UnprocessedKeys": {TEST_TABLE_NAME: {"Keys": [items[1]]}},
+        },
+        {"Responses": {TEST_TABLE_NAME: items[1:]}, "UnprocessedKeys": {}},
+    ]
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=mock_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
+    )
+
+    # Act
+    products = query_service.get_products_by_ids(
+        product_ids=[item["id"]["S"] for item in items]
+    )
+
+    # Assert
+    assertpy.assert_that([p.id for p in products]).is_equal_to(
+        [item["id"]["S"] for item in items]
+    )
+    assertpy.assert_that(mock_client.batch_get_item.call_count).is_equal_to(2)
+
+
+def test_get_product_by_id_with_consistent_read_should_read_consistently():
+    # Arrange
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    item = _product_index_item(str(uuid.uuid4()), current_time)
+    mock_client = unittest.mock.Mock()
+    mock_client.get_item.return_value = {"Item": item}
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=mock_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
+    )
+
+    # Act
+    query_service.get_product_by_id(product_id=item["id"]["S"])
+    query_service.get_product_by_id(product_id=item["id"]["S"], consistent_read=True)
+
+    # Assert
+    assertpy.assert_that(
+        [c.kwargs["ConsistentRead"] for c in mock_client.get_item.call_args_list]
+    ).is_equal_to([False, True])
+
+
+def test_get_products_by_ids_with_consistent_read_should_read_consistently():
+    # Arrange
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    item = _product_index_item(str(uuid.uuid4()), current_time)
+    mock_client = unittest.mock.Mock()
+    mock_client.batch_get_item.return_value = {
+        "Responses": {TEST_TABLE_NAME: [item]},
+        "UnprocessedKeys": {},
+    }
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=mock_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
+    )
+
+    # Act
+    query_service.get_products_by_ids(
+        product_ids=[item["id"]["S"]], consistent_read=True
+    )
+
+    # Assert
+    request_items = mock_client.batch_get_item.call_args.kwargs["RequestItems"]
+    assertpy.assert_that(request_items[TEST_TABLE_NAME]["ConsistentRead"]).is_true()
+
+
+def _add_product_versions(dynamodb_client, product_id, timestamps_ms):
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    with unit_of_work:
+        for index, timestamp_ms in enumerate(timestamps_ms):
+            unit_of_work.product_versions.add(
+                product_id,
+                product_version.ProductVersion(
+                    id=time_sortable_id.new_id(timestamp_ms),
+                    name=f"name-{index}",
+                    version=str(index + 1),
+                    createDate=datetime.datetime.fromtimestamp(
+                        timestamp_ms / 1000, datetime.timezone.utc
+                    ).isoformat(),
+                ),
+            )
+        unit_of_work.commit()
+
+
+def test_list_product_versions_should_page_newest_first(dynamodb_client):
+    # Arrange
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
+    )
+    _add_product_versions(
+        dynamodb_client, "product-1", [1665396610000 + i * 1000 for i in range(5)]
+    )
+    _add_product_versions(dynamodb_client, "product-2", [1665396610000])
+
+    # Act
+    first_page, next_token = query_service.list_product_versions(
+        product_id="product-1", limit=3
+    )
+    second_page, last_token = query_service.list_product_versions(
+        product_id="product-1", limit=3, next_token=next_token
+    )
+
+    # Assert
+    assertpy.assert_that([v.version for v in first_page]).is_equal_to(["5", "4", "3"])
+    assertpy.assert_that([v.version for v in second_page]).is_equal_to(["2", "1"])
+    assertpy.assert_that(last_token).is_none()
+
+
+def test_list_product_versions_since_should_return_only_later_versions(
+    dynamodb_client,
+):
+    # Arrange
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
+    )
+    _add_product_versions(
+        dynamodb_client, "product-1", [1665396610000 + i * 1000 for i in range(5)]
+    )
+    dynamodb_client.put_item(
+        TableName=TEST_TABLE_NAME,
+        Item=attribute_value_codec.serialize_item(
+            dynamodb_unit_of_work.DynamoDBProductsRepository.generate_product_key(
+                "product-1"
+            )
+        ),
+    )
+
+    # Act
+    versions, next_token = query_service.list_product_versions(
+        product_id="product-1", limit=10, since="2022-10-10T10:10:13+00:00"
+    )
+
+    # Assert
+    assertpy.assert_that([v.version for v in versions]).is_equal_to(["5", "4"])
+    assertpy.assert_that(next_token).is_none()
+
+
+def test_list_product_versions_with_token_of_other_product_should_throw(
+    dynamodb_client,
+):
+    # Arrange
+    query_service = dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        cursor_signing_key=TEST_CURSOR_SIGNING_KEY,
+    )
+    _add_product_versions(dynamodb_client, "product-1", [1665396610000, 1665396611000])
+    _, next_token = query_service.list_product_versions(product_id="product-1", limit=1)
+
+    # Act & Assert
+    assertpy.assert_that(query_service.list_product_versions).raises(
+        DomainException
+    ).when_called_with(product_id="product-2", limit=1, next_token=next_token)
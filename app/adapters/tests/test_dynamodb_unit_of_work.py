@@ -1,13 +1,19 @@
 import datetime
+import time
+import unittest.mock
 import uuid
 
 import assertpy
 import boto3
 import moto
 import pytest
+from botocore import exceptions
 
 from app.adapters import dynamodb_unit_of_work
-from app.domain.model import product
+from app.adapters.internal import attribute_value_codec, dynamodb_base
+from app.domain.exceptions.repository_exception import RepositoryException
+from app.domain.exceptions.write_conflict_exception import WriteConflictException
+from app.domain.model import bulk_write, idempotency_record, product
 
 TEST_TABLE_NAME = "test-table"
 
@@ -18,6 +24,11 @@ def mock_dynamodb():
         yield boto3.resource("dynamodb", region_name="eu-central-1")
 
 
+@pytest.fixture
+def dynamodb_client(mock_dynamodb):
+    return boto3.client("dynamodb", region_name="eu-central-1")
+
+
 @pytest.fixture(autouse=True)
 def app_registry_dynamodb_table(mock_dynamodb):
     table = mock_dynamodb.create_table(
@@ -29,6 +40,18 @@ def app_registry_dynamodb_table(mock_dynamodb):
         AttributeDefinitions=[
             {"AttributeName": "PK", "AttributeType": "S"},
             {"AttributeName": "SK", "AttributeType": "S"},
+            {"AttributeName": "GSI1PK", "AttributeType": "S"},
+            {"AttributeName": "GSI1SK", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "GSI1",
+                "KeySchema": [
+                    {"AttributeName": "GSI1PK", "KeyType": "HASH"},
+                    {"AttributeName": "GSI1SK", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
         ],
         BillingMode="PAY_PER_REQUEST",
     )
@@ -37,13 +60,13 @@ def app_registry_dynamodb_table(mock_dynamodb):
     return table
 
 
-def test_add_and_commit_should_store_product(mock_dynamodb):
+def test_add_and_commit_should_store_product(dynamodb_client):
     # Arrange
     unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
     )
     unit_of_work_readonly = dynamodb_unit_of_work.DynamoDBUnitOfWork(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
     )
     current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
 
@@ -73,14 +96,15 @@ def test_add_and_commit_should_store_product(mock_dynamodb):
             "description": "test-description",
             "createDate": current_time,
             "lastUpdateDate": current_time,
+            "version": 0,
         }
     )
 
 
-def test_get_product_when_does_not_exist_should_throw(mock_dynamodb):
+def test_get_product_when_does_not_exist_should_throw(dynamodb_client):
     # Arrange
     unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
     )
 
     # Act
@@ -91,13 +115,13 @@ def test_get_product_when_does_not_exist_should_throw(mock_dynamodb):
     assertpy.assert_that(product).is_none()
 
 
-def test_update_attribute_should_only_update_specified_property(mock_dynamodb):
+def test_update_attribute_should_only_update_specified_property(dynamodb_client):
     # Arrange
     unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
     )
     unit_of_work_readonly = dynamodb_unit_of_work.DynamoDBUnitOfWork(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
     )
     current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
 
@@ -116,7 +140,7 @@ def test_update_attribute_should_only_update_specified_property(mock_dynamodb):
     # Act
     with unit_of_work:
         unit_of_work.products.update_attributes(
-            new_product_id, description="new-description"
+            new_product_id, name="new-name", description="new-description"
         )
         unit_of_work.commit()
 
@@ -128,21 +152,174 @@ def test_update_attribute_should_only_update_specified_property(mock_dynamodb):
     assertpy.assert_that(product_from_db.dict()).is_equal_to(
         {
             "id": new_product_id,
-            "name": "test-name",
+            "name": "new-name",
             "description": "new-description",
             "createDate": current_time,
             "lastUpdateDate": current_time,
+            "version": 1,
+        }
+    )
+
+
+def test_update_attribute_with_expected_version_should_reject_stale_update(
+    dynamodb_client,
+):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    new_product_id = str(uuid.uuid4())
+    with unit_of_work:
+        unit_of_work.products.add(
+            product.Product(
+                id=new_product_id,
+                name="test-name",
+                createDate=current_time,
+                lastUpdateDate=current_time,
+            )
+        )
+        unit_of_work.commit()
+    with unit_of_work:
+        unit_of_work.products.update_attributes(
+            new_product_id, expected_version=0, name="first-update"
+        )
+        unit_of_work.commit()
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.update_attributes(
+            new_product_id, expected_version=0, name="stale-update"
+        )
+        with pytest.raises(WriteConflictException) as conflict:
+            unit_of_work.commit()
+
+    # Assert
+    with unit_of_work:
+        product_from_db = unit_of_work.products.get(new_product_id)
+    assertpy.assert_that(conflict.value.retryable).is_false()
+    assertpy.assert_that(product_from_db.name).is_equal_to("first-update")
+    assertpy.assert_that(product_from_db.version).is_equal_to(1)
+
+
+def test_commit_conflicting_with_concurrent_transaction_should_be_retryable():
+    # Arrange
+    mock_client = unittest.mock.Mock()
+    mock_client.transact_write_items.side_effect = exceptions.ClientError(
+        {
+            "Error": {"Code": "TransactionCanceledException"},
+            "CancellationReasons": [{"Code": "TransactionConflict"}],
+        },
+        "TransactWriteItems",
+    )
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=mock_client
+    )
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.update_attributes("product-1", name="new-name")
+        with pytest.raises(WriteConflictException) as conflict:
+            unit_of_work.commit()
+
+    # Assert
+    assertpy.assert_that(conflict.value.retryable).is_true()
+
+
+def test_get_product_with_consistent_read_should_read_consistently():
+    # Arrange
+    mock_client = unittest.mock.Mock()
+    mock_client.get_item.return_value = {}
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=mock_client
+    )
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.get("product-1")
+        unit_of_work.products.get("product-1", consistent_read=True)
+
+    # Assert
+    assertpy.assert_that(
+        [c.kwargs["ConsistentRead"] for c in mock_client.get_item.call_args_list]
+    ).is_equal_to([False, True])
+
+
+def test_commit_returning_product_should_return_updated_product(dynamodb_client):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    new_product_id = str(uuid.uuid4())
+    with unit_of_work:
+        unit_of_work.products.add(
+            product.Product(
+                id=new_product_id,
+                name="test-name",
+                description="test-description",
+                createDate=current_time,
+                lastUpdateDate=current_time,
+            )
+        )
+        unit_of_work.commit()
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.update_attributes(
+            new_product_id, expected_version=0, name="new-name"
+        )
+        updated_product = unit_of_work.commit_returning_product()
+
+    # Assert
+    assertpy.assert_that(updated_product.dict()).is_equal_to(
+        {
+            "id": new_product_id,
+            "name": "new-name",
+            "description": "test-description",
+            "createDate": current_time,
+            "lastUpdateDate": current_time,
+            "version": 1,
         }
     )
 
 
-def test_delete_and_commit_should_delete_product(mock_dynamodb):
+def test_commit_returning_product_for_missing_product_should_raise_conflict(
+    dynamodb_client,
+):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+
+    # Act & Assert
+    with unit_of_work:
+        unit_of_work.products.update_attributes("does-not-exist", name="new-name")
+        with pytest.raises(WriteConflictException):
+            unit_of_work.commit_returning_product()
+
+
+def test_commit_returning_product_with_several_changes_should_raise(dynamodb_client):
     # Arrange
     unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+
+    # Act & Assert
+    with unit_of_work:
+        unit_of_work.products.delete("product-1")
+        unit_of_work.products.delete("product-2")
+        with pytest.raises(RepositoryException):
+            unit_of_work.commit_returning_product()
+
+
+def test_delete_and_commit_should_delete_product(dynamodb_client):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
     )
     unit_of_work_readonly = dynamodb_unit_of_work.DynamoDBUnitOfWork(
-        table_name=TEST_TABLE_NAME, dynamodb_client=mock_dynamodb.meta.client
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
     )
     current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
 
@@ -168,3 +345,226 @@ def test_delete_and_commit_should_delete_product(mock_dynamodb):
         product_from_db = unit_of_work_readonly.products.get(new_product_id)
 
     assertpy.assert_that(product_from_db).is_none()
+
+
+def test_commit_bulk_should_store_products_in_transaction_chunks(dynamodb_client):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        transaction_max_items=25,
+        max_bulk_workers=1,  # moto is not thread safe
+    )
+    unit_of_work_readonly = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    product_ids = [str(uuid.uuid4()) for i in range(60)]
+
+    # Act
+    with unit_of_work:
+        for product_id in product_ids:
+            unit_of_work.products.add(
+                product.Product(
+                    id=product_id,
+                    name="test-name",
+                    createDate=current_time,
+                    lastUpdateDate=current_time,
+                )
+            )
+        errors = unit_of_work.commit_bulk(bulk_write.BulkWriteMode.TRANSACTIONAL)
+
+    # Assert
+    assertpy.assert_that(errors).is_equal_to([None] * len(product_ids))
+    with unit_of_work_readonly:
+        for product_id in product_ids:
+            assertpy.assert_that(
+                unit_of_work_readonly.products.get(product_id)
+            ).is_not_none()
+
+
+def test_commit_bulk_should_report_failed_transaction_chunk(dynamodb_client):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        transaction_max_items=2,
+        max_bulk_workers=1,  # moto is not thread safe
+    )
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    new_product = product.Product(
+        id=str(uuid.uuid4()),
+        name="test-name",
+        createDate=current_time,
+        lastUpdateDate=current_time,
+    )
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.add(new_product)
+        unit_of_work.products.update_attributes("does-not-exist", name="new-name")
+        unit_of_work.products.delete(new_product.id)
+        errors = unit_of_work.commit_bulk(bulk_write.BulkWriteMode.TRANSACTIONAL)
+
+    # Assert
+    assertpy.assert_that(errors[0]).is_not_none()
+    assertpy.assert_that(errors[1]).is_not_none()
+    assertpy.assert_that(errors[2]).is_none()
+
+
+def test_commit_bulk_best_effort_should_write_independent_changes(dynamodb_client):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME,
+        dynamodb_client=dynamodb_client,
+        max_bulk_workers=1,  # moto is not thread safe
+    )
+    unit_of_work_readonly = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+    )
+    current_time = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    product_ids = [str(uuid.uuid4()) for i in range(30)]
+
+    # Act
+    with unit_of_work:
+        for product_id in product_ids:
+            unit_of_work.products.add(
+                product.Product(
+                    id=product_id,
+                    name="test-name",
+                    createDate=current_time,
+                    lastUpdateDate=current_time,
+                )
+            )
+        unit_of_work.products.update_attributes("does-not-exist", name="new-name")
+        errors = unit_of_work.commit_bulk(bulk_write.BulkWriteMode.BEST_EFFORT)
+
+    # Assert
+    assertpy.assert_that(errors[:-1]).is_equal_to([None] * len(product_ids))
+    assertpy.assert_that(errors[-1]).is_not_none()
+    with unit_of_work_readonly:
+        assertpy.assert_that(
+            unit_of_work_readonly.products.get(product_ids[-1])
+        ).is_not_none()
+
+
+def _create_idempotency_record(key, expires_at):
+    return idempotency_record.IdempotencyRecord(
+        key=key,
+        commandHash="hash-1",
+        result='"product-1"',
+        createDate="2022-10-10T10:10:10+00:00",
+        expiresAt=expires_at,
+    )
+
+
+def test_commit_bulk_best_effort_should_report_only_pending_items_when_retry_raises():
+    # Arrange
+    requests = [
+        {"PutRequest": {"Item": {"PK": {"S": f"ITEM#{index}"}, "SK": {"S": "ITEM"}}}}
+        for index in range(2)
+    ]
+    mock_client = unittest.mock.Mock()
+    mock_client.batch_write_item.side_effect = [
+        {"UnprocessedItems": {TEST_TABLE_NAME: [requests[1]]}},
+        exceptions.ClientError(
+            {"Error": {"Code": "InternalServerError", "Message": "Failed."}},
+            "BatchWriteItem",
+        ),
+    ]
+    context = dynamodb_base.DynamoDBContext(dynamodb_client=mock_client)
+    for request in requests:
+        context.add_generic_item(
+            {"Put": {"TableName": TEST_TABLE_NAME, **request["PutRequest"]}}
+        )
+
+    # Act
+    errors = context.commit_bulk(bulk_write.BulkWriteMode.BEST_EFFORT)
+
+    # Assert
+    assertpy.assert_that(errors[0]).is_none()
+    assertpy.assert_that(errors[1]).contains("InternalServerError")
+    assertpy.assert_that(mock_client.batch_write_item.call_count).is_equal_to(2)
+
+
+def test_idempotency_record_should_be_committed_with_product_and_cached(
+    dynamodb_client,
+):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        TEST_TABLE_NAME, dynamodb_client
+    )
+    record = _create_idempotency_record("key-1", int(time.time()) + 60)
+    product_obj = product.Product(
+        id="product-1",
+        name="test-name",
+        createDate="2022-10-10T10:10:10+00:00",
+        lastUpdateDate="2022-10-10T10:10:10+00:00",
+    )
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.add(product_obj)
+        unit_of_work.idempotency_records.add(record)
+        unit_of_work.commit()
+    records_repository = dynamodb_unit_of_work.DynamoDBIdempotencyRecordsRepository
+    dynamodb_client.delete_item(
+        TableName=TEST_TABLE_NAME,
+        Key=attribute_value_codec.serialize_item(
+            records_repository.generate_idempotency_record_key("key-1")
+        ),
+    )
+    with unit_of_work:
+        cached_record = unit_of_work.idempotency_records.get("key-1")
+        stored_product = unit_of_work.products.get("product-1")
+
+    # Assert
+    assertpy.assert_that(cached_record).is_equal_to(record)
+    assertpy.assert_that(stored_product).is_not_none()
+
+
+def test_idempotency_record_with_used_key_should_raise_conflict(dynamodb_client):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        TEST_TABLE_NAME, dynamodb_client, idempotency_cache_max_entries=0
+    )
+    with unit_of_work:
+        unit_of_work.idempotency_records.add(
+            _create_idempotency_record("key-1", int(time.time()) + 60)
+        )
+        unit_of_work.commit()
+
+    # Act
+    with unit_of_work:
+        stored_record = unit_of_work.idempotency_records.get("key-1")
+        unit_of_work.idempotency_records.add(
+            _create_idempotency_record("key-1", int(time.time()) + 60)
+        )
+
+        # Assert
+        assertpy.assert_that(stored_record.result).is_equal_to('"product-1"')
+        assertpy.assert_that(unit_of_work.commit).raises(WriteConflictException)
+
+
+def test_expired_idempotency_record_should_be_replaced(dynamodb_client):
+    # Arrange
+    unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        TEST_TABLE_NAME, dynamodb_client, idempotency_cache_max_entries=0
+    )
+    with unit_of_work:
+        unit_of_work.idempotency_records.add(
+            _create_idempotency_record("key-1", int(time.time()) - 1)
+        )
+        unit_of_work.commit()
+    new_record = _create_idempotency_record("key-1", int(time.time()) + 60)
+
+    # Act
+    with unit_of_work:
+        unit_of_work.idempotency_records.add(new_record)
+        unit_of_work.commit()
+
+    # Assert
+    with unit_of_work:
+        assertpy.assert_that(unit_of_work.idempotency_records.get("key-1")).is_equal_to(
+            new_record
+        )
@@ -0,0 +1,148 @@
+import json
+
+import assertpy
+
+from app.adapters.internal import emf_metrics
+
+
+def _create_recorder(lines, sample_value=0.0, sample_rate=0.5):
+    return emf_metrics.MetricsRecorder(
+        namespace="TestNamespace",
+        sample_rate=sample_rate,
+        write=lambda line: lines.append(json.loads(line)),
+        sample=lambda: sample_value,
+        clock=lambda: 1700000000.123,
+    )
+
+
+def test_flush_should_write_a_line_per_dimension_set():
+    # Arrange
+    lines = []
+    recorder = _create_recorder(lines)
+    recorder.start_invocation()
+    recorder.add("Latency", 12.5, "Milliseconds", {"Operation": "GetItem"})
+    recorder.add("Latency", 7.5, "Milliseconds", {"Operation": "GetItem"})
+    recorder.add("ProductLookups", 3, "Count")
+
+    # Act
+    recorder.flush()
+
+    # Assert
+    assertpy.assert_that(lines).is_equal_to(
+        [
+            {
+                "_aws": {
+                    "Timestamp": 1700000000123,
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": "TestNamespace",
+                            "Dimensions": [["Operation"]],
+                            "Metrics": [{"Name": "Latency", "Unit": "Milliseconds"}],
+                        }
+                    ],
+                },
+                "Operation": "GetItem",
+                "SampleRate": 0.5,
+                "Latency": [12.5, 7.5],
+            },
+            {
+                "_aws": {
+                    "Timestamp": 1700000000123,
+                    "CloudWatchMetrics": [
+                        {
+                            "Namespace": "TestNamespace",
+                            "Dimensions": [[]],
+                            "Metrics": [{"Name": "ProductLookups", "Unit": "Count"}],
+                        }
+                    ],
+                },
+                "SampleRate": 0.5,
+                "ProductLookups": 6,
+            },
+        ]
+    )
+
+
+def test_flush_should_split_values_over_the_emf_limit():
+    # Arrange
+    lines = []
+    recorder = _create_recorder(lines)
+    recorder.start_invocation()
+    for value in range(emf_metrics.MAX_VALUES_PER_METRIC + 1):
+        recorder.add("Latency", value, "Milliseconds")
+    recorder.add("ResponseBytes", 10, "Bytes")
+
+    # Act
+    recorder.flush()
+
+    # Assert
+    assertpy.assert_that(lines).is_length(2)
+    assertpy.assert_that(lines[0]["Latency"]).is_length(
+        emf_metrics.MAX_VALUES_PER_METRIC
+    )
+    assertpy.assert_that(lines[0]["ResponseBytes"]).is_equal_to(10)
+    assertpy.assert_that(lines[1]["Latency"]).is_equal_to(
+        emf_metrics.MAX_VALUES_PER_METRIC
+    )
+    assertpy.assert_that(lines[1]).does_not_contain_key("ResponseBytes")
+    assertpy.assert_that(
+        [
+            metric["Name"]
+            for metric in lines[1]["_aws"]["CloudWatchMetrics"][0]["Metrics"]
+        ]
+    ).is_equal_to(["Latency"])
+
+
+def test_flush_should_scale_counts_to_the_totals_of_all_invocations():
+    # Arrange
+    lines = []
+    samples = iter([0.1, 0.3, 0.6, 0.9] * 5)
+    recorder = emf_metrics.MetricsRecorder(
+        namespace="TestNamespace",
+        sample_rate=0.25,
+        write=lambda line: lines.append(json.loads(line)),
+        sample=lambda: next(samples),
+    )
+
+    # Act
+    for _ in range(20):
+        recorder.start_invocation()
+        recorder.add("ConsumedRCU", 0.5, "Count")
+        recorder.add("Errors", 1, "Count")
+        recorder.add("Latency", 12.5, "Milliseconds")
+        recorder.add("ProductLookups", 4, "Count", scale=False)
+        recorder.flush()
+
+    # Assert
+    assertpy.assert_that(lines).is_length(5)
+    assertpy.assert_that(sum(line["ConsumedRCU"] for line in lines)).is_equal_to(10)
+    assertpy.assert_that(sum(line["Errors"] for line in lines)).is_equal_to(20)
+    assertpy.assert_that({line["Latency"] for line in lines}).is_equal_to({12.5})
+    assertpy.assert_that(sum(line["ProductLookups"] for line in lines)).is_equal_to(20)
+
+
+def test_recorder_should_not_record_invocations_that_are_not_sampled():
+    # Arrange
+    lines = []
+    recorder = _create_recorder(lines, sample_value=0.7)
+
+    # Act
+    sampled = recorder.start_invocation()
+    recorder.add("Latency", 12.5, "Milliseconds")
+    recorder.flush()
+
+    # Assert
+    assertpy.assert_that(sampled).is_false()
+    assertpy.assert_that(lines).is_empty()
+
+
+def test_recorder_should_be_disabled_without_a_sample_rate():
+    # Arrange
+    recorder = _create_recorder([], sample_rate=0)
+
+    # Act
+    sampled = recorder.start_invocation()
+
+    # Assert
+    assertpy.assert_that(recorder.enabled).is_false()
+    assertpy.assert_that(sampled).is_false()
@@ -0,0 +1,57 @@
+import assertpy
+import pytest
+
+from app.adapters.internal import pagination_cursor
+from app.domain.exceptions.domain_exception import DomainException
+
+
+def test_encode_and_decode_should_round_trip_fields():
+    # Arrange
+    codec = pagination_cursor.PaginationCursorCodec(signing_key="test-key")
+    fields = ["2022-07-01T10:00:00+00:00#product-id", "", "ü" * 200]
+
+    # Act
+    token = codec.encode(fields)
+
+    # Assert
+    assertpy.assert_that(token).does_not_contain("=", "+", "/")
+    assertpy.assert_that(codec.decode(token)).is_equal_to(fields)
+
+
+def test_decode_when_token_is_tampered_should_throw():
+    # Arrange
+    codec = pagination_cursor.PaginationCursorCodec(signing_key="test-key")
+    token = codec.encode(["2022-07-01T10:00:00+00:00#product-id"])
+    tampered_token = ("A" if token[0] != "A" else "B") + token[1:]
+
+    # Act & Assert
+    with pytest.raises(DomainException):
+        codec.decode(tampered_token)
+
+
+def test_decode_when_signed_with_other_key_should_throw():
+    # Arrange
+    token = pagination_cursor.PaginationCursorCodec(signing_key="other-key").encode(
+        ["2022-07-01T10:00:00+00:00#product-id"]
+    )
+    codec = pagination_cursor.PaginationCursorCodec(signing_key="test-key")
+
+    # Act & Assert
+    with pytest.raises(DomainException):
+        codec.decode(token)
+
+
+@pytest.mark.parametrize("token", ["", "not a token", "AAAA", "{'PK': 'x'}"])
+def test_decode_when_token_is_malformed_should_throw(token):
+    # Arrange
+    codec = pagination_cursor.PaginationCursorCodec(signing_key="test-key")
+
+    # Act & Assert
+    with pytest.raises(DomainException):
+        codec.decode(token)
+
+
+def test_codec_with_empty_signing_key_should_throw():
+    # Act & Assert
+    with pytest.raises(ValueError):
+        pagination_cursor.PaginationCursorCodec(signing_key="")
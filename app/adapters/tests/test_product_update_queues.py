@@ -0,0 +1,59 @@
+import json
+import unittest.mock
+
+import assertpy
+import pytest
+
+from app.adapters import sqlite_product_update_queue, sqs_product_update_queue
+from app.domain.commands import update_product_command
+from app.domain.exceptions.repository_exception import RepositoryException
+
+
+def test_sqlite_queue_should_return_updates_in_order_until_deleted():
+    # Arrange
+    queue = sqlite_product_update_queue.SQLiteProductUpdateQueue()
+    first = update_product_command.UpdateProductCommand(id="id-1", name="Name 1")
+    second = update_product_command.UpdateProductCommand(id="id-1", name="Name 2")
+    queue.send(first)
+    queue.send(second)
+
+    # Act
+    received = queue.receive(max_messages=10)
+    queue.delete([received[0][0]])
+    remaining = queue.receive(max_messages=10)
+
+    # Assert
+    assertpy.assert_that([update for _, update in received]).is_equal_to(
+        [first, second]
+    )
+    assertpy.assert_that(remaining).is_equal_to([received[1]])
+
+
+def test_sqs_queue_should_send_update_as_json_message():
+    # Arrange
+    mock_sqs_client = unittest.mock.MagicMock()
+    queue = sqs_product_update_queue.SQSProductUpdateQueue(
+        "test-queue-url", mock_sqs_client
+    )
+    command = update_product_command.UpdateProductCommand(id="id-1", name="Name")
+
+    # Act
+    queue.send(command)
+
+    # Assert
+    request = mock_sqs_client.send_message.call_args.kwargs
+    assertpy.assert_that(request["QueueUrl"]).is_equal_to("test-queue-url")
+    assertpy.assert_that(json.loads(request["MessageBody"])).is_equal_to(command.dict())
+
+
+def test_sqs_queue_when_send_fails_should_raise():
+    # Arrange
+    mock_sqs_client = unittest.mock.MagicMock()
+    mock_sqs_client.send_message.side_effect = Exception("Throttled.")
+    queue = sqs_product_update_queue.SQSProductUpdateQueue(
+        "test-queue-url", mock_sqs_client
+    )
+
+    # Act & Assert
+    with pytest.raises(RepositoryException):
+        queue.send(update_product_command.UpdateProductCommand(id="id-1", name="Name"))
@@ -0,0 +1,107 @@
+import unittest.mock
+
+import assertpy
+import pytest
+
+from app.adapters import read_your_writes_query_service
+from app.domain.ports import products_query_service
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def mock_query_service():
+    return unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def query_service(mock_query_service, clock):
+    return read_your_writes_query_service.ReadYourWritesProductsQueryService(
+        mock_query_service, window_seconds=2, clock=clock
+    )
+
+
+def test_get_product_by_id_should_read_consistently_within_window_after_write(
+    query_service, mock_query_service, clock
+):
+    # Arrange
+    query_service.invalidate_product("id-1")
+
+    # Act
+    query_service.get_product_by_id("id-1")
+    query_service.get_product_by_id("id-2")
+    clock.now += 2
+    query_service.get_product_by_id("id-1")
+
+    # Assert
+    assertpy.assert_that(
+        [
+            c.kwargs["consistent_read"]
+            for c in mock_query_service.get_product_by_id.call_args_list
+        ]
+    ).is_equal_to([True, False, False])
+    mock_query_service.invalidate_product.assert_called_once_with("id-1")
+
+
+def test_get_products_by_ids_should_read_consistently_when_any_product_was_written(
+    query_service, mock_query_service
+):
+    # Arrange
+    query_service.invalidate_product("id-2")
+
+    # Act
+    query_service.get_products_by_ids(["id-1", "id-2"])
+    query_service.get_products_by_ids(["id-1", "id-3"])
+
+    # Assert
+    assertpy.assert_that(
+        [
+            c.kwargs["consistent_read"]
+            for c in mock_query_service.get_products_by_ids.call_args_list
+        ]
+    ).is_equal_to([True, False])
+
+
+def test_requested_consistent_read_should_be_kept_without_write(
+    query_service, mock_query_service
+):
+    # Act
+    query_service.list_product_versions("id-1", limit=5, consistent_read=True)
+
+    # Assert
+    mock_query_service.list_product_versions.assert_called_once_with(
+        product_id="id-1",
+        limit=5,
+        next_token=None,
+        since=None,
+        consistent_read=True,
+    )
+
+
+def test_invalidate_product_should_forget_expired_writes(query_service, clock):
+    # Arrange
+    query_service.invalidate_product("id-1")
+    clock.now += 1
+    query_service.invalidate_product("id-2")
+    clock.now += 1.5
+
+    # Act
+    query_service.invalidate_product("id-3")
+
+    # Assert
+    assertpy.assert_that(list(query_service._written_until)).is_equal_to(
+        ["id-2", "id-3"]
+    )
@@ -0,0 +1,461 @@
+"""
+Contract tests run against every UnitOfWork and ProductsQueryService adapter,
+so the local adapters used for load testing behave like the DynamoDB ones.
+"""
+import datetime
+import time
+import typing
+
+import assertpy
+import boto3
+import moto
+import pytest
+
+from app.adapters import (
+    dynamodb_query_service,
+    dynamodb_unit_of_work,
+    in_memory_query_service,
+    in_memory_unit_of_work,
+    sqlite_query_service,
+    sqlite_unit_of_work,
+)
+from app.domain.exceptions.domain_exception import DomainException
+from app.domain.exceptions.repository_exception import RepositoryException
+from app.domain.exceptions.write_conflict_exception import WriteConflictException
+from app.domain.model import (
+    bulk_write,
+    idempotency_record,
+    product,
+    product_version,
+    time_sortable_id,
+)
+from app.domain.ports.products_query_service import ProductsQueryService
+from app.domain.ports.unit_of_work import UnitOfWork
+
+TEST_TABLE_NAME = "test-table"
+
+
+class Adapters(typing.NamedTuple):
+    create_unit_of_work: typing.Callable[..., UnitOfWork]
+    query_service: ProductsQueryService
+
+
+def _create_dynamodb_adapters() -> Adapters:
+    dynamodb = boto3.resource("dynamodb", region_name="eu-central-1")
+    dynamodb.create_table(
+        TableName=TEST_TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+            {"AttributeName": "GSI1PK", "AttributeType": "S"},
+            {"AttributeName": "GSI1SK", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "GSI1",
+                "KeySchema": [
+                    {"AttributeName": "GSI1PK", "KeyType": "HASH"},
+                    {"AttributeName": "GSI1SK", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    dynamodb_client = boto3.client("dynamodb", region_name="eu-central-1")
+
+    def create_unit_of_work(**kwargs) -> UnitOfWork:
+        return dynamodb_unit_of_work.DynamoDBUnitOfWork(
+            TEST_TABLE_NAME,
+            dynamodb_client,
+            max_bulk_workers=1,  # moto is not thread safe
+            idempotency_cache_max_entries=0,
+            **kwargs,
+        )
+
+    return Adapters(
+        create_unit_of_work,
+        dynamodb_query_service.DynamoDBProductsQueryService(
+            TEST_TABLE_NAME,
+            dynamodb_client,
+            cursor_signing_key="test-signing-key",
+        ),
+    )
+
+
+def _create_in_memory_adapters() -> Adapters:
+    store = in_memory_unit_of_work.InMemoryStore()
+    return Adapters(
+        lambda **kwargs: in_memory_unit_of_work.InMemoryUnitOfWork(store, **kwargs),
+        in_memory_query_service.InMemoryProductsQueryService(store),
+    )
+
+
+def _create_sqlite_adapters() -> Adapters:
+    store = sqlite_unit_of_work.SQLiteStore()
+    return Adapters(
+        lambda **kwargs: sqlite_unit_of_work.SQLiteUnitOfWork(store, **kwargs),
+        sqlite_query_service.SQLiteProductsQueryService(store),
+    )
+
+
+@pytest.fixture(params=["dynamodb", "in_memory", "sqlite"])
+def adapters(request):
+    if request.param == "dynamodb":
+        with moto.mock_dynamodb():
+            yield _create_dynamodb_adapters()
+    elif request.param == "in_memory":
+        yield _create_in_memory_adapters()
+    else:
+        yield _create_sqlite_adapters()
+
+
+def _create_product(product_id: str, seconds: int = 0) -> product.Product:
+    create_date = (
+        datetime.datetime(2022, 10, 10, 10, 10, tzinfo=datetime.timezone.utc)
+        + datetime.timedelta(seconds=seconds)
+    ).isoformat()
+    return product.Product(
+        id=product_id,
+        name=f"name-{product_id}",
+        description="test-description",
+        createDate=create_date,
+        lastUpdateDate=create_date,
+    )
+
+
+def _add_products(adapters: Adapters, products: typing.List[product.Product]) -> None:
+    unit_of_work = adapters.create_unit_of_work()
+    with unit_of_work:
+        for product_obj in products:
+            unit_of_work.products.add(product_obj)
+        unit_of_work.commit()
+
+
+def test_added_product_should_be_read_back(adapters):
+    # Arrange
+    new_product = _create_product("product-1")
+
+    # Act
+    _add_products(adapters, [new_product])
+
+    # Assert
+    unit_of_work = adapters.create_unit_of_work()
+    with unit_of_work:
+        assertpy.assert_that(unit_of_work.products.get("product-1")).is_equal_to(
+            new_product
+        )
+        assertpy.assert_that(unit_of_work.products.get("does-not-exist")).is_none()
+    assertpy.assert_that(
+        adapters.query_service.get_product_by_id("product-1")
+    ).is_equal_to(new_product)
+
+
+def test_add_existing_product_should_raise_conflict_and_write_nothing(adapters):
+    # Arrange
+    _add_products(adapters, [_create_product("product-1")])
+    unit_of_work = adapters.create_unit_of_work()
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.add(_create_product("product-2"))
+        unit_of_work.products.add(_create_product("product-1"))
+
+        # Assert
+        assertpy.assert_that(unit_of_work.commit).raises(WriteConflictException)
+    assertpy.assert_that(
+        adapters.query_service.get_product_by_id("product-2")
+    ).is_none()
+
+
+def test_update_should_increment_version_and_check_expected_version(adapters):
+    # Arrange
+    _add_products(adapters, [_create_product("product-1")])
+    unit_of_work = adapters.create_unit_of_work()
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.update_attributes(
+            "product-1", expected_version=0, name="new"
+        )
+        unit_of_work.commit()
+        unit_of_work.products.update_attributes(
+            "product-1", expected_version=0, name="stale"
+        )
+
+        # Assert
+        assertpy.assert_that(unit_of_work.commit).raises(WriteConflictException)
+    stored = adapters.query_service.get_product_by_id("product-1")
+    assertpy.assert_that(stored.name).is_equal_to("new")
+    assertpy.assert_that(stored.version).is_equal_to(1)
+
+
+def test_update_should_check_product_was_last_updated_before(adapters):
+    # Arrange
+    _add_products(adapters, [_create_product("product-1")])
+    stored_update_date = _create_product("product-1").lastUpdateDate
+    unit_of_work = adapters.create_unit_of_work()
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.update_attributes(
+            "product-1", last_updated_before=stored_update_date, name="stale"
+        )
+
+        # Assert
+        assertpy.assert_that(unit_of_work.commit).raises(WriteConflictException)
+    with unit_of_work:
+        unit_of_work.products.update_attributes(
+            "product-1",
+            last_updated_before=_create_product("product-1", seconds=1).lastUpdateDate,
+            name="new",
+        )
+        unit_of_work.commit()
+    assertpy.assert_that(
+        adapters.query_service.get_product_by_id("product-1").name
+    ).is_equal_to("new")
+
+
+def test_update_missing_product_should_raise_conflict(adapters):
+    # Arrange
+    unit_of_work = adapters.create_unit_of_work()
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.update_attributes("does-not-exist", name="new")
+
+        # Assert
+        assertpy.assert_that(unit_of_work.commit).raises(WriteConflictException)
+
+
+def test_commit_returning_product_should_return_updated_product(adapters):
+    # Arrange
+    _add_products(adapters, [_create_product("product-1")])
+    unit_of_work = adapters.create_unit_of_work()
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.update_attributes("product-1", name="new")
+        updated = unit_of_work.commit_returning_product()
+        unit_of_work.products.update_attributes("does-not-exist", name="new")
+        assertpy.assert_that(unit_of_work.commit_returning_product).raises(
+            WriteConflictException
+        )
+    with unit_of_work:
+        unit_of_work.products.delete("product-1")
+        unit_of_work.products.add(_create_product("product-2"))
+        assertpy.assert_that(unit_of_work.commit_returning_product).raises(
+            RepositoryException
+        )
+
+    # Assert
+    assertpy.assert_that(updated.name).is_equal_to("new")
+    assertpy.assert_that(updated.version).is_equal_to(1)
+    assertpy.assert_that(updated.description).is_equal_to("test-description")
+
+
+def test_delete_should_remove_product_from_reads_and_listing(adapters):
+    # Arrange
+    _add_products(
+        adapters, [_create_product("product-1"), _create_product("product-2")]
+    )
+    unit_of_work = adapters.create_unit_of_work()
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.delete("product-1")
+        unit_of_work.commit()
+
+    # Assert
+    products, _ = adapters.query_service.list_products(page_size=10, next_token=None)
+    assertpy.assert_that([p.id for p in products]).is_equal_to(["product-2"])
+    assertpy.assert_that(
+        adapters.query_service.get_product_by_id("product-1")
+    ).is_none()
+
+
+def test_commit_bulk_transactional_should_fail_only_the_failed_chunk(adapters):
+    # Arrange
+    unit_of_work = adapters.create_unit_of_work(transaction_max_items=2)
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.add(_create_product("product-1"))
+        unit_of_work.products.update_attributes("does-not-exist", name="new")
+        unit_of_work.products.add(_create_product("product-2"))
+        errors = unit_of_work.commit_bulk(bulk_write.BulkWriteMode.TRANSACTIONAL)
+
+    # Assert
+    assertpy.assert_that(errors[0]).is_not_none()
+    assertpy.assert_that(errors[1]).is_not_none()
+    assertpy.assert_that(errors[2]).is_none()
+    assertpy.assert_that(
+        adapters.query_service.get_product_by_id("product-1")
+    ).is_none()
+    assertpy.assert_that(
+        adapters.query_service.get_product_by_id("product-2")
+    ).is_not_none()
+
+
+def test_commit_bulk_best_effort_should_write_independent_changes(adapters):
+    # Arrange
+    _add_products(adapters, [_create_product("product-1")])
+    unit_of_work = adapters.create_unit_of_work()
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.add(_create_product("product-2"))
+        unit_of_work.products.update_attributes("does-not-exist", name="new")
+        unit_of_work.products.delete("product-1")
+        errors = unit_of_work.commit_bulk(bulk_write.BulkWriteMode.BEST_EFFORT)
+
+    # Assert
+    assertpy.assert_that(errors[0]).is_none()
+    assertpy.assert_that(errors[1]).is_not_none()
+    assertpy.assert_that(errors[2]).is_none()
+    products, _ = adapters.query_service.list_products(page_size=10, next_token=None)
+    assertpy.assert_that([p.id for p in products]).is_equal_to(["product-2"])
+
+
+def test_commit_bulk_best_effort_should_keep_conditions_of_puts_and_deletes(adapters):
+    # Arrange
+    _add_products(adapters, [_create_product("product-1")])
+    unit_of_work = adapters.create_unit_of_work()
+
+    # Act
+    with unit_of_work:
+        unit_of_work.products.add(_create_product("product-1", seconds=1))
+        unit_of_work.products.delete("does-not-exist", must_exist=True)
+        unit_of_work.products.delete("also-does-not-exist")
+        errors = unit_of_work.commit_bulk(bulk_write.BulkWriteMode.BEST_EFFORT)
+
+    # Assert
+    assertpy.assert_that(errors[0]).is_not_none()
+    assertpy.assert_that(errors[1]).is_not_none()
+    assertpy.assert_that(errors[2]).is_none()
+    assertpy.assert_that(
+        adapters.query_service.get_product_by_id("product-1")
+    ).is_equal_to(_create_product("product-1"))
+
+
+def test_idempotency_record_should_be_added_once_until_it_expires(adapters):
+    # Arrange
+    def create_record(expires_at):
+        return idempotency_record.IdempotencyRecord(
+            key="key-1",
+            commandHash="hash-1",
+            result='"product-1"',
+            createDate="2022-10-10T10:10:10+00:00",
+            expiresAt=expires_at,
+        )
+
+    expired_record = create_record(int(time.time()) - 1)
+    new_record = create_record(int(time.time()) + 60)
+    unit_of_work = adapters.create_unit_of_work()
+
+    # Act
+    with unit_of_work:
+        unit_of_work.idempotency_records.add(expired_record)
+        unit_of_work.commit()
+        unit_of_work.idempotency_records.add(new_record)
+        unit_of_work.commit()
+        unit_of_work.idempotency_records.add(new_record)
+
+        # Assert
+        assertpy.assert_that(unit_of_work.commit).raises(WriteConflictException)
+        assertpy.assert_that(unit_of_work.idempotency_records.get("key-1")).is_equal_to(
+            new_record
+        )
+        assertpy.assert_that(unit_of_work.idempotency_records.get("key-2")).is_none()
+
+
+def test_list_products_should_page_through_all_products_in_creation_order(adapters):
+    # Arrange
+    products = [_create_product(f"product-{i:02}", seconds=-i) for i in range(11)]
+    _add_products(adapters, products)
+    expected_ids = [p.id for p in reversed(products)]
+
+    # Act
+    listed_ids = []
+    next_token = None
+    for _ in range(len(products)):
+        page, next_token = adapters.query_service.list_products(
+            page_size=4, next_token=next_token, fields=["name"]
+        )
+        listed_ids.extend(p.id for p in page)
+        assertpy.assert_that([p.name for p in page]).is_equal_to(
+            [f"name-{p.id}" for p in page]
+        )
+        if not next_token:
+            break
+
+    # Assert
+    assertpy.assert_that(listed_ids).is_equal_to(expected_ids)
+    assertpy.assert_that(next_token).is_none()
+
+
+def test_list_products_with_invalid_token_should_throw(adapters):
+    # Act & Assert
+    assertpy.assert_that(adapters.query_service.list_products).raises(
+        DomainException
+    ).when_called_with(page_size=10, next_token="invalid")
+
+
+def test_get_products_by_ids_should_keep_requested_order(adapters):
+    # Arrange
+    _add_products(adapters, [_create_product(f"product-{i}") for i in range(3)])
+
+    # Act
+    products = adapters.query_service.get_products_by_ids(
+        ["product-2", "does-not-exist", "product-0", "product-2"]
+    )
+
+    # Assert
+    assertpy.assert_that([p.id for p in products]).is_equal_to(
+        ["product-2", "product-0"]
+    )
+
+
+def test_product_versions_should_page_newest_first(adapters):
+    # Arrange
+    unit_of_work = adapters.create_unit_of_work()
+    with unit_of_work:
+        for i in range(5):
+            unit_of_work.product_versions.add(
+                "product-1",
+                product_version.ProductVersion(
+                    id=time_sortable_id.new_id(1665396610000 + i * 1000),
+                    name=f"name-{i}",
+                    version=str(i + 1),
+                    createDate="2022-10-10T10:10:10+00:00",
+                ),
+            )
+        unit_of_work.commit()
+
+    # Act
+    first_page, next_token = adapters.query_service.list_product_versions(
+        product_id="product-1", limit=3
+    )
+    second_page, last_token = adapters.query_service.list_product_versions(
+        product_id="product-1", limit=3, next_token=next_token
+    )
+    recent, _ = adapters.query_service.list_product_versions(
+        product_id="product-1", limit=10, since="2022-10-10T10:10:13+00:00"
+    )
+
+    # Assert
+    assertpy.assert_that([v.version for v in first_page]).is_equal_to(["5", "4", "3"])
+    assertpy.assert_that([v.version for v in second_page]).is_equal_to(["2", "1"])
+    assertpy.assert_that(last_token).is_none()
+    assertpy.assert_that([v.version for v in recent]).is_equal_to(["5", "4"])
+    with unit_of_work:
+        assertpy.assert_that(
+            unit_of_work.product_versions.get("product-1", first_page[0].id)
+        ).is_equal_to(first_page[0])
+    assertpy.assert_that(adapters.query_service.list_product_versions).raises(
+        DomainException
+    ).when_called_with(product_id="product-2", limit=1, next_token=next_token)
@@ -0,0 +1,14 @@
+from app.domain.commands import apply_product_changes_command
+from app.domain.ports import product_projections
+
+
+def handle_apply_product_changes_command(
+    command: apply_product_changes_command.ApplyProductChangesCommand,
+    product_projections: product_projections.ProductProjections,
+) -> int:
+
+    latest_changes = {change.id: change for change in command.changes}
+    if latest_changes:
+        product_projections.apply_changes(list(latest_changes.values()))
+
+    return len(latest_changes)
@@ -0,0 +1,119 @@
+from typing import Dict, List, Optional
+
+from app.domain.command_handlers import update_product_command_handler
+from app.domain.commands import apply_product_updates_command, update_product_command
+from app.domain.exceptions.domain_exception import DomainException
+from app.domain.exceptions.write_conflict_exception import WriteConflictException
+from app.domain.ports import products_query_service, unit_of_work
+
+
+def handle_apply_product_updates_command(
+    command: apply_product_updates_command.ApplyProductUpdatesCommand,
+    unit_of_work: unit_of_work.UnitOfWork,
+    products_query_service: Optional[
+        products_query_service.ProductsQueryService
+    ] = None,
+    record_version: bool = True,
+) -> List[str]:
+    """
+    Merges the queued updates of each product in the order they were queued,
+    where later values replace earlier ones, and applies each merged update
+    with a single write.
+
+    Messages can be received out of order, and a failed update is received
+    again after newer ones were applied. The write is therefore conditional on
+    the product not being updated since the oldest update was queued. When it
+    was, the product is read and only the updates queued after its last update
+    are applied, so a stale update never replaces newer values.
+
+    Returns the IDs of products whose update failed and should be retried.
+    Updates of products that do not exist are dropped.
+    """
+    updates_by_product: Dict[
+        str, List[update_product_command.UpdateProductCommand]
+    ] = {}
+    for update in sorted(command.updates, key=lambda update: update.queuedAt or ""):
+        updates_by_product.setdefault(update.id, []).append(update)
+
+    failed_ids = []
+    for product_id, updates in updates_by_product.items():
+        try:
+            _apply_updates(
+                product_id,
+                updates,
+                unit_of_work,
+                products_query_service,
+                record_version,
+            )
+        except WriteConflictException as e:
+            if e.retryable:
+                failed_ids.append(product_id)
+        except DomainException:
+            continue
+        except Exception:
+            failed_ids.append(product_id)
+
+    return failed_ids
+
+
+def _apply_updates(
+    product_id: str,
+    updates: List[update_product_command.UpdateProductCommand],
+    unit_of_work: unit_of_work.UnitOfWork,
+    products_query_service: Optional[products_query_service.ProductsQueryService],
+    record_version: bool,
+) -> None:
+    try:
+        _apply_merged_update(
+            updates, unit_of_work, products_query_service, record_version
+        )
+    except WriteConflictException as e:
+        if e.retryable or updates[0].queuedAt is None:
+            raise
+        with unit_of_work:
+            current_product = unit_of_work.products.get(
+                product_id, consistent_read=True
+            )
+        if current_product is None:
+            return
+        updates = [
+            update
+            for update in updates
+            if update.queuedAt and update.queuedAt > current_product.lastUpdateDate
+        ]
+        if not updates:
+            return
+        try:
+            _apply_merged_update(
+                updates, unit_of_work, products_query_service, record_version
+            )
+        except WriteConflictException as e:
+            # Another write came in between, the updates are received again.
+            raise WriteConflictException(str(e), retryable=True) from e
+
+
+def _apply_merged_update(
+    updates: List[update_product_command.UpdateProductCommand],
+    unit_of_work: unit_of_work.UnitOfWork,
+    products_query_service: Optional[products_query_service.ProductsQueryService],
+    record_version: bool,
+) -> None:
+    merged = updates[0].copy(update={"expectedVersion": None})
+    for update in updates[1:]:
+        merged = merged.copy(
+            update={
+                name: value
+                for name, value in update.dict(
+                    include={"name", "description", "queuedAt"}
+                ).items()
+                if value
+            }
+        )
+
+    update_product_command_handler.handle_update_product_command(
+        command=merged,
+        unit_of_work=unit_of_work,
+        products_query_service=products_query_service,
+        record_version=record_version,
+        last_updated_before=updates[0].queuedAt,
+    )
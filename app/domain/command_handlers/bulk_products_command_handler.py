@@ -0,0 +1,125 @@
+import collections
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from app.domain.command_handlers import idempotency
+from app.domain.commands import bulk_products_command
+from app.domain.exceptions.domain_exception import DomainException
+from app.domain.exceptions.write_conflict_exception import WriteConflictException
+from app.domain.model import bulk_write, product
+from app.domain.ports import products_query_service, unit_of_work
+
+
+def handle_bulk_products_command(
+    command: bulk_products_command.BulkProductsCommand,
+    unit_of_work: unit_of_work.UnitOfWork,
+    products_query_service: Optional[
+        products_query_service.ProductsQueryService
+    ] = None,
+    idempotency_key: Optional[str] = None,
+    record_version: bool = False,
+) -> List[bulk_write.BulkWriteResult]:
+    """
+    Creates, updates and deletes products in chunks and returns a result per
+    change. With an idempotency key, a retried command returns the results of
+    the first execution. The changes span several writes, so the idempotency
+    record is written once they are committed, and only a retry arriving
+    after that is recognized.
+
+    A product can be changed only once per command, because DynamoDB rejects
+    a batch or transaction that writes the same item twice. Deletes fail for
+    missing products, like updates do.
+
+    Bulk updates do not record product versions, so when record_version is set,
+    commands with updates are rejected rather than leaving gaps in the history.
+    """
+    if record_version and command.updates:
+        raise DomainException(
+            "Products cannot be updated in bulk while version history is enabled."
+        )
+    _check_no_duplicate_ids(command)
+
+    stored_result = idempotency.find_result(command, idempotency_key, unit_of_work)
+    if stored_result is not None:
+        return [
+            bulk_write.BulkWriteResult.parse_obj(result)
+            for result in json.loads(stored_result)
+        ]
+
+    current_time = datetime.now(timezone.utc).isoformat()
+    operations: List[Tuple[bulk_write.BulkWriteOperation, str]] = []
+
+    with unit_of_work:
+        for create_command in command.creates:
+            id = str(uuid.uuid4())
+            unit_of_work.products.add(
+                product.Product(
+                    id=id,
+                    name=create_command.name,
+                    description=create_command.description,
+                    createDate=current_time,
+                    lastUpdateDate=current_time,
+                )
+            )
+            operations.append((bulk_write.BulkWriteOperation.CREATE, id))
+
+        for update_command in command.updates:
+            attr_to_update = {
+                "lastUpdateDate": current_time,
+            }
+            if update_command.name:
+                attr_to_update["name"] = update_command.name
+            if update_command.description:
+                attr_to_update["description"] = update_command.description
+
+            unit_of_work.products.update_attributes(
+                product_id=update_command.id,
+                expected_version=update_command.expectedVersion,
+                **attr_to_update,
+            )
+            operations.append((bulk_write.BulkWriteOperation.UPDATE, update_command.id))
+
+        for delete_command in command.deletes:
+            unit_of_work.products.delete(product_id=delete_command.id, must_exist=True)
+            operations.append((bulk_write.BulkWriteOperation.DELETE, delete_command.id))
+
+        errors = unit_of_work.commit_bulk(command.mode)
+        results = [
+            bulk_write.BulkWriteResult(
+                operation=operation, id=id, succeeded=error is None, error=error
+            )
+            for (operation, id), error in zip(operations, errors)
+        ]
+
+        if idempotency_key:
+            idempotency.add_record(
+                command,
+                idempotency_key,
+                unit_of_work,
+                json.dumps([result.dict() for result in results]),
+            )
+            try:
+                unit_of_work.commit()
+            except WriteConflictException:
+                # A concurrent retry of the command stored its results first.
+                pass
+
+    if products_query_service:
+        for _, id in operations:
+            products_query_service.invalidate_product(id)
+
+    return results
+
+
+def _check_no_duplicate_ids(command: bulk_products_command.BulkProductsCommand) -> None:
+    id_counts = collections.Counter(
+        [update_command.id for update_command in command.updates]
+        + [delete_command.id for delete_command in command.deletes]
+    )
+    duplicate_ids = [id for id, count in id_counts.items() if count > 1]
+    if duplicate_ids:
+        raise DomainException(
+            f"Products can be changed only once per request: {', '.join(duplicate_ids)}."
+        )
@@ -1,15 +1,31 @@
+import json
 import uuid
 from datetime import datetime, timezone
+from typing import Optional
 
+from app.domain.command_handlers import idempotency
 from app.domain.commands import create_product_command
+from app.domain.exceptions.write_conflict_exception import WriteConflictException
 from app.domain.model import product
-from app.domain.ports import unit_of_work
+from app.domain.ports import products_query_service, unit_of_work
 
 
 def handle_create_product_command(
     command: create_product_command.CreateProductCommand,
     unit_of_work: unit_of_work.UnitOfWork,
+    idempotency_key: Optional[str] = None,
+    products_query_service: Optional[
+        products_query_service.ProductsQueryService
+    ] = None,
 ) -> str:
+    """
+    Creates a product and returns its ID. With an idempotency key, a retried
+    command returns the ID of the product created the first time.
+    """
+    stored_result = idempotency.find_result(command, idempotency_key, unit_of_work)
+    if stored_result is not None:
+        return json.loads(stored_result)
+
     current_time = datetime.now(timezone.utc).isoformat()
     id = str(uuid.uuid4())
 
@@ -21,8 +37,21 @@ def handle_create_product_command(
         lastUpdateDate=current_time,
     )
 
-    with unit_of_work:
-        unit_of_work.products.add(product_obj)
-        unit_of_work.commit()
+    try:
+        with unit_of_work:
+            unit_of_work.products.add(product_obj)
+            idempotency.add_record(
+                command, idempotency_key, unit_of_work, json.dumps(id)
+            )
+            unit_of_work.commit()
+    except WriteConflictException:
+        # A concurrent retry of the command committed first.
+        stored_result = idempotency.find_result(command, idempotency_key, unit_of_work)
+        if stored_result is None:
+            raise
+        return json.loads(stored_result)
+
+    if products_query_service:
+        products_query_service.invalidate_product(id)
 
     return id
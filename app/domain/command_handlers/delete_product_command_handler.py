@@ -1,14 +1,37 @@
+import json
+from typing import Optional
+
+from app.domain.command_handlers import idempotency
 from app.domain.commands import delete_product_command
-from app.domain.ports import unit_of_work
+from app.domain.exceptions.write_conflict_exception import WriteConflictException
+from app.domain.ports import products_query_service, unit_of_work
 
 
 def handle_delete_product_command(
     command: delete_product_command.DeleteProductCommand,
     unit_of_work: unit_of_work.UnitOfWork,
+    products_query_service: Optional[
+        products_query_service.ProductsQueryService
+    ] = None,
+    idempotency_key: Optional[str] = None,
 ) -> str:
+    stored_result = idempotency.find_result(command, idempotency_key, unit_of_work)
+    if stored_result is not None:
+        return json.loads(stored_result)
+
+    try:
+        with unit_of_work:
+            unit_of_work.products.delete(product_id=command.id)
+            idempotency.add_record(
+                command, idempotency_key, unit_of_work, json.dumps(command.id)
+            )
+            unit_of_work.commit()
+    except WriteConflictException:
+        # A concurrent retry of the command committed first.
+        if idempotency.find_result(command, idempotency_key, unit_of_work) is None:
+            raise
 
-    with unit_of_work:
-        unit_of_work.products.delete(product_id=command.id)
-        unit_of_work.commit()
+    if products_query_service:
+        products_query_service.invalidate_product(command.id)
 
     return command.id
@@ -0,0 +1,34 @@
+from app.domain.commands import export_products_command
+from app.domain.model import product_export
+from app.domain.ports import product_export as product_export_ports
+
+
+def handle_export_products_command(
+    command: export_products_command.ExportProductsCommand,
+    export_source: product_export_ports.ProductsExportSource,
+    export_sink: product_export_ports.ProductsExportSink,
+) -> product_export.ProductExportResult:
+
+    chunk_locations = []
+    product_count = 0
+    chunk = []
+
+    for products in export_source.read_products():
+        for product_obj in products:
+            chunk.append(product_obj)
+            if len(chunk) >= command.chunkSize:
+                chunk_locations.append(
+                    export_sink.write_chunk(len(chunk_locations), chunk)
+                )
+                product_count += len(chunk)
+                chunk = []
+
+    if chunk:
+        chunk_locations.append(export_sink.write_chunk(len(chunk_locations), chunk))
+        product_count += len(chunk)
+
+    result = product_export.ProductExportResult(
+        productCount=product_count, chunkLocations=chunk_locations
+    )
+    export_sink.complete(result)
+    return result
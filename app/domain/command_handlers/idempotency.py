@@ -0,0 +1,62 @@
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.domain.exceptions.idempotency_key_reused_exception import (
+    IdempotencyKeyReusedException,
+)
+from app.domain.model import idempotency_record
+from app.domain.ports import unit_of_work
+
+IDEMPOTENCY_RECORD_TTL_SECONDS = 24 * 60 * 60
+
+
+def find_result(
+    command: BaseModel,
+    idempotency_key: Optional[str],
+    unit_of_work: unit_of_work.UnitOfWork,
+) -> Optional[str]:
+    """
+    Returns the stored result of the command executed before with the same
+    idempotency key, or None if it was not executed yet.
+    Must be called outside of a unit of work block, because it opens its own.
+    Raises IdempotencyKeyReusedException if the key was used for another command.
+    """
+    if not idempotency_key:
+        return None
+
+    with unit_of_work:
+        record = unit_of_work.idempotency_records.get(idempotency_key)
+    if record is None or record.expiresAt <= time.time():
+        return None
+    if record.commandHash != idempotency_record.hash_command(command):
+        raise IdempotencyKeyReusedException(
+            f"Idempotency key {idempotency_key} was already used for another request."
+        )
+    return record.result
+
+
+def add_record(
+    command: BaseModel,
+    idempotency_key: Optional[str],
+    unit_of_work: unit_of_work.UnitOfWork,
+    result: str,
+) -> None:
+    """
+    Adds the idempotency record of the command to the pending changes, so it is
+    committed together with them. Does nothing without an idempotency key.
+    """
+    if not idempotency_key:
+        return
+
+    unit_of_work.idempotency_records.add(
+        idempotency_record.IdempotencyRecord(
+            key=idempotency_key,
+            commandHash=idempotency_record.hash_command(command),
+            result=result,
+            createDate=datetime.now(timezone.utc).isoformat(),
+            expiresAt=int(time.time()) + IDEMPOTENCY_RECORD_TTL_SECONDS,
+        )
+    )
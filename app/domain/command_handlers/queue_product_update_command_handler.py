@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+
+from app.domain.commands import update_product_command
+from app.domain.exceptions.domain_exception import DomainException
+from app.domain.ports import product_update_queue
+
+
+def handle_queue_product_update_command(
+    command: update_product_command.UpdateProductCommand,
+    product_update_queue: product_update_queue.ProductUpdateQueue,
+) -> str:
+    """
+    Queues the update to be merged with other queued updates of the product
+    and applied later. Updates based on an expected version need the result
+    of the version check, so they cannot be queued.
+
+    The update carries the time it was queued, which becomes the product's
+    lastUpdateDate, so updates received out of order are applied in order.
+    """
+    if command.expectedVersion is not None:
+        raise DomainException("Updates with an expected version cannot be queued.")
+
+    product_update_queue.send(
+        command.copy(update={"queuedAt": datetime.now(timezone.utc).isoformat()})
+    )
+    return command.id
@@ -1,14 +1,59 @@
+import time
 from datetime import datetime, timezone
+from typing import Dict, Optional
 
+from app.domain.command_handlers import idempotency
 from app.domain.commands import update_product_command
-from app.domain.ports import unit_of_work
+from app.domain.exceptions.domain_exception import DomainException
+from app.domain.exceptions.product_version_conflict_exception import (
+    ProductVersionConflictException,
+)
+from app.domain.exceptions.write_conflict_exception import WriteConflictException
+from app.domain.model import product, product_version, time_sortable_id
+from app.domain.ports import products_query_service, unit_of_work
+
+UPDATE_MAX_ATTEMPTS = 3
+UPDATE_BASE_BACKOFF_SECONDS = 0.02
 
 
 def handle_update_product_command(
     command: update_product_command.UpdateProductCommand,
     unit_of_work: unit_of_work.UnitOfWork,
-) -> str:
-    current_time = datetime.now(timezone.utc).isoformat()
+    products_query_service: Optional[
+        products_query_service.ProductsQueryService
+    ] = None,
+    record_version: bool = True,
+    idempotency_key: Optional[str] = None,
+    last_updated_before: Optional[str] = None,
+) -> product.Product:
+    """
+    Updates the product, increments its version and returns the product as
+    stored after the update.
+
+    When record_version is set, the product is read first and a product version
+    is added in the same transaction as the update, which is conditional on the
+    version read. A concurrent update in between makes the attempt fail, and it
+    is retried a bounded number of times. Otherwise, the update is a single
+    write that returns the stored product, and only writes rejected by a
+    concurrent transaction are retried.
+
+    When the command carries the expected version and the product has changed
+    since, ProductVersionConflictException is raised.
+
+    With an idempotency key, the product is also read first, so the idempotency
+    record can hold the updated product and be written in the same transaction.
+    A retried command returns that product without updating it again.
+
+    A queued command is stored with the time it was queued as lastUpdateDate.
+    With last_updated_before, the update is applied only if the product was
+    not updated since, and WriteConflictException is raised otherwise.
+    """
+    stored_result = idempotency.find_result(command, idempotency_key, unit_of_work)
+    if stored_result is not None:
+        return product.Product.parse_raw(stored_result)
+
+    transactional = record_version or bool(idempotency_key)
+    current_time = command.queuedAt or datetime.now(timezone.utc).isoformat()
 
     attr_to_update = {
         "lastUpdateDate": current_time,
@@ -18,8 +63,109 @@ def handle_update_product_command(
     if command.description:
         attr_to_update["description"] = command.description
 
-    with unit_of_work:
-        unit_of_work.products.update_attributes(product_id=command.id, **attr_to_update)
-        unit_of_work.commit()
+    for attempt in range(UPDATE_MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(UPDATE_BASE_BACKOFF_SECONDS * 2 ** (attempt - 1))
+        try:
+            with unit_of_work:
+                if transactional:
+                    updated_product = _update_in_transaction(
+                        command,
+                        unit_of_work,
+                        attr_to_update,
+                        current_time,
+                        record_version,
+                        idempotency_key,
+                        last_updated_before,
+                    )
+                else:
+                    unit_of_work.products.update_attributes(
+                        product_id=command.id,
+                        expected_version=command.expectedVersion,
+                        last_updated_before=last_updated_before,
+                        **attr_to_update,
+                    )
+                    updated_product = unit_of_work.commit_returning_product()
+            break
+        except WriteConflictException as e:
+            # A concurrent retry of the command may have committed first.
+            stored_result = idempotency.find_result(
+                command, idempotency_key, unit_of_work
+            )
+            if stored_result is not None:
+                updated_product = product.Product.parse_raw(stored_result)
+                break
+            if not e.retryable and command.expectedVersion is not None:
+                raise _version_conflict(command) from e
+            if not e.retryable and last_updated_before is not None:
+                raise
+            if (
+                not e.retryable and not transactional
+            ) or attempt + 1 == UPDATE_MAX_ATTEMPTS:
+                raise
+
+    if products_query_service:
+        products_query_service.invalidate_product(command.id)
+
+    return updated_product
 
-    return command.id
+
+def _update_in_transaction(
+    command: update_product_command.UpdateProductCommand,
+    unit_of_work: unit_of_work.UnitOfWork,
+    attr_to_update: Dict[str, str],
+    current_time: str,
+    record_version: bool,
+    idempotency_key: Optional[str],
+    last_updated_before: Optional[str],
+) -> product.Product:
+    # A stale read would fail the conditional write below as a version conflict.
+    current_product = unit_of_work.products.get(command.id, consistent_read=True)
+    if not current_product:
+        raise DomainException(f"Could not locate product with id: {command.id}.")
+    if (
+        command.expectedVersion is not None
+        and current_product.version != command.expectedVersion
+    ):
+        raise _version_conflict(command)
+    if (
+        last_updated_before is not None
+        and current_product.lastUpdateDate >= last_updated_before
+    ):
+        raise WriteConflictException(
+            f"Product {command.id} was updated after {last_updated_before}."
+        )
+
+    updated_product = current_product.copy(
+        update={**attr_to_update, "version": current_product.version + 1}
+    )
+    unit_of_work.products.update_attributes(
+        product_id=command.id,
+        expected_version=current_product.version,
+        last_updated_before=last_updated_before,
+        **attr_to_update,
+    )
+    if record_version:
+        unit_of_work.product_versions.add(
+            command.id,
+            product_version.ProductVersion(
+                id=time_sortable_id.new_id(),
+                name=updated_product.name,
+                version=str(updated_product.version),
+                createDate=current_time,
+            ),
+        )
+    idempotency.add_record(
+        command, idempotency_key, unit_of_work, updated_product.json()
+    )
+    unit_of_work.commit()
+    return updated_product
+
+
+def _version_conflict(
+    command: update_product_command.UpdateProductCommand,
+) -> ProductVersionConflictException:
+    return ProductVersionConflictException(
+        f"Product {command.id} does not have the expected version "
+        f"{command.expectedVersion}."
+    )
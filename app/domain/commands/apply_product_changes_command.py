@@ -0,0 +1,9 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from app.domain.model import product_change
+
+
+class ApplyProductChangesCommand(BaseModel):
+    changes: List[product_change.ProductChange]
@@ -0,0 +1,9 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from app.domain.commands import update_product_command
+
+
+class ApplyProductUpdatesCommand(BaseModel):
+    updates: List[update_product_command.UpdateProductCommand]
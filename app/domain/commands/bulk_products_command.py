@@ -0,0 +1,17 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from app.domain.commands import (
+    create_product_command,
+    delete_product_command,
+    update_product_command,
+)
+from app.domain.model import bulk_write
+
+
+class BulkProductsCommand(BaseModel):
+    mode: bulk_write.BulkWriteMode = bulk_write.BulkWriteMode.TRANSACTIONAL
+    creates: List[create_product_command.CreateProductCommand] = []
+    updates: List[update_product_command.UpdateProductCommand] = []
+    deletes: List[delete_product_command.DeleteProductCommand] = []
@@ -0,0 +1,5 @@
+from pydantic import BaseModel, Field
+
+
+class ExportProductsCommand(BaseModel):
+    chunkSize: int = Field(10000, gt=0)
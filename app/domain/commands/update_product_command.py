@@ -7,3 +7,5 @@ class UpdateProductCommand(BaseModel):
     id: str
     name: Optional[str]
     description: Optional[str]
+    expectedVersion: Optional[int]
+    queuedAt: Optional[str]
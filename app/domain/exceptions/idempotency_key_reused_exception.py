@@ -0,0 +1,5 @@
+from app.domain.exceptions.domain_exception import DomainException
+
+
+class IdempotencyKeyReusedException(DomainException):
+    """The idempotency key was already used for a different command."""
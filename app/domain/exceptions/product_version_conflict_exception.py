@@ -0,0 +1,5 @@
+from app.domain.exceptions.domain_exception import DomainException
+
+
+class ProductVersionConflictException(DomainException):
+    """The product was changed or deleted since the expected version was read."""
@@ -0,0 +1,12 @@
+from app.domain.exceptions.repository_exception import RepositoryException
+
+
+class WriteConflictException(RepositoryException):
+    """
+    A write was rejected by a condition or by a concurrent transaction.
+    Retryable when only a concurrent transaction on the same items caused it.
+    """
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
@@ -0,0 +1,22 @@
+import enum
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class BulkWriteMode(str, enum.Enum):
+    TRANSACTIONAL = "TRANSACTIONAL"
+    BEST_EFFORT = "BEST_EFFORT"
+
+
+class BulkWriteOperation(str, enum.Enum):
+    CREATE = "CREATE"
+    UPDATE = "UPDATE"
+    DELETE = "DELETE"
+
+
+class BulkWriteResult(BaseModel):
+    operation: BulkWriteOperation = Field(..., title="Operation")
+    id: str = Field(..., title="Id")
+    succeeded: bool = Field(..., title="Succeeded")
+    error: Optional[str] = Field(title="Error")
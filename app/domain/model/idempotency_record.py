@@ -0,0 +1,20 @@
+import hashlib
+
+from pydantic import BaseModel, Field
+
+
+class IdempotencyRecord(BaseModel):
+    key: str = Field(..., title="Key")
+    commandHash: str = Field(..., title="CommandHash")
+    result: str = Field(..., title="Result")
+    createDate: str = Field(..., title="CreateDate")
+    expiresAt: int = Field(..., title="ExpiresAt")
+
+
+def hash_command(command: BaseModel) -> str:
+    """
+    Returns a fingerprint of the command type and contents, so an idempotency
+    key reused for a different command can be told apart from a retry.
+    """
+    payload = f"{type(command).__name__}:{command.json(sort_keys=True)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -9,3 +9,4 @@ class Product(BaseModel):
     description: Optional[str] = Field(title="Description")
     createDate: str = Field(..., title="CreateDate")
     lastUpdateDate: str = Field(..., title="LastUpdateDate")
+    version: int = Field(0, title="Version")
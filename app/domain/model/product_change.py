@@ -0,0 +1,16 @@
+import enum
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ProductChangeType(str, enum.Enum):
+    INSERT = "INSERT"
+    MODIFY = "MODIFY"
+    REMOVE = "REMOVE"
+
+
+class ProductChange(BaseModel):
+    id: str = Field(..., title="Id")
+    changeType: ProductChangeType = Field(..., title="ChangeType")
+    createDate: Optional[str] = Field(title="CreateDate")
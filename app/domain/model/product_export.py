@@ -0,0 +1,8 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class ProductExportResult(BaseModel):
+    productCount: int = Field(..., title="ProductCount")
+    chunkLocations: List[str] = Field(..., title="ChunkLocations")
@@ -0,0 +1,50 @@
+import datetime
+import os
+import time
+from typing import Optional
+
+from app.domain.exceptions.domain_exception import DomainException
+
+# Crockford's base32, as used by ULIDs. Its characters are in ASCII order,
+# so IDs sort by time as plain strings.
+ENCODING = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+TIMESTAMP_LENGTH = 10
+RANDOMNESS_LENGTH = 16
+
+
+def new_id(timestamp_ms: Optional[int] = None) -> str:
+    """
+    Generates a ULID: a 48 bit millisecond timestamp followed by 80 random bits,
+    encoded in 26 characters. IDs created in a later millisecond sort after
+    earlier ones.
+    """
+    if timestamp_ms is None:
+        timestamp_ms = time.time_ns() // 1_000_000
+    randomness = int.from_bytes(os.urandom(10), "big")
+    return _encode(timestamp_ms, TIMESTAMP_LENGTH) + _encode(
+        randomness, RANDOMNESS_LENGTH
+    )
+
+
+def timestamp_prefix(timestamp_ms: int) -> str:
+    """Returns the prefix shared by all IDs created in the given millisecond."""
+    return _encode(timestamp_ms, TIMESTAMP_LENGTH)
+
+
+def parse_timestamp_ms(date: str) -> int:
+    """Converts an ISO 8601 date to milliseconds since the epoch, UTC if unset."""
+    try:
+        parsed = datetime.datetime.fromisoformat(date)
+    except ValueError as e:
+        raise DomainException("since should be an ISO 8601 date.") from e
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return max(0, int(parsed.timestamp() * 1000))
+
+
+def _encode(value: int, length: int) -> str:
+    characters = []
+    for _ in range(length):
+        value, remainder = divmod(value, 32)
+        characters.append(ENCODING[remainder])
+    return "".join(reversed(characters))
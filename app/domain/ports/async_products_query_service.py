@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from app.domain.model import product, product_version
+
+
+class AsyncProductsQueryService(ABC):
+    """Asynchronous counterpart of ProductsQueryService."""
+
+    @abstractmethod
+    async def list_products(
+        self,
+        page_size: int,
+        next_token: Optional[str],
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[product.Product], Optional[str]]:
+        """
+        Returns a page of products. When fields are given, products may carry
+        only those fields and the id.
+        """
+
+    @abstractmethod
+    async def get_product_by_id(
+        self,
+        product_id: str,
+        fields: Optional[List[str]] = None,
+        consistent_read: bool = False,
+    ) -> Optional[product.Product]:
+        """
+        Returns a single product. When fields are given, the product may carry
+        only those fields and the id.
+        """
+
+    @abstractmethod
+    async def get_products_by_ids(
+        self, product_ids: List[str], consistent_read: bool = False
+    ) -> List[product.Product]:
+        ...
+
+    @abstractmethod
+    async def list_product_versions(
+        self,
+        product_id: str,
+        limit: int,
+        next_token: Optional[str] = None,
+        since: Optional[str] = None,
+        consistent_read: bool = False,
+    ) -> Tuple[List[product_version.ProductVersion], Optional[str]]:
+        """Returns a page of the versions of a product, newest first."""
+
+    async def invalidate_product(self, product_id: str) -> None:
+        """Drops any state cached for the product. Does nothing by default."""
@@ -0,0 +1,28 @@
+import typing
+from abc import ABC, abstractmethod
+
+from app.domain.model import product, product_export
+
+
+class ProductsExportSource(ABC):
+    @abstractmethod
+    def read_products(self) -> typing.Iterator[typing.List[product.Product]]:
+        """
+        Yields all products in batches, in no particular order.
+        Batches are produced only as fast as they are consumed.
+        """
+        ...
+
+
+class ProductsExportSink(ABC):
+    @abstractmethod
+    def write_chunk(
+        self, chunk_index: int, products: typing.List[product.Product]
+    ) -> str:
+        """Writes a chunk of the export and returns its location."""
+        ...
+
+    @abstractmethod
+    def complete(self, result: product_export.ProductExportResult) -> None:
+        """Marks the export as complete after all chunks are written."""
+        ...
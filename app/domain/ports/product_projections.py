@@ -0,0 +1,23 @@
+import typing
+from abc import ABC, abstractmethod
+
+from app.domain.model import product_change
+
+
+class ProductProjections(ABC):
+    @abstractmethod
+    def apply_changes(self, changes: typing.List[product_change.ProductChange]) -> None:
+        ...
+
+
+class ProductChangeFeed(ABC):
+    @abstractmethod
+    def get_changed_product_ids(
+        self, since_position: typing.Tuple[int, ...]
+    ) -> typing.Tuple[typing.Tuple[int, ...], typing.Optional[typing.List[str]]]:
+        """
+        Returns the latest position in the change feed and the IDs changed after
+        since_position. Positions are opaque, and an empty one is the start.
+        The IDs are None when the changes are no longer known.
+        """
+        ...
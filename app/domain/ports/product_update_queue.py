@@ -0,0 +1,11 @@
+from abc import ABC, abstractmethod
+
+from app.domain.commands import update_product_command
+
+
+class ProductUpdateQueue(ABC):
+    """Queue of product updates applied later, merged per product."""
+
+    @abstractmethod
+    def send(self, command: update_product_command.UpdateProductCommand) -> None:
+        ...
@@ -1,16 +1,55 @@
 from abc import ABC, abstractmethod
-from typing import Any, List, Optional, Tuple
+from typing import List, Optional, Tuple
 
-from app.domain.model import product
+from app.domain.model import product, product_version
 
 
 class ProductsQueryService(ABC):
     @abstractmethod
     def list_products(
-        self, page_size: int, next_token: Any
-    ) -> Tuple[List[product.Product], Any]:
-        ...
+        self,
+        page_size: int,
+        next_token: Optional[str],
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[product.Product], Optional[str]]:
+        """
+        Returns a page of products. When fields are given, products may carry
+        only those fields and the id. Pages may miss the most recent writes.
+        """
+
+    @abstractmethod
+    def get_product_by_id(
+        self,
+        product_id: str,
+        fields: Optional[List[str]] = None,
+        consistent_read: bool = False,
+    ) -> Optional[product.Product]:
+        """
+        Returns a single product. When fields are given, the product may carry
+        only those fields and the id. A consistent read reflects every write
+        that completed before it, while by default a recent write may be missing.
+        """
 
     @abstractmethod
-    def get_product_by_id(self, product_id: str) -> Optional[product.Product]:
+    def get_products_by_ids(
+        self, product_ids: List[str], consistent_read: bool = False
+    ) -> List[product.Product]:
         ...
+
+    @abstractmethod
+    def list_product_versions(
+        self,
+        product_id: str,
+        limit: int,
+        next_token: Optional[str] = None,
+        since: Optional[str] = None,
+        consistent_read: bool = False,
+    ) -> Tuple[List[product_version.ProductVersion], Optional[str]]:
+        """
+        Returns a page of the versions of a product, newest first.
+        When since is given as an ISO 8601 date, only versions created at or
+        after it are returned.
+        """
+
+    def invalidate_product(self, product_id: str) -> None:
+        """Drops any state cached for the product. Does nothing by default."""
@@ -1,7 +1,7 @@
 import typing
 from abc import ABC, abstractmethod
 
-from app.domain.model import product, product_version
+from app.domain.model import bulk_write, idempotency_record, product, product_version
 
 
 class ProductsRepository(ABC):
@@ -10,16 +10,36 @@ class ProductsRepository(ABC):
         ...
 
     @abstractmethod
-    def update_attributes(self, product_id: str, **kwargs) -> None:
-        ...
+    def update_attributes(
+        self,
+        product_id: str,
+        expected_version: typing.Optional[int] = None,
+        last_updated_before: typing.Optional[str] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Updates the given attributes and increments the product version.
+        When expected_version is given, the commit fails with
+        WriteConflictException unless the stored version is still the same.
+        When last_updated_before is given, it fails unless the stored
+        lastUpdateDate is earlier.
+        """
 
     @abstractmethod
-    def get(self, product_id: str) -> typing.Optional[product.Product]:
-        ...
+    def get(
+        self, product_id: str, consistent_read: bool = False
+    ) -> typing.Optional[product.Product]:
+        """
+        Gets a product. A consistent read reflects every write that completed
+        before it, while by default a recent write may be missing.
+        """
 
     @abstractmethod
-    def delete(self, product_id: str) -> None:
-        ...
+    def delete(self, product_id: str, must_exist: bool = False) -> None:
+        """
+        Deletes a product. With must_exist, the change fails when the product
+        does not exist, otherwise deleting a missing product succeeds.
+        """
 
 
 class ProductVersionsRepository(ABC):
@@ -31,19 +51,46 @@ class ProductVersionsRepository(ABC):
 
     @abstractmethod
     def get(
-        self, product_id: str, product_version_id: str
+        self, product_id: str, product_version_id: str, consistent_read: bool = False
     ) -> typing.Optional[product_version.ProductVersion]:
         ...
 
 
+class IdempotencyRecordsRepository(ABC):
+    @abstractmethod
+    def add(self, record: idempotency_record.IdempotencyRecord) -> None:
+        """
+        Adds the record. The commit fails with WriteConflictException if an
+        unexpired record with the same key exists.
+        """
+
+    @abstractmethod
+    def get(self, key: str) -> typing.Optional[idempotency_record.IdempotencyRecord]:
+        ...
+
+
 class UnitOfWork(ABC):
     products: ProductsRepository
     product_versions: ProductVersionsRepository
+    idempotency_records: IdempotencyRecordsRepository
 
     @abstractmethod
     def commit(self) -> None:
         ...
 
+    @abstractmethod
+    def commit_returning_product(self) -> typing.Optional[product.Product]:
+        """
+        Commits a single pending product change without a transaction.
+        Returns the product as stored after an update, otherwise None.
+        """
+
+    @abstractmethod
+    def commit_bulk(
+        self, mode: bulk_write.BulkWriteMode
+    ) -> typing.List[typing.Optional[str]]:
+        ...
+
     @abstractmethod
     def __enter__(self) -> typing.Any:
         ...
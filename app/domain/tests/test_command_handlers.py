@@ -1,19 +1,46 @@
+import json
+import time
 import unittest
 import uuid
 
 import assertpy
 
 from app.domain.command_handlers import (
+    apply_product_changes_command_handler,
+    apply_product_updates_command_handler,
+    bulk_products_command_handler,
     create_product_command_handler,
     delete_product_command_handler,
+    export_products_command_handler,
+    queue_product_update_command_handler,
     update_product_command_handler,
 )
 from app.domain.commands import (
+    apply_product_changes_command,
+    apply_product_updates_command,
+    bulk_products_command,
     create_product_command,
     delete_product_command,
+    export_products_command,
     update_product_command,
 )
-from app.domain.ports import unit_of_work
+from app.domain.exceptions.domain_exception import DomainException
+from app.domain.exceptions.idempotency_key_reused_exception import (
+    IdempotencyKeyReusedException,
+)
+from app.domain.exceptions.product_version_conflict_exception import (
+    ProductVersionConflictException,
+)
+from app.domain.exceptions.repository_exception import RepositoryException
+from app.domain.exceptions.write_conflict_exception import WriteConflictException
+from app.domain.model import bulk_write, idempotency_record, product, product_change
+from app.domain.ports import (
+    product_export,
+    product_projections,
+    product_update_queue,
+    products_query_service,
+    unit_of_work,
+)
 
 
 def test_create_product_should_store_in_repository():
@@ -43,6 +70,156 @@ def test_create_product_should_store_in_repository():
     assertpy.assert_that(product.description).is_equal_to("Test Description")
 
 
+def _mock_unit_of_work_with_idempotency_records(stored_records):
+    mock_unit_of_work = unittest.mock.create_autospec(
+        spec=unit_of_work.UnitOfWork, instance=True
+    )
+    mock_unit_of_work.products = unittest.mock.create_autospec(
+        spec=unit_of_work.ProductsRepository, instance=True
+    )
+    mock_unit_of_work.idempotency_records = unittest.mock.create_autospec(
+        spec=unit_of_work.IdempotencyRecordsRepository, instance=True
+    )
+    mock_unit_of_work.idempotency_records.get.side_effect = stored_records
+    return mock_unit_of_work
+
+
+def _create_idempotency_record(command, result):
+    return idempotency_record.IdempotencyRecord(
+        key="key-1",
+        commandHash=idempotency_record.hash_command(command),
+        result=result,
+        createDate="2022-10-10T10:10:10+00:00",
+        expiresAt=int(time.time()) + 60,
+    )
+
+
+def test_create_product_should_notify_query_service_of_write():
+    # Arrange
+    mock_unit_of_work = unittest.mock.create_autospec(
+        spec=unit_of_work.UnitOfWork, instance=True
+    )
+    mock_unit_of_work.products = unittest.mock.create_autospec(
+        spec=unit_of_work.ProductsRepository, instance=True
+    )
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+
+    # Act
+    id = create_product_command_handler.handle_create_product_command(
+        command=create_product_command.CreateProductCommand(name="Test Product"),
+        unit_of_work=mock_unit_of_work,
+        products_query_service=mock_query_service,
+    )
+
+    # Assert
+    mock_query_service.invalidate_product.assert_called_once_with(id)
+
+
+def test_create_product_with_idempotency_key_should_store_record_in_same_transaction():
+    # Arrange
+    mock_unit_of_work = _mock_unit_of_work_with_idempotency_records([None])
+    command = create_product_command.CreateProductCommand(name="Test Product")
+
+    # Act
+    id = create_product_command_handler.handle_create_product_command(
+        command=command, unit_of_work=mock_unit_of_work, idempotency_key="key-1"
+    )
+
+    # Assert
+    mock_unit_of_work.commit.assert_called_once()
+    record = mock_unit_of_work.idempotency_records.add.call_args.args[0]
+    assertpy.assert_that(record.key).is_equal_to("key-1")
+    assertpy.assert_that(record.commandHash).is_equal_to(
+        idempotency_record.hash_command(command)
+    )
+    assertpy.assert_that(json.loads(record.result)).is_equal_to(id)
+
+
+def test_create_product_with_used_idempotency_key_should_return_stored_result():
+    # Arrange
+    command = create_product_command.CreateProductCommand(name="Test Product")
+    mock_unit_of_work = _mock_unit_of_work_with_idempotency_records(
+        [_create_idempotency_record(command, json.dumps("product-1"))]
+    )
+
+    # Act
+    id = create_product_command_handler.handle_create_product_command(
+        command=command, unit_of_work=mock_unit_of_work, idempotency_key="key-1"
+    )
+
+    # Assert
+    assertpy.assert_that(id).is_equal_to("product-1")
+    mock_unit_of_work.products.add.assert_not_called()
+    mock_unit_of_work.commit.assert_not_called()
+
+
+def test_create_product_with_idempotency_key_of_another_command_should_raise():
+    # Arrange
+    other_command = create_product_command.CreateProductCommand(name="Other")
+    mock_unit_of_work = _mock_unit_of_work_with_idempotency_records(
+        [_create_idempotency_record(other_command, json.dumps("product-1"))]
+    )
+
+    # Act & Assert
+    assertpy.assert_that(
+        create_product_command_handler.handle_create_product_command
+    ).raises(IdempotencyKeyReusedException).when_called_with(
+        command=create_product_command.CreateProductCommand(name="Test Product"),
+        unit_of_work=mock_unit_of_work,
+        idempotency_key="key-1",
+    )
+    mock_unit_of_work.commit.assert_not_called()
+
+
+def test_create_product_losing_to_concurrent_retry_should_return_its_result():
+    # Arrange
+    command = create_product_command.CreateProductCommand(name="Test Product")
+    mock_unit_of_work = _mock_unit_of_work_with_idempotency_records(
+        [None, _create_idempotency_record(command, json.dumps("product-1"))]
+    )
+    mock_unit_of_work.commit.side_effect = WriteConflictException("Condition.")
+
+    # Act
+    id = create_product_command_handler.handle_create_product_command(
+        command=command, unit_of_work=mock_unit_of_work, idempotency_key="key-1"
+    )
+
+    # Assert
+    assertpy.assert_that(id).is_equal_to("product-1")
+
+
+def test_update_product_with_idempotency_key_should_update_in_transaction():
+    # Arrange
+    mock_unit_of_work = _mock_unit_of_work_with_product(stored_versions=[4])
+    mock_unit_of_work.idempotency_records = unittest.mock.create_autospec(
+        spec=unit_of_work.IdempotencyRecordsRepository, instance=True
+    )
+    mock_unit_of_work.idempotency_records.get.return_value = None
+    command = update_product_command.UpdateProductCommand(
+        id="product-1", name="New Name"
+    )
+
+    # Act
+    updated_product = update_product_command_handler.handle_update_product_command(
+        command=command,
+        unit_of_work=mock_unit_of_work,
+        record_version=False,
+        idempotency_key="key-1",
+    )
+
+    # Assert
+    mock_unit_of_work.commit.assert_called_once()
+    mock_unit_of_work.commit_returning_product.assert_not_called()
+    mock_unit_of_work.product_versions.add.assert_not_called()
+    record = mock_unit_of_work.idempotency_records.add.call_args.args[0]
+    assertpy.assert_that(product.Product.parse_raw(record.result)).is_equal_to(
+        updated_product
+    )
+    assertpy.assert_that(updated_product.version).is_equal_to(5)
+
+
 def test_update_product_should_only_update_specified_property():
     # Arrange
     mock_unit_of_work = unittest.mock.create_autospec(
@@ -60,18 +237,161 @@ def test_update_product_should_only_update_specified_property():
     )
 
     # Act
-    update_product_command_handler.handle_update_product_command(
-        command=command, unit_of_work=mock_unit_of_work
+    updated_product = update_product_command_handler.handle_update_product_command(
+        command=command, unit_of_work=mock_unit_of_work, record_version=False
     )
 
     # Assert
-    mock_unit_of_work.commit.assert_called_once()
+    mock_unit_of_work.commit_returning_product.assert_called_once()
+    assertpy.assert_that(updated_product).is_same_as(
+        mock_unit_of_work.commit_returning_product.return_value
+    )
     updated_attributes = mock_unit_of_work.products.update_attributes.call_args.kwargs
 
     assertpy.assert_that(updated_attributes["product_id"]).is_equal_to(product_id)
     assertpy.assert_that(updated_attributes["description"]).is_equal_to(new_description)
 
 
+def test_update_product_should_retry_write_rejected_by_concurrent_transaction():
+    # Arrange
+    mock_unit_of_work = unittest.mock.create_autospec(
+        spec=unit_of_work.UnitOfWork, instance=True
+    )
+    mock_unit_of_work.products = unittest.mock.create_autospec(
+        spec=unit_of_work.ProductsRepository, instance=True
+    )
+    mock_unit_of_work.commit_returning_product.side_effect = [
+        WriteConflictException("Conflict.", retryable=True),
+        None,
+    ]
+    command = update_product_command.UpdateProductCommand(
+        id="product-1", name="New Name", expectedVersion=3
+    )
+
+    # Act
+    update_product_command_handler.handle_update_product_command(
+        command=command, unit_of_work=mock_unit_of_work, record_version=False
+    )
+
+    # Assert
+    assertpy.assert_that(
+        mock_unit_of_work.commit_returning_product.call_count
+    ).is_equal_to(2)
+    assertpy.assert_that(
+        mock_unit_of_work.products.update_attributes.call_args.kwargs
+    ).contains_entry({"expected_version": 3}, {"name": "New Name"})
+
+
+def test_update_product_with_stale_version_should_raise_conflict():
+    # Arrange
+    mock_unit_of_work = unittest.mock.create_autospec(
+        spec=unit_of_work.UnitOfWork, instance=True
+    )
+    mock_unit_of_work.products = unittest.mock.create_autospec(
+        spec=unit_of_work.ProductsRepository, instance=True
+    )
+    mock_unit_of_work.commit_returning_product.side_effect = WriteConflictException(
+        "Condition."
+    )
+    command = update_product_command.UpdateProductCommand(
+        id="product-1", name="New Name", expectedVersion=3
+    )
+
+    # Act & Assert
+    assertpy.assert_that(
+        update_product_command_handler.handle_update_product_command
+    ).raises(ProductVersionConflictException).when_called_with(
+        command=command, unit_of_work=mock_unit_of_work, record_version=False
+    )
+    mock_unit_of_work.commit_returning_product.assert_called_once()
+
+
+def _mock_unit_of_work_with_product(stored_versions):
+    mock_unit_of_work = unittest.mock.create_autospec(
+        spec=unit_of_work.UnitOfWork, instance=True
+    )
+    mock_unit_of_work.products = unittest.mock.create_autospec(
+        spec=unit_of_work.ProductsRepository, instance=True
+    )
+    mock_unit_of_work.product_versions = unittest.mock.create_autospec(
+        spec=unit_of_work.ProductVersionsRepository, instance=True
+    )
+    mock_unit_of_work.products.get.side_effect = [
+        product.Product(
+            id="product-1",
+            name="Old Name",
+            createDate="2022-10-10T10:10:10+00:00",
+            lastUpdateDate="2022-10-10T10:10:10+00:00",
+            version=version,
+        )
+        for version in stored_versions
+    ]
+    return mock_unit_of_work
+
+
+def test_update_product_should_record_version_in_same_transaction():
+    # Arrange
+    mock_unit_of_work = _mock_unit_of_work_with_product(stored_versions=[4])
+    command = update_product_command.UpdateProductCommand(
+        id="product-1", name="New Name"
+    )
+
+    # Act
+    updated_product = update_product_command_handler.handle_update_product_command(
+        command=command, unit_of_work=mock_unit_of_work
+    )
+
+    # Assert
+    mock_unit_of_work.commit.assert_called_once()
+    assertpy.assert_that(
+        mock_unit_of_work.products.update_attributes.call_args.kwargs
+    ).contains_entry({"expected_version": 4}, {"name": "New Name"})
+    product_id, recorded_version = mock_unit_of_work.product_versions.add.call_args.args
+    assertpy.assert_that(product_id).is_equal_to("product-1")
+    assertpy.assert_that(recorded_version.name).is_equal_to("New Name")
+    assertpy.assert_that(recorded_version.version).is_equal_to("5")
+    assertpy.assert_that(updated_product.name).is_equal_to("New Name")
+    assertpy.assert_that(updated_product.version).is_equal_to(5)
+
+
+def test_update_product_should_read_again_when_product_changed_before_commit():
+    # Arrange
+    mock_unit_of_work = _mock_unit_of_work_with_product(stored_versions=[4, 5])
+    mock_unit_of_work.commit.side_effect = [
+        WriteConflictException("Condition."),
+        None,
+    ]
+    command = update_product_command.UpdateProductCommand(
+        id="product-1", name="New Name"
+    )
+
+    # Act
+    updated_product = update_product_command_handler.handle_update_product_command(
+        command=command, unit_of_work=mock_unit_of_work
+    )
+
+    # Assert
+    assertpy.assert_that(mock_unit_of_work.commit.call_count).is_equal_to(2)
+    assertpy.assert_that(updated_product.version).is_equal_to(6)
+
+
+def test_update_product_should_not_write_when_expected_version_is_stale():
+    # Arrange
+    mock_unit_of_work = _mock_unit_of_work_with_product(stored_versions=[4])
+    command = update_product_command.UpdateProductCommand(
+        id="product-1", name="New Name", expectedVersion=3
+    )
+
+    # Act & Assert
+    assertpy.assert_that(
+        update_product_command_handler.handle_update_product_command
+    ).raises(ProductVersionConflictException).when_called_with(
+        command=command, unit_of_work=mock_unit_of_work
+    )
+    mock_unit_of_work.commit.assert_not_called()
+    mock_unit_of_work.product_versions.add.assert_not_called()
+
+
 def test_delete_product_should_delete_from_repository():
     # Arrange
     mock_unit_of_work = unittest.mock.create_autospec(
@@ -96,3 +416,365 @@ def test_delete_product_should_delete_from_repository():
     ]
 
     assertpy.assert_that(deleted_product_id).is_equal_to(product_id)
+
+
+def test_bulk_products_should_commit_all_changes_and_report_results():
+    # Arrange
+    mock_unit_of_work = unittest.mock.create_autospec(
+        spec=unit_of_work.UnitOfWork, instance=True
+    )
+    mock_unit_of_work.products = unittest.mock.create_autospec(
+        spec=unit_of_work.ProductsRepository, instance=True
+    )
+    mock_unit_of_work.commit_bulk.return_value = [None, None, "Failed"]
+
+    command = bulk_products_command.BulkProductsCommand(
+        mode=bulk_write.BulkWriteMode.BEST_EFFORT,
+        creates=[create_product_command.CreateProductCommand(name="Test Product")],
+        updates=[
+            update_product_command.UpdateProductCommand(
+                id=str(uuid.uuid4()), description="New Description"
+            )
+        ],
+        deletes=[delete_product_command.DeleteProductCommand(id=str(uuid.uuid4()))],
+    )
+
+    # Act
+    results = bulk_products_command_handler.handle_bulk_products_command(
+        command=command, unit_of_work=mock_unit_of_work
+    )
+
+    # Assert
+    mock_unit_of_work.commit_bulk.assert_called_once_with(
+        bulk_write.BulkWriteMode.BEST_EFFORT
+    )
+    mock_unit_of_work.commit.assert_not_called()
+    created_product = mock_unit_of_work.products.add.call_args.args[0]
+
+    assertpy.assert_that([r.operation for r in results]).is_equal_to(
+        [
+            bulk_write.BulkWriteOperation.CREATE,
+            bulk_write.BulkWriteOperation.UPDATE,
+            bulk_write.BulkWriteOperation.DELETE,
+        ]
+    )
+    assertpy.assert_that(results[0].id).is_equal_to(created_product.id)
+    assertpy.assert_that([r.succeeded for r in results]).is_equal_to(
+        [True, True, False]
+    )
+
+
+def test_bulk_products_with_duplicate_ids_should_raise_before_writing():
+    # Arrange
+    mock_unit_of_work = unittest.mock.create_autospec(
+        spec=unit_of_work.UnitOfWork, instance=True
+    )
+    product_id = str(uuid.uuid4())
+    command = bulk_products_command.BulkProductsCommand(
+        updates=[
+            update_product_command.UpdateProductCommand(
+                id=product_id, description="New Description"
+            )
+        ],
+        deletes=[delete_product_command.DeleteProductCommand(id=product_id)],
+    )
+
+    # Act & Assert
+    assertpy.assert_that(
+        bulk_products_command_handler.handle_bulk_products_command
+    ).raises(DomainException).when_called_with(
+        command=command, unit_of_work=mock_unit_of_work
+    )
+    mock_unit_of_work.commit_bulk.assert_not_called()
+
+
+def test_bulk_products_with_updates_and_version_history_should_raise():
+    # Arrange
+    mock_unit_of_work = unittest.mock.create_autospec(
+        spec=unit_of_work.UnitOfWork, instance=True
+    )
+    command = bulk_products_command.BulkProductsCommand(
+        updates=[
+            update_product_command.UpdateProductCommand(
+                id=str(uuid.uuid4()), description="New Description"
+            )
+        ],
+    )
+
+    # Act & Assert
+    assertpy.assert_that(
+        bulk_products_command_handler.handle_bulk_products_command
+    ).raises(DomainException).when_called_with(
+        command=command, unit_of_work=mock_unit_of_work, record_version=True
+    )
+    mock_unit_of_work.commit_bulk.assert_not_called()
+
+
+def test_update_product_should_invalidate_cached_product():
+    # Arrange
+    mock_unit_of_work = unittest.mock.create_autospec(
+        spec=unit_of_work.UnitOfWork, instance=True
+    )
+    mock_unit_of_work.products = unittest.mock.create_autospec(
+        spec=unit_of_work.ProductsRepository, instance=True
+    )
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+
+    product_id = str(uuid.uuid4())
+    command = update_product_command.UpdateProductCommand(
+        id=product_id, name="New Name"
+    )
+
+    # Act
+    update_product_command_handler.handle_update_product_command(
+        command=command,
+        unit_of_work=mock_unit_of_work,
+        record_version=False,
+        products_query_service=mock_query_service,
+    )
+
+    # Assert
+    mock_query_service.invalidate_product.assert_called_once_with(product_id)
+
+
+def test_apply_product_changes_should_apply_latest_change_per_product():
+    # Arrange
+    mock_product_projections = unittest.mock.create_autospec(
+        spec=product_projections.ProductProjections, instance=True
+    )
+    command = apply_product_changes_command.ApplyProductChangesCommand(
+        changes=[
+            product_change.ProductChange(
+                id="id-1", changeType=product_change.ProductChangeType.INSERT
+            ),
+            product_change.ProductChange(
+                id="id-1", changeType=product_change.ProductChangeType.REMOVE
+            ),
+        ]
+    )
+
+    # Act
+    apply_product_changes_command_handler.handle_apply_product_changes_command(
+        command=command, product_projections=mock_product_projections
+    )
+
+    # Assert
+    applied_changes = mock_product_projections.apply_changes.call_args.args[0]
+    assertpy.assert_that(applied_changes).is_length(1)
+    assertpy.assert_that(applied_changes[0].changeType).is_equal_to(
+        product_change.ProductChangeType.REMOVE
+    )
+
+
+def test_export_products_should_write_chunks_of_command_size():
+    # Arrange
+    products = [
+        product.Product(
+            id=f"id-{i}",
+            name="test-name",
+            createDate="2022-10-10T10:10:10+00:00",
+            lastUpdateDate="2022-10-10T10:10:10+00:00",
+        )
+        for i in range(5)
+    ]
+    mock_source = unittest.mock.create_autospec(
+        spec=product_export.ProductsExportSource, instance=True
+    )
+    mock_source.read_products.return_value = iter([products[:3], products[3:]])
+    mock_sink = unittest.mock.create_autospec(
+        spec=product_export.ProductsExportSink, instance=True
+    )
+    mock_sink.write_chunk.side_effect = lambda index, chunk: f"chunk-{index}"
+
+    # Act
+    result = export_products_command_handler.handle_export_products_command(
+        command=export_products_command.ExportProductsCommand(chunkSize=2),
+        export_source=mock_source,
+        export_sink=mock_sink,
+    )
+
+    # Assert
+    assertpy.assert_that(
+        [len(c.args[1]) for c in mock_sink.write_chunk.call_args_list]
+    ).is_equal_to([2, 2, 1])
+    assertpy.assert_that(result.productCount).is_equal_to(5)
+    assertpy.assert_that(result.chunkLocations).is_equal_to(
+        ["chunk-0", "chunk-1", "chunk-2"]
+    )
+    mock_sink.complete.assert_called_once_with(result)
+
+
+def test_queue_product_update_should_send_update_to_queue():
+    # Arrange
+    mock_queue = unittest.mock.create_autospec(
+        spec=product_update_queue.ProductUpdateQueue, instance=True
+    )
+    command = update_product_command.UpdateProductCommand(
+        id="product-1", name="New Name"
+    )
+
+    # Act
+    product_id = (
+        queue_product_update_command_handler.handle_queue_product_update_command(
+            command=command, product_update_queue=mock_queue
+        )
+    )
+
+    # Assert
+    assertpy.assert_that(product_id).is_equal_to("product-1")
+    sent_command = mock_queue.send.call_args.args[0]
+    assertpy.assert_that(sent_command.copy(update={"queuedAt": None})).is_equal_to(
+        command
+    )
+    assertpy.assert_that(sent_command.queuedAt).is_not_none()
+
+
+def test_queue_product_update_with_expected_version_should_raise():
+    # Arrange
+    mock_queue = unittest.mock.create_autospec(
+        spec=product_update_queue.ProductUpdateQueue, instance=True
+    )
+
+    # Act & Assert
+    assertpy.assert_that(
+        queue_product_update_command_handler.handle_queue_product_update_command
+    ).raises(DomainException).when_called_with(
+        command=update_product_command.UpdateProductCommand(
+            id="product-1", name="New Name", expectedVersion=3
+        ),
+        product_update_queue=mock_queue,
+    )
+    mock_queue.send.assert_not_called()
+
+
+def test_apply_product_updates_should_merge_updates_per_product():
+    # Arrange
+    mock_unit_of_work = unittest.mock.create_autospec(
+        spec=unit_of_work.UnitOfWork, instance=True
+    )
+    mock_unit_of_work.products = unittest.mock.create_autospec(
+        spec=unit_of_work.ProductsRepository, instance=True
+    )
+    command = apply_product_updates_command.ApplyProductUpdatesCommand(
+        updates=[
+            update_product_command.UpdateProductCommand(
+                id="product-1", name="Name 1", description="Description 1"
+            ),
+            update_product_command.UpdateProductCommand(id="product-2", name="Name"),
+            update_product_command.UpdateProductCommand(id="product-1", name="Name 2"),
+            update_product_command.UpdateProductCommand(id="product-1", name="Name 3"),
+        ]
+    )
+
+    # Act
+    failed_ids = (
+        apply_product_updates_command_handler.handle_apply_product_updates_command(
+            command=command, unit_of_work=mock_unit_of_work, record_version=False
+        )
+    )
+
+    # Assert
+    assertpy.assert_that(failed_ids).is_empty()
+    assertpy.assert_that(
+        mock_unit_of_work.commit_returning_product.call_count
+    ).is_equal_to(2)
+    updates = {
+        call.kwargs["product_id"]: call.kwargs
+        for call in mock_unit_of_work.products.update_attributes.call_args_list
+    }
+    assertpy.assert_that(updates["product-1"]).contains_entry(
+        {"name": "Name 3"}, {"description": "Description 1"}, {"expected_version": None}
+    )
+    assertpy.assert_that(updates["product-2"]).contains_entry({"name": "Name"})
+
+
+def test_apply_product_updates_should_report_failed_updates_for_retry():
+    # Arrange
+    mock_unit_of_work = unittest.mock.create_autospec(
+        spec=unit_of_work.UnitOfWork, instance=True
+    )
+    mock_unit_of_work.products = unittest.mock.create_autospec(
+        spec=unit_of_work.ProductsRepository, instance=True
+    )
+    mock_unit_of_work.commit_returning_product.side_effect = [
+        WriteConflictException("Product does not exist."),
+        RepositoryException("Throttled."),
+    ]
+    command = apply_product_updates_command.ApplyProductUpdatesCommand(
+        updates=[
+            update_product_command.UpdateProductCommand(id="missing", name="Name"),
+            update_product_command.UpdateProductCommand(id="product-1", name="Name"),
+        ]
+    )
+
+    # Act
+    failed_ids = (
+        apply_product_updates_command_handler.handle_apply_product_updates_command(
+            command=command, unit_of_work=mock_unit_of_work, record_version=False
+        )
+    )
+
+    # Assert
+    assertpy.assert_that(failed_ids).is_equal_to(["product-1"])
+
+
+def test_apply_product_updates_should_not_apply_redelivered_stale_update():
+    # Arrange
+    mock_unit_of_work = unittest.mock.create_autospec(
+        spec=unit_of_work.UnitOfWork, instance=True
+    )
+    mock_unit_of_work.products = unittest.mock.create_autospec(
+        spec=unit_of_work.ProductsRepository, instance=True
+    )
+    mock_unit_of_work.products.get.return_value = product.Product(
+        id="product-1",
+        name="Newer Name",
+        createDate="2022-10-10T10:10:00+00:00",
+        lastUpdateDate="2022-10-10T10:10:02+00:00",
+    )
+    mock_unit_of_work.commit_returning_product.side_effect = [
+        WriteConflictException("The conditional request failed."),
+        None,
+    ]
+    command = apply_product_updates_command.ApplyProductUpdatesCommand(
+        updates=[
+            update_product_command.UpdateProductCommand(
+                id="product-1",
+                description="New Description",
+                queuedAt="2022-10-10T10:10:03+00:00",
+            ),
+            # Failed in an earlier batch, before the update queued at 10:10:02
+            # was applied, and received again.
+            update_product_command.UpdateProductCommand(
+                id="product-1",
+                name="Stale Name",
+                queuedAt="2022-10-10T10:10:01+00:00",
+            ),
+        ]
+    )
+
+    # Act
+    failed_ids = (
+        apply_product_updates_command_handler.handle_apply_product_updates_command(
+            command=command, unit_of_work=mock_unit_of_work, record_version=False
+        )
+    )
+
+    # Assert
+    assertpy.assert_that(failed_ids).is_empty()
+    first_update, second_update = [
+        call.kwargs
+        for call in mock_unit_of_work.products.update_attributes.call_args_list
+    ]
+    assertpy.assert_that(first_update).contains_entry(
+        {"name": "Stale Name"},
+        {"last_updated_before": "2022-10-10T10:10:01+00:00"},
+    )
+    assertpy.assert_that(second_update).does_not_contain_key("name")
+    assertpy.assert_that(second_update).contains_entry(
+        {"description": "New Description"},
+        {"lastUpdateDate": "2022-10-10T10:10:03+00:00"},
+        {"last_updated_before": "2022-10-10T10:10:03+00:00"},
+    )
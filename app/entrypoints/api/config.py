@@ -19,13 +19,112 @@ class AppConfig(BaseModel):
     def get_table_name() -> str:
         return os.environ.get("TABLE_NAME", "")
 
+    @staticmethod
+    def get_cursor_signing_key() -> str:
+        return os.environ.get("CURSOR_SIGNING_KEY", "")
+
+    @staticmethod
+    def get_cursor_signing_key_secret_arn() -> str:
+        return os.environ.get("CURSOR_SIGNING_KEY_SECRET_ARN", "")
+
+    @staticmethod
+    def get_products_cache_max_entries() -> int:
+        return int(os.environ.get("PRODUCTS_CACHE_MAX_ENTRIES", "1000"))
+
+    @staticmethod
+    def get_products_cache_max_bytes() -> int:
+        return int(os.environ.get("PRODUCTS_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+    @staticmethod
+    def get_products_cache_ttl_seconds() -> float:
+        return float(os.environ.get("PRODUCTS_CACHE_TTL_SECONDS", "30"))
+
+    @staticmethod
+    def get_products_cache_not_found_ttl_seconds() -> float:
+        return float(os.environ.get("PRODUCTS_CACHE_NOT_FOUND_TTL_SECONDS", "5"))
+
+    @staticmethod
+    def get_idempotency_cache_max_entries() -> int:
+        return int(os.environ.get("IDEMPOTENCY_CACHE_MAX_ENTRIES", "1000"))
+
+    @staticmethod
+    def get_idempotency_cache_ttl_seconds() -> float:
+        return float(os.environ.get("IDEMPOTENCY_CACHE_TTL_SECONDS", "300"))
+
+    @staticmethod
+    def get_metrics_namespace() -> str:
+        return os.environ.get("POWERTOOLS_METRICS_NAMESPACE", "SimpleCrudApp")
+
+    @staticmethod
+    def get_metrics_sample_rate() -> float:
+        return float(os.environ.get("METRICS_SAMPLE_RATE", "0.05"))
+
+    @staticmethod
+    def is_products_read_coalescing_enabled() -> bool:
+        return (
+            os.environ.get("PRODUCTS_READ_COALESCING_ENABLED", "true").lower() == "true"
+        )
+
+    @staticmethod
+    def get_read_your_writes_seconds() -> float:
+        return float(os.environ.get("READ_YOUR_WRITES_SECONDS", "2"))
+
+    @staticmethod
+    def get_products_change_feed_poll_seconds() -> float:
+        return float(os.environ.get("PRODUCTS_CHANGE_FEED_POLL_SECONDS", "0"))
+
+    @staticmethod
+    def get_dynamodb_max_pool_connections() -> int:
+        return int(os.environ.get("DYNAMODB_MAX_POOL_CONNECTIONS", "25"))
+
+    @staticmethod
+    def get_dynamodb_connect_timeout_seconds() -> float:
+        return float(os.environ.get("DYNAMODB_CONNECT_TIMEOUT_SECONDS", "1"))
+
+    @staticmethod
+    def get_dynamodb_read_timeout_seconds() -> float:
+        return float(os.environ.get("DYNAMODB_READ_TIMEOUT_SECONDS", "3"))
+
+    @staticmethod
+    def get_dynamodb_total_max_attempts() -> int:
+        return int(os.environ.get("DYNAMODB_TOTAL_MAX_ATTEMPTS", "5"))
+
+    @staticmethod
+    def get_dynamodb_retry_mode() -> str:
+        return os.environ.get("DYNAMODB_RETRY_MODE", "adaptive")
+
+    @staticmethod
+    def is_dynamodb_tcp_keepalive_enabled() -> bool:
+        return os.environ.get("DYNAMODB_TCP_KEEPALIVE", "true").lower() == "true"
+
+    @staticmethod
+    def is_product_version_history_enabled() -> bool:
+        return (
+            os.environ.get("PRODUCT_VERSION_HISTORY_ENABLED", "false").lower() == "true"
+        )
+
+    @staticmethod
+    def get_product_updates_queue_url() -> str:
+        return os.environ.get("PRODUCT_UPDATES_QUEUE_URL", "")
+
+    @staticmethod
+    def is_queued_product_updates_enabled() -> bool:
+        return os.environ.get(
+            "QUEUED_PRODUCT_UPDATES_ENABLED", "false"
+        ).lower() == "true" and bool(AppConfig.get_product_updates_queue_url())
+
+    @staticmethod
+    def is_listing_head_enabled() -> bool:
+        return os.environ.get("LISTING_HEAD_ENABLED", "false").lower() == "true"
+
 
 config = {
     "cors_config": {
         "allow_origin": "*",
         "expose_headers": [],
         "allow_headers": [
-            "Content-Type,X-Amz-Date,Authorization,X-Api-Key,x-amz-security-token"
+            "Content-Type,X-Amz-Date,Authorization,X-Api-Key,x-amz-security-token,"
+            "Idempotency-Key,Consistent-Read"
         ],
         "max_age": 100,
         "allow_credentials": True,
@@ -0,0 +1,304 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.domain.ports.async_products_query_service import AsyncProductsQueryService
+from app.domain.ports.product_update_queue import ProductUpdateQueue
+from app.domain.ports.products_query_service import ProductsQueryService
+from app.domain.ports.unit_of_work import UnitOfWork
+from app.entrypoints.api import config
+
+T = TypeVar("T")
+
+
+class Dependencies:
+    """
+    Lazy composition root of the API.
+    The DynamoDB client and the adapters are imported and created on first use,
+    then reused by later invocations in the same execution environment.
+    The time spent creating each of them is recorded for cold start analysis.
+    The asynchronous query service shares the client and the query service
+    cache with the synchronous one, and run_async drives it on an event loop
+    that is kept for the lifetime of the execution environment.
+    """
+
+    def __init__(self):
+        self._instances: Dict[str, Any] = {}
+        self._timings_ms: Dict[str, float] = {}
+        self._reported_timings: set = set()
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def dynamodb_client(self) -> Any:
+        return self._get_or_create(
+            "dynamodb_client", self._create_dynamodb_client, "metrics_recorder"
+        )
+
+    @property
+    def unit_of_work(self) -> UnitOfWork:
+        return self._get_or_create(
+            "unit_of_work", self._create_unit_of_work, "dynamodb_client"
+        )
+
+    @unit_of_work.setter
+    def unit_of_work(self, value: UnitOfWork) -> None:
+        self._instances["unit_of_work"] = value
+
+    @property
+    def products_query_service(self) -> ProductsQueryService:
+        return self._get_or_create(
+            "products_query_service",
+            self._create_products_query_service,
+            "dynamodb_client",
+            "products_read_coalescer",
+            "cursor_signing_key",
+        )
+
+    @products_query_service.setter
+    def products_query_service(self, value: ProductsQueryService) -> None:
+        self._instances["products_query_service"] = value
+        self._instances.pop("async_products_query_service", None)
+
+    @property
+    def cursor_signing_key(self) -> str:
+        return self._get_or_create(
+            "cursor_signing_key", self._create_cursor_signing_key
+        )
+
+    @property
+    def products_read_coalescer(self) -> Any:
+        return self._get_or_create(
+            "products_read_coalescer", self._create_products_read_coalescer
+        )
+
+    @property
+    def product_update_queue(self) -> ProductUpdateQueue:
+        return self._get_or_create(
+            "product_update_queue", self._create_product_update_queue
+        )
+
+    @product_update_queue.setter
+    def product_update_queue(self, value: ProductUpdateQueue) -> None:
+        self._instances["product_update_queue"] = value
+
+    @property
+    def metrics_recorder(self) -> Any:
+        return self._get_or_create("metrics_recorder", self._create_metrics_recorder)
+
+    @metrics_recorder.setter
+    def metrics_recorder(self, value: Any) -> None:
+        self._instances["metrics_recorder"] = value
+
+    @property
+    def async_dynamodb_client(self) -> Any:
+        return self._get_or_create(
+            "async_dynamodb_client", self._create_async_dynamodb_client
+        )
+
+    @property
+    def async_products_query_service(self) -> AsyncProductsQueryService:
+        return self._get_or_create(
+            "async_products_query_service",
+            self._create_async_products_query_service,
+            "products_query_service",
+            "async_dynamodb_client",
+        )
+
+    @async_products_query_service.setter
+    def async_products_query_service(self, value: AsyncProductsQueryService) -> None:
+        self._instances["async_products_query_service"] = value
+
+    def run_async(self, awaitable: Awaitable[T]) -> T:
+        """
+        Runs a coroutine to completion on the event loop of the execution
+        environment, so routes can await independent reads together.
+        """
+        if self._event_loop is None or self._event_loop.is_closed():
+            self._event_loop = asyncio.new_event_loop()
+        return self._event_loop.run_until_complete(awaitable)
+
+    def pop_new_timings(self) -> Dict[str, float]:
+        """Returns creation timings in milliseconds not returned before."""
+        new_timings = {
+            name: duration
+            for name, duration in self._timings_ms.items()
+            if name not in self._reported_timings
+        }
+        self._reported_timings.update(new_timings)
+        return new_timings
+
+    def pop_read_coalescing_stats(self) -> Dict[str, int]:
+        """
+        Returns the number of product lookups and of lookups that joined a read
+        already in flight, since the last call. Empty before the first read.
+        """
+        coalescer = self._instances.get("products_read_coalescer")
+        return coalescer.pop_stats() if coalescer is not None else {}
+
+    def _get_or_create(
+        self, name: str, factory: Callable[..., Any], *dependencies: str
+    ) -> Any:
+        """Creates the instance on first use, after the dependencies it is built from."""
+        instance = self._instances.get(name)
+        if instance is None:
+            arguments = [getattr(self, dependency) for dependency in dependencies]
+            started = time.perf_counter()
+            instance = factory(*arguments)
+            self._timings_ms[name] = round((time.perf_counter() - started) * 1000, 2)
+            self._instances[name] = instance
+        return instance
+
+    @staticmethod
+    def _create_product_update_queue() -> ProductUpdateQueue:
+        import boto3
+
+        from app.adapters import sqs_product_update_queue
+
+        return sqs_product_update_queue.SQSProductUpdateQueue(
+            config.AppConfig.get_product_updates_queue_url(),
+            boto3.session.Session().client(
+                "sqs", region_name=config.AppConfig.get_default_region()
+            ),
+        )
+
+    @staticmethod
+    def _create_metrics_recorder() -> Any:
+        from app.adapters.internal import emf_metrics
+
+        return emf_metrics.MetricsRecorder(
+            namespace=config.AppConfig.get_metrics_namespace(),
+            sample_rate=config.AppConfig.get_metrics_sample_rate(),
+        )
+
+    @staticmethod
+    def _create_dynamodb_client(metrics_recorder: Any) -> Any:
+        from app.adapters import dynamodb_client_factory
+        from app.adapters.internal import dynamodb_instrumentation
+
+        dynamodb_client = dynamodb_client_factory.create_dynamodb_client(
+            region_name=config.AppConfig.get_default_region(),
+            max_pool_connections=config.AppConfig.get_dynamodb_max_pool_connections(),
+            connect_timeout_seconds=(
+                config.AppConfig.get_dynamodb_connect_timeout_seconds()
+            ),
+            read_timeout_seconds=config.AppConfig.get_dynamodb_read_timeout_seconds(),
+            total_max_attempts=config.AppConfig.get_dynamodb_total_max_attempts(),
+            retry_mode=config.AppConfig.get_dynamodb_retry_mode(),
+            tcp_keepalive=config.AppConfig.is_dynamodb_tcp_keepalive_enabled(),
+        )
+        if metrics_recorder.enabled:
+            dynamodb_instrumentation.instrument_dynamodb_client(
+                dynamodb_client, metrics_recorder
+            )
+        return dynamodb_client
+
+    @staticmethod
+    def _create_unit_of_work(dynamodb_client: Any) -> UnitOfWork:
+        from app.adapters import dynamodb_unit_of_work
+
+        return dynamodb_unit_of_work.DynamoDBUnitOfWork(
+            config.AppConfig.get_table_name(),
+            dynamodb_client,
+            idempotency_cache_max_entries=(
+                config.AppConfig.get_idempotency_cache_max_entries()
+            ),
+            idempotency_cache_ttl_seconds=(
+                config.AppConfig.get_idempotency_cache_ttl_seconds()
+            ),
+        )
+
+    @staticmethod
+    def _create_async_dynamodb_client() -> Any:
+        from app.adapters.internal import async_dynamodb_base
+
+        return async_dynamodb_base.AsyncDynamoDBClient(
+            max_concurrent_calls=config.AppConfig.get_dynamodb_max_pool_connections(),
+        )
+
+    @staticmethod
+    def _create_async_products_query_service(
+        products_query_service: ProductsQueryService, async_dynamodb_client: Any
+    ) -> AsyncProductsQueryService:
+        from app.adapters import async_dynamodb_query_service
+
+        return async_dynamodb_query_service.AsyncDynamoDBProductsQueryService(
+            products_query_service, async_dynamodb_client
+        )
+
+    @staticmethod
+    def _create_cursor_signing_key() -> str:
+        """
+        Reads the pagination token signing key from its secret when deployed,
+        or from CURSOR_SIGNING_KEY otherwise. An empty key is rejected by the
+        query service, so tokens are never signed with a guessable key.
+        """
+        secret_arn = config.AppConfig.get_cursor_signing_key_secret_arn()
+        if not secret_arn:
+            return config.AppConfig.get_cursor_signing_key()
+
+        import boto3
+
+        secrets_client = boto3.session.Session().client(
+            "secretsmanager", region_name=config.AppConfig.get_default_region()
+        )
+        return secrets_client.get_secret_value(SecretId=secret_arn)["SecretString"]
+
+    @staticmethod
+    def _create_products_read_coalescer() -> Any:
+        from app.adapters.internal import single_flight
+
+        return single_flight.SingleFlight()
+
+    @staticmethod
+    def _create_products_query_service(
+        dynamodb_client: Any, products_read_coalescer: Any, cursor_signing_key: str
+    ) -> ProductsQueryService:
+        from app.adapters import (
+            cached_query_service,
+            coalescing_query_service,
+            dynamodb_product_projections,
+            dynamodb_query_service,
+            read_your_writes_query_service,
+        )
+
+        query_service: ProductsQueryService = (
+            dynamodb_query_service.DynamoDBProductsQueryService(
+                config.AppConfig.get_table_name(),
+                dynamodb_client,
+                cursor_signing_key=cursor_signing_key,
+                use_listing_head=config.AppConfig.is_listing_head_enabled(),
+            )
+        )
+        if config.AppConfig.is_products_read_coalescing_enabled():
+            query_service = coalescing_query_service.CoalescingProductsQueryService(
+                query_service, products_read_coalescer
+            )
+        # Without the change feed, writes made through other execution
+        # environments would be served stale for the whole cache TTL.
+        if (
+            config.AppConfig.get_products_cache_max_entries() > 0
+            and config.AppConfig.get_products_change_feed_poll_seconds() > 0
+        ):
+            change_feed = dynamodb_product_projections.DynamoDBProductChangeFeed(
+                config.AppConfig.get_table_name(), dynamodb_client
+            )
+            query_service = cached_query_service.CachedProductsQueryService(
+                query_service,
+                max_entries=config.AppConfig.get_products_cache_max_entries(),
+                max_bytes=config.AppConfig.get_products_cache_max_bytes(),
+                ttl_seconds=config.AppConfig.get_products_cache_ttl_seconds(),
+                not_found_ttl_seconds=(
+                    config.AppConfig.get_products_cache_not_found_ttl_seconds()
+                ),
+                change_feed=change_feed,
+                change_feed_poll_interval_seconds=(
+                    config.AppConfig.get_products_change_feed_poll_seconds()
+                ),
+            )
+        if config.AppConfig.get_read_your_writes_seconds() > 0:
+            query_service = (
+                read_your_writes_query_service.ReadYourWritesProductsQueryService(
+                    query_service, config.AppConfig.get_read_your_writes_seconds()
+                )
+            )
+        return query_service
@@ -1,23 +1,30 @@
-import boto3
+import asyncio
+import json
+import time
+from http import HTTPStatus
+from typing import Any, List, Optional, Union
+
 from aws_lambda_powertools import logging, tracing
 from aws_lambda_powertools.event_handler import api_gateway
 from aws_lambda_powertools.utilities import data_classes, typing
 
-from app.adapters import dynamodb_query_service, dynamodb_unit_of_work
 from app.domain.command_handlers import (
+    bulk_products_command_handler,
     create_product_command_handler,
     delete_product_command_handler,
+    queue_product_update_command_handler,
     update_product_command_handler,
 )
 from app.domain.commands import (
+    bulk_products_command,
     create_product_command,
     delete_product_command,
     update_product_command,
 )
 from app.domain.exceptions.domain_exception import DomainException
-from app.entrypoints.api import config
+from app.entrypoints.api import config, dependencies
 from app.entrypoints.api.middleware import exception_handler, utils
-from app.entrypoints.api.model import api_model
+from app.entrypoints.api.model import api_model, serializers
 
 app_config = config.AppConfig(**config.config)
 cors_config = api_gateway.CORSConfig(**app_config.cors_config)
@@ -27,56 +34,137 @@ app = api_gateway.ApiGatewayResolver(
     strip_prefixes=[config.AppConfig.get_api_base_path()],
 )
 
+DEFAULT_VERSIONS_PAGE_SIZE = 20
+MAX_VERSIONS_PAGE_SIZE = 100
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+CONSISTENT_READ_HEADER = "Consistent-Read"
+
 logger = logging.Logger()
 tracer = tracing.Tracer()
 
-dynamodb_client = boto3.resource(
-    "dynamodb", region_name=config.AppConfig.get_default_region()
-)
-unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
-    config.AppConfig.get_table_name(), dynamodb_client.meta.client
-)
-products_query_service = dynamodb_query_service.DynamoDBProductsQueryService(
-    config.AppConfig.get_table_name(), dynamodb_client.meta.client
-)
+# Adapters and the boto3 client are created lazily on first use, so the
+# init phase only loads what every invocation needs.
+app_dependencies = dependencies.Dependencies()
+init_cpu_ms = round(time.process_time() * 1000, 2)
 
 
 @tracer.capture_method
 @app.get("/products/<id>")
 def get_product(id: str) -> api_model.GetProductResponse:
-    """Returns a single product."""
+    """Returns a single product, optionally with only the fields listed in fields."""
 
-    product = products_query_service.get_product_by_id(product_id=id)
+    fields = serializers.parse_product_fields(
+        app.current_event.get_query_string_value("fields")
+    )
+    product = app_dependencies.products_query_service.get_product_by_id(
+        product_id=id, fields=fields, consistent_read=_is_consistent_read_requested()
+    )
 
     if not product:
         raise DomainException(f"Could not locate product with id: {id}.")
 
-    response = api_model.GetProductResponse.parse_obj(product)
-    return response.dict()
+    return serializers.get_product_response(product, fields)
 
 
 @tracer.capture_method
 @app.get("/products")
 def list_products() -> api_model.ListProductsResponse:
-    """Returns a list of products with paging support."""
+    """
+    Returns a list of products with paging support,
+    optionally with only the fields listed in fields.
+    """
 
     page_size_str = app.current_event.get_query_string_value("pageSize")
     next_token = app.current_event.get_query_string_value("nextToken")
+    fields = serializers.parse_product_fields(
+        app.current_event.get_query_string_value("fields")
+    )
 
     if not page_size_str or not page_size_str.isnumeric():
         raise DomainException(
             "pageSize should be provided in query string as a number."
         )
 
-    products, last_evaluated_key = products_query_service.list_products(
+    products, new_next_token = app_dependencies.products_query_service.list_products(
         page_size=int(page_size_str),
         next_token=next_token,
+        fields=fields,
     )
-    products_parsed = [api_model.Product.parse_obj(p.dict()) for p in products]
-    response = api_model.ListProductsResponse(
-        products=products_parsed, nextToken=last_evaluated_key
+    return serializers.list_products_response(products, new_next_token, fields)
+
+
+@tracer.capture_method
+@app.get("/products/<id>/versions")
+def list_product_versions(id: str) -> api_model.ListProductVersionsResponse:
+    """Returns the version history of a product, newest first, with paging support."""
+
+    (
+        versions,
+        next_token,
+    ) = app_dependencies.products_query_service.list_product_versions(
+        product_id=id,
+        limit=_get_versions_limit(),
+        next_token=app.current_event.get_query_string_value("nextToken"),
+        since=app.current_event.get_query_string_value("since"),
+        consistent_read=_is_consistent_read_requested(),
+    )
+    return serializers.list_product_versions_response(versions, next_token)
+
+
+@tracer.capture_method
+@app.get("/products/<id>/history")
+def get_product_history(id: str) -> api_model.GetProductHistoryResponse:
+    """
+    Returns a product with the first page of its versions, newest first.
+    Both are read concurrently, so the route waits for one round trip.
+    """
+
+    product, (versions, next_token) = app_dependencies.run_async(
+        _get_product_and_versions(
+            product_id=id,
+            limit=_get_versions_limit(),
+            consistent_read=_is_consistent_read_requested(),
+        )
+    )
+
+    if not product:
+        raise DomainException(f"Could not locate product with id: {id}.")
+
+    return serializers.product_history_response(product, versions, next_token)
+
+
+async def _get_product_and_versions(
+    product_id: str, limit: int, consistent_read: bool
+) -> List[Any]:
+    query_service = app_dependencies.async_products_query_service
+    return await asyncio.gather(
+        query_service.get_product_by_id(
+            product_id=product_id, consistent_read=consistent_read
+        ),
+        query_service.list_product_versions(
+            product_id=product_id, limit=limit, consistent_read=consistent_read
+        ),
+    )
+
+
+@tracer.capture_method
+@app.post("/products:batchGet")
+@utils.parse_event(model=api_model.BatchGetProductsRequest, app_context=app)
+def batch_get_products(
+    request: api_model.BatchGetProductsRequest,
+) -> api_model.BatchGetProductsResponse:
+    """Returns multiple products by their IDs."""
+
+    products = app_dependencies.products_query_service.get_products_by_ids(
+        product_ids=request.ids, consistent_read=_is_consistent_read_requested()
+    )
+
+    found_ids = {p.id for p in products}
+    return serializers.batch_get_products_response(
+        products,
+        [id for id in dict.fromkeys(request.ids) if id not in found_ids],
     )
-    return response.dict()
 
 
 @tracer.capture_method
@@ -92,30 +180,101 @@ def create_product(
             name=request.name,
             description=request.description,
         ),
-        unit_of_work=unit_of_work,
+        unit_of_work=app_dependencies.unit_of_work,
+        idempotency_key=_get_idempotency_key(),
+        products_query_service=app_dependencies.products_query_service,
     )
     response = api_model.CreateProductResponse(id=id)
     return response.dict()
 
 
+@tracer.capture_method
+@app.post("/products:bulk")
+@utils.parse_event(model=api_model.BulkProductsRequest, app_context=app)
+def bulk_products(
+    request: api_model.BulkProductsRequest,
+) -> api_model.BulkProductsResponse:
+    """Creates, updates and deletes products in bulk."""
+
+    results = bulk_products_command_handler.handle_bulk_products_command(
+        command=bulk_products_command.BulkProductsCommand(
+            mode=request.mode,
+            creates=[
+                create_product_command.CreateProductCommand(
+                    name=create.name, description=create.description
+                )
+                for create in request.creates
+            ],
+            updates=[
+                update_product_command.UpdateProductCommand(
+                    id=update.id,
+                    name=update.name,
+                    description=update.description,
+                    expectedVersion=update.expectedVersion,
+                )
+                for update in request.updates
+            ],
+            deletes=[
+                delete_product_command.DeleteProductCommand(id=id)
+                for id in request.deletes
+            ],
+        ),
+        unit_of_work=app_dependencies.unit_of_work,
+        products_query_service=app_dependencies.products_query_service,
+        idempotency_key=_get_idempotency_key(),
+        record_version=config.AppConfig.is_product_version_history_enabled(),
+    )
+    return serializers.bulk_products_response(results)
+
+
 @tracer.capture_method
 @app.put("/products/<id>")
 @utils.parse_event(model=api_model.UpdateProductRequest, app_context=app)
 def update_product(
     request: api_model.UpdateProductRequest, id: str
-) -> api_model.UpdateProductResponse:
-    """Updates a product."""
+) -> Union[api_model.UpdateProductResponse, api_gateway.Response]:
+    """
+    Updates a product and returns it as stored after the update. With queued
+    updates enabled, updates without an expected version or idempotency key
+    are queued to be merged with other updates of the product, and the
+    response is 202 Accepted.
+    """
 
-    updated_product_id = update_product_command_handler.handle_update_product_command(
-        command=update_product_command.UpdateProductCommand(
-            id=id,
-            name=request.name,
-            description=request.description,
-        ),
-        unit_of_work=unit_of_work,
+    command = update_product_command.UpdateProductCommand(
+        id=id,
+        name=request.name,
+        description=request.description,
+        expectedVersion=request.expectedVersion,
     )
-    response = api_model.UpdateProductResponse(id=updated_product_id)
-    return response.dict()
+    idempotency_key = _get_idempotency_key()
+
+    if (
+        config.AppConfig.is_queued_product_updates_enabled()
+        and command.expectedVersion is None
+        and idempotency_key is None
+    ):
+        queued_product_id = (
+            queue_product_update_command_handler.handle_queue_product_update_command(
+                command=command,
+                product_update_queue=app_dependencies.product_update_queue,
+            )
+        )
+        return api_gateway.Response(
+            status_code=HTTPStatus.ACCEPTED,
+            content_type="application/json",
+            body=json.dumps(
+                api_model.QueuedUpdateProductResponse(id=queued_product_id).dict()
+            ),
+        )
+
+    updated_product = update_product_command_handler.handle_update_product_command(
+        command=command,
+        unit_of_work=app_dependencies.unit_of_work,
+        products_query_service=app_dependencies.products_query_service,
+        record_version=config.AppConfig.is_product_version_history_enabled(),
+        idempotency_key=idempotency_key,
+    )
+    return serializers.update_product_response(updated_product)
 
 
 @tracer.capture_method
@@ -129,22 +288,149 @@ def delete_product(
         command=delete_product_command.DeleteProductCommand(
             id=id,
         ),
-        unit_of_work=unit_of_work,
+        unit_of_work=app_dependencies.unit_of_work,
+        products_query_service=app_dependencies.products_query_service,
+        idempotency_key=_get_idempotency_key(),
     )
     response = api_model.DeleteProductResponse(id=deleted_product_id)
     return response.dict()
 
 
+def _get_idempotency_key() -> Optional[str]:
+    """
+    Returns the Idempotency-Key header of a write request. Retries sent with
+    the same key get the response of the first request instead of writing again.
+    """
+    idempotency_key = _get_header(IDEMPOTENCY_KEY_HEADER)
+    if idempotency_key is None:
+        return None
+    if (
+        not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH
+        or not idempotency_key.isprintable()
+    ):
+        raise DomainException(
+            f"{IDEMPOTENCY_KEY_HEADER} should be 1 to "
+            f"{MAX_IDEMPOTENCY_KEY_LENGTH} printable characters."
+        )
+    return idempotency_key
+
+
+def _get_versions_limit() -> int:
+    """Returns the limit query parameter of a versions page, 20 by default."""
+    limit_str = app.current_event.get_query_string_value("limit") or str(
+        DEFAULT_VERSIONS_PAGE_SIZE
+    )
+    if not limit_str.isnumeric() or not 1 <= int(limit_str) <= MAX_VERSIONS_PAGE_SIZE:
+        raise DomainException(
+            f"limit should be a number from 1 to {MAX_VERSIONS_PAGE_SIZE}."
+        )
+    return int(limit_str)
+
+
+def _is_consistent_read_requested() -> bool:
+    """
+    Returns whether a read request asked for a strongly consistent read with
+    the Consistent-Read header. Reads are eventually consistent otherwise.
+    """
+    return (_get_header(CONSISTENT_READ_HEADER) or "").lower() == "true"
+
+
+def _get_header(header_name: str) -> Optional[str]:
+    headers = app.current_event.get("headers") or {}
+    return next(
+        (
+            value
+            for name, value in headers.items()
+            if name.lower() == header_name.lower()
+        ),
+        None,
+    )
+
+
 @tracer.capture_lambda_handler
 @logger.inject_lambda_context(log_event=True)
 @data_classes.event_source(
     data_class=data_classes.api_gateway_proxy_event.APIGatewayProxyEvent
 )
+def handler(
+    event: data_classes.api_gateway_proxy_event.APIGatewayProxyEvent,
+    context: typing.LambdaContext,
+):
+    metrics = app_dependencies.metrics_recorder
+    sampled = metrics.start_invocation()
+    started = time.perf_counter()
+    response = None
+    try:
+        response = _resolve(event, context)
+        return response
+    finally:
+        _log_dependency_timings()
+        if sampled:
+            _record_route_metrics(event, response, started)
+            _record_read_coalescing_metrics()
+        metrics.flush()
+
+
 @exception_handler.handle_exceptions(
     user_exceptions=[Exception], cors_config=cors_config
 )
-def handler(
+def _resolve(
     event: data_classes.api_gateway_proxy_event.APIGatewayProxyEvent,
     context: typing.LambdaContext,
 ):
+    """
+    Resolves the route, with exceptions mapped to error responses inside,
+    so route metrics are recorded from the response returned to the client.
+    """
     return app.resolve(event, context)
+
+
+def _log_dependency_timings() -> None:
+    """Logs the time spent creating dependencies first used by this invocation."""
+    global init_cpu_ms
+
+    timings = app_dependencies.pop_new_timings()
+    if init_cpu_ms is not None:
+        timings["init_cpu"] = init_cpu_ms
+        init_cpu_ms = None
+    if timings:
+        logger.info("Dependency initialization timings.", extra={"timings_ms": timings})
+
+
+def _record_route_metrics(
+    event: data_classes.api_gateway_proxy_event.APIGatewayProxyEvent,
+    response: Optional[dict],
+    started: float,
+) -> None:
+    """
+    Records the latency and response size of the route, by its resource path,
+    and counts responses with an error status.
+    """
+    metrics = app_dependencies.metrics_recorder
+    dimensions = {
+        "Route": f'{event.get("httpMethod")} {event.get("resource") or "unknown"}'
+    }
+    metrics.add(
+        "Latency",
+        round((time.perf_counter() - started) * 1000, 3),
+        "Milliseconds",
+        dimensions,
+    )
+    if response is not None:
+        metrics.add(
+            "ResponseBytes", len(response.get("body") or ""), "Bytes", dimensions
+        )
+        if response.get("statusCode", 200) >= 400:
+            metrics.add("Errors", 1, "Count", dimensions)
+
+
+def _record_read_coalescing_metrics() -> None:
+    """
+    Records how many product lookups joined a read already in flight.
+    The counts accumulate between sampled invocations, so none are lost.
+    """
+    stats = app_dependencies.pop_read_coalescing_stats()
+    if stats.get("lookups"):
+        metrics = app_dependencies.metrics_recorder
+        metrics.add("ProductLookups", stats["lookups"], "Count", scale=False)
+        metrics.add("CoalescedProductLookups", stats["coalesced"], "Count", scale=False)
@@ -1,7 +1,9 @@
-from typing import Any, Dict, List, Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+from app.domain.model import bulk_write
+
 
 class GetProductResponse(BaseModel):
     id: str = Field(..., title="Id")
@@ -9,6 +11,7 @@ class GetProductResponse(BaseModel):
     description: Optional[str] = Field(title="Description")
     createDate: str = Field(..., title="CreateDate")
     lastUpdateDate: str = Field(..., title="LastUpdateDate")
+    version: int = Field(0, title="Version")
 
 
 class CreateProductRequest(BaseModel):
@@ -23,10 +26,7 @@ class CreateProductResponse(BaseModel):
 class UpdateProductRequest(BaseModel):
     name: Optional[str] = Field(title="Name")
     description: Optional[str] = Field(title="Description")
-
-
-class UpdateProductResponse(BaseModel):
-    id: str = Field(..., title="Id")
+    expectedVersion: Optional[int] = Field(title="Version the update is based on")
 
 
 class DeleteProductResponse(BaseModel):
@@ -39,8 +39,72 @@ class Product(BaseModel):
     description: Optional[str] = Field(title="Description")
     createDate: str = Field(..., title="CreateDate")
     lastUpdateDate: str = Field(..., title="LastUpdateDate")
+    version: int = Field(0, title="Version")
+
+
+class ProductVersion(BaseModel):
+    id: str = Field(..., title="Id")
+    name: Optional[str] = Field(title="Name")
+    version: str = Field(..., title="Version")
+    createDate: str = Field(..., title="CreateDate")
+
+
+class ListProductVersionsResponse(BaseModel):
+    nextToken: Optional[str] = Field(title="Opaque pagination token")
+    versions: List[ProductVersion] = Field(..., title="Versions, newest first")
+
+
+class GetProductHistoryResponse(BaseModel):
+    product: Product = Field(..., title="Product")
+    nextToken: Optional[str] = Field(title="Opaque pagination token of the versions")
+    versions: List[ProductVersion] = Field(..., title="Versions, newest first")
+
+
+class UpdateProductResponse(BaseModel):
+    id: str = Field(..., title="Id")
+    product: Product = Field(..., title="Product as stored after the update")
+
+
+class QueuedUpdateProductResponse(BaseModel):
+    id: str = Field(..., title="Id")
 
 
 class ListProductsResponse(BaseModel):
-    nextToken: Optional[Dict[str, Any]] = Field(title="LastEvaluatedKey token")
+    nextToken: Optional[str] = Field(title="Opaque pagination token")
+    products: List[Product] = Field(..., title="Products")
+
+
+class BatchGetProductsRequest(BaseModel):
+    ids: List[str] = Field(..., title="Ids", min_items=1, max_items=1000)
+
+
+class BatchGetProductsResponse(BaseModel):
     products: List[Product] = Field(..., title="Products")
+    notFoundIds: List[str] = Field(..., title="Ids of products that do not exist")
+
+
+class BulkUpdateProductRequest(BaseModel):
+    id: str = Field(..., title="Id")
+    name: Optional[str] = Field(title="Name")
+    description: Optional[str] = Field(title="Description")
+    expectedVersion: Optional[int] = Field(title="Version the update is based on")
+
+
+class BulkProductsRequest(BaseModel):
+    mode: bulk_write.BulkWriteMode = Field(
+        bulk_write.BulkWriteMode.TRANSACTIONAL, title="Mode"
+    )
+    creates: List[CreateProductRequest] = Field([], title="Creates", max_items=1000)
+    updates: List[BulkUpdateProductRequest] = Field([], title="Updates", max_items=1000)
+    deletes: List[str] = Field([], title="Ids to delete", max_items=1000)
+
+
+class BulkProductResult(BaseModel):
+    operation: str = Field(..., title="Operation")
+    id: str = Field(..., title="Id")
+    succeeded: bool = Field(..., title="Succeeded")
+    error: Optional[str] = Field(title="Error")
+
+
+class BulkProductsResponse(BaseModel):
+    results: List[BulkProductResult] = Field(..., title="Results")
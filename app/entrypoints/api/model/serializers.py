@@ -0,0 +1,140 @@
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from app.domain.exceptions.domain_exception import DomainException
+from app.domain.model import bulk_write, product, product_version
+from app.entrypoints.api.model import api_model
+
+
+def compile_serializer(
+    source_model: Type[BaseModel], payload_model: Type[BaseModel]
+) -> Callable[[BaseModel], Dict[str, Any]]:
+    """
+    Compiles a conversion from trusted source model instances to payloads
+    with the fields of the API model, without validating or copying them again.
+    Only flat API models are supported, and the source model must declare
+    all their fields.
+    """
+    field_names = tuple(payload_model.__fields__)
+    missing_fields = set(field_names) - set(source_model.__fields__)
+    if missing_fields:
+        raise TypeError(
+            f"{source_model.__name__} has no fields {sorted(missing_fields)} "
+            f"of {payload_model.__name__}."
+        )
+    nested_fields = [
+        field.name
+        for field in payload_model.__fields__.values()
+        if isinstance(field.type_, type) and issubclass(field.type_, BaseModel)
+    ]
+    if nested_fields:
+        raise TypeError(f"{payload_model.__name__} has nested fields {nested_fields}.")
+
+    def serialize(obj: BaseModel) -> Dict[str, Any]:
+        values = obj.__dict__
+        return {name: values[name] for name in field_names}
+
+    return serialize
+
+
+serialize_product = compile_serializer(product.Product, api_model.Product)
+serialize_product_version = compile_serializer(
+    product_version.ProductVersion, api_model.ProductVersion
+)
+serialize_bulk_product_result = compile_serializer(
+    bulk_write.BulkWriteResult, api_model.BulkProductResult
+)
+
+PRODUCT_FIELDS = tuple(api_model.Product.__fields__)
+
+
+def parse_product_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parses a comma separated list of product fields to return.
+    The id is always returned. Returns None when all fields are requested.
+    """
+    if fields is None:
+        return None
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(PRODUCT_FIELDS)
+    if unknown:
+        raise DomainException(
+            f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Allowed fields: {', '.join(PRODUCT_FIELDS)}."
+        )
+    return [field for field in PRODUCT_FIELDS if field == "id" or field in requested]
+
+
+def serialize_product_fields(
+    product_obj: product.Product, fields: Optional[List[str]]
+) -> Dict[str, Any]:
+    """Payload of api_model.Product, with only the given fields when set."""
+    if fields is None:
+        return serialize_product(product_obj)
+    values = product_obj.__dict__
+    return {field: values.get(field) for field in fields}
+
+
+def get_product_response(
+    product_obj: product.Product, fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Payload of api_model.GetProductResponse."""
+    return serialize_product_fields(product_obj, fields)
+
+
+def update_product_response(product_obj: product.Product) -> Dict[str, Any]:
+    """Payload of api_model.UpdateProductResponse."""
+    return {"id": product_obj.id, "product": serialize_product(product_obj)}
+
+
+def list_products_response(
+    products: List[product.Product],
+    next_token: Optional[str],
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Payload of api_model.ListProductsResponse."""
+    return {
+        "nextToken": next_token,
+        "products": [serialize_product_fields(p, fields) for p in products],
+    }
+
+
+def list_product_versions_response(
+    versions: List[product_version.ProductVersion], next_token: Optional[str]
+) -> Dict[str, Any]:
+    """Payload of api_model.ListProductVersionsResponse."""
+    return {
+        "nextToken": next_token,
+        "versions": [serialize_product_version(v) for v in versions],
+    }
+
+
+def product_history_response(
+    product_obj: product.Product,
+    versions: List[product_version.ProductVersion],
+    next_token: Optional[str],
+) -> Dict[str, Any]:
+    """Payload of api_model.GetProductHistoryResponse."""
+    return {
+        "product": serialize_product(product_obj),
+        **list_product_versions_response(versions, next_token),
+    }
+
+
+def batch_get_products_response(
+    products: List[product.Product], not_found_ids: List[str]
+) -> Dict[str, Any]:
+    """Payload of api_model.BatchGetProductsResponse."""
+    return {
+        "products": [serialize_product(p) for p in products],
+        "notFoundIds": not_found_ids,
+    }
+
+
+def bulk_products_response(
+    results: List[bulk_write.BulkWriteResult],
+) -> Dict[str, Any]:
+    """Payload of api_model.BulkProductsResponse."""
+    return {"results": [serialize_bulk_product_result(r) for r in results]}
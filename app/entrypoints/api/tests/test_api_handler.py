@@ -1,4 +1,5 @@
 import json
+import threading
 import unittest
 from dataclasses import dataclass
 
@@ -6,16 +7,25 @@ import assertpy
 import pytest
 from aws_lambda_powertools.utilities.data_classes import api_gateway_proxy_event
 
+from app.adapters import sqlite_product_update_queue
+from app.adapters.internal import emf_metrics
 from app.domain.command_handlers import (
+    bulk_products_command_handler,
     create_product_command_handler,
     delete_product_command_handler,
     update_product_command_handler,
 )
+from app.domain.model import bulk_write, product, product_version
 from app.domain.ports import products_query_service
 from app.entrypoints.api import handler
 from app.entrypoints.api.model import api_model
 
 
+@pytest.fixture(autouse=True)
+def cursor_signing_key(monkeypatch):
+    monkeypatch.setenv("CURSOR_SIGNING_KEY", "test-signing-key")
+
+
 @pytest.fixture
 def lambda_context():
     @dataclass
@@ -38,6 +48,7 @@ def test_create_product(lambda_context):
         {
             "path": "/products",
             "httpMethod": "POST",
+            "headers": {"idempotency-key": "key-1"},
             "requestContext": {  # correlation ID
                 "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"
             },
@@ -60,6 +71,39 @@ def test_create_product(lambda_context):
     command = create_product_func_mock.call_args.kwargs["command"]
     assertpy.assert_that(command.name).is_equal_to(name)
     assertpy.assert_that(command.description).is_equal_to(description)
+    assertpy.assert_that(
+        create_product_func_mock.call_args.kwargs["idempotency_key"]
+    ).is_equal_to("key-1")
+
+
+def test_create_product_with_invalid_idempotency_key_should_fail(
+    lambda_context, monkeypatch
+):
+    # Arrange
+    minimal_event = api_gateway_proxy_event.APIGatewayProxyEvent(
+        {
+            "path": "/products",
+            "httpMethod": "POST",
+            "headers": {"Idempotency-Key": "k" * 256},
+            "requestContext": {  # correlation ID
+                "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"
+            },
+            "body": json.dumps({"name": "TestName"}),
+        }
+    )
+    create_product_func_mock = unittest.mock.MagicMock()
+    monkeypatch.setattr(
+        handler.create_product_command_handler,
+        "handle_create_product_command",
+        create_product_func_mock,
+    )
+
+    # Act
+    response = handler.handler(minimal_event, lambda_context)
+
+    # Assert
+    assertpy.assert_that(response["statusCode"]).is_equal_to(400)
+    create_product_func_mock.assert_not_called()
 
 
 def test_update_product(lambda_context):
@@ -82,18 +126,69 @@ def test_update_product(lambda_context):
     update_product_func_mock = unittest.mock.create_autospec(
         spec=update_product_command_handler.handle_update_product_command
     )
+    update_product_func_mock.return_value = product.Product(
+        id=id,
+        name="Test name",
+        description=description,
+        createDate="2022-10-10T10:10:10+00:00",
+        lastUpdateDate="2022-10-11T10:10:10+00:00",
+        version=2,
+    )
     handler.update_product_command_handler.handle_update_product_command = (
         update_product_func_mock
     )
 
     # Act
-    handler.handler(minimal_event, lambda_context)
+    response = handler.handler(minimal_event, lambda_context)
 
     # Assert
     update_product_func_mock.assert_called_once()
     command = update_product_func_mock.call_args.kwargs["command"]
     assertpy.assert_that(command.id).is_equal_to(id)
     assertpy.assert_that(command.description).is_equal_to(description)
+    assertpy.assert_that(json.loads(response["body"])).is_equal_to(
+        {
+            "id": id,
+            "product": {
+                "id": id,
+                "name": "Test name",
+                "description": description,
+                "createDate": "2022-10-10T10:10:10+00:00",
+                "lastUpdateDate": "2022-10-11T10:10:10+00:00",
+                "version": 2,
+            },
+        }
+    )
+
+
+def test_update_product_with_queued_updates_should_queue_update(
+    lambda_context, monkeypatch
+):
+    # Arrange
+    monkeypatch.setenv("QUEUED_PRODUCT_UPDATES_ENABLED", "true")
+    monkeypatch.setenv("PRODUCT_UPDATES_QUEUE_URL", "test-queue-url")
+    queue = sqlite_product_update_queue.SQLiteProductUpdateQueue()
+    handler.app_dependencies.product_update_queue = queue
+    minimal_event = api_gateway_proxy_event.APIGatewayProxyEvent(
+        {
+            "path": "/products/test-id",
+            "httpMethod": "PUT",
+            "requestContext": {  # correlation ID
+                "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"
+            },
+            "body": json.dumps({"name": "New Name"}),
+        }
+    )
+
+    # Act
+    response = handler.handler(minimal_event, lambda_context)
+
+    # Assert
+    assertpy.assert_that(response["statusCode"]).is_equal_to(202)
+    assertpy.assert_that(json.loads(response["body"])).is_equal_to({"id": "test-id"})
+    ((_, queued_update),) = queue.receive(max_messages=10)
+    assertpy.assert_that(queued_update.id).is_equal_to("test-id")
+    assertpy.assert_that(queued_update.name).is_equal_to("New Name")
 
 
 def test_delete_product(lambda_context):
@@ -142,7 +237,7 @@ def test_get_product(lambda_context):
     mock_query_service = unittest.mock.create_autospec(
         spec=products_query_service.ProductsQueryService
     )
-    handler.products_query_service = mock_query_service
+    handler.app_dependencies.products_query_service = mock_query_service
 
     # Act
     handler.handler(minimal_event, lambda_context)
@@ -153,6 +248,35 @@ def test_get_product(lambda_context):
     assertpy.assert_that(got_product_id).is_equal_to(id)
 
 
+def test_get_product_with_consistent_read_header_should_read_consistently(
+    lambda_context,
+):
+    # Arrange
+    minimal_event = api_gateway_proxy_event.APIGatewayProxyEvent(
+        {
+            "path": "/products/test-id",
+            "httpMethod": "GET",
+            "headers": {"consistent-read": "True"},
+            "requestContext": {  # correlation ID
+                "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"
+            },
+        }
+    )
+
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService
+    )
+    handler.app_dependencies.products_query_service = mock_query_service
+
+    # Act
+    handler.handler(minimal_event, lambda_context)
+
+    # Assert
+    assertpy.assert_that(
+        mock_query_service.get_product_by_id.call_args.kwargs["consistent_read"]
+    ).is_true()
+
+
 def test_list_products(lambda_context):
     # Arrange
     page_size = 10
@@ -170,7 +294,7 @@ def test_list_products(lambda_context):
     mock_query_service = unittest.mock.create_autospec(
         spec=products_query_service.ProductsQueryService
     )
-    handler.products_query_service = mock_query_service
+    handler.app_dependencies.products_query_service = mock_query_service
 
     # Act
     handler.handler(minimal_event, lambda_context)
@@ -179,3 +303,308 @@ def test_list_products(lambda_context):
     mock_query_service.list_products.assert_called_once()
     got_page_size = mock_query_service.list_products.call_args.kwargs["page_size"]
     assertpy.assert_that(got_page_size).is_equal_to(page_size)
+
+
+def test_list_product_versions(lambda_context):
+    # Arrange
+    minimal_event = api_gateway_proxy_event.APIGatewayProxyEvent(
+        {
+            "path": "/products/test-id/versions",
+            "httpMethod": "GET",
+            "requestContext": {  # correlation ID
+                "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"
+            },
+            "queryStringParameters": {
+                "limit": "5",
+                "since": "2022-10-10T10:10:10+00:00",
+            },
+        }
+    )
+
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService
+    )
+    mock_query_service.list_product_versions.return_value = (
+        [
+            product_version.ProductVersion(
+                id="01GF2Y0JX0AAAAAAAAAAAAAAAA",
+                name="test-name",
+                version="2",
+                createDate="2022-10-10T10:10:11+00:00",
+            )
+        ],
+        "token",
+    )
+    handler.app_dependencies.products_query_service = mock_query_service
+
+    # Act
+    response = handler.handler(minimal_event, lambda_context)
+
+    # Assert
+    mock_query_service.list_product_versions.assert_called_once_with(
+        product_id="test-id",
+        limit=5,
+        next_token=None,
+        since="2022-10-10T10:10:10+00:00",
+        consistent_read=False,
+    )
+    assertpy.assert_that(json.loads(response["body"])).is_equal_to(
+        {
+            "nextToken": "token",
+            "versions": [
+                {
+                    "id": "01GF2Y0JX0AAAAAAAAAAAAAAAA",
+                    "name": "test-name",
+                    "version": "2",
+                    "createDate": "2022-10-10T10:10:11+00:00",
+                }
+            ],
+        }
+    )
+
+
+def test_get_product_history_should_read_product_and_versions_concurrently(
+    lambda_context,
+):
+    # Arrange
+    minimal_event = api_gateway_proxy_event.APIGatewayProxyEvent(
+        {
+            "path": "/products/test-id/history",
+            "httpMethod": "GET",
+            "requestContext": {  # correlation ID
+                "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"
+            },
+            "queryStringParameters": {"limit": "5"},
+        }
+    )
+    both_reads_started = threading.Barrier(2, timeout=5)
+    test_product = product.Product(
+        id="test-id",
+        name="test-name",
+        createDate="2022-10-10T10:10:10+00:00",
+        lastUpdateDate="2022-10-10T10:10:11+00:00",
+        version=2,
+    )
+    test_version = product_version.ProductVersion(
+        id="01GF2Y0JX0AAAAAAAAAAAAAAAA",
+        name="test-name",
+        version="2",
+        createDate="2022-10-10T10:10:11+00:00",
+    )
+
+    def get_product_by_id(product_id, fields=None, consistent_read=False):
+        # Fails with BrokenBarrierError unless the versions read is in flight.
+        both_reads_started.wait()
+        return test_product
+
+    def list_product_versions(
+        product_id, limit, next_token=None, since=None, consistent_read=False
+    ):
+        both_reads_started.wait()
+        return [test_version], "token"
+
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService, instance=True
+    )
+    mock_query_service.get_product_by_id.side_effect = get_product_by_id
+    mock_query_service.list_product_versions.side_effect = list_product_versions
+    handler.app_dependencies.products_query_service = mock_query_service
+
+    # Act
+    response = handler.handler(minimal_event, lambda_context)
+
+    # Assert
+    assertpy.assert_that(response["statusCode"]).is_equal_to(200)
+    mock_query_service.list_product_versions.assert_called_once_with(
+        product_id="test-id",
+        limit=5,
+        next_token=None,
+        since=None,
+        consistent_read=False,
+    )
+    body = json.loads(response["body"])
+    assertpy.assert_that(body["product"]["id"]).is_equal_to("test-id")
+    assertpy.assert_that(body["nextToken"]).is_equal_to("token")
+    assertpy.assert_that(body["versions"]).is_length(1)
+
+
+def test_list_products_with_fields(lambda_context):
+    # Arrange
+    minimal_event = api_gateway_proxy_event.APIGatewayProxyEvent(
+        {
+            "path": "/products",
+            "httpMethod": "GET",
+            "requestContext": {  # correlation ID
+                "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"
+            },
+            "queryStringParameters": {"pageSize": "10", "fields": "name"},
+        }
+    )
+
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService
+    )
+    mock_query_service.list_products.return_value = (
+        [product.Product.construct(id="test-id", name="test-name")],
+        None,
+    )
+    handler.app_dependencies.products_query_service = mock_query_service
+
+    # Act
+    response = handler.handler(minimal_event, lambda_context)
+
+    # Assert
+    got_fields = mock_query_service.list_products.call_args.kwargs["fields"]
+    assertpy.assert_that(got_fields).is_equal_to(["id", "name"])
+    assertpy.assert_that(json.loads(response["body"])["products"]).is_equal_to(
+        [{"id": "test-id", "name": "test-name"}]
+    )
+
+
+def test_batch_get_products(lambda_context):
+    # Arrange
+    ids = ["test-id-1", "test-id-2"]
+    request = api_model.BatchGetProductsRequest(ids=ids)
+    minimal_event = api_gateway_proxy_event.APIGatewayProxyEvent(
+        {
+            "path": "/products:batchGet",
+            "httpMethod": "POST",
+            "requestContext": {  # correlation ID
+                "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"
+            },
+            "body": json.dumps(request.dict()),
+        }
+    )
+
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService
+    )
+    mock_query_service.get_products_by_ids.return_value = []
+    handler.app_dependencies.products_query_service = mock_query_service
+
+    # Act
+    response = handler.handler(minimal_event, lambda_context)
+
+    # Assert
+    mock_query_service.get_products_by_ids.assert_called_once()
+    got_ids = mock_query_service.get_products_by_ids.call_args.kwargs["product_ids"]
+    assertpy.assert_that(got_ids).is_equal_to(ids)
+    assertpy.assert_that(json.loads(response["body"])["notFoundIds"]).is_equal_to(ids)
+
+
+def test_bulk_products(lambda_context):
+    # Arrange
+    request = api_model.BulkProductsRequest(
+        creates=[api_model.CreateProductRequest(name="TestName")],
+        deletes=["test-id"],
+    )
+    minimal_event = api_gateway_proxy_event.APIGatewayProxyEvent(
+        {
+            "path": "/products:bulk",
+            "httpMethod": "POST",
+            "requestContext": {  # correlation ID
+                "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"
+            },
+            "body": json.dumps(request.dict()),
+        }
+    )
+
+    bulk_products_func_mock = unittest.mock.create_autospec(
+        spec=bulk_products_command_handler.handle_bulk_products_command
+    )
+    bulk_products_func_mock.return_value = []
+    handler.bulk_products_command_handler.handle_bulk_products_command = (
+        bulk_products_func_mock
+    )
+
+    # Act
+    handler.handler(minimal_event, lambda_context)
+
+    # Assert
+    bulk_products_func_mock.assert_called_once()
+    command = bulk_products_func_mock.call_args.kwargs["command"]
+    assertpy.assert_that(command.mode).is_equal_to(
+        bulk_write.BulkWriteMode.TRANSACTIONAL
+    )
+    assertpy.assert_that(command.creates[0].name).is_equal_to("TestName")
+    assertpy.assert_that(command.deletes[0].id).is_equal_to("test-id")
+
+
+def test_handler_should_write_route_metrics_for_sampled_invocations(lambda_context):
+    # Arrange
+    id = "test-id"
+    minimal_event = api_gateway_proxy_event.APIGatewayProxyEvent(
+        {
+            "path": f"/products/{id}",
+            "resource": "/products/{id}",
+            "httpMethod": "GET",
+            "requestContext": {  # correlation ID
+                "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"
+            },
+        }
+    )
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService
+    )
+    mock_query_service.get_product_by_id.return_value = product.Product(
+        id=id,
+        name="TestName",
+        createDate="2022-10-10T10:10:10+00:00",
+        lastUpdateDate="2022-10-10T10:10:10+00:00",
+    )
+    handler.app_dependencies.products_query_service = mock_query_service
+    lines = []
+    handler.app_dependencies.metrics_recorder = emf_metrics.MetricsRecorder(
+        namespace="TestNamespace",
+        sample_rate=1.0,
+        write=lambda line: lines.append(json.loads(line)),
+    )
+
+    # Act
+    response = handler.handler(minimal_event, lambda_context)
+
+    # Assert
+    route_metrics = [line for line in lines if "Route" in line]
+    assertpy.assert_that(route_metrics).is_length(1)
+    assertpy.assert_that(route_metrics[0]["Route"]).is_equal_to("GET /products/{id}")
+    assertpy.assert_that(route_metrics[0]["Latency"]).is_greater_than(0)
+    assertpy.assert_that(route_metrics[0]["ResponseBytes"]).is_equal_to(
+        len(response["body"])
+    )
+
+
+def test_handler_should_write_error_metric_when_route_raises(lambda_context):
+    # Arrange
+    minimal_event = api_gateway_proxy_event.APIGatewayProxyEvent(
+        {
+            "path": "/products/test-id",
+            "resource": "/products/{id}",
+            "httpMethod": "GET",
+            "requestContext": {  # correlation ID
+                "requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"
+            },
+        }
+    )
+    mock_query_service = unittest.mock.create_autospec(
+        spec=products_query_service.ProductsQueryService
+    )
+    mock_query_service.get_product_by_id.side_effect = RuntimeError("Failed.")
+    handler.app_dependencies.products_query_service = mock_query_service
+    lines = []
+    handler.app_dependencies.metrics_recorder = emf_metrics.MetricsRecorder(
+        namespace="TestNamespace",
+        sample_rate=1.0,
+        write=lambda line: lines.append(json.loads(line)),
+    )
+
+    # Act
+    response = handler.handler(minimal_event, lambda_context)
+
+    # Assert
+    route_metrics = [line for line in lines if "Route" in line]
+    assertpy.assert_that(response["statusCode"]).is_equal_to(400)
+    assertpy.assert_that(route_metrics).is_length(1)
+    assertpy.assert_that(route_metrics[0]["Errors"]).is_equal_to(1)
+    assertpy.assert_that(route_metrics[0]["ResponseBytes"]).is_equal_to(
+        len(response["body"])
+    )
@@ -0,0 +1,134 @@
+import unittest.mock
+
+import assertpy
+import boto3
+import moto
+
+from app.adapters import cached_query_service
+from app.domain.ports.products_query_service import ProductsQueryService
+from app.entrypoints.api import dependencies
+
+
+def test_dependencies_should_create_instances_once_and_report_timings_once():
+    # Arrange
+    app_dependencies = dependencies.Dependencies()
+
+    # Act
+    first_unit_of_work = app_dependencies.unit_of_work
+    second_unit_of_work = app_dependencies.unit_of_work
+    first_timings = app_dependencies.pop_new_timings()
+    second_timings = app_dependencies.pop_new_timings()
+
+    # Assert
+    assertpy.assert_that(first_unit_of_work).is_same_as(second_unit_of_work)
+    assertpy.assert_that(first_timings).contains_key("dynamodb_client", "unit_of_work")
+    assertpy.assert_that(second_timings).is_empty()
+
+
+def test_dependencies_should_not_create_client_for_overridden_instances():
+    # Arrange
+    app_dependencies = dependencies.Dependencies()
+    mock_query_service = unittest.mock.create_autospec(spec=ProductsQueryService)
+
+    # Act
+    app_dependencies.products_query_service = mock_query_service
+
+    # Assert
+    assertpy.assert_that(app_dependencies.products_query_service).is_same_as(
+        mock_query_service
+    )
+    assertpy.assert_that(app_dependencies.pop_new_timings()).is_empty()
+
+
+def test_dependencies_should_run_async_reads_with_the_sync_query_service():
+    # Arrange
+    app_dependencies = dependencies.Dependencies()
+    mock_query_service = unittest.mock.create_autospec(
+        spec=ProductsQueryService, instance=True
+    )
+    mock_query_service.get_product_by_id.return_value = None
+    app_dependencies.products_query_service = mock_query_service
+
+    # Act
+    first = app_dependencies.run_async(
+        app_dependencies.async_products_query_service.get_product_by_id("id-1")
+    )
+    second = app_dependencies.run_async(
+        app_dependencies.async_products_query_service.get_product_by_id("id-2")
+    )
+
+    # Assert
+    assertpy.assert_that([first, second]).is_equal_to([None, None])
+    assertpy.assert_that(mock_query_service.get_product_by_id.call_count).is_equal_to(2)
+    assertpy.assert_that(app_dependencies.pop_new_timings()).contains_key(
+        "async_dynamodb_client", "async_products_query_service"
+    )
+
+
+def test_dependencies_should_create_client_from_app_config(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("DYNAMODB_MAX_POOL_CONNECTIONS", "40")
+    monkeypatch.setenv("DYNAMODB_READ_TIMEOUT_SECONDS", "0.5")
+    monkeypatch.setenv("DYNAMODB_RETRY_MODE", "standard")
+    app_dependencies = dependencies.Dependencies()
+
+    # Act
+    client_config = app_dependencies.dynamodb_client.meta.config
+
+    # Assert
+    assertpy.assert_that(client_config.max_pool_connections).is_equal_to(40)
+    assertpy.assert_that(client_config.read_timeout).is_equal_to(0.5)
+    assertpy.assert_that(client_config.retries["mode"]).is_equal_to("standard")
+
+
+def test_dependencies_should_report_read_coalescing_stats_once():
+    # Arrange
+    app_dependencies = dependencies.Dependencies()
+    coalescer = app_dependencies.products_read_coalescer
+
+    # Act
+    coalescer.do("id-1", lambda: None)
+    first_stats = app_dependencies.pop_read_coalescing_stats()
+    second_stats = app_dependencies.pop_read_coalescing_stats()
+
+    # Assert
+    assertpy.assert_that(first_stats).is_equal_to({"lookups": 1, "coalesced": 0})
+    assertpy.assert_that(second_stats).is_equal_to({"lookups": 0, "coalesced": 0})
+
+
+def test_dependencies_should_read_cursor_signing_key_from_secret(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-1")
+    with moto.mock_secretsmanager():
+        secret = boto3.client("secretsmanager", region_name="eu-west-1").create_secret(
+            Name="cursor-signing-key", SecretString="secret-signing-key"
+        )
+        monkeypatch.setenv("CURSOR_SIGNING_KEY_SECRET_ARN", secret["ARN"])
+        app_dependencies = dependencies.Dependencies()
+
+        # Act
+        cursor_signing_key = app_dependencies.cursor_signing_key
+
+    # Assert
+    assertpy.assert_that(cursor_signing_key).is_equal_to("secret-signing-key")
+
+
+def test_dependencies_should_cache_products_only_with_change_feed(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("CURSOR_SIGNING_KEY", "test-signing-key")
+    monkeypatch.setenv("READ_YOUR_WRITES_SECONDS", "0")
+    monkeypatch.setenv("PRODUCTS_CACHE_MAX_ENTRIES", "1000")
+
+    # Act
+    monkeypatch.setenv("PRODUCTS_CHANGE_FEED_POLL_SECONDS", "0")
+    without_change_feed = dependencies.Dependencies().products_query_service
+    monkeypatch.setenv("PRODUCTS_CHANGE_FEED_POLL_SECONDS", "5")
+    with_change_feed = dependencies.Dependencies().products_query_service
+
+    # Assert
+    assertpy.assert_that(
+        isinstance(without_change_feed, cached_query_service.CachedProductsQueryService)
+    ).is_false()
+    assertpy.assert_that(with_change_feed).is_instance_of(
+        cached_query_service.CachedProductsQueryService
+    )
@@ -0,0 +1,119 @@
+from typing import Optional
+
+import assertpy
+from pydantic import BaseModel
+
+from app.domain.exceptions.domain_exception import DomainException
+from app.domain.model import bulk_write, product, product_version
+from app.entrypoints.api.model import api_model, serializers
+
+
+def _product(index: int, description: Optional[str]) -> product.Product:
+    return product.Product(
+        id=f"id-{index}",
+        name=f"name-{index}",
+        description=description,
+        createDate="2022-10-10T10:10:10+00:00",
+        lastUpdateDate="2022-10-11T10:10:10+00:00",
+    )
+
+
+def test_list_products_response_should_match_api_model():
+    # Arrange
+    products = [_product(1, "description"), _product(2, None)]
+
+    # Act
+    payload = serializers.list_products_response(products, "next-token")
+
+    # Assert
+    expected = api_model.ListProductsResponse(
+        products=[api_model.Product.parse_obj(p.dict()) for p in products],
+        nextToken="next-token",
+    ).dict()
+    assertpy.assert_that(payload).is_equal_to(expected)
+
+
+def test_product_history_response_should_match_api_model():
+    # Arrange
+    product_obj = _product(1, "description")
+    versions = [
+        product_version.ProductVersion(
+            id="01GF2Y0JX0AAAAAAAAAAAAAAAA",
+            name="name-1",
+            version="1",
+            createDate="2022-10-10T10:10:10+00:00",
+        )
+    ]
+
+    # Act
+    payload = serializers.product_history_response(product_obj, versions, None)
+
+    # Assert
+    expected = api_model.GetProductHistoryResponse(
+        product=api_model.Product.parse_obj(product_obj.dict()),
+        versions=[api_model.ProductVersion.parse_obj(v.dict()) for v in versions],
+        nextToken=None,
+    ).dict()
+    assertpy.assert_that(payload).is_equal_to(expected)
+
+
+def test_bulk_products_response_should_match_api_model():
+    # Arrange
+    results = [
+        bulk_write.BulkWriteResult(
+            operation=bulk_write.BulkWriteOperation.DELETE,
+            id="id-1",
+            succeeded=False,
+            error="Not found.",
+        )
+    ]
+
+    # Act
+    payload = serializers.bulk_products_response(results)
+
+    # Assert
+    expected = api_model.BulkProductsResponse(
+        results=[api_model.BulkProductResult.parse_obj(r.dict()) for r in results]
+    ).dict()
+    assertpy.assert_that(payload).is_equal_to(expected)
+
+
+def test_compile_serializer_should_reject_source_without_payload_fields():
+    # Arrange
+    class PartialProduct(BaseModel):
+        id: str
+
+    # Act & Assert
+    assertpy.assert_that(serializers.compile_serializer).raises(
+        TypeError
+    ).when_called_with(PartialProduct, api_model.Product)
+
+
+def test_list_products_response_with_fields_should_return_only_those_fields():
+    # Arrange
+    products = [
+        product.Product.construct(id="id-1", name="name-1"),
+        product.Product.construct(id="id-2", name="name-2"),
+    ]
+
+    # Act
+    fields = serializers.parse_product_fields("name")
+    payload = serializers.list_products_response(products, None, fields)
+
+    # Assert
+    assertpy.assert_that(payload).is_equal_to(
+        {
+            "nextToken": None,
+            "products": [
+                {"id": "id-1", "name": "name-1"},
+                {"id": "id-2", "name": "name-2"},
+            ],
+        }
+    )
+
+
+def test_parse_product_fields_should_reject_unknown_fields():
+    # Act & Assert
+    assertpy.assert_that(serializers.parse_product_fields).raises(
+        DomainException
+    ).when_called_with("name,price")
@@ -0,0 +1,64 @@
+"""
+Exports the product catalog as newline delimited JSON files.
+
+Usage: TABLE_NAME=... python -m app.entrypoints.export --destination ./export
+"""
+import argparse
+import typing
+
+from app.adapters import (
+    dynamodb_client_factory,
+    dynamodb_products_export,
+    local_file_export_sink,
+)
+from app.domain.command_handlers import export_products_command_handler
+from app.domain.commands import export_products_command
+from app.entrypoints.export import config
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Exports all products.")
+    parser.add_argument("--destination", required=True, help="Output directory.")
+    parser.add_argument(
+        "--segments",
+        type=int,
+        default=dynamodb_products_export.TOTAL_SEGMENTS,
+        help="Number of parallel scan segments.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=dynamodb_products_export.MAX_EXPORT_WORKERS,
+        help="Number of segments scanned at the same time.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=export_products_command.ExportProductsCommand().chunkSize,
+        help="Number of products per output file.",
+    )
+    args = parser.parse_args(argv)
+
+    export_source = dynamodb_products_export.DynamoDBProductsExportSource(
+        config.AppConfig.get_table_name(),
+        dynamodb_client_factory.create_dynamodb_client(
+            region_name=config.AppConfig.get_default_region(),
+            max_pool_connections=max(
+                args.workers, dynamodb_client_factory.MAX_POOL_CONNECTIONS
+            ),
+        ),
+        total_segments=args.segments,
+        max_workers=args.workers,
+    )
+    result = export_products_command_handler.handle_export_products_command(
+        command=export_products_command.ExportProductsCommand(
+            chunkSize=args.chunk_size
+        ),
+        export_source=export_source,
+        export_sink=local_file_export_sink.LocalFileExportSink(args.destination),
+    )
+    print(result.json())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import json
+
+import assertpy
+import boto3
+import moto
+import pytest
+
+from app.entrypoints.export import __main__ as export_cli
+
+TEST_TABLE_NAME = "test-table"
+
+
+@pytest.fixture
+def products_table(monkeypatch):
+    monkeypatch.setenv("TABLE_NAME", TEST_TABLE_NAME)
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-central-1")
+    with moto.mock_dynamodb():
+        dynamodb = boto3.resource("dynamodb", region_name="eu-central-1")
+        table = dynamodb.create_table(
+            TableName=TEST_TABLE_NAME,
+            KeySchema=[
+                {"AttributeName": "PK", "KeyType": "HASH"},
+                {"AttributeName": "SK", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "PK", "AttributeType": "S"},
+                {"AttributeName": "SK", "AttributeType": "S"},
+                {"AttributeName": "GSI1PK", "AttributeType": "S"},
+                {"AttributeName": "GSI1SK", "AttributeType": "S"},
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "GSI1",
+                    "KeySchema": [
+                        {"AttributeName": "GSI1PK", "KeyType": "HASH"},
+                        {"AttributeName": "GSI1SK", "KeyType": "RANGE"},
+                    ],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield table
+
+
+def test_main_should_export_products_to_destination(products_table, tmp_path, capsys):
+    # Arrange
+    for i in range(3):
+        products_table.put_item(
+            Item={
+                "PK": f"PRODUCT#{i}",
+                "SK": f"PRODUCT#{i}",
+                "GSI1PK": "PRODUCT",
+                "GSI1SK": f"PRODUCT#2022-10-10T10:10:10+00:00#{i}",
+                "id": str(i),
+                "name": "test-name",
+                "createDate": "2022-10-10T10:10:10+00:00",
+                "lastUpdateDate": "2022-10-10T10:10:10+00:00",
+            }
+        )
+
+    # Act
+    export_cli.main(
+        [
+            "--destination",
+            str(tmp_path),
+            "--segments",
+            "1",
+            "--workers",
+            "1",
+            "--chunk-size",
+            "2",
+        ]
+    )
+
+    # Assert
+    result = json.loads(capsys.readouterr().out)
+    assertpy.assert_that(result["productCount"]).is_equal_to(3)
+    assertpy.assert_that(result["chunkLocations"]).is_length(2)
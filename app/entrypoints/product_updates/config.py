@@ -0,0 +1,20 @@
+import os
+import typing
+
+from pydantic import BaseModel
+
+
+class AppConfig(BaseModel):
+    @staticmethod
+    def get_default_region() -> typing.Optional[str]:
+        return os.environ.get("AWS_DEFAULT_REGION")
+
+    @staticmethod
+    def get_table_name() -> str:
+        return os.environ.get("TABLE_NAME", "")
+
+    @staticmethod
+    def is_product_version_history_enabled() -> bool:
+        return (
+            os.environ.get("PRODUCT_VERSION_HISTORY_ENABLED", "false").lower() == "true"
+        )
@@ -0,0 +1,87 @@
+from typing import List, Optional, Tuple
+
+import pydantic
+from aws_lambda_powertools import logging, tracing
+from aws_lambda_powertools.utilities import data_classes, typing
+from aws_lambda_powertools.utilities.data_classes import sqs_event
+
+from app.adapters import dynamodb_client_factory, dynamodb_unit_of_work
+from app.domain.command_handlers import apply_product_updates_command_handler
+from app.domain.commands import apply_product_updates_command, update_product_command
+from app.entrypoints.product_updates import config
+
+logger = logging.Logger()
+tracer = tracing.Tracer()
+
+dynamodb_client = dynamodb_client_factory.create_dynamodb_client(
+    region_name=config.AppConfig.get_default_region()
+)
+unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+    config.AppConfig.get_table_name(), dynamodb_client
+)
+
+
+def parse_product_update(
+    record: sqs_event.SQSRecord,
+) -> Optional[update_product_command.UpdateProductCommand]:
+    """Converts a queue message to an update command, or None if it is malformed."""
+    try:
+        return update_product_command.UpdateProductCommand.parse_raw(record.body)
+    except pydantic.ValidationError:
+        logger.exception(
+            "Dropped malformed product update.", extra={"message_id": record.message_id}
+        )
+        return None
+
+
+def apply_product_updates(
+    messages: List[Tuple[str, update_product_command.UpdateProductCommand]],
+) -> List[str]:
+    """
+    Applies the queued updates, merged per product, and returns the IDs of
+    the messages whose update failed and should be received again.
+    """
+    failed_product_ids = set(
+        apply_product_updates_command_handler.handle_apply_product_updates_command(
+            command=apply_product_updates_command.ApplyProductUpdatesCommand(
+                updates=[update for _, update in messages]
+            ),
+            unit_of_work=unit_of_work,
+            record_version=config.AppConfig.is_product_version_history_enabled(),
+        )
+    )
+    return [
+        message_id for message_id, update in messages if update.id in failed_product_ids
+    ]
+
+
+@tracer.capture_lambda_handler
+@logger.inject_lambda_context
+@data_classes.event_source(data_class=sqs_event.SQSEvent)
+def handler(
+    event: sqs_event.SQSEvent,
+    context: typing.LambdaContext,
+):
+    messages = [
+        (record.message_id, update)
+        for record, update in (
+            (record, parse_product_update(record)) for record in event.records
+        )
+        if update
+    ]
+
+    failed_message_ids = apply_product_updates(messages)
+    logger.info(
+        "Applied product updates.",
+        extra={
+            "message_count": len(messages),
+            "product_count": len({update.id for _, update in messages}),
+            "failed_message_count": len(failed_message_ids),
+        },
+    )
+    # Only the failed messages return to the queue.
+    return {
+        "batchItemFailures": [
+            {"itemIdentifier": message_id} for message_id in failed_message_ids
+        ]
+    }
@@ -0,0 +1,62 @@
+import json
+import unittest.mock
+from dataclasses import dataclass
+
+import assertpy
+import pytest
+
+from app.domain.command_handlers import apply_product_updates_command_handler
+from app.entrypoints.product_updates import handler
+
+
+@pytest.fixture
+def lambda_context():
+    @dataclass
+    class LambdaContext:
+        function_name: str = "test"
+        memory_limit_in_mb: int = 128
+        invoked_function_arn: str = "arn:aws:lambda:eu-west-1:809313241:function:test"
+        aws_request_id: str = "52fdfc07-2182-154f-163f-5f0f9a621d72"
+
+    return LambdaContext()
+
+
+def _sqs_record(message_id: str, body: str) -> dict:
+    return {"messageId": message_id, "body": body}
+
+
+def test_handler_should_apply_updates_and_report_failed_messages(lambda_context):
+    # Arrange
+    event = {
+        "Records": [
+            _sqs_record("message-1", json.dumps({"id": "id-1", "name": "Name 1"})),
+            _sqs_record("message-2", json.dumps({"id": "id-2", "name": "Name"})),
+            _sqs_record("message-3", json.dumps({"id": "id-1", "name": "Name 2"})),
+            _sqs_record("message-4", "not json"),
+        ]
+    }
+
+    apply_updates_func_mock = unittest.mock.create_autospec(
+        spec=apply_product_updates_command_handler.handle_apply_product_updates_command
+    )
+    apply_updates_func_mock.return_value = ["id-1"]
+    handler.apply_product_updates_command_handler.handle_apply_product_updates_command = (
+        apply_updates_func_mock
+    )
+
+    # Act
+    response = handler.handler(event, lambda_context)
+
+    # Assert
+    command = apply_updates_func_mock.call_args.kwargs["command"]
+    assertpy.assert_that([update.name for update in command.updates]).is_equal_to(
+        ["Name 1", "Name", "Name 2"]
+    )
+    assertpy.assert_that(response).is_equal_to(
+        {
+            "batchItemFailures": [
+                {"itemIdentifier": "message-1"},
+                {"itemIdentifier": "message-3"},
+            ]
+        }
+    )
@@ -0,0 +1,79 @@
+from typing import Optional
+
+from aws_lambda_powertools import logging, tracing
+from aws_lambda_powertools.utilities import data_classes, typing
+from aws_lambda_powertools.utilities.data_classes import dynamo_db_stream_event
+
+from app.adapters import (
+    dynamodb_client_factory,
+    dynamodb_product_projections,
+    dynamodb_unit_of_work,
+)
+from app.domain.command_handlers import apply_product_changes_command_handler
+from app.domain.commands import apply_product_changes_command
+from app.domain.model import product_change
+from app.entrypoints.stream import config
+
+logger = logging.Logger()
+tracer = tracing.Tracer()
+
+dynamodb_client = dynamodb_client_factory.create_dynamodb_client(
+    region_name=config.AppConfig.get_default_region()
+)
+product_projections = dynamodb_product_projections.DynamoDBProductProjections(
+    config.AppConfig.get_table_name(),
+    dynamodb_client,
+    maintain_listing_head=config.AppConfig.is_listing_head_enabled(),
+)
+
+PRODUCT_KEY_PREFIX = f"{dynamodb_unit_of_work.DBPrefix.PRODUCT.value}#"
+
+
+def parse_product_change(
+    record: dynamo_db_stream_event.DynamoDBRecord,
+) -> Optional[product_change.ProductChange]:
+    """Converts a stream record of a product item to a product change."""
+    stream_record = record.dynamodb
+    if not stream_record or not stream_record.keys or not record.event_name:
+        return None
+
+    partition_key = stream_record.keys["PK"].s_value
+    sort_key = stream_record.keys["SK"].s_value
+    if (
+        not partition_key
+        or partition_key != sort_key
+        or not partition_key.startswith(PRODUCT_KEY_PREFIX)
+    ):
+        return None
+
+    image = stream_record.new_image or stream_record.old_image or {}
+    create_date = image.get("createDate")
+    return product_change.ProductChange(
+        id=partition_key.split("#", 1)[1],
+        changeType=record.event_name.name,
+        createDate=create_date.s_value if create_date else None,
+    )
+
+
+@tracer.capture_lambda_handler
+@logger.inject_lambda_context
+@data_classes.event_source(data_class=dynamo_db_stream_event.DynamoDBStreamEvent)
+def handler(
+    event: dynamo_db_stream_event.DynamoDBStreamEvent,
+    context: typing.LambdaContext,
+):
+    changes = [
+        change
+        for change in (parse_product_change(record) for record in event.records)
+        if change
+    ]
+
+    applied_count = (
+        apply_product_changes_command_handler.handle_apply_product_changes_command(
+            command=apply_product_changes_command.ApplyProductChangesCommand(
+                changes=changes
+            ),
+            product_projections=product_projections,
+        )
+    )
+    logger.info("Applied product changes.", extra={"product_count": applied_count})
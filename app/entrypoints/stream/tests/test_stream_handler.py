@@ -0,0 +1,86 @@
+import unittest.mock
+from dataclasses import dataclass
+
+import assertpy
+import pytest
+
+from app.domain.command_handlers import apply_product_changes_command_handler
+from app.domain.model import product_change
+from app.entrypoints.stream import handler
+
+
+@pytest.fixture
+def lambda_context():
+    @dataclass
+    class LambdaContext:
+        function_name: str = "test"
+        memory_limit_in_mb: int = 128
+        invoked_function_arn: str = "arn:aws:lambda:eu-west-1:809313241:function:test"
+        aws_request_id: str = "52fdfc07-2182-154f-163f-5f0f9a621d72"
+
+    return LambdaContext()
+
+
+def _stream_record(event_name: str, pk: str, sk: str, image: dict) -> dict:
+    image_name = "OldImage" if event_name == "REMOVE" else "NewImage"
+    return {
+        "eventName": event_name,
+        "dynamodb": {
+            "Keys": {"PK": {"S": pk}, "SK": {"S": sk}},
+            image_name: {
+                "PK": {"S": pk},
+                "SK": {"S": sk},
+                **{key: {"S": value} for key, value in image.items()},
+            },
+        },
+    }
+
+
+def test_handler_should_apply_product_changes(lambda_context):
+    # Arrange
+    event = {
+        "Records": [
+            _stream_record(
+                "INSERT",
+                "PRODUCT#id-1",
+                "PRODUCT#id-1",
+                {"createDate": "2022-07-01T10:00:00+00:00"},
+            ),
+            _stream_record(
+                "REMOVE",
+                "PRODUCT#id-2",
+                "PRODUCT#id-2",
+                {"createDate": "2022-07-02T10:00:00+00:00"},
+            ),
+            _stream_record("INSERT", "PRODUCT#id-1", "PRODUCTVERSION#v-1", {}),
+            _stream_record("MODIFY", "PRODUCTCHANGELOG", "PRODUCTCHANGELOG", {}),
+        ]
+    }
+
+    apply_changes_func_mock = unittest.mock.create_autospec(
+        spec=apply_product_changes_command_handler.handle_apply_product_changes_command
+    )
+    handler.apply_product_changes_command_handler.handle_apply_product_changes_command = (
+        apply_changes_func_mock
+    )
+
+    # Act
+    handler.handler(event, lambda_context)
+
+    # Assert
+    apply_changes_func_mock.assert_called_once()
+    command = apply_changes_func_mock.call_args.kwargs["command"]
+    assertpy.assert_that(command.changes).is_equal_to(
+        [
+            product_change.ProductChange(
+                id="id-1",
+                changeType=product_change.ProductChangeType.INSERT,
+                createDate="2022-07-01T10:00:00+00:00",
+            ),
+            product_change.ProductChange(
+                id="id-2",
+                changeType=product_change.ProductChangeType.REMOVE,
+                createDate="2022-07-02T10:00:00+00:00",
+            ),
+        ]
+    )
@@ -0,0 +1,244 @@
+import datetime
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+import boto3
+import moto
+import pytest
+
+from app.adapters import dynamodb_unit_of_work
+from app.adapters.internal import dynamodb_base
+from app.domain.model import product
+from benchmarks import harness
+
+TEST_TABLE_NAME = "benchmark-table"
+DEFAULT_BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+results_key = pytest.StashKey[Dict[str, harness.BenchmarkResult]]()
+regressions_key = pytest.StashKey[list]()
+load_results_key = pytest.StashKey[Dict[str, Dict[str, harness.LoadResult]]]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark-rounds",
+        type=int,
+        default=20,
+        help="Number of measured rounds per benchmark.",
+    )
+    group.addoption(
+        "--benchmark-save",
+        metavar="NAME",
+        help="Stores the results as benchmarks/baselines/NAME.json.",
+    )
+    group.addoption(
+        "--benchmark-compare",
+        metavar="NAME",
+        help="Compares the results with benchmarks/baselines/NAME.json.",
+    )
+    group.addoption(
+        "--benchmark-max-regression",
+        type=float,
+        metavar="PCT",
+        help="Fails the run if a median time grows by more than PCT percent.",
+    )
+    group.addoption(
+        "--conformance-report",
+        metavar="PATH",
+        help="Stores the adapter load results, grouped by adapter, as JSON.",
+    )
+
+
+def pytest_configure(config):
+    config.stash[results_key] = {}
+    config.stash[regressions_key] = []
+    config.stash[load_results_key] = {}
+
+
+@pytest.fixture
+def benchmark(request):
+    """Runs a function repeatedly and records its statistics under the test ID."""
+    rounds = request.config.getoption("--benchmark-rounds")
+    results = request.config.stash[results_key]
+
+    def run(func, rounds=rounds, **kwargs):
+        result = harness.run_benchmark(
+            name=request.node.nodeid, func=func, rounds=rounds, **kwargs
+        )
+        results[result.name] = result
+        return result
+
+    return run
+
+
+@pytest.fixture
+def load_test(request):
+    """Runs operations concurrently and records the result per adapter and scenario."""
+    results = request.config.stash[load_results_key]
+
+    def run(adapter: str, scenario: str, operations, workers: int):
+        result = harness.run_load(
+            name=f"{scenario}[{adapter}]", operations=operations, workers=workers
+        )
+        results.setdefault(adapter, {})[scenario] = result
+        return result
+
+    return run
+
+
+@pytest.fixture
+def lambda_context():
+    @dataclass
+    class LambdaContext:
+        function_name: str = "benchmark"
+        memory_limit_in_mb: int = 128
+        invoked_function_arn: str = (
+            "arn:aws:lambda:eu-west-1:809313241:function:benchmark"
+        )
+        aws_request_id: str = "52fdfc07-2182-154f-163f-5f0f9a621d72"
+
+    return LambdaContext()
+
+
+@pytest.fixture
+def mock_dynamodb(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-central-1")
+    monkeypatch.setenv("TABLE_NAME", TEST_TABLE_NAME)
+    monkeypatch.setenv("CURSOR_SIGNING_KEY", "benchmark-signing-key")
+    with moto.mock_dynamodb():
+        yield boto3.resource("dynamodb", region_name="eu-central-1")
+
+
+@pytest.fixture
+def dynamodb_client(mock_dynamodb):
+    return boto3.client("dynamodb", region_name="eu-central-1")
+
+
+@pytest.fixture
+def dynamodb_table(mock_dynamodb):
+    table = mock_dynamodb.create_table(
+        TableName=TEST_TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+            {"AttributeName": "GSI1PK", "AttributeType": "S"},
+            {"AttributeName": "GSI1SK", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "GSI1",
+                "KeySchema": [
+                    {"AttributeName": "GSI1PK", "KeyType": "HASH"},
+                    {"AttributeName": "GSI1SK", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+    table.meta.client.get_waiter("table_exists").wait(TableName=TEST_TABLE_NAME)
+    return table
+
+
+@pytest.fixture
+def add_products(dynamodb_table, dynamodb_client) -> Callable[[int], List[str]]:
+    """Returns a function that adds products to the table and returns their IDs."""
+
+    def add(product_count: int) -> List[str]:
+        unit_of_work = dynamodb_unit_of_work.DynamoDBUnitOfWork(
+            table_name=TEST_TABLE_NAME, dynamodb_client=dynamodb_client
+        )
+        start_time = datetime.datetime.now(datetime.timezone.utc)
+        products = [
+            product.Product(
+                id=str(uuid.uuid4()),
+                name=f"benchmark-product-{i}",
+                description="Benchmark product description.",
+                createDate=(start_time + datetime.timedelta(seconds=i)).isoformat(),
+                lastUpdateDate=start_time.isoformat(),
+            )
+            for i in range(product_count)
+        ]
+        for chunk in dynamodb_base.chunked(products, 25):
+            with unit_of_work:
+                for new_product in chunk:
+                    unit_of_work.products.add(new_product)
+                unit_of_work.commit()
+        return [p.id for p in products]
+
+    return add
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    report_path = config.getoption("--conformance-report")
+    if report_path and config.stash[load_results_key]:
+        harness.save_load_results(report_path, config.stash[load_results_key])
+
+    results = config.stash[results_key]
+    if not results:
+        return
+
+    save_name = config.getoption("--benchmark-save")
+    if save_name:
+        harness.save_results(_baseline_path(save_name), results)
+
+    compare_name = config.getoption("--benchmark-compare")
+    max_regression = config.getoption("--benchmark-max-regression")
+    if compare_name and max_regression is not None:
+        comparison = harness.compare_results(
+            results, harness.load_results(_baseline_path(compare_name))
+        )
+        regressions = [
+            entry
+            for entry in comparison
+            if entry["median_change_pct"] is not None
+            and entry["median_change_pct"] > max_regression
+        ]
+        config.stash[regressions_key] = regressions
+        if regressions:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    adapter_results = config.stash[load_results_key]
+    if adapter_results:
+        terminalreporter.section("adapter conformance")
+        for line in harness.format_load_results(adapter_results):
+            terminalreporter.write_line(line)
+
+    results = config.stash[results_key]
+    if not results:
+        return
+
+    terminalreporter.section("benchmark results")
+    for line in harness.format_results(results):
+        terminalreporter.write_line(line)
+
+    compare_name = config.getoption("--benchmark-compare")
+    if compare_name:
+        terminalreporter.section(f"benchmark comparison with {compare_name}")
+        comparison = harness.compare_results(
+            results, harness.load_results(_baseline_path(compare_name))
+        )
+        for line in harness.format_comparison(comparison):
+            terminalreporter.write_line(line)
+
+    for regression in config.stash[regressions_key]:
+        terminalreporter.write_line(
+            f"REGRESSION {regression['name']}: "
+            f"median {regression['median_change_pct']:+.1f}%",
+            red=True,
+        )
+
+
+def _baseline_path(name: str) -> str:
+    return os.path.join(DEFAULT_BASELINE_DIR, f"{name}.json")
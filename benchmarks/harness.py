@@ -0,0 +1,305 @@
+import json
+import math
+import os
+import statistics
+import time
+import tracemalloc
+from concurrent import futures
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class BenchmarkResult:
+    """Timing and allocation statistics of a benchmarked function."""
+
+    def __init__(
+        self,
+        name: str,
+        durations_ms: List[float],
+        allocated_bytes: int,
+        operations_per_round: int = 1,
+    ):
+        self.name = name
+        self.rounds = len(durations_ms)
+        self.min_ms = min(durations_ms)
+        self.median_ms = statistics.median(durations_ms)
+        self.mean_ms = statistics.mean(durations_ms)
+        self.max_ms = max(durations_ms)
+        self.stddev_ms = (
+            statistics.stdev(durations_ms) if len(durations_ms) > 1 else 0.0
+        )
+        self.allocated_bytes = allocated_bytes
+        self.operations_per_second = (
+            operations_per_round * 1000 / self.median_ms if self.median_ms else 0.0
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "rounds": self.rounds,
+            "min_ms": round(self.min_ms, 4),
+            "median_ms": round(self.median_ms, 4),
+            "mean_ms": round(self.mean_ms, 4),
+            "max_ms": round(self.max_ms, 4),
+            "stddev_ms": round(self.stddev_ms, 4),
+            "allocated_bytes": self.allocated_bytes,
+            "operations_per_second": round(self.operations_per_second, 2),
+        }
+
+
+def run_benchmark(
+    name: str,
+    func: Callable[[], Any],
+    rounds: int,
+    warmup_rounds: int = 1,
+    operations_per_round: int = 1,
+    setup: Optional[Callable[[], None]] = None,
+) -> BenchmarkResult:
+    """
+    Runs the function for warm-up and measured rounds.
+    Allocations are measured separately in one extra round, so tracing
+    memory does not slow down the timed rounds.
+    """
+    for _ in range(warmup_rounds):
+        if setup:
+            setup()
+        func()
+
+    durations_ms = []
+    for _ in range(rounds):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        durations_ms.append((time.perf_counter() - started) * 1000)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        name=name,
+        durations_ms=durations_ms,
+        allocated_bytes=peak_bytes,
+        operations_per_round=operations_per_round,
+    )
+
+
+class LoadResult:
+    """Throughput, latency percentiles and errors of operations run concurrently."""
+
+    def __init__(
+        self,
+        name: str,
+        workers: int,
+        durations_ms: List[float],
+        errors: Dict[str, int],
+        elapsed_seconds: float,
+    ):
+        self.name = name
+        self.workers = workers
+        self.operations = len(durations_ms)
+        self.errors = errors
+        self.elapsed_seconds = elapsed_seconds
+        self.operations_per_second = (
+            self.operations / elapsed_seconds if elapsed_seconds else 0.0
+        )
+        sorted_durations = sorted(durations_ms)
+        self.p50_ms = _percentile(sorted_durations, 50)
+        self.p95_ms = _percentile(sorted_durations, 95)
+        self.p99_ms = _percentile(sorted_durations, 99)
+        self.max_ms = sorted_durations[-1] if sorted_durations else 0.0
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "workers": self.workers,
+            "operations": self.operations,
+            "errors": dict(sorted(self.errors.items())),
+            "elapsed_seconds": round(self.elapsed_seconds, 4),
+            "operations_per_second": round(self.operations_per_second, 2),
+            "p50_ms": round(self.p50_ms, 4),
+            "p95_ms": round(self.p95_ms, 4),
+            "p99_ms": round(self.p99_ms, 4),
+            "max_ms": round(self.max_ms, 4),
+        }
+
+
+def run_load(
+    name: str, operations: Sequence[Callable[[], Any]], workers: int
+) -> LoadResult:
+    """
+    Runs each operation once on a pool of worker threads and records its latency.
+    Exceptions are counted by type instead of stopping the run, so expected
+    failures like write conflicts show up in the result.
+    """
+
+    def run_operation(operation: Callable[[], Any]) -> Tuple[float, Optional[str]]:
+        started = time.perf_counter()
+        try:
+            operation()
+            error = None
+        except Exception as e:
+            error = type(e).__name__
+        return (time.perf_counter() - started) * 1000, error
+
+    started = time.perf_counter()
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(run_operation, operations))
+    elapsed_seconds = time.perf_counter() - started
+
+    errors: Dict[str, int] = {}
+    for _, error in outcomes:
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+    return LoadResult(
+        name=name,
+        workers=workers,
+        durations_ms=[duration for duration, _ in outcomes],
+        errors=errors,
+        elapsed_seconds=elapsed_seconds,
+    )
+
+
+def save_load_results(path: str, results: Dict[str, Dict[str, LoadResult]]) -> None:
+    """Stores load results grouped by adapter as a report file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as report_file:
+        json.dump(
+            {
+                adapter: {
+                    scenario: result.to_dict()
+                    for scenario, result in sorted(scenarios.items())
+                }
+                for adapter, scenarios in sorted(results.items())
+            },
+            report_file,
+            indent=2,
+        )
+
+
+def format_load_results(results: Dict[str, Dict[str, LoadResult]]) -> List[str]:
+    """Formats load results as a text table with a row per scenario and adapter."""
+    rows = sorted(
+        (scenario, adapter, result)
+        for adapter, scenarios in results.items()
+        for scenario, result in scenarios.items()
+    )
+    scenario_width = max(len(scenario) for scenario, _, _ in rows)
+    adapter_width = max(len("adapter"), *(len(adapter) for _, adapter, _ in rows))
+    lines = [
+        f"{'scenario':<{scenario_width}} {'adapter':<{adapter_width}} "
+        f"{'workers':>7} {'ops':>6} {'errors':>6} {'ops/s':>10} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    ]
+    for scenario, adapter, result in rows:
+        lines.append(
+            f"{scenario:<{scenario_width}} {adapter:<{adapter_width}} "
+            f"{result.workers:>7} {result.operations:>6} {result.error_count:>6} "
+            f"{result.operations_per_second:>10.1f} {result.p50_ms:>8.3f} "
+            f"{result.p95_ms:>8.3f} {result.p99_ms:>8.3f}"
+        )
+    return lines
+
+
+def save_results(path: str, results: Dict[str, BenchmarkResult]) -> None:
+    """Stores results as a baseline file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as baseline_file:
+        json.dump(
+            {name: result.to_dict() for name, result in sorted(results.items())},
+            baseline_file,
+            indent=2,
+        )
+
+
+def load_results(path: str) -> Dict[str, dict]:
+    """Loads results stored by save_results."""
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def compare_results(
+    results: Dict[str, BenchmarkResult], baseline: Dict[str, dict]
+) -> List[dict]:
+    """Returns the change of median time and allocations of each benchmark against the baseline."""
+    comparison = []
+    for name, result in sorted(results.items()):
+        baseline_result = baseline.get(name)
+        if not baseline_result:
+            comparison.append({"name": name, "median_change_pct": None})
+            continue
+
+        comparison.append(
+            {
+                "name": name,
+                "baseline_median_ms": baseline_result["median_ms"],
+                "median_ms": result.median_ms,
+                "median_change_pct": _change_pct(
+                    baseline_result["median_ms"], result.median_ms
+                ),
+                "allocated_bytes_change_pct": _change_pct(
+                    baseline_result["allocated_bytes"], result.allocated_bytes
+                ),
+            }
+        )
+    return comparison
+
+
+def format_results(results: Dict[str, BenchmarkResult]) -> List[str]:
+    """Formats results as text table lines."""
+    width = max(len(name) for name in results)
+    lines = [
+        f"{'benchmark':<{width}} {'median ms':>10} {'min ms':>10} {'stddev':>8} "
+        f"{'ops/s':>10} {'alloc KiB':>10}"
+    ]
+    for name, result in sorted(results.items()):
+        lines.append(
+            f"{name:<{width}} {result.median_ms:>10.3f} {result.min_ms:>10.3f} "
+            f"{result.stddev_ms:>8.3f} {result.operations_per_second:>10.1f} "
+            f"{result.allocated_bytes / 1024:>10.1f}"
+        )
+    return lines
+
+
+def format_comparison(comparison: List[dict]) -> List[str]:
+    """Formats a comparison as text table lines."""
+    width = max(len(entry["name"]) for entry in comparison)
+    lines = [
+        f"{'benchmark':<{width}} {'baseline ms':>12} {'median ms':>10} {'change':>9} "
+        f"{'alloc change':>13}"
+    ]
+    for entry in comparison:
+        if entry["median_change_pct"] is None:
+            lines.append(f"{entry['name']:<{width}} {'(new)':>12}")
+            continue
+        lines.append(
+            f"{entry['name']:<{width}} {entry['baseline_median_ms']:>12.3f} "
+            f"{entry['median_ms']:>10.3f} {entry['median_change_pct']:>+8.1f}% "
+            f"{entry['allocated_bytes_change_pct']:>+12.1f}%"
+        )
+    return lines
+
+
+def _change_pct(baseline: float, current: float) -> float:
+    if not baseline:
+        return 0.0
+    return (current - baseline) * 100 / baseline
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Returns the nearest-rank percentile of sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
@@ -0,0 +1,255 @@
+"""
+Conformance of the UnitOfWork and ProductsQueryService adapters under
+concurrent load. Each scenario runs on a thread pool against every adapter,
+checks the invariants DynamoDB guarantees, and records throughput and latency
+percentiles for the per-adapter report. Single-threaded semantics are covered
+by app/adapters/tests/test_unit_of_work_contract.py.
+
+To check a new adapter, add it to the adapter fixture.
+"""
+import datetime
+import random
+import typing
+
+import pytest
+
+from app.adapters import (
+    dynamodb_query_service,
+    dynamodb_unit_of_work,
+    in_memory_query_service,
+    in_memory_unit_of_work,
+    sqlite_query_service,
+    sqlite_unit_of_work,
+)
+from app.domain.model import bulk_write, product, product_version, time_sortable_id
+from app.domain.ports.products_query_service import ProductsQueryService
+from app.domain.ports.unit_of_work import UnitOfWork
+
+OPERATIONS = 200
+WORKERS = 8
+HOT_PRODUCTS = 4
+PAGE_SIZE = 20
+CONFLICTING_TRANSACTION_EVERY = 4
+
+
+class Adapter(typing.NamedTuple):
+    name: str
+    create_unit_of_work: typing.Callable[[], UnitOfWork]
+    query_service: ProductsQueryService
+    workers: int
+
+
+@pytest.fixture(params=["dynamodb", "in_memory", "sqlite"])
+def adapter(request) -> Adapter:
+    if request.param == "dynamodb":
+        dynamodb_table = request.getfixturevalue("dynamodb_table")
+        dynamodb_client = request.getfixturevalue("dynamodb_client")
+        return Adapter(
+            name="dynamodb",
+            create_unit_of_work=lambda: dynamodb_unit_of_work.DynamoDBUnitOfWork(
+                dynamodb_table.name,
+                dynamodb_client,
+                transaction_max_items=25,  # moto allows at most 25 items per transaction
+                max_bulk_workers=1,
+                idempotency_cache_max_entries=0,
+            ),
+            query_service=dynamodb_query_service.DynamoDBProductsQueryService(
+                dynamodb_table.name,
+                dynamodb_client,
+                cursor_signing_key="benchmark-signing-key",
+            ),
+            # moto is not thread safe, and its timings are not DynamoDB's anyway.
+            workers=1,
+        )
+    if request.param == "in_memory":
+        in_memory_store = in_memory_unit_of_work.InMemoryStore()
+        return Adapter(
+            name="in_memory",
+            create_unit_of_work=lambda: in_memory_unit_of_work.InMemoryUnitOfWork(
+                in_memory_store
+            ),
+            query_service=in_memory_query_service.InMemoryProductsQueryService(
+                in_memory_store
+            ),
+            workers=WORKERS,
+        )
+    sqlite_store = sqlite_unit_of_work.SQLiteStore()
+    return Adapter(
+        name="sqlite",
+        create_unit_of_work=lambda: sqlite_unit_of_work.SQLiteUnitOfWork(sqlite_store),
+        query_service=sqlite_query_service.SQLiteProductsQueryService(sqlite_store),
+        workers=WORKERS,
+    )
+
+
+def _new_product(index: int, prefix: str = "product") -> product.Product:
+    create_date = (
+        datetime.datetime(2022, 10, 10, tzinfo=datetime.timezone.utc)
+        + datetime.timedelta(milliseconds=index)
+    ).isoformat()
+    return product.Product(
+        id=f"{prefix}-{index:05}",
+        name=f"conformance-product-{index}",
+        description="Conformance product description.",
+        createDate=create_date,
+        lastUpdateDate=create_date,
+    )
+
+
+def _add_products(adapter: Adapter, products: typing.List[product.Product]) -> None:
+    unit_of_work = adapter.create_unit_of_work()
+    with unit_of_work:
+        for product_obj in products:
+            unit_of_work.products.add(product_obj)
+        errors = unit_of_work.commit_bulk(bulk_write.BulkWriteMode.TRANSACTIONAL)
+    assert errors == [None] * len(products)
+
+
+def _list_all_product_ids(query_service: ProductsQueryService) -> typing.List[str]:
+    product_ids: typing.List[str] = []
+    next_token = None
+    while True:
+        page, next_token = query_service.list_products(
+            page_size=PAGE_SIZE, next_token=next_token
+        )
+        assert len(page) <= PAGE_SIZE
+        product_ids.extend(p.id for p in page)
+        if not next_token:
+            return product_ids
+
+
+def test_concurrent_creates_should_be_listed_completely_in_order(adapter, load_test):
+    products = [_new_product(i) for i in range(OPERATIONS)]
+    submission_order = list(products)
+    random.Random(0).shuffle(submission_order)
+
+    def create(product_obj: product.Product) -> None:
+        unit_of_work = adapter.create_unit_of_work()
+        with unit_of_work:
+            unit_of_work.products.add(product_obj)
+            unit_of_work.commit()
+
+    result = load_test(
+        adapter.name,
+        "create",
+        [lambda p=p: create(p) for p in submission_order],
+        adapter.workers,
+    )
+
+    assert result.errors == {}
+    assert _list_all_product_ids(adapter.query_service) == [p.id for p in products]
+
+
+def test_concurrent_reads_should_return_stored_products(adapter, load_test):
+    products = [_new_product(i) for i in range(OPERATIONS)]
+    _add_products(adapter, products)
+    product_ids = [p.id for p in products]
+    query_service = adapter.query_service
+
+    def get_product(index: int) -> None:
+        assert query_service.get_product_by_id(product_ids[index]) == products[index]
+
+    def get_products(start: int) -> None:
+        end = start + PAGE_SIZE
+        found = query_service.get_products_by_ids(product_ids[start:end])
+        assert [p.id for p in found] == product_ids[start:end]
+
+    def list_all_pages() -> None:
+        assert _list_all_product_ids(query_service) == product_ids
+
+    results = [
+        load_test(
+            adapter.name,
+            "get_product_by_id",
+            [lambda i=i: get_product(i) for i in range(OPERATIONS)],
+            adapter.workers,
+        ),
+        load_test(
+            adapter.name,
+            "get_products_by_ids",
+            [lambda i=i: get_products(i % (OPERATIONS - PAGE_SIZE)) for i in range(50)],
+            adapter.workers,
+        ),
+        load_test(
+            adapter.name,
+            "list_all_pages",
+            [list_all_pages] * (2 * WORKERS),
+            adapter.workers,
+        ),
+    ]
+
+    assert [result.errors for result in results] == [{}, {}, {}]
+
+
+def test_concurrent_conditional_updates_should_not_lose_updates(adapter, load_test):
+    hot_products = [_new_product(i, prefix="hot") for i in range(HOT_PRODUCTS)]
+    _add_products(adapter, hot_products)
+    succeeded: typing.List[str] = []
+
+    def update(index: int) -> None:
+        product_id = hot_products[index % HOT_PRODUCTS].id
+        unit_of_work = adapter.create_unit_of_work()
+        with unit_of_work:
+            current = unit_of_work.products.get(product_id)
+            unit_of_work.products.update_attributes(
+                product_id,
+                expected_version=current.version,
+                description=f"Update {index}.",
+            )
+            unit_of_work.commit()
+        succeeded.append(product_id)
+
+    result = load_test(
+        adapter.name,
+        "conditional_update",
+        [lambda i=i: update(i) for i in range(OPERATIONS)],
+        adapter.workers,
+    )
+
+    assert set(result.errors) <= {"WriteConflictException"}
+    assert result.error_count + len(succeeded) == OPERATIONS
+    for hot_product in hot_products:
+        stored = adapter.query_service.get_product_by_id(hot_product.id)
+        assert stored.version == succeeded.count(hot_product.id)
+
+
+def test_concurrent_transactions_should_be_atomic(adapter, load_test):
+    existing_product = _new_product(0, prefix="existing")
+    _add_products(adapter, [existing_product])
+    products = [_new_product(i) for i in range(OPERATIONS)]
+
+    def write(index: int) -> None:
+        unit_of_work = adapter.create_unit_of_work()
+        with unit_of_work:
+            unit_of_work.products.add(products[index])
+            unit_of_work.product_versions.add(
+                products[index].id,
+                product_version.ProductVersion(
+                    id=time_sortable_id.new_id(),
+                    name=products[index].name,
+                    version="0",
+                    createDate=products[index].createDate,
+                ),
+            )
+            if index % CONFLICTING_TRANSACTION_EVERY == 0:
+                unit_of_work.products.add(existing_product)
+            unit_of_work.commit()
+
+    result = load_test(
+        adapter.name,
+        "transaction",
+        [lambda i=i: write(i) for i in range(OPERATIONS)],
+        adapter.workers,
+    )
+
+    assert result.errors == {
+        "WriteConflictException": OPERATIONS // CONFLICTING_TRANSACTION_EVERY
+    }
+    for index, product_obj in enumerate(products):
+        committed = index % CONFLICTING_TRANSACTION_EVERY != 0
+        stored = adapter.query_service.get_product_by_id(product_obj.id)
+        versions, _ = adapter.query_service.list_product_versions(
+            product_obj.id, limit=10
+        )
+        assert (stored is not None) == committed
+        assert len(versions) == (1 if committed else 0)
@@ -0,0 +1,90 @@
+import datetime
+import uuid
+
+import pytest
+
+from app.adapters import dynamodb_query_service, dynamodb_unit_of_work
+from app.domain.model import product
+
+TRANSACTION_SIZE = 25
+
+
+@pytest.fixture(params=[100, 1000], ids=lambda size: f"table_size={size}")
+def product_ids(request, add_products):
+    return add_products(request.param)
+
+
+@pytest.fixture
+def unit_of_work(dynamodb_table, dynamodb_client):
+    return dynamodb_unit_of_work.DynamoDBUnitOfWork(
+        table_name=dynamodb_table.name, dynamodb_client=dynamodb_client
+    )
+
+
+@pytest.fixture
+def query_service(dynamodb_table, dynamodb_client):
+    return dynamodb_query_service.DynamoDBProductsQueryService(
+        table_name=dynamodb_table.name,
+        dynamodb_client=dynamodb_client,
+        cursor_signing_key="benchmark-signing-key",
+    )
+
+
+def _new_product() -> product.Product:
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    return product.Product(
+        id=str(uuid.uuid4()),
+        name="benchmark-product",
+        description="Benchmark product description.",
+        createDate=now,
+        lastUpdateDate=now,
+    )
+
+
+@pytest.mark.parametrize("products_per_commit", [1, TRANSACTION_SIZE])
+def test_unit_of_work_add_and_commit(
+    benchmark, unit_of_work, product_ids, products_per_commit
+):
+    def add_and_commit():
+        with unit_of_work:
+            for _ in range(products_per_commit):
+                unit_of_work.products.add(_new_product())
+            unit_of_work.commit()
+
+    benchmark(add_and_commit, operations_per_round=products_per_commit)
+
+
+def test_unit_of_work_update_and_commit(benchmark, unit_of_work, product_ids):
+    def update_and_commit():
+        with unit_of_work:
+            unit_of_work.products.update_attributes(
+                product_ids[0], description="Updated by benchmark."
+            )
+            unit_of_work.commit()
+
+    benchmark(update_and_commit)
+
+
+def test_query_service_get_product_by_id(benchmark, query_service, product_ids):
+    benchmark(lambda: query_service.get_product_by_id(product_ids[-1]))
+
+
+@pytest.mark.parametrize("page_size", [20, 100])
+def test_query_service_list_products(benchmark, query_service, product_ids, page_size):
+    benchmark(
+        lambda: query_service.list_products(page_size=page_size, next_token=None),
+        operations_per_round=page_size,
+    )
+
+
+def test_query_service_list_products_second_page(benchmark, query_service, product_ids):
+    _, next_token = query_service.list_products(page_size=20, next_token=None)
+
+    benchmark(lambda: query_service.list_products(page_size=20, next_token=next_token))
+
+
+def test_query_service_get_products_by_ids(benchmark, query_service, product_ids):
+    benchmark(
+        lambda: query_service.get_products_by_ids(product_ids[:100]),
+        operations_per_round=100,
+    )
@@ -0,0 +1,79 @@
+import pytest
+from boto3.dynamodb import types
+
+from app.adapters import dynamodb_unit_of_work
+from app.adapters.internal import attribute_value_codec
+from app.domain.model import product
+
+PRODUCT_COUNT = 1000
+
+
+@pytest.fixture
+def products():
+    return [
+        product.Product(
+            id=f"id-{i}",
+            name=f"benchmark-product-{i}",
+            description="Benchmark product description.",
+            createDate="2022-10-10T10:10:10+00:00",
+            lastUpdateDate="2022-10-11T10:10:10+00:00",
+        )
+        for i in range(PRODUCT_COUNT)
+    ]
+
+
+@pytest.fixture
+def items(products):
+    return [dynamodb_unit_of_work.PRODUCT_CODEC.marshal(p) for p in products]
+
+
+def test_marshal_products_with_boto3_type_serializer(benchmark, products):
+    type_serializer = types.TypeSerializer()
+
+    benchmark(
+        lambda: [
+            {name: type_serializer.serialize(value) for name, value in p.dict().items()}
+            for p in products
+        ],
+        operations_per_round=PRODUCT_COUNT,
+    )
+
+
+def test_marshal_products_with_model_codec(benchmark, products):
+    benchmark(
+        lambda: [dynamodb_unit_of_work.PRODUCT_CODEC.marshal(p) for p in products],
+        operations_per_round=PRODUCT_COUNT,
+    )
+
+
+def test_unmarshal_products_with_boto3_type_deserializer(benchmark, items):
+    type_deserializer = types.TypeDeserializer()
+
+    benchmark(
+        lambda: [
+            product.Product.parse_obj(
+                {
+                    name: type_deserializer.deserialize(value)
+                    for name, value in item.items()
+                }
+            )
+            for item in items
+        ],
+        operations_per_round=PRODUCT_COUNT,
+    )
+
+
+def test_unmarshal_products_with_model_codec(benchmark, items):
+    benchmark(
+        lambda: [dynamodb_unit_of_work.PRODUCT_CODEC.unmarshal(i) for i in items],
+        operations_per_round=PRODUCT_COUNT,
+    )
+
+
+def test_serialize_items_with_generic_codec(benchmark, products):
+    dicts = [p.dict() for p in products]
+
+    benchmark(
+        lambda: [attribute_value_codec.serialize_item(d) for d in dicts],
+        operations_per_round=PRODUCT_COUNT,
+    )
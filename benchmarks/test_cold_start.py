@@ -0,0 +1,75 @@
+import os
+import subprocess  # nosec B404
+import sys
+
+import pytest
+
+IMPORT_HANDLER_SCRIPT = "import app.entrypoints.api.handler"
+
+FIRST_REQUEST_SCRIPT = """
+import json
+
+import boto3
+import moto
+
+with moto.mock_dynamodb():
+    boto3.client("dynamodb").create_table(
+        TableName="benchmark-table",
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+    from app.entrypoints.api import handler
+
+    class LambdaContext:
+        function_name = "benchmark"
+        memory_limit_in_mb = 128
+        invoked_function_arn = "arn:aws:lambda:eu-west-1:809313241:function:benchmark"
+        aws_request_id = "52fdfc07-2182-154f-163f-5f0f9a621d72"
+
+    response = handler.handler(
+        {"path": "/products/missing", "httpMethod": "GET", "requestContext": {}},
+        LambdaContext(),
+    )
+    assert response["statusCode"] == 400, json.dumps(response)
+"""
+
+
+def _run_in_new_interpreter(script: str) -> None:
+    subprocess.run(  # nosec B603
+        [sys.executable, "-c", script],
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={
+            **os.environ,
+            "AWS_DEFAULT_REGION": "eu-central-1",
+            "AWS_ACCESS_KEY_ID": "benchmark",
+            "AWS_SECRET_ACCESS_KEY": "benchmark",
+            "TABLE_NAME": "benchmark-table",
+            "POWERTOOLS_LOG_LEVEL": "WARNING",
+        },
+        stdout=subprocess.DEVNULL,
+    )
+
+
+@pytest.mark.parametrize(
+    "script",
+    [
+        pytest.param("import sys", id="interpreter"),
+        pytest.param(IMPORT_HANDLER_SCRIPT, id="import_handler"),
+        pytest.param(FIRST_REQUEST_SCRIPT, id="import_handler_and_first_request"),
+    ],
+)
+def test_cold_start(benchmark, script):
+    """
+    Measures a new interpreter running the script. The interpreter case
+    is the floor to subtract from the others.
+    """
+    benchmark(lambda: _run_in_new_interpreter(script), rounds=5, warmup_rounds=1)
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from app.entrypoints.api import dependencies, handler
+
+SEEDED_PRODUCT_COUNT = 100
+
+
+@pytest.fixture
+def product_ids(add_products, monkeypatch):
+    monkeypatch.setattr(handler, "app_dependencies", dependencies.Dependencies())
+    return add_products(SEEDED_PRODUCT_COUNT)
+
+
+@pytest.fixture(params=["0", "1000"], ids=["uncached", "cached"])
+def products_cache(request, monkeypatch):
+    monkeypatch.setenv("PRODUCTS_CACHE_MAX_ENTRIES", request.param)
+    monkeypatch.setenv("PRODUCTS_CHANGE_FEED_POLL_SECONDS", "5")
+
+
+def _event(method: str, path: str, body=None, query=None) -> dict:
+    return {
+        "path": path,
+        "httpMethod": method,
+        "requestContext": {"requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef"},
+        "queryStringParameters": query,
+        "body": json.dumps(body) if body is not None else None,
+    }
+
+
+def _invoke(event: dict, lambda_context) -> dict:
+    response = handler.handler(event, lambda_context)
+    assert response["statusCode"] == 200, response["body"]
+    return response
+
+
+def test_get_product(benchmark, products_cache, product_ids, lambda_context):
+    event = _event("GET", f"/products/{product_ids[0]}")
+
+    benchmark(lambda: _invoke(event, lambda_context))
+
+
+def test_list_products(benchmark, products_cache, product_ids, lambda_context):
+    event = _event("GET", "/products", query={"pageSize": "20"})
+
+    benchmark(lambda: _invoke(event, lambda_context))
+
+
+def test_batch_get_products(benchmark, products_cache, product_ids, lambda_context):
+    event = _event("POST", "/products:batchGet", body={"ids": product_ids[:50]})
+
+    benchmark(lambda: _invoke(event, lambda_context), operations_per_round=50)
+
+
+def test_create_product(benchmark, product_ids, lambda_context):
+    event = _event(
+        "POST",
+        "/products",
+        body={"name": "benchmark-product", "description": "Created by benchmark."},
+    )
+
+    benchmark(lambda: _invoke(event, lambda_context))
+
+
+def test_update_product(benchmark, product_ids, lambda_context):
+    event = _event(
+        "PUT",
+        f"/products/{product_ids[0]}",
+        body={"name": "benchmark-product", "description": "Updated by benchmark."},
+    )
+
+    benchmark(lambda: _invoke(event, lambda_context))
+
+
+def test_delete_product(benchmark, product_ids, lambda_context):
+    remaining_ids = list(product_ids)
+
+    benchmark(
+        lambda: _invoke(
+            _event("DELETE", f"/products/{remaining_ids.pop()}"), lambda_context
+        ),
+        rounds=min(20, SEEDED_PRODUCT_COUNT - 2),
+    )
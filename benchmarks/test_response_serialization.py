@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from app.domain.model import product
+from app.entrypoints.api.model import api_model, serializers
+
+
+@pytest.fixture(params=[20, 1000], ids=lambda size: f"page_size={size}")
+def products(request):
+    return [
+        product.Product(
+            id=f"id-{i}",
+            name=f"benchmark-product-{i}",
+            description="Benchmark product description.",
+            createDate="2022-10-10T10:10:10+00:00",
+            lastUpdateDate="2022-10-11T10:10:10+00:00",
+        )
+        for i in range(request.param)
+    ]
+
+
+def _dumps(payload: dict) -> str:
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def test_list_products_response_via_api_models(benchmark, products):
+    def serialize():
+        products_parsed = [api_model.Product.parse_obj(p.dict()) for p in products]
+        response = api_model.ListProductsResponse(
+            products=products_parsed, nextToken="next-token"
+        )
+        return _dumps(response.dict())
+
+    benchmark(serialize, operations_per_round=len(products))
+
+
+def test_list_products_response_via_serializers(benchmark, products):
+    benchmark(
+        lambda: _dumps(serializers.list_products_response(products, "next-token")),
+        operations_per_round=len(products),
+    )
@@ -65,7 +65,7 @@ class AppProjectFunction(Construct):
                 cdk_nag.NagPackSuppression(
                     id="AwsSolutions-IAM5",
                     reason="Log stream IDs are autogenerated.",
-                    applies_to=["Resource::arn:aws:logs:<AWS::Region>:<AWS::AccountId>:log-group:simple-crud-api:log-stream:*"]
+                    applies_to=[f"Resource::arn:aws:logs:<AWS::Region>:<AWS::AccountId>:log-group:{function_name}:log-stream:*"]
                 ),
                 cdk_nag.NagPackSuppression(
                     id="AwsSolutions-IAM5",
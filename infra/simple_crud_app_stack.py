@@ -1,6 +1,13 @@
 import aws_cdk
 import constructs
-from aws_cdk import aws_apigateway, aws_dynamodb, aws_lambda
+from aws_cdk import (
+    aws_apigateway,
+    aws_dynamodb,
+    aws_lambda,
+    aws_lambda_event_sources,
+    aws_secretsmanager,
+    aws_sqs,
+)
 import cdk_nag
 from infra.app_constructs import app_project, app_project_api, layers
 
@@ -22,6 +29,17 @@ class SimpleCrudAppStack(aws_cdk.Stack):
                 name="SK", type=aws_dynamodb.AttributeType.STRING
             ),
             table_name="simple-crud-app-table",
+            stream=aws_dynamodb.StreamViewType.NEW_AND_OLD_IMAGES,
+            time_to_live_attribute="expiresAt",
+        )
+        table.add_global_secondary_index(
+            index_name="GSI1",
+            partition_key=aws_dynamodb.Attribute(
+                name="GSI1PK", type=aws_dynamodb.AttributeType.STRING
+            ),
+            sort_key=aws_dynamodb.Attribute(
+                name="GSI1SK", type=aws_dynamodb.AttributeType.STRING
+            ),
         )
 
         runtime = aws_lambda.Runtime.PYTHON_3_9
@@ -33,7 +51,52 @@ class SimpleCrudAppStack(aws_cdk.Stack):
             entry="app/libraries",
         )
 
+        # Queued product updates, merged per product by the updates consumer
+        product_updates_dlq = aws_sqs.Queue(
+            self,
+            "ProductUpdatesDeadLetterQueue",
+            encryption=aws_sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+        )
+        product_updates_queue = aws_sqs.Queue(
+            self,
+            "ProductUpdatesQueue",
+            encryption=aws_sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+            visibility_timeout=aws_cdk.Duration.seconds(60),
+            dead_letter_queue=aws_sqs.DeadLetterQueue(
+                max_receive_count=5, queue=product_updates_dlq
+            ),
+        )
+
+        # Key signing the pagination tokens of the API, read at init
+        cursor_signing_key = aws_secretsmanager.Secret(
+            self,
+            "CursorSigningKey",
+            generate_secret_string=aws_secretsmanager.SecretStringGenerator(
+                exclude_punctuation=True, password_length=64
+            ),
+        )
+
         api_entrypoint_name = "simple-crud-api"
+        stream_entrypoint_name = "simple-crud-stream"
+        product_updates_entrypoint_name = "simple-crud-product-updates"
+        api_environment = {
+            "TABLE_NAME": table.table_name,
+            "PRODUCTS_CHANGE_FEED_POLL_SECONDS": "5",
+            "PRODUCT_UPDATES_QUEUE_URL": product_updates_queue.queue_url,
+            "CURSOR_SIGNING_KEY_SECRET_ARN": cursor_signing_key.secret_arn,
+        }
+        stream_environment = {"TABLE_NAME": table.table_name}
+        product_updates_environment = {"TABLE_NAME": table.table_name}
+        if self.node.try_get_context("queuedProductUpdates") == "true":
+            api_environment["QUEUED_PRODUCT_UPDATES_ENABLED"] = "true"
+        if self.node.try_get_context("listingHead") == "true":
+            api_environment["LISTING_HEAD_ENABLED"] = "true"
+            stream_environment["LISTING_HEAD_ENABLED"] = "true"
+        if self.node.try_get_context("productVersionHistory") == "true":
+            api_environment["PRODUCT_VERSION_HISTORY_ENABLED"] = "true"
+            product_updates_environment["PRODUCT_VERSION_HISTORY_ENABLED"] = "true"
 
         self._app_project = app_project.AppProject(
             self,
@@ -43,16 +106,60 @@ class SimpleCrudAppStack(aws_cdk.Stack):
                     name=api_entrypoint_name,
                     root="app",
                     entry="app/entrypoints/api",
-                    environment={"TABLE_NAME": table.table_name},
+                    environment=api_environment,
+                    permissions=[
+                        lambda lambda_f: table.grant_read_write_data(lambda_f),
+                        lambda lambda_f: product_updates_queue.grant_send_messages(
+                            lambda_f
+                        ),
+                        lambda lambda_f: cursor_signing_key.grant_read(lambda_f),
+                    ],
+                ),
+                app_project.AppEntryPoint(
+                    name=stream_entrypoint_name,
+                    root="app",
+                    entry="app/entrypoints/stream",
+                    environment=stream_environment,
                     permissions=[
                         lambda lambda_f: table.grant_read_write_data(lambda_f)
                     ],
-                )
+                ),
+                app_project.AppEntryPoint(
+                    name=product_updates_entrypoint_name,
+                    root="app",
+                    entry="app/entrypoints/product_updates",
+                    environment=product_updates_environment,
+                    permissions=[
+                        lambda lambda_f: table.grant_read_write_data(lambda_f)
+                    ],
+                ),
             ],
             app_layers=[self._layer.libraries_layer],
             runtime=runtime,
         )
 
+        # Projections are refreshed once per batch of table changes
+        self._app_project.app_entries[stream_entrypoint_name].add_event_source(
+            aws_lambda_event_sources.DynamoEventSource(
+                table,
+                starting_position=aws_lambda.StartingPosition.TRIM_HORIZON,
+                batch_size=100,
+                max_batching_window=aws_cdk.Duration.seconds(1),
+                bisect_batch_on_error=True,
+                retry_attempts=5,
+            )
+        )
+
+        # Updates queued within the batching window are merged per product
+        self._app_project.app_entries[product_updates_entrypoint_name].add_event_source(
+            aws_lambda_event_sources.SqsEventSource(
+                product_updates_queue,
+                batch_size=100,
+                max_batching_window=aws_cdk.Duration.seconds(1),
+                report_batch_item_failures=True,
+            )
+        )
+
         # API Gateway
         self._api = app_project_api.AppProjectApi(
             self,
@@ -77,8 +184,30 @@ class SimpleCrudAppStack(aws_cdk.Stack):
         products_id.add_method(
             "DELETE", authorization_type=aws_apigateway.AuthorizationType.IAM
         )
+        products_id_versions = products_id.add_resource("versions")
+        products_id_versions.add_method(
+            "GET", authorization_type=aws_apigateway.AuthorizationType.IAM
+        )
+        products_id_history = products_id.add_resource("history")
+        products_id_history.add_method(
+            "GET", authorization_type=aws_apigateway.AuthorizationType.IAM
+        )
+
+        products_batch_get = self._api.api.root.add_resource("products:batchGet")
+        products_batch_get.add_method(
+            "POST", authorization_type=aws_apigateway.AuthorizationType.IAM
+        )
+
+        products_bulk = self._api.api.root.add_resource("products:bulk")
+        products_bulk.add_method(
+            "POST", authorization_type=aws_apigateway.AuthorizationType.IAM
+        )
 
         products.add_cors_preflight(allow_origins=["*"], allow_methods=["GET", "POST"])
+        products_batch_get.add_cors_preflight(
+            allow_origins=["*"], allow_methods=["POST"]
+        )
+        products_bulk.add_cors_preflight(allow_origins=["*"], allow_methods=["POST"])
         products_id.add_cors_preflight(
             allow_origins=["*"], allow_methods=["GET", "PUT", "DELETE"]
         )
@@ -104,6 +233,41 @@ class SimpleCrudAppStack(aws_cdk.Stack):
             ],
         )
 
+        cdk_nag.NagSuppressions.add_resource_suppressions_by_path(
+            stack=self,
+            path='/SimpleCrudAppStack/SimpleCrudAppApi/SimpleCrudAppRestApi/Default/products:batchGet/OPTIONS/Resource',
+            suppressions=[
+                cdk_nag.NagPackSuppression(
+                    id="AwsSolutions-APIG4",
+                    reason="OPTIONS methods have no authorization.",
+                ),
+            ],
+        )
+
+        cdk_nag.NagSuppressions.add_resource_suppressions_by_path(
+            stack=self,
+            path='/SimpleCrudAppStack/SimpleCrudAppApi/SimpleCrudAppRestApi/Default/products:bulk/OPTIONS/Resource',
+            suppressions=[
+                cdk_nag.NagPackSuppression(
+                    id="AwsSolutions-APIG4",
+                    reason="OPTIONS methods have no authorization.",
+                ),
+            ],
+        )
+
+        cdk_nag.NagSuppressions.add_resource_suppressions(
+            construct=cursor_signing_key,
+            suppressions=[
+                cdk_nag.NagPackSuppression(
+                    id="AwsSolutions-SMG4",
+                    reason=(
+                        "Rotating the key would invalidate the pagination tokens "
+                        "already handed out."
+                    ),
+                ),
+            ],
+        )
+
         cdk_nag.NagSuppressions.add_resource_suppressions(
             construct=self._api,
             apply_to_children=True,